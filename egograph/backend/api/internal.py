@@ -0,0 +1,36 @@
+"""運用向けの内部 API エンドポイント。"""
+
+import logging
+
+from fastapi import APIRouter, Depends, Query
+
+from backend.config import BackendConfig
+from backend.dependencies import get_config, verify_api_key_docs
+from backend.infrastructure.database import get_data_version, query_result_cache
+from backend.usecases.warmup import refresh_warm_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1/internal", tags=["internal"])
+
+
+@router.post("/warmup")
+def warmup_endpoint(
+    force: bool = Query(False, description="バージョンが同じでも warm-up をやり直す"),
+    config: BackendConfig = Depends(get_config),
+    _api_key: None = Depends(verify_api_key_docs),
+):
+    """データバージョンを確認し、変わっていればクエリキャッシュを warm-up します。
+
+    pipelines の local mirror sync / compaction 完了後に呼び出すと、
+    定期監視を待たずに新しいデータバージョンへ切り替えられます。
+
+    Returns:
+        dict: 現在のデータバージョンと warm-up 結果（実行しなかった場合は null）
+    """
+    result = refresh_warm_cache(config, force=force)
+    return {
+        "data_version": get_data_version(config.r2),
+        "active_version": query_result_cache.active_version,
+        "warmup": result.to_dict() if result else None,
+    }
@@ -3,7 +3,7 @@
 import logging
 import os
 
-from egograph_paths import PARQUET_DATA_DIR
+from egograph_paths import ANALYTICS_DUCKDB_PATH, PARQUET_DATA_DIR
 from pydantic import BaseModel, Field, SecretStr, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -23,6 +23,8 @@ class R2Config(BaseModel):
     events_path: str = "events/"
     master_path: str = "master/"
     local_parquet_root: str | None = str(PARQUET_DATA_DIR)
+    # pipelines が local mirror から更新する DuckDB warehouse（read-only で参照）
+    local_warehouse_path: str | None = str(ANALYTICS_DUCKDB_PATH)
 
 
 class BackendConfig(BaseSettings):
@@ -54,6 +56,24 @@ class BackendConfig(BaseSettings):
     # MCP transport security: テスト環境向けにHost許可リストを設定可能
     mcp_allowed_hosts: list[str] = Field([], alias="MCP_ALLOWED_HOSTS")
 
+    # データバージョン変化時のクエリ warm-up
+    warmup_enabled: bool = Field(True, alias="BACKEND_WARMUP_ENABLED")
+    warmup_interval_seconds: float = Field(
+        60.0, alias="BACKEND_WARMUP_INTERVAL_SECONDS"
+    )
+    warmup_queries: list[str] = Field(
+        [
+            "spotify_top_tracks",
+            "spotify_listening_stats",
+            "github_activity_stats",
+            "browser_top_domains",
+        ],
+        alias="BACKEND_WARMUP_QUERIES",
+    )
+    warmup_window_days: list[int] = Field(
+        [7, 30, 365], alias="BACKEND_WARMUP_WINDOW_DAYS"
+    )
+
     @classmethod
     def from_env(cls) -> "BackendConfig":
         """環境変数から設定をロードします。
@@ -134,6 +154,7 @@ class R2Settings(BaseSettings):
     events_path: str = Field("events/", alias="R2_EVENTS_PATH")
     master_path: str = Field("master/", alias="R2_MASTER_PATH")
     local_parquet_root: str | None = str(PARQUET_DATA_DIR)
+    local_warehouse_path: str | None = str(ANALYTICS_DUCKDB_PATH)
 
     def to_config(self) -> R2Config:
         return R2Config(
@@ -145,4 +166,5 @@ class R2Settings(BaseSettings):
             events_path=self.events_path,
             master_path=self.master_path,
             local_parquet_root=self.local_parquet_root,
+            local_warehouse_path=self.local_warehouse_path,
         )
@@ -3,6 +3,8 @@
 DuckDB 接続管理とクエリユーティリティを提供します。
 """
 
+from egograph_mirror_layout import read_current_version, resolve_mirror_root
+
 from backend.infrastructure.database.browser_history_queries import (
     BrowserHistoryQueryParams,
     get_page_views,
@@ -20,7 +22,9 @@ from backend.infrastructure.database.github_queries import (
     get_repositories,
 )
 from backend.infrastructure.database.parquet_paths import (
+    DatasetSource,
     build_dataset_glob,
+    build_dataset_source,
     build_partition_paths,
 )
 from backend.infrastructure.database.queries import (
@@ -31,6 +35,12 @@ from backend.infrastructure.database.queries import (
     get_top_tracks,
     search_tracks_by_name,
 )
+from backend.infrastructure.database.result_cache import (
+    QueryResultCache,
+    cached_query,
+    get_data_version,
+    query_result_cache,
+)
 
 __all__ = [
     # R2 Data Lake (DuckDB)
@@ -48,6 +58,15 @@ __all__ = [
     "search_tracks_by_name",
     "build_partition_paths",
     "build_dataset_glob",
+    "build_dataset_source",
+    "DatasetSource",
+    "read_current_version",
+    "resolve_mirror_root",
+    # Query result cache
+    "QueryResultCache",
+    "cached_query",
+    "get_data_version",
+    "query_result_cache",
     # GitHub
     "GitHubQueryParams",
     "get_prs_parquet_path",
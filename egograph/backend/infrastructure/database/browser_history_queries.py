@@ -8,8 +8,12 @@ import duckdb
 
 from backend.config import R2Config
 from backend.constants import DEFAULT_PAGE_VIEWS_LIMIT, DEFAULT_TOP_DOMAINS_LIMIT
-from backend.infrastructure.database.parquet_paths import build_partition_paths
+from backend.infrastructure.database.parquet_paths import (
+    DatasetSource,
+    build_dataset_source,
+)
 from backend.infrastructure.database.queries import execute_query
+from backend.infrastructure.database.result_cache import cached_query
 
 BROWSER_HISTORY_PAGE_VIEWS_PARTITION_PATH = (
     "s3://{bucket}/{events_path}browser_history/page_views/"
@@ -57,20 +61,26 @@ def _generate_browser_history_partition_paths(
     return paths
 
 
-def _resolve_partition_paths(params: BrowserHistoryQueryParams) -> list[str]:
+def _resolve_page_views_source(params: BrowserHistoryQueryParams) -> DatasetSource:
     if params.r2_config is not None:
-        return build_partition_paths(
+        return build_dataset_source(
+            params.conn,
             params.r2_config,
             data_domain="events",
             dataset_path="browser_history/page_views",
             start_date=params.start_date,
             end_date=params.end_date,
         )
-    return _generate_browser_history_partition_paths(
-        params.bucket,
-        params.events_path,
-        params.start_date,
-        params.end_date,
+    return DatasetSource(
+        sql="read_parquet(?)",
+        params=[
+            _generate_browser_history_partition_paths(
+                params.bucket,
+                params.events_path,
+                params.start_date,
+                params.end_date,
+            )
+        ],
     )
 
 
@@ -82,8 +92,8 @@ def get_page_views(
     limit: int = DEFAULT_PAGE_VIEWS_LIMIT,
 ) -> list[dict[str, Any]]:
     """指定期間のpage view一覧を取得する。"""
-    partition_paths = _resolve_partition_paths(params)
-    sql = """
+    source = _resolve_page_views_source(params)
+    sql = f"""
         SELECT
             page_view_id,
             started_at_utc,
@@ -94,7 +104,7 @@ def get_page_views(
             profile,
             transition,
             visit_span_count
-        FROM read_parquet(?)
+        FROM {source.sql}
         WHERE started_at_utc::DATE BETWEEN ? AND ?
           AND (? IS NULL OR browser = ?)
           AND (? IS NULL OR profile = ?)
@@ -105,7 +115,7 @@ def get_page_views(
         params.conn,
         sql,
         [
-            partition_paths,
+            *source.params,
             params.start_date,
             params.end_date,
             browser,
@@ -117,6 +127,7 @@ def get_page_views(
     )
 
 
+@cached_query
 def get_top_domains(
     params: BrowserHistoryQueryParams,
     *,
@@ -125,13 +136,13 @@ def get_top_domains(
     limit: int = DEFAULT_TOP_DOMAINS_LIMIT,
 ) -> list[dict[str, Any]]:
     """指定期間のdomain別ランキングを取得する。"""
-    partition_paths = _resolve_partition_paths(params)
-    sql = """
+    source = _resolve_page_views_source(params)
+    sql = f"""
         WITH filtered_page_views AS (
             SELECT
                 NULLIF(regexp_extract(url, '^[a-zA-Z]+://([^/?#]+)', 1), '') AS domain,
                 url
-            FROM read_parquet(?)
+            FROM {source.sql}
             WHERE started_at_utc::DATE BETWEEN ? AND ?
               AND (? IS NULL OR browser = ?)
               AND (? IS NULL OR profile = ?)
@@ -150,7 +161,7 @@ def get_top_domains(
         params.conn,
         sql,
         [
-            partition_paths,
+            *source.params,
             params.start_date,
             params.end_date,
             browser,
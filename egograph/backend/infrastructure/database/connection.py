@@ -2,15 +2,18 @@
 
 ステートレス設計：:memory:モードで毎回新規接続を作成し、
 R2のParquetファイルを直接クエリします。
+local warehouse が存在する場合は read-only で ATTACH します。
 """
 
 import hashlib
 import logging
+from pathlib import Path
 from urllib.parse import urlparse
 
 import duckdb
 
 from backend.config import R2Config
+from backend.infrastructure.database.parquet_paths import WAREHOUSE_ALIAS
 
 logger = logging.getLogger(__name__)
 
@@ -125,6 +128,8 @@ class DuckDBConnection:
             )
             logger.debug("Configured R2 secret for endpoint: %s", endpoint)
 
+            self._attach_warehouse()
+
         except Exception:
             logger.exception("Failed to configure DuckDB connection")
             if self.conn:
@@ -134,6 +139,26 @@ class DuckDBConnection:
 
         return self.conn
 
+    def _attach_warehouse(self) -> None:
+        """local warehouse を read-only で ATTACH する。
+
+        ファイルが無い・開けない場合は何もせず、
+        クエリは Parquet 直読みにフォールバックします。
+        """
+        warehouse_path = self.r2_config.local_warehouse_path
+        if not warehouse_path or not Path(warehouse_path).exists():
+            return
+        escaped = str(warehouse_path).replace("'", "''")
+        try:
+            self.conn.execute(f"ATTACH '{escaped}' AS {WAREHOUSE_ALIAS} (READ_ONLY);")
+            logger.debug("Attached local warehouse: %s", warehouse_path)
+        except duckdb.Error:
+            logger.warning(
+                "Failed to attach local warehouse, falling back to parquet: %s",
+                warehouse_path,
+                exc_info=True,
+            )
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """コンテキストマネージャーの終了。
 
@@ -9,7 +9,11 @@ import duckdb
 import numpy as np
 
 from backend.config import R2Config
-from backend.infrastructure.database.parquet_paths import build_partition_paths
+from backend.infrastructure.database.parquet_paths import (
+    DatasetSource,
+    build_dataset_source,
+)
+from backend.infrastructure.database.result_cache import cached_query
 
 logger = logging.getLogger(__name__)
 
@@ -148,31 +152,43 @@ def _generate_commit_partition_paths(
     )
 
 
-def _resolve_pr_partition_paths(params: GitHubQueryParams) -> list[str]:
+def _resolve_pr_source(params: GitHubQueryParams) -> DatasetSource:
     if params.r2_config is not None:
-        return build_partition_paths(
+        return build_dataset_source(
+            params.conn,
             params.r2_config,
             data_domain="events",
             dataset_path="github/pull_requests",
             start_date=params.start_date,
             end_date=params.end_date,
         )
-    return _generate_pr_partition_paths(
-        params.bucket, params.events_path, params.start_date, params.end_date
+    return DatasetSource(
+        sql="read_parquet(?)",
+        params=[
+            _generate_pr_partition_paths(
+                params.bucket, params.events_path, params.start_date, params.end_date
+            )
+        ],
     )
 
 
-def _resolve_commit_partition_paths(params: GitHubQueryParams) -> list[str]:
+def _resolve_commit_source(params: GitHubQueryParams) -> DatasetSource:
     if params.r2_config is not None:
-        return build_partition_paths(
+        return build_dataset_source(
+            params.conn,
             params.r2_config,
             data_domain="events",
             dataset_path="github/commits",
             start_date=params.start_date,
             end_date=params.end_date,
         )
-    return _generate_commit_partition_paths(
-        params.bucket, params.events_path, params.start_date, params.end_date
+    return DatasetSource(
+        sql="read_parquet(?)",
+        params=[
+            _generate_commit_partition_paths(
+                params.bucket, params.events_path, params.start_date, params.end_date
+            )
+        ],
     )
 
 
@@ -265,9 +281,9 @@ def get_pull_requests(
             ...
         ]
     """
-    partition_paths = _resolve_pr_partition_paths(params)
+    source = _resolve_pr_source(params)
 
-    query = """
+    query = f"""
         SELECT
             pr_event_id,
             pr_key,
@@ -289,11 +305,11 @@ def get_pull_requests(
             changed_files_count,
             reviews_count,
             commits_count
-        FROM read_parquet(?)
+        FROM {source.sql}
         WHERE updated_at_utc::DATE BETWEEN ? AND ?
     """
 
-    query_params: list[Any] = [partition_paths, params.start_date, params.end_date]
+    query_params: list[Any] = [*source.params, params.start_date, params.end_date]
 
     if owner:
         query += " AND owner = ?"
@@ -358,9 +374,9 @@ def get_commits(
             ...
         ]
     """
-    partition_paths = _resolve_commit_partition_paths(params)
+    source = _resolve_commit_source(params)
 
-    query = """
+    query = f"""
         SELECT
             commit_event_id,
             owner,
@@ -372,11 +388,11 @@ def get_commits(
             changed_files_count,
             additions,
             deletions
-        FROM read_parquet(?)
+        FROM {source.sql}
         WHERE committed_at_utc::DATE BETWEEN ? AND ?
     """
 
-    query_params: list[Any] = [partition_paths, params.start_date, params.end_date]
+    query_params: list[Any] = [*source.params, params.start_date, params.end_date]
 
     if owner:
         query += " AND owner = ?"
@@ -500,6 +516,7 @@ def get_repositories(
     return execute_query(params.conn, query, query_params)
 
 
+@cached_query
 def get_activity_stats(
     params: GitHubQueryParams,
     granularity: str = "day",
@@ -527,8 +544,8 @@ def get_activity_stats(
     Raises:
         ValueError: granularityが無効な場合
     """
-    pr_partition_paths = _resolve_pr_partition_paths(params)
-    commit_partition_paths = _resolve_commit_partition_paths(params)
+    pr_source = _resolve_pr_source(params)
+    commit_source = _resolve_commit_source(params)
 
     date_format_map = {
         "day": "%Y-%m-%d",
@@ -559,7 +576,7 @@ def get_activity_stats(
                     MAX(pr.deletions) FILTER (WHERE pr.action = 'merged'),
                     0
                 ) as deletions
-            FROM read_parquet(?) pr
+            FROM {pr_source.sql} pr
             WHERE pr.updated_at_utc::DATE BETWEEN ? AND ?
             GROUP BY period, pr.pr_key
         ),
@@ -579,7 +596,7 @@ def get_activity_stats(
                 COUNT(*) as commits_count,
                 COALESCE(SUM(c.additions), 0) as commit_additions,
                 COALESCE(SUM(c.deletions), 0) as commit_deletions
-            FROM read_parquet(?) c
+            FROM {commit_source.sql} c
             WHERE c.committed_at_utc::DATE BETWEEN ? AND ?
             GROUP BY period
         )
@@ -606,10 +623,10 @@ def get_activity_stats(
         params.conn,
         query,
         [
-            pr_partition_paths,
+            *pr_source.params,
             params.start_date,
             params.end_date,
-            commit_partition_paths,
+            *commit_source.params,
             params.start_date,
             params.end_date,
         ],
@@ -646,10 +663,10 @@ def get_repo_summary_stats(
             ...
         ]
     """
-    pr_partition_paths = _resolve_pr_partition_paths(params)
-    commit_partition_paths = _resolve_commit_partition_paths(params)
+    pr_source = _resolve_pr_source(params)
+    commit_source = _resolve_commit_source(params)
 
-    query = """
+    query = f"""
         WITH pr_per_key AS (
             SELECT
                 pr.owner,
@@ -665,7 +682,7 @@ def get_repo_summary_stats(
                     0
                 ) as deletions,
                 MAX(CASE WHEN pr.action = 'merged' THEN 1 ELSE 0 END) as is_merged
-            FROM read_parquet(?) pr
+            FROM {pr_source.sql} pr
             WHERE pr.updated_at_utc::DATE BETWEEN ? AND ?
             GROUP BY pr.owner, pr.repo, pr.repo_full_name, pr.pr_key
         ),
@@ -691,7 +708,7 @@ def get_repo_summary_stats(
                 COALESCE(SUM(c.additions), 0) as commit_additions,
                 COALESCE(SUM(c.deletions), 0) as commit_deletions,
                 MAX(c.committed_at_utc) as last_commit_at
-            FROM read_parquet(?) c
+            FROM {commit_source.sql} c
             WHERE c.committed_at_utc::DATE BETWEEN ? AND ?
             GROUP BY c.owner, c.repo, c.repo_full_name
         )
@@ -714,10 +731,10 @@ def get_repo_summary_stats(
     """
 
     query_params: list[Any] = [
-        pr_partition_paths,
+        *pr_source.params,
         params.start_date,
         params.end_date,
-        commit_partition_paths,
+        *commit_source.params,
         params.start_date,
         params.end_date,
     ]
@@ -3,10 +3,16 @@
 from dataclasses import dataclass
 from datetime import date
 from pathlib import Path
+from typing import Any
+
+import duckdb
+from egograph_mirror_layout import resolve_mirror_root
 
 from backend.config import R2Config
 
 COMPACTED_ROOT = "compacted/"
+# DuckDBConnection が local warehouse を ATTACH するときの別名
+WAREHOUSE_ALIAS = "warehouse"
 
 
 @dataclass(frozen=True)
@@ -17,6 +23,14 @@ class PartitionRef:
     month: int
 
 
+@dataclass(frozen=True)
+class DatasetSource:
+    """FROM 句に埋め込むデータソース SQL とそのパラメータ。"""
+
+    sql: str
+    params: list[Any]
+
+
 def _normalize_path(path: str) -> str:
     return path.rstrip("/") + "/"
 
@@ -37,13 +51,13 @@ def _iter_months(start_date: date, end_date: date) -> list[PartitionRef]:
 
 
 def _build_local_compacted_file(
-    local_root: str,
+    local_root: Path,
     data_domain: str,
     dataset_path: str,
     partition: PartitionRef,
 ) -> Path:
     return (
-        Path(local_root)
+        local_root
         / "compacted"
         / data_domain
         / dataset_path
@@ -74,12 +88,17 @@ def build_partition_paths(
 ) -> list[str]:
     """Build month-scoped parquet paths for compacted datasets."""
     paths: list[str] = []
+    mirror_root = (
+        resolve_mirror_root(config.local_parquet_root)
+        if config.local_parquet_root
+        else None
+    )
     for partition in _iter_months(start_date, end_date):
         local_path = (
             _build_local_compacted_file(
-                config.local_parquet_root, data_domain, dataset_path, partition
+                mirror_root, data_domain, dataset_path, partition
             )
-            if config.local_parquet_root
+            if mirror_root
             else None
         )
         if local_path and local_path.exists():
@@ -101,7 +120,10 @@ def build_dataset_glob(
     """Build all-data glob for compacted datasets."""
     if config.local_parquet_root:
         local_root = (
-            Path(config.local_parquet_root) / "compacted" / data_domain / dataset_path
+            resolve_mirror_root(config.local_parquet_root)
+            / "compacted"
+            / data_domain
+            / dataset_path
         )
         if any(local_root.rglob("*.parquet")):
             return str(local_root / "**" / "*.parquet")
@@ -110,3 +132,75 @@ def build_dataset_glob(
         f"s3://{config.bucket_name}/{COMPACTED_ROOT}{data_domain}/"
         f"{dataset_path}/**/*.parquet"
     )
+
+
+def warehouse_table_name(data_domain: str, dataset_path: str) -> str:
+    """compacted dataset に対応する warehouse テーブルの完全修飾名を返す。
+
+    pipelines の local warehouse refresh と同じ命名規則
+    （schema = data_domain、table = dataset_path の / を _ に置換）に従う。
+    """
+    table = dataset_path.strip("/").replace("/", "_")
+    return f'{WAREHOUSE_ALIAS}."{data_domain}"."{table}"'
+
+
+def _has_warehouse_table(
+    conn: duckdb.DuckDBPyConnection, data_domain: str, dataset_path: str
+) -> bool:
+    table = dataset_path.strip("/").replace("/", "_")
+    try:
+        row = conn.execute(
+            """
+            SELECT 1 FROM duckdb_tables()
+            WHERE database_name = ? AND schema_name = ? AND table_name = ?
+            """,
+            [WAREHOUSE_ALIAS, data_domain, table],
+        ).fetchone()
+    except duckdb.Error:
+        return False
+    return row is not None
+
+
+def build_dataset_source(
+    conn: duckdb.DuckDBPyConnection,
+    config: R2Config,
+    data_domain: str,
+    dataset_path: str,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> DatasetSource:
+    """compacted dataset を読むための FROM 句を組み立てる。
+
+    local warehouse が ATTACH 済みでテーブルがあればネイティブテーブルを、
+    無ければ月パーティション（期間指定なしは全件 glob）の Parquet を参照する。
+    """
+    if _has_warehouse_table(conn, data_domain, dataset_path):
+        table = warehouse_table_name(data_domain, dataset_path)
+        if start_date is None or end_date is None:
+            return DatasetSource(
+                sql=f"(SELECT * EXCLUDE (_year, _month) FROM {table})", params=[]
+            )
+        return DatasetSource(
+            sql=(
+                f"(SELECT * EXCLUDE (_year, _month) FROM {table} "
+                "WHERE _year * 12 + _month BETWEEN ? AND ?)"
+            ),
+            params=[
+                start_date.year * 12 + start_date.month,
+                end_date.year * 12 + end_date.month,
+            ],
+        )
+
+    if start_date is None or end_date is None:
+        return DatasetSource(
+            sql="read_parquet(?)",
+            params=[build_dataset_glob(config, data_domain, dataset_path)],
+        )
+    return DatasetSource(
+        sql="read_parquet(?)",
+        params=[
+            build_partition_paths(
+                config, data_domain, dataset_path, start_date, end_date
+            )
+        ],
+    )
@@ -14,9 +14,10 @@ from backend.constants import (
     MS_TO_MINUTES_FACTOR,
 )
 from backend.infrastructure.database.parquet_paths import (
-    build_dataset_glob,
-    build_partition_paths,
+    DatasetSource,
+    build_dataset_source,
 )
+from backend.infrastructure.database.result_cache import cached_query
 
 logger = logging.getLogger(__name__)
 
@@ -97,17 +98,23 @@ def _generate_partition_paths(
     return paths
 
 
-def _resolve_partition_paths(params: QueryParams) -> list[str]:
+def _resolve_plays_source(params: QueryParams) -> DatasetSource:
     if params.r2_config is not None:
-        return build_partition_paths(
+        return build_dataset_source(
+            params.conn,
             params.r2_config,
             data_domain="events",
             dataset_path="spotify/plays",
             start_date=params.start_date,
             end_date=params.end_date,
         )
-    return _generate_partition_paths(
-        params.bucket, params.events_path, params.start_date, params.end_date
+    return DatasetSource(
+        sql="read_parquet(?)",
+        params=[
+            _generate_partition_paths(
+                params.bucket, params.events_path, params.start_date, params.end_date
+            )
+        ],
     )
 
 
@@ -132,6 +139,7 @@ def execute_query(
     return df.to_dict(orient="records")
 
 
+@cached_query
 def get_top_tracks(
     params: QueryParams, limit: int = DEFAULT_TOP_TRACKS_LIMIT
 ) -> list[dict[str, Any]]:
@@ -153,9 +161,9 @@ def get_top_tracks(
             ...
         ]
     """
-    partition_paths = _resolve_partition_paths(params)
+    source = _resolve_plays_source(params)
 
-    query = """
+    query = f"""
         SELECT
             track_name,
             CASE
@@ -163,7 +171,7 @@ def get_top_tracks(
             END as artist,
             COUNT(*) as play_count,
             SUM(ms_played) / ? as total_minutes
-        FROM read_parquet(?)
+        FROM {source.sql}
         WHERE played_at_utc::DATE BETWEEN ? AND ?
         GROUP BY track_name, artist
         ORDER BY play_count DESC
@@ -180,7 +188,7 @@ def get_top_tracks(
         query,
         [
             MS_TO_MINUTES_FACTOR,
-            partition_paths,
+            *source.params,
             params.start_date,
             params.end_date,
             limit,
@@ -188,6 +196,7 @@ def get_top_tracks(
     )
 
 
+@cached_query
 def get_listening_stats(
     params: QueryParams, granularity: str = "day"
 ) -> list[dict[str, Any]]:
@@ -212,7 +221,7 @@ def get_listening_stats(
     Raises:
         ValueError: granularityが無効な場合
     """
-    partition_paths = _resolve_partition_paths(params)
+    source = _resolve_plays_source(params)
 
     # 粒度に応じた期間フォーマットを選択
     date_format_map = {
@@ -237,7 +246,7 @@ def get_listening_stats(
             SUM(ms_played) as total_ms,
             COUNT(*) as track_count,
             COUNT(DISTINCT track_id) as unique_tracks
-        FROM read_parquet(?)
+        FROM {source.sql}
         WHERE played_at_utc::DATE BETWEEN ? AND ?
         GROUP BY period
         ORDER BY period ASC
@@ -250,7 +259,7 @@ def get_listening_stats(
         granularity,
     )
     return execute_query(
-        params.conn, query, [partition_paths, params.start_date, params.end_date]
+        params.conn, query, [*source.params, params.start_date, params.end_date]
     )
 
 
@@ -277,18 +286,22 @@ def search_tracks_by_name(
         ]
     """
     # 全期間を対象とするため、ワイルドカードパスを使用
-    parquet_path = (
-        build_dataset_glob(
+    source = (
+        build_dataset_source(
+            params.conn,
             params.r2_config,
             data_domain="events",
             dataset_path="spotify/plays",
         )
         if params.r2_config is not None
-        else get_parquet_path(params.bucket, params.events_path)
+        else DatasetSource(
+            sql="read_parquet(?)",
+            params=[get_parquet_path(params.bucket, params.events_path)],
+        )
     )
 
     search_pattern = f"%{query}%"
-    sql = """
+    sql = f"""
         SELECT
             track_name,
             CASE
@@ -296,7 +309,7 @@ def search_tracks_by_name(
             END as artist,
             COUNT(*) as play_count,
             MAX(played_at_utc)::VARCHAR as last_played
-        FROM read_parquet(?)
+        FROM {source.sql}
         WHERE LOWER(track_name) LIKE LOWER(?)
            OR (len(artist_names) >= 1 AND LOWER(artist_names[1]) LIKE LOWER(?))
         GROUP BY track_name, artist
@@ -306,5 +319,5 @@ def search_tracks_by_name(
 
     logger.debug("Searching tracks with query: %s, limit=%s", query, limit)
     return execute_query(
-        params.conn, sql, [parquet_path, search_pattern, search_pattern, limit]
+        params.conn, sql, [*source.params, search_pattern, search_pattern, limit]
     )
@@ -0,0 +1,148 @@
+"""データバージョン単位のクエリ結果キャッシュ。
+
+local mirror の世代番号と warehouse ファイルの更新時刻から「データバージョン」を作り、
+集計クエリの結果をそのバージョンに紐づけて保持します。
+バージョンが切り替わるまで同じ入力には同じ結果を返すため、
+warm-up 済みのクエリはリクエスト時に DuckDB を開かずに応答できます。
+"""
+
+import functools
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, TypeVar
+
+from egograph_mirror_layout import read_current_version
+
+from backend.config import R2Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+
+F = TypeVar("F", bound=Callable[..., list[dict[str, Any]]])
+
+# warm-up 中は公開前の新バージョンにキャッシュを書き込む
+_warming_version: ContextVar[str | None] = ContextVar("_warming_version", default=None)
+
+
+def get_data_version(config: R2Config | None) -> str | None:
+    """現在のデータバージョンを返す。local mirror の世代が無ければ None。"""
+    if config is None or not config.local_parquet_root:
+        return None
+    mirror_version = read_current_version(config.local_parquet_root)
+    if mirror_version is None:
+        return None
+    warehouse = config.local_warehouse_path
+    if warehouse and Path(warehouse).exists():
+        return f"{mirror_version}:{Path(warehouse).stat().st_mtime_ns}"
+    return str(mirror_version)
+
+
+class QueryResultCache:
+    """バージョンごとの LRU 結果キャッシュ（スレッドセーフ）。
+
+    ``activate`` されたバージョンだけが通常リクエストから参照されます。
+    バージョンが None の間はキャッシュを使いません。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple[str, Hashable], list[dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._active_version: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def active_version(self) -> str | None:
+        """リクエストに使うデータバージョン。"""
+        with self._lock:
+            return self._active_version
+
+    def activate(self, version: str | None) -> None:
+        """バージョンを切り替え、他バージョンのエントリを捨てる。"""
+        with self._lock:
+            self._active_version = version
+            for key in [k for k in self._entries if k[0] != version]:
+                del self._entries[key]
+
+    def get(self, version: str, key: Hashable) -> list[dict[str, Any]] | None:
+        with self._lock:
+            value = self._entries.get((version, key))
+            if value is not None:
+                self._entries.move_to_end((version, key))
+            return value
+
+    def put(self, version: str, key: Hashable, value: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[(version, key)] = value
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._active_version = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @contextmanager
+    def warming(self, version: str) -> Iterator[None]:
+        """この文脈内のクエリ結果を version に書き込む（warm-up 用）。"""
+        token = _warming_version.set(version)
+        try:
+            yield
+        finally:
+            _warming_version.reset(token)
+
+
+query_result_cache = QueryResultCache()
+
+
+def _params_key(params: Any) -> tuple[Any, ...]:
+    # conn と r2_config は結果に影響しないため除外する
+    return (
+        getattr(params, "bucket", None),
+        getattr(params, "events_path", None),
+        getattr(params, "master_path", None),
+        params.start_date,
+        params.end_date,
+    )
+
+
+def cached_query(fn: F) -> F:
+    """第1引数にクエリパラメータを取るクエリ関数の結果をキャッシュする。"""
+    signature = inspect.signature(fn)
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(params: Any, *args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        warming_version = _warming_version.get()
+        version = warming_version or query_result_cache.active_version
+        if version is None:
+            return fn(params, *args, **kwargs)
+        bound = signature.bind(params, *args, **kwargs)
+        bound.apply_defaults()
+        options = tuple(
+            (key, value) for key, value in bound.arguments.items() if key != "params"
+        )
+        key = (name, _params_key(params), options)
+        # warm-up 中は常に再計算して上書きする
+        if warming_version is None:
+            cached = query_result_cache.get(version, key)
+            if cached is not None:
+                return [dict(row) for row in cached]
+        result = fn(params, *args, **kwargs)
+        query_result_cache.put(version, key, [dict(row) for row in result])
+        return result
+
+    return wrapper  # type: ignore[return-value]
@@ -7,7 +7,12 @@ from typing import Any
 
 import duckdb
 
+from backend.config import R2Config
 from backend.constants import DEFAULT_TOP_TRACKS_LIMIT
+from backend.infrastructure.database.parquet_paths import (
+    DatasetSource,
+    build_dataset_source,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +27,7 @@ class YouTubeQueryParams:
     master_path: str
     start_date: date
     end_date: date
+    r2_config: R2Config | None = None
 
 
 # Parquetパスパターン
@@ -112,6 +118,74 @@ def _generate_partition_paths(
     return paths
 
 
+def _resolve_watch_source(params: YouTubeQueryParams) -> DatasetSource:
+    if params.r2_config is not None:
+        return build_dataset_source(
+            params.conn,
+            params.r2_config,
+            data_domain="events",
+            dataset_path="youtube/watch_history",
+            start_date=params.start_date,
+            end_date=params.end_date,
+        )
+    return DatasetSource(
+        sql="read_parquet(?)",
+        params=[
+            _generate_partition_paths(
+                params.bucket, params.events_path, params.start_date, params.end_date
+            )
+        ],
+    )
+
+
+# 動画マスターがまだ無い場合に結合するデータソース（duration は 0 扱いになる）
+_EMPTY_VIDEO_SOURCE = DatasetSource(
+    sql="(SELECT NULL::VARCHAR AS video_id, NULL::BIGINT AS duration_seconds LIMIT 0)",
+    params=[],
+)
+
+
+def _has_parquet_files(conn: duckdb.DuckDBPyConnection, pattern: str) -> bool:
+    return (
+        conn.execute("SELECT 1 FROM glob(?) LIMIT 1", [pattern]).fetchone() is not None
+    )
+
+
+def _resolve_video_source(params: YouTubeQueryParams) -> DatasetSource:
+    """動画マスターを video_id ごとの最新行に絞ったデータソースを返す。
+
+    マスターは取得月ごとに compact されるため、同じ動画が複数の月に現れます。
+    compact 済みマスターが1つも無い間は空のデータソースを返します。
+    """
+    if params.r2_config is not None:
+        source = build_dataset_source(
+            params.conn,
+            params.r2_config,
+            data_domain="master",
+            dataset_path="youtube/videos",
+        )
+    else:
+        source = DatasetSource(
+            sql="read_parquet(?)",
+            params=[get_videos_parquet_path(params.bucket, params.master_path)],
+        )
+    # read_parquet はファイルが無いと失敗するため、glob の場合は先に存在を確かめる
+    pattern = source.params[0] if source.params else None
+    if isinstance(pattern, str) and not _has_parquet_files(params.conn, pattern):
+        logger.info("No YouTube video master parquet found: %s", pattern)
+        return _EMPTY_VIDEO_SOURCE
+    return DatasetSource(
+        sql=f"""(
+            SELECT video_id, duration_seconds
+            FROM {source.sql}
+            QUALIFY row_number() OVER (
+                PARTITION BY video_id ORDER BY updated_at DESC
+            ) = 1
+        )""",
+        params=source.params,
+    )
+
+
 def execute_query(
     conn: duckdb.DuckDBPyConnection, sql: str, params: list[Any] | None = None
 ) -> list[dict[str, Any]]:
@@ -157,11 +231,9 @@ def get_watch_history(
             ...
         ]
     """
-    partition_paths = _generate_partition_paths(
-        params.bucket, params.events_path, params.start_date, params.end_date
-    )
+    source = _resolve_watch_source(params)
 
-    query = """
+    query = f"""
         SELECT
             w.watch_id,
             w.watched_at_utc,
@@ -170,7 +242,7 @@ def get_watch_history(
             w.channel_id,
             w.channel_name,
             w.video_url
-        FROM read_parquet(?) w
+        FROM {source.sql} w
         WHERE w.watched_at_utc::DATE BETWEEN ? AND ?
         ORDER BY w.watched_at_utc DESC
     """
@@ -187,7 +259,7 @@ def get_watch_history(
     return execute_query(
         params.conn,
         query,
-        [partition_paths, params.start_date, params.end_date],
+        [*source.params, params.start_date, params.end_date],
     )
 
 
@@ -215,10 +287,6 @@ def get_watching_stats(
     Raises:
         ValueError: granularityが無効な場合
     """
-    partition_paths = _generate_partition_paths(
-        params.bucket, params.events_path, params.start_date, params.end_date
-    )
-
     # 粒度に応じた期間フォーマットを選択
     date_format_map = {
         "day": "%Y-%m-%d",
@@ -233,6 +301,8 @@ def get_watching_stats(
         )
 
     date_format = date_format_map[granularity]
+    watch_source = _resolve_watch_source(params)
+    video_source = _resolve_video_source(params)
 
     # DuckDBのstrftimeフォーマット文字列は動的に埋める必要があるため
     # 例外的にf-stringを使用
@@ -242,8 +312,8 @@ def get_watching_stats(
             SUM(COALESCE(v.duration_seconds, 0)) as total_seconds,
             COUNT(*) as video_count,
             COUNT(DISTINCT w.video_id) as unique_videos
-        FROM read_parquet(?) w
-        LEFT JOIN read_parquet(?) v ON w.video_id = v.video_id
+        FROM {watch_source.sql} w
+        LEFT JOIN {video_source.sql} v ON w.video_id = v.video_id
         WHERE w.watched_at_utc::DATE BETWEEN ? AND ?
         GROUP BY period
         ORDER BY period ASC
@@ -256,11 +326,15 @@ def get_watching_stats(
         granularity,
     )
 
-    videos_path = get_videos_parquet_path(params.bucket, params.master_path)
     return execute_query(
         params.conn,
         query,
-        [partition_paths, videos_path, params.start_date, params.end_date],
+        [
+            *watch_source.params,
+            *video_source.params,
+            params.start_date,
+            params.end_date,
+        ],
     )
 
 
@@ -285,18 +359,17 @@ def get_top_channels(
             ...
         ]
     """
-    partition_paths = _generate_partition_paths(
-        params.bucket, params.events_path, params.start_date, params.end_date
-    )
+    watch_source = _resolve_watch_source(params)
+    video_source = _resolve_video_source(params)
 
-    query = """
+    query = f"""
         SELECT
             w.channel_id,
             w.channel_name,
             COUNT(*) as video_count,
             SUM(COALESCE(v.duration_seconds, 0)) as total_seconds
-        FROM read_parquet(?) w
-        LEFT JOIN read_parquet(?) v ON w.video_id = v.video_id
+        FROM {watch_source.sql} w
+        LEFT JOIN {video_source.sql} v ON w.video_id = v.video_id
         WHERE w.watched_at_utc::DATE BETWEEN ? AND ?
         GROUP BY w.channel_id, w.channel_name
         ORDER BY total_seconds DESC
@@ -310,9 +383,14 @@ def get_top_channels(
         limit,
     )
 
-    videos_path = get_videos_parquet_path(params.bucket, params.master_path)
     return execute_query(
         params.conn,
         query,
-        [partition_paths, videos_path, params.start_date, params.end_date, limit],
+        [
+            *watch_source.params,
+            *video_source.params,
+            params.start_date,
+            params.end_date,
+            limit,
+        ],
     )
@@ -64,6 +64,7 @@ class YouTubeRepository:
                 master_path=self.r2_config.master_path,
                 start_date=start_date,
                 end_date=end_date,
+                r2_config=self.r2_config,
             )
             result = query_func(params, **query_kwargs)
 
@@ -4,6 +4,7 @@ REST API と MCP (Model Context Protocol) を単一サーバーで提供する
 MCP エンドポイントは /mcp パスにマウントされる。
 """
 
+import asyncio
 import contextlib
 import logging
 import secrets
@@ -15,9 +16,10 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
-from backend.api import browser_history_data, data, github, health
+from backend.api import browser_history_data, data, github, health, internal
 from backend.config import BackendConfig
 from backend.mcp_server import create_mcp_server
+from backend.usecases.warmup import watch_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -67,9 +69,18 @@ def create_app(config: BackendConfig | None = None) -> FastAPI:
 
     @contextlib.asynccontextmanager
     async def lifespan(_app: FastAPI):
-        """MCPセッションマネージャのタスクグループを有効化する。"""
-        async with mcp.session_manager.run():
-            yield
+        """MCPセッションマネージャとデータバージョン監視を有効化する。"""
+        warmup_task = None
+        if config.warmup_enabled and config.r2 is not None:
+            warmup_task = asyncio.create_task(watch_data_version(config))
+        try:
+            async with mcp.session_manager.run():
+                yield
+        finally:
+            if warmup_task is not None:
+                warmup_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await warmup_task
 
     app = FastAPI(
         title="EgoGraph Backend API",
@@ -123,6 +134,7 @@ def create_app(config: BackendConfig | None = None) -> FastAPI:
     app.include_router(data.router)
     app.include_router(browser_history_data.router)
     app.include_router(github.router)
+    app.include_router(internal.router)
 
     # MCPサブアプリをマウント
     app.mount("/mcp", mcp_asgi)
@@ -1,15 +1,16 @@
-"""Sync compacted parquet files from R2 to local storage."""
+"""Sync compacted parquet files from R2 to local storage.
+
+同期処理は pipelines の local_mirror_sync（``run_local_mirror_sync``）をそのまま使い、
+このスクリプトは backend の R2 設定を渡す CLI だけを担います。
+manifest・再開可能な途中ファイル・世代の公開はすべて pipelines 側の実装に従います。
+"""
 
 import argparse
 import logging
-import os
-from pathlib import Path
 
-import boto3
 from backend.config import BackendConfig
-from backend.infrastructure.database.parquet_paths import COMPACTED_ROOT
-from botocore.exceptions import ClientError
-from egograph_paths import PARQUET_DATA_DIR
+from pipelines.sources.common.config import R2Config
+from pipelines.sources.local_mirror_sync import run_local_mirror_sync
 
 logger = logging.getLogger(__name__)
 
@@ -17,50 +18,23 @@ logger = logging.getLogger(__name__)
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--root", default=None)
+    parser.add_argument("--workers", type=int, default=4)
     return parser.parse_args()
 
 
 def main() -> None:
-    """Download compacted parquet files to the local mirror directory."""
+    """Sync changed compacted parquet files into a new local mirror generation."""
     args = _parse_args()
     config = BackendConfig.from_env()
     if config.r2 is None:
         raise ValueError("R2 configuration is required")
 
-    local_root = Path(args.root or config.r2.local_parquet_root or PARQUET_DATA_DIR)
-    local_root.mkdir(parents=True, exist_ok=True)
-
-    s3 = boto3.client(
-        "s3",
-        endpoint_url=config.r2.endpoint_url,
-        aws_access_key_id=config.r2.access_key_id,
-        aws_secret_access_key=config.r2.secret_access_key.get_secret_value(),
-        region_name="auto",
+    result = run_local_mirror_sync(
+        r2_config=R2Config.model_validate(config.r2.model_dump()),
+        local_root=args.root,
+        max_workers=args.workers,
     )
-    paginator = s3.get_paginator("list_objects_v2")
-
-    downloaded = 0
-    for page in paginator.paginate(
-        Bucket=config.r2.bucket_name,
-        Prefix=COMPACTED_ROOT,
-    ):
-        for obj in page.get("Contents", []):
-            key = obj["Key"]
-            relative_path = Path(key)
-            destination = local_root / relative_path
-            tmp_destination = destination.with_suffix(destination.suffix + ".tmp")
-            destination.parent.mkdir(parents=True, exist_ok=True)
-            try:
-                s3.download_file(config.r2.bucket_name, key, str(tmp_destination))
-                os.replace(tmp_destination, destination)
-                downloaded += 1
-            except ClientError:
-                logger.exception("Failed to sync compacted parquet: %s", key)
-                if tmp_destination.exists():
-                    tmp_destination.unlink()
-                continue
-
-    logger.info("Downloaded %d compacted parquet files into %s", downloaded, local_root)
+    logger.info("Local mirror sync summary: %s", result.to_summary_dict())
 
 
 if __name__ == "__main__":
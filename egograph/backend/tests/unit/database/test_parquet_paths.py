@@ -2,11 +2,15 @@
 
 from datetime import date
 
+import duckdb
+from egograph_mirror_layout import read_current_version
 from pydantic import SecretStr
 
 from backend.config import R2Config
 from backend.infrastructure.database.parquet_paths import (
+    WAREHOUSE_ALIAS,
     build_dataset_glob,
+    build_dataset_source,
     build_partition_paths,
 )
 
@@ -54,6 +58,31 @@ class TestBuildPartitionPaths:
 
         assert paths == [str(local_file)]
 
+    def test_reads_from_current_mirror_generation(self, tmp_path):
+        # Arrange
+        config = _build_r2_config(local_parquet_root=str(tmp_path))
+        generation = tmp_path / "generations" / "0000000003"
+        local_file = (
+            generation
+            / "compacted/events/spotify/plays/year=2024/month=01/data.parquet"
+        )
+        local_file.parent.mkdir(parents=True)
+        local_file.write_bytes(b"parquet")
+        (tmp_path / "current").symlink_to("generations/0000000003")
+
+        # Act
+        paths = build_partition_paths(
+            config,
+            "events",
+            "spotify/plays",
+            date(2024, 1, 1),
+            date(2024, 1, 31),
+        )
+
+        # Assert
+        assert read_current_version(tmp_path) == 3
+        assert paths == [str(local_file)]
+
     def test_falls_back_to_r2_when_local_file_missing(self, tmp_path):
         config = _build_r2_config(local_parquet_root=str(tmp_path))
 
@@ -114,3 +143,67 @@ class TestBuildDatasetGlob:
         )
 
         assert path == "s3://test-bucket/compacted/master/spotify/tracks/**/*.parquet"
+
+
+class TestBuildDatasetSource:
+    """build_dataset_source tests."""
+
+    def test_uses_attached_warehouse_table_with_month_filter(self, tmp_path):
+        # Arrange
+        warehouse_path = tmp_path / "analytics.duckdb"
+        with duckdb.connect(str(warehouse_path)) as writer:
+            writer.execute('CREATE SCHEMA "events"')
+            writer.execute(
+                """
+                CREATE TABLE "events"."spotify_plays" AS
+                SELECT * FROM (VALUES
+                    ('p1', 2024, 1),
+                    ('p2', 2024, 2),
+                    ('p3', 2024, 3)
+                ) AS t(play_id, _year, _month)
+                """
+            )
+        conn = duckdb.connect(":memory:")
+        conn.execute(f"ATTACH '{warehouse_path}' AS {WAREHOUSE_ALIAS} (READ_ONLY)")
+        config = _build_r2_config(local_parquet_root=str(tmp_path))
+
+        # Act
+        source = build_dataset_source(
+            conn,
+            config,
+            "events",
+            "spotify/plays",
+            date(2024, 2, 1),
+            date(2024, 3, 31),
+        )
+        rows = conn.execute(
+            f"SELECT * FROM {source.sql} ORDER BY play_id", source.params
+        ).fetchall()
+
+        # Assert
+        assert "read_parquet" not in source.sql
+        assert rows == [("p2",), ("p3",)]
+
+    def test_falls_back_to_parquet_without_warehouse(self, tmp_path):
+        # Arrange
+        conn = duckdb.connect(":memory:")
+        config = _build_r2_config(local_parquet_root=str(tmp_path))
+
+        # Act
+        source = build_dataset_source(
+            conn,
+            config,
+            "events",
+            "spotify/plays",
+            date(2024, 1, 1),
+            date(2024, 1, 31),
+        )
+
+        # Assert
+        assert source.sql == "read_parquet(?)"
+        assert source.params == [
+            [
+                "s3://test-bucket/compacted/events/spotify/plays/"
+                "year=2024/month=01/data.parquet"
+            ]
+        ]
@@ -0,0 +1,113 @@
+"""データバージョン単位のクエリ結果キャッシュのテスト。"""
+
+from datetime import date
+
+import pytest
+
+from backend.infrastructure.database import QueryParams, get_data_version
+from backend.infrastructure.database.result_cache import (
+    cached_query,
+    query_result_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    query_result_cache.clear()
+    yield
+    query_result_cache.clear()
+
+
+def _params() -> QueryParams:
+    return QueryParams(
+        conn=None,
+        bucket="test-bucket",
+        events_path="events/",
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 1, 31),
+    )
+
+
+def _counting_query():
+    calls = []
+
+    @cached_query
+    def fake_query(params, limit=10):
+        calls.append(limit)
+        return [{"limit": limit, "call": len(calls)}]
+
+    return fake_query, calls
+
+
+def test_cached_query_bypasses_cache_without_active_version():
+    # Arrange
+    fake_query, calls = _counting_query()
+
+    # Act
+    fake_query(_params())
+    fake_query(_params())
+
+    # Assert
+    assert calls == [10, 10]
+
+
+def test_cached_query_reuses_result_for_same_version_and_arguments():
+    # Arrange
+    fake_query, calls = _counting_query()
+    query_result_cache.activate("1")
+
+    # Act
+    first = fake_query(_params())
+    second = fake_query(_params(), limit=10)
+    other = fake_query(_params(), 5)
+
+    # Assert
+    assert first == second == [{"limit": 10, "call": 1}]
+    assert other == [{"limit": 5, "call": 2}]
+    assert calls == [10, 5]
+
+
+def test_warming_fills_new_version_before_activation():
+    # Arrange
+    fake_query, calls = _counting_query()
+    query_result_cache.activate("1")
+    fake_query(_params())
+
+    # Act
+    with query_result_cache.warming("2"):
+        fake_query(_params())
+    before_switch = fake_query(_params())
+    query_result_cache.activate("2")
+    after_switch = fake_query(_params())
+
+    # Assert
+    assert before_switch == [{"limit": 10, "call": 1}]
+    assert after_switch == [{"limit": 10, "call": 2}]
+    assert len(calls) == 2
+    assert len(query_result_cache) == 1
+
+
+def test_get_data_version_combines_mirror_generation_and_warehouse(
+    tmp_path, mock_r2_config
+):
+    # Arrange
+    (tmp_path / "generations" / "0000000004").mkdir(parents=True)
+    warehouse = tmp_path / "analytics.duckdb"
+    config = mock_r2_config.model_copy(
+        update={
+            "local_parquet_root": str(tmp_path),
+            "local_warehouse_path": str(warehouse),
+        }
+    )
+
+    # Act
+    without_mirror = get_data_version(config)
+    (tmp_path / "current").symlink_to("generations/0000000004")
+    mirror_only = get_data_version(config)
+    warehouse.write_bytes(b"db")
+    with_warehouse = get_data_version(config)
+
+    # Assert
+    assert without_mirror is None
+    assert mirror_only == "4"
+    assert with_warehouse == f"4:{warehouse.stat().st_mtime_ns}"
@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 from pydantic import SecretStr
 
 from backend.config import R2Config
+from backend.infrastructure.database.parquet_paths import DatasetSource
 from backend.infrastructure.repositories.github_repository import GitHubRepository
 
 
@@ -26,7 +27,7 @@ class TestGitHubRepository:
             mock_conn_class.return_value = mock_conn
 
             with patch(
-                "backend.infrastructure.database.github_queries.build_partition_paths",
+                "backend.infrastructure.database.parquet_paths.build_partition_paths",
                 return_value=[prs_parquet_path],
             ):
                 # Act
@@ -55,7 +56,7 @@ class TestGitHubRepository:
             mock_conn_class.return_value = mock_conn
 
             with patch(
-                "backend.infrastructure.database.github_queries.build_partition_paths",
+                "backend.infrastructure.database.parquet_paths.build_partition_paths",
                 return_value=[prs_parquet_path],
             ):
                 # Act
@@ -90,7 +91,7 @@ class TestGitHubRepository:
             mock_conn_class.return_value = mock_conn
 
             with patch(
-                "backend.infrastructure.database.github_queries.build_partition_paths",
+                "backend.infrastructure.database.parquet_paths.build_partition_paths",
                 return_value=[commits_parquet_path],
             ):
                 # Act
@@ -119,7 +120,7 @@ class TestGitHubRepository:
             mock_conn_class.return_value = mock_conn
 
             with patch(
-                "backend.infrastructure.database.github_queries.build_partition_paths",
+                "backend.infrastructure.database.parquet_paths.build_partition_paths",
                 return_value=[commits_parquet_path],
             ):
                 # Act
@@ -213,12 +214,14 @@ class TestGitHubRepository:
             mock_conn_class.return_value = mock_conn
 
             with patch(
-                "backend.infrastructure.database.github_queries.build_partition_paths",
+                "backend.infrastructure.database.parquet_paths.build_partition_paths",
                 return_value=[prs_parquet_path],
             ):
                 with patch(
-                    "backend.infrastructure.database.github_queries._resolve_commit_partition_paths",
-                    return_value=[commits_parquet_path],
+                    "backend.infrastructure.database.github_queries._resolve_commit_source",
+                    return_value=DatasetSource(
+                        sql="read_parquet(?)", params=[[commits_parquet_path]]
+                    ),
                 ):
                     # Act
                     repo = GitHubRepository(mock_r2_config())
@@ -249,12 +252,14 @@ class TestGitHubRepository:
             mock_conn_class.return_value = mock_conn
 
             with patch(
-                "backend.infrastructure.database.github_queries.build_partition_paths",
+                "backend.infrastructure.database.parquet_paths.build_partition_paths",
                 return_value=[prs_parquet_path],
             ):
                 with patch(
-                    "backend.infrastructure.database.github_queries._resolve_commit_partition_paths",
-                    return_value=[commits_parquet_path],
+                    "backend.infrastructure.database.github_queries._resolve_commit_source",
+                    return_value=DatasetSource(
+                        sql="read_parquet(?)", params=[[commits_parquet_path]]
+                    ),
                 ):
                     # Act
                     repo = GitHubRepository(mock_r2_config())
@@ -1,10 +1,14 @@
 """YouTube Repository層のテスト（REDフェーズ）。"""
 
+import shutil
 from datetime import date
 from unittest.mock import patch
 
+import pandas as pd
 import pytest
+from pydantic import SecretStr
 
+from backend.config import R2Config
 from backend.infrastructure.database.youtube_queries import (
     YouTubeQueryParams,
     _generate_partition_paths,
@@ -470,3 +474,133 @@ class TestGetTopChannels:
         # Assert: 視聴時間降順でソートされている
         for i in range(len(result) - 1):
             assert result[i]["total_seconds"] >= result[i + 1]["total_seconds"]
+
+
+class TestCompactedSources:
+    """r2_config 指定時に compacted parquet を参照するテスト。"""
+
+    @staticmethod
+    def _write_compacted(root, data_domain, dataset_path, year, month, df):
+        path = (
+            root
+            / "compacted"
+            / data_domain
+            / dataset_path
+            / f"year={year}"
+            / f"month={month:02d}"
+            / "data.parquet"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path)
+
+    @pytest.fixture
+    def compacted_params(self, duckdb_conn, tmp_path):
+        watches = pd.DataFrame(
+            {
+                "watch_id": ["watch_1", "watch_2"],
+                "watched_at_utc": pd.to_datetime(
+                    ["2024-01-01 10:00:00", "2024-01-01 11:00:00"]
+                ),
+                "video_id": ["video_1", "video_1"],
+                "video_title": ["Video A", "Video A"],
+                "channel_id": ["channel_1", "channel_1"],
+                "channel_name": ["Channel X", "Channel X"],
+                "video_url": ["https://youtube.com/watch?v=video_1"] * 2,
+            }
+        )
+        self._write_compacted(
+            tmp_path, "events", "youtube/watch_history", 2024, 1, watches
+        )
+        # 同じ動画が2つの月の master に存在し、新しい月の行が最新
+        for month, duration, updated_at in (
+            (1, 100, "2024-01-01"),
+            (2, 600, "2024-02-01"),
+        ):
+            self._write_compacted(
+                tmp_path,
+                "master",
+                "youtube/videos",
+                2024,
+                month,
+                pd.DataFrame(
+                    {
+                        "video_id": ["video_1"],
+                        "duration_seconds": [duration],
+                        "updated_at": pd.to_datetime([updated_at]),
+                    }
+                ),
+            )
+        r2_config = R2Config.model_construct(
+            endpoint_url="https://test.r2.cloudflarestorage.com",
+            access_key_id="test_key",
+            secret_access_key=SecretStr("test_secret"),
+            bucket_name="test-bucket",
+            raw_path="raw/",
+            events_path="events/",
+            master_path="master/",
+            local_parquet_root=str(tmp_path),
+        )
+        return YouTubeQueryParams(
+            conn=duckdb_conn,
+            bucket="test-bucket",
+            events_path="events/",
+            master_path="master/",
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 31),
+            r2_config=r2_config,
+        )
+
+    def test_watching_stats_uses_latest_master_row(self, compacted_params):
+        """重複した master は最新行だけを結合する。"""
+        # Act
+        result = get_watching_stats(compacted_params, granularity="day")
+
+        # Assert: 2件の視聴 × 最新の600秒（重複行で件数が膨らまない）
+        assert result == [
+            {
+                "period": "2024-01-01",
+                "total_seconds": 1200,
+                "video_count": 2,
+                "unique_videos": 1,
+            }
+        ]
+
+    def test_top_channels_reads_compacted_partition(self, compacted_params):
+        """月次 compacted ファイルから集計する。"""
+        # Act
+        result = get_top_channels(compacted_params)
+
+        # Assert
+        assert len(result) == 1
+        assert result[0]["channel_id"] == "channel_1"
+        assert result[0]["video_count"] == 2
+        assert result[0]["total_seconds"] == 1200
+
+    def test_watching_stats_without_video_master(
+        self, compacted_params, tmp_path, monkeypatch
+    ):
+        """compact 済みマスターが無くても再生時間 0 として集計する。"""
+        # Arrange: マスターを消し、R2 側にも無い状態をローカル glob で再現する
+        shutil.rmtree(tmp_path / "compacted" / "master")
+        monkeypatch.setattr(
+            "backend.infrastructure.database.parquet_paths.build_dataset_glob",
+            lambda config, data_domain, dataset_path: str(
+                tmp_path / "compacted" / data_domain / dataset_path / "**/*.parquet"
+            ),
+        )
+
+        # Act
+        stats = get_watching_stats(compacted_params, granularity="day")
+        channels = get_top_channels(compacted_params)
+
+        # Assert
+        assert stats == [
+            {
+                "period": "2024-01-01",
+                "total_seconds": 0,
+                "video_count": 2,
+                "unique_videos": 1,
+            }
+        ]
+        assert channels[0]["video_count"] == 2
+        assert channels[0]["total_seconds"] == 0
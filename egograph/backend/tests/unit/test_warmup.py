@@ -0,0 +1,101 @@
+"""データ更新後のクエリ warm-up のテスト。"""
+
+import contextlib
+import shutil
+from datetime import date
+
+import duckdb
+import pytest
+
+from backend.infrastructure.database import (
+    QueryParams,
+    get_top_tracks,
+    query_result_cache,
+)
+from backend.usecases import warmup
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    query_result_cache.clear()
+    yield
+    query_result_cache.clear()
+
+
+@pytest.fixture
+def mirrored_config(mock_backend_config, duckdb_with_sample_data, tmp_path):
+    """サンプル再生履歴を世代 1 として公開した local mirror を持つ設定。"""
+    root = tmp_path / "mirror"
+    month_dir = (
+        root
+        / "generations/0000000001/compacted/events/spotify/plays/year=2024/month=01"
+    )
+    month_dir.mkdir(parents=True)
+    shutil.copy(duckdb_with_sample_data.test_parquet_path, month_dir / "data.parquet")
+    (root / "current").symlink_to("generations/0000000001")
+    mock_backend_config.r2 = mock_backend_config.r2.model_copy(
+        update={"local_parquet_root": str(root), "local_warehouse_path": None}
+    )
+    return mock_backend_config
+
+
+@contextlib.contextmanager
+def _memory_connection(_r2_config):
+    conn = duckdb.connect(":memory:")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def test_run_warmup_fills_cache_for_new_version(monkeypatch, mirrored_config):
+    """warm-up した結果は activate 後のリクエストで再利用される。"""
+    # Arrange
+    monkeypatch.setattr(warmup, "DuckDBConnection", _memory_connection)
+    mirrored_config.warmup_queries = ["spotify_top_tracks", "github_activity_stats"]
+    mirrored_config.warmup_window_days = [7]
+
+    # Act
+    result = warmup.run_warmup(mirrored_config, "1", today=date(2024, 1, 8))
+    query_result_cache.activate("1")
+    cached = get_top_tracks(
+        QueryParams(
+            conn=None,
+            bucket=mirrored_config.r2.bucket_name,
+            events_path=mirrored_config.r2.events_path,
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 1, 8),
+        ),
+        10,
+    )
+
+    # Assert
+    assert result.executed == ("spotify_top_tracks:7d",)
+    assert result.failed == ("github_activity_stats:7d",)
+    assert cached[0]["track_name"] == "Song A"
+    assert cached[0]["play_count"] == 3
+
+
+def test_refresh_warm_cache_runs_only_when_version_changes(
+    monkeypatch, mirrored_config
+):
+    """同じデータバージョンでは warm-up をやり直さない。"""
+    # Arrange
+    versions = []
+
+    def fake_run_warmup(config, version):
+        versions.append(version)
+        return warmup.WarmupResult(version, (), (), 0.0)
+
+    monkeypatch.setattr(warmup, "run_warmup", fake_run_warmup)
+
+    # Act
+    first = warmup.refresh_warm_cache(mirrored_config)
+    second = warmup.refresh_warm_cache(mirrored_config)
+    forced = warmup.refresh_warm_cache(mirrored_config, force=True)
+
+    # Assert
+    assert first is not None and forced is not None
+    assert second is None
+    assert versions == ["1", "1"]
+    assert query_result_cache.active_version == "1"
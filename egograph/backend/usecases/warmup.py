@@ -0,0 +1,198 @@
+"""データ更新後のクエリ warm-up。
+
+local mirror sync や compaction でデータバージョンが変わったら、
+よく使われる集計クエリを新バージョンで事前に実行して結果キャッシュを埋め、
+完了後にそのバージョンへ切り替えます。切り替えまでは旧バージョンの結果を返すため、
+データ更新直後もユーザー向けのレイテンシが跳ねません。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Any
+
+import duckdb
+
+from backend.config import BackendConfig
+from backend.constants import DEFAULT_TOP_DOMAINS_LIMIT, DEFAULT_TOP_TRACKS_LIMIT
+from backend.infrastructure.database import (
+    BrowserHistoryQueryParams,
+    DuckDBConnection,
+    GitHubQueryParams,
+    QueryParams,
+    get_activity_stats,
+    get_data_version,
+    get_listening_stats,
+    get_top_domains,
+    get_top_tracks,
+    query_result_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+# 同時に複数の warm-up が走らないようにする（定期監視と内部 API の両方から呼ばれる）
+_warmup_lock = threading.Lock()
+
+
+def _spotify_top_tracks(
+    conn: duckdb.DuckDBPyConnection, config: BackendConfig, start: date, end: date
+) -> None:
+    params = QueryParams(
+        conn=conn,
+        bucket=config.r2.bucket_name,
+        events_path=config.r2.events_path,
+        start_date=start,
+        end_date=end,
+        r2_config=config.r2,
+    )
+    get_top_tracks(params, DEFAULT_TOP_TRACKS_LIMIT)
+
+
+def _spotify_listening_stats(
+    conn: duckdb.DuckDBPyConnection, config: BackendConfig, start: date, end: date
+) -> None:
+    params = QueryParams(
+        conn=conn,
+        bucket=config.r2.bucket_name,
+        events_path=config.r2.events_path,
+        start_date=start,
+        end_date=end,
+        r2_config=config.r2,
+    )
+    get_listening_stats(params, "day")
+
+
+def _github_activity_stats(
+    conn: duckdb.DuckDBPyConnection, config: BackendConfig, start: date, end: date
+) -> None:
+    params = GitHubQueryParams(
+        conn=conn,
+        bucket=config.r2.bucket_name,
+        events_path=config.r2.events_path,
+        master_path=config.r2.master_path,
+        start_date=start,
+        end_date=end,
+        r2_config=config.r2,
+    )
+    get_activity_stats(params, granularity="day")
+
+
+def _browser_top_domains(
+    conn: duckdb.DuckDBPyConnection, config: BackendConfig, start: date, end: date
+) -> None:
+    params = BrowserHistoryQueryParams(
+        conn=conn,
+        bucket=config.r2.bucket_name,
+        events_path=config.r2.events_path,
+        start_date=start,
+        end_date=end,
+        r2_config=config.r2,
+    )
+    get_top_domains(params, limit=DEFAULT_TOP_DOMAINS_LIMIT)
+
+
+WarmupQuery = Callable[[duckdb.DuckDBPyConnection, BackendConfig, date, date], None]
+
+WARMUP_QUERIES: dict[str, WarmupQuery] = {
+    "spotify_top_tracks": _spotify_top_tracks,
+    "spotify_listening_stats": _spotify_listening_stats,
+    "github_activity_stats": _github_activity_stats,
+    "browser_top_domains": _browser_top_domains,
+}
+
+
+@dataclass(frozen=True)
+class WarmupResult:
+    """warm-up の実行サマリー。"""
+
+    version: str
+    executed: tuple[str, ...]
+    failed: tuple[str, ...]
+    duration_seconds: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def run_warmup(
+    config: BackendConfig,
+    version: str,
+    *,
+    today: date | None = None,
+) -> WarmupResult:
+    """設定された hot query を version のキャッシュへ流し込む。
+
+    個々のクエリ失敗（データ未投入など）はログに残して続行します。
+    """
+    today = today or date.today()
+    executed: list[str] = []
+    failed: list[str] = []
+    started = time.monotonic()
+    with query_result_cache.warming(version), DuckDBConnection(config.r2) as conn:
+        for name in config.warmup_queries:
+            query = WARMUP_QUERIES.get(name)
+            if query is None:
+                logger.warning("Unknown warm-up query: %s", name)
+                continue
+            for days in config.warmup_window_days:
+                label = f"{name}:{days}d"
+                try:
+                    query(conn, config, today - timedelta(days=days), today)
+                    executed.append(label)
+                except Exception:
+                    logger.warning("Warm-up query failed: %s", label, exc_info=True)
+                    failed.append(label)
+    return WarmupResult(
+        version=version,
+        executed=tuple(executed),
+        failed=tuple(failed),
+        duration_seconds=round(time.monotonic() - started, 3),
+    )
+
+
+def refresh_warm_cache(
+    config: BackendConfig,
+    *,
+    force: bool = False,
+) -> WarmupResult | None:
+    """データバージョンが変わっていれば warm-up してからキャッシュを切り替える。
+
+    Args:
+        config: Backend 設定
+        force: バージョンが同じでも warm-up をやり直す
+
+    Returns:
+        warm-up を実行した場合はその結果、不要だった場合は None
+    """
+    with _warmup_lock:
+        version = get_data_version(config.r2)
+        if version is None:
+            # 世代管理された local mirror が無い場合はキャッシュしない
+            query_result_cache.activate(None)
+            return None
+        if version == query_result_cache.active_version and not force:
+            return None
+        result = run_warmup(config, version)
+        query_result_cache.activate(version)
+        logger.info(
+            "Warmed query cache for data version %s: executed=%d failed=%d in %.2fs",
+            version,
+            len(result.executed),
+            len(result.failed),
+            result.duration_seconds,
+        )
+        return result
+
+
+async def watch_data_version(config: BackendConfig) -> None:
+    """データバージョンを定期的に確認し、変化したら warm-up する。"""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_warm_cache, config)
+        except Exception:
+            logger.exception("Query cache warm-up failed")
+        await asyncio.sleep(config.warmup_interval_seconds)
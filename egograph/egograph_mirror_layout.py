@@ -0,0 +1,105 @@
+"""Local mirror の世代ディレクトリ管理。
+
+``{root}/generations/{version}/compacted/...`` に世代ごとのスナップショットを作り、
+``{root}/current`` シンボリックリンクを差し替えて公開します。
+reader は ``current`` を一度だけ解決して使うことで、同期中でも
+一貫したデータセットバージョンを読み続けられます。
+
+書き手の pipelines と読み手の backend の両方から参照するため、
+``egograph_paths`` と同じくリポジトリ直下に置いています。
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+GENERATIONS_DIR = "generations"
+CURRENT_LINK = "current"
+# 公開済み世代を何世代残すか（current を含む。読み込み中の reader 用）
+KEEP_GENERATIONS = 2
+_VERSION_WIDTH = 10
+
+
+def generation_dir(root: Path, version: int) -> Path:
+    """世代ディレクトリのパスを返す。"""
+    return root / GENERATIONS_DIR / f"{version:0{_VERSION_WIDTH}d}"
+
+
+def _list_generations(root: Path) -> dict[int, Path]:
+    generations_root = root / GENERATIONS_DIR
+    if not generations_root.exists():
+        return {}
+    return {
+        int(path.name): path
+        for path in generations_root.iterdir()
+        if path.is_dir() and path.name.isdigit()
+    }
+
+
+def read_current_version(root: str | Path) -> int | None:
+    """公開中のデータセットバージョンを返す。未公開なら None。"""
+    link = Path(root) / CURRENT_LINK
+    if not link.is_symlink():
+        return None
+    name = Path(os.readlink(link)).name
+    return int(name) if name.isdigit() else None
+
+
+def resolve_mirror_root(root: str | Path) -> Path:
+    """reader が参照すべきディレクトリを返す。
+
+    公開済み世代があればその実体パス、無ければ旧レイアウトの root 自身。
+    """
+    root = Path(root)
+    version = read_current_version(root)
+    if version is None:
+        return root
+    return generation_dir(root, version)
+
+
+def prepare_next_generation(root: Path) -> tuple[int, Path]:
+    """次に公開する世代の番号とディレクトリを返す。
+
+    前回中断した未公開世代があれば、途中ファイルを再開できるよう再利用します。
+    """
+    current = read_current_version(root) or 0
+    pending = [version for version in _list_generations(root) if version > current]
+    version = max(pending) if pending else current + 1
+    path = generation_dir(root, version)
+    path.mkdir(parents=True, exist_ok=True)
+    return version, path
+
+
+def link_file(source: Path, destination: Path) -> None:
+    """前世代のファイルをハードリンクする。別デバイスならコピーする。"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def publish_generation(root: Path, version: int) -> None:
+    """``current`` を新しい世代へ原子的に切り替える。"""
+    tmp_link = root / f".{CURRENT_LINK}.tmp"
+    tmp_link.unlink(missing_ok=True)
+    tmp_link.symlink_to(Path(GENERATIONS_DIR) / generation_dir(root, version).name)
+    os.replace(tmp_link, root / CURRENT_LINK)
+
+
+def prune_generations(root: Path, keep: int = KEEP_GENERATIONS) -> list[int]:
+    """公開済みの古い世代と、current より前の未公開世代を削除する。"""
+    current = read_current_version(root)
+    if current is None:
+        return []
+    published = sorted(v for v in _list_generations(root) if v <= current)
+    removed = published[: max(0, len(published) - max(1, keep))]
+    for version in removed:
+        shutil.rmtree(generation_dir(root, version), ignore_errors=True)
+    if removed:
+        logger.info("Removed old mirror generations: %s", removed)
+    return removed
@@ -23,6 +23,12 @@ CHAT_SQLITE_PATH = BACKEND_DATA_DIR / "chat.sqlite"
 PIPELINES_DATA_DIR = DATA_ROOT / "pipelines"
 PIPELINES_STATE_DB_PATH = PIPELINES_DATA_DIR / "state.sqlite3"
 PIPELINES_LOGS_DIR = PIPELINES_DATA_DIR / "logs"
+PIPELINES_ARCHIVE_DIR = PIPELINES_DATA_DIR / "archive"
+PIPELINES_CACHE_DIR = PIPELINES_DATA_DIR / "cache"
+GITHUB_HTTP_CACHE_PATH = PIPELINES_CACHE_DIR / "github_http_cache.sqlite3"
+GITHUB_COMMIT_DETAIL_CACHE_PATH = PIPELINES_CACHE_DIR / "github_commit_details.sqlite3"
+SPOTIFY_MASTER_ID_INDEX_PATH = PIPELINES_CACHE_DIR / "spotify_master_ids.sqlite3"
+YOUTUBE_KNOWN_ID_INDEX_PATH = PIPELINES_CACHE_DIR / "youtube_known_ids.sqlite3"
 
 PARQUET_DATA_DIR = DATA_ROOT / "parquet"
 
@@ -1,22 +1,47 @@
 """Run management API."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import PlainTextResponse
 
 from pipelines.api.dependencies import get_service, verify_api_key
-from pipelines.domain.errors import PipelinesError
+from pipelines.domain.errors import InvalidRunCursorError, PipelinesError
+from pipelines.domain.workflow import WorkflowRunStatus
 from pipelines.service import PipelineService
 
 router = APIRouter(prefix="/v1/runs", tags=["runs"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @router.get("")
 def list_runs(
+    response: Response,
+    workflow_id: str | None = None,
+    status: list[WorkflowRunStatus] | None = Query(None),
+    queued_after: datetime | None = None,
+    queued_before: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     _: None = Depends(verify_api_key),
     service: PipelineService = Depends(get_service),
 ) -> list[dict]:
-    """run 一覧を取得する。"""
-    return [run.__dict__ for run in service.list_runs()]
+    """run 一覧を新しい順に取得する。次ページの cursor は X-Next-Cursor で返す。"""
+    try:
+        page = service.list_runs_page(
+            workflow_id=workflow_id,
+            statuses=status or (),
+            queued_after=queued_after,
+            queued_before=queued_before,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidRunCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return [run.__dict__ for run in page.runs]
 
 
 @router.get("/{run_id}")
@@ -53,12 +78,13 @@ def get_step_log(
 @router.post("/{run_id}/retry", status_code=201)
 def retry_run(
     run_id: str,
+    resume: bool = False,
     _: None = Depends(verify_api_key),
     service: PipelineService = Depends(get_service),
 ) -> dict:
-    """再実行 run を queue に積む。"""
+    """再実行 run を queue に積む。resume=true なら失敗 step から再開する。"""
     try:
-        return service.retry_run(run_id).__dict__
+        return service.retry_run(run_id, resume=resume).__dict__
     except PipelinesError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
@@ -1,9 +1,13 @@
 """Workflow management API."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from pipelines.api.dependencies import get_service, verify_api_key
-from pipelines.domain.errors import PipelinesError
+from pipelines.api.runs import NEXT_CURSOR_HEADER
+from pipelines.domain.errors import InvalidRunCursorError, PipelinesError
+from pipelines.domain.workflow import WorkflowRunStatus
 from pipelines.service import PipelineService
 
 router = APIRouter(prefix="/v1/workflows", tags=["workflows"])
@@ -34,11 +38,30 @@ def get_workflow(
 @router.get("/{workflow_id}/runs")
 def list_workflow_runs(
     workflow_id: str,
+    response: Response,
+    status: list[WorkflowRunStatus] | None = Query(None),
+    queued_after: datetime | None = None,
+    queued_before: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
     _: None = Depends(verify_api_key),
     service: PipelineService = Depends(get_service),
 ) -> list[dict]:
     """指定 workflow の run 一覧を取得する。"""
-    return [run.__dict__ for run in service.list_runs(workflow_id=workflow_id)]
+    try:
+        page = service.list_runs_page(
+            workflow_id=workflow_id,
+            statuses=status or (),
+            queued_after=queued_after,
+            queued_before=queued_before,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidRunCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return [run.__dict__ for run in page.runs]
 
 
 @router.post("/{workflow_id}/runs", status_code=201)
@@ -3,7 +3,11 @@
 import os
 from pathlib import Path
 
-from egograph_paths import PIPELINES_LOGS_DIR, PIPELINES_STATE_DB_PATH
+from egograph_paths import (
+    PIPELINES_ARCHIVE_DIR,
+    PIPELINES_LOGS_DIR,
+    PIPELINES_STATE_DB_PATH,
+)
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -23,6 +27,7 @@ class PipelinesConfig(BaseSettings):
 
     database_path: Path = PIPELINES_STATE_DB_PATH
     logs_root: Path = PIPELINES_LOGS_DIR
+    archive_root: Path = PIPELINES_ARCHIVE_DIR
     host: str = "127.0.0.1"
     port: int = 8001
     api_key: SecretStr | None = None
@@ -31,3 +36,11 @@ class PipelinesConfig(BaseSettings):
     max_concurrent_runs: int = 4
     lock_lease_seconds: int = 300
     lock_heartbeat_seconds: int = 30
+    # queued run の待機がこの秒数を超えるごとに実効優先度を 1 上げる（0 以下で無効）。
+    run_priority_aging_seconds: int = 600
+    # event lane 以上の run 専用に空けておく slot 数。
+    reserved_priority_slots: int = 0
+    # 0 以下で run retention を無効化する。
+    run_retention_days: int = 30
+    run_retention_batch_size: int = 500
+    run_retention_interval_hours: int = 24
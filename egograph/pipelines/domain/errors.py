@@ -23,3 +23,11 @@ class StepRunNotFoundError(PipelinesError):
 
 class WorkflowLockUnavailableError(PipelinesError):
     """workflow lock を取得できない。"""
+
+
+class InvalidRunCursorError(PipelinesError):
+    """run 一覧の pagination cursor が不正。"""
+
+
+class RunNotResumableError(PipelinesError):
+    """失敗 step から再開できない run が指定された。"""
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from enum import StrEnum
+from enum import IntEnum, StrEnum
 from typing import Any
 
 from pipelines.domain.schedule import MisfirePolicy, TriggerSpec
@@ -37,10 +37,35 @@ class QueuedReason(StrEnum):
     EVENT_ENQUEUE = "event_enqueue"
 
 
+class RunPriority(IntEnum):
+    """queue 上の run 優先度 lane。値が大きいほど先に dispatch される。"""
+
+    RECONCILE = 0
+    SCHEDULE = 1
+    MANUAL = 2
+    EVENT = 3
+
+
+_TRIGGER_PRIORITIES = {
+    TriggerType.EVENT: RunPriority.EVENT,
+    TriggerType.MANUAL: RunPriority.MANUAL,
+    TriggerType.RETRY: RunPriority.MANUAL,
+    TriggerType.SCHEDULE: RunPriority.SCHEDULE,
+    TriggerType.RECONCILE: RunPriority.RECONCILE,
+}
+
+
+def resolve_run_priority(trigger_type: TriggerType, priority_boost: int = 0) -> int:
+    """trigger 種別と workflow の priority_boost から run 優先度を決める。"""
+    return int(_TRIGGER_PRIORITIES[trigger_type]) + priority_boost
+
+
 class WorkflowRunStatus(StrEnum):
     """workflow run の状態。"""
 
     QUEUED = "queued"
+    # workflow lock 待ちで dispatcher の waiter queue に park されている。
+    WAITING = "waiting"
     RUNNING = "running"
     SUCCEEDED = "succeeded"
     FAILED = "failed"
@@ -69,6 +94,8 @@ class StepDefinition:
     timeout_seconds: int = 1800
     max_attempts: int = 1
     retry_delay_seconds: float = 0.0
+    # 前段 step の result_summary だけを入力に単独で再実行できる。
+    resumable: bool = False
 
 
 @dataclass(frozen=True)
@@ -85,6 +112,9 @@ class WorkflowDefinition:
     concurrency_key: str | None = None
     timeout_seconds: int = 3600
     misfire_policy: MisfirePolicy = MisfirePolicy.COALESCE_LATEST
+    coalesce_event_runs: bool = False
+    # trigger 種別由来の優先度に加算する。長時間 workflow は負値で後回しにできる。
+    priority_boost: int = 0
 
     @property
     def lock_key(self) -> str:
@@ -109,6 +139,17 @@ class WorkflowRun:
     requested_by: str
     parent_run_id: str | None
     result_summary: dict[str, Any] | None
+    coalesced_count: int = 0
+    priority: int = 0
+    resume_from_step_id: str | None = None
+
+
+@dataclass(frozen=True)
+class RunPage:
+    """keyset pagination した run 一覧の1ページ。"""
+
+    runs: list[WorkflowRun]
+    next_cursor: str | None
 
 
 @dataclass(frozen=True)
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import base64
+import binascii
 import json
 import sqlite3
 import threading
 from datetime import UTC, datetime
 from typing import Any
 
+from pipelines.domain.errors import InvalidRunCursorError
 from pipelines.domain.workflow import (
     QueuedReason,
     StepRun,
@@ -40,6 +43,51 @@ def text_to_json(value: str | None) -> dict[str, Any] | None:
     return json.loads(value) if value else None
 
 
+def merge_result_summaries(
+    existing: dict[str, Any] | None,
+    incoming: dict[str, Any] | None,
+) -> dict[str, Any] | None:
+    """coalesce 用に2つの event payload を merge する。
+
+    list 値は重複を除いて連結し、それ以外の値は incoming を優先する。
+    """
+    if existing is None:
+        return incoming
+    if incoming is None:
+        return existing
+    merged = dict(existing)
+    for key, value in incoming.items():
+        current = merged.get(key)
+        if isinstance(current, list) and isinstance(value, list):
+            seen = {json.dumps(item, sort_keys=True) for item in current}
+            combined = list(current)
+            for item in value:
+                marker = json.dumps(item, sort_keys=True)
+                if marker not in seen:
+                    seen.add(marker)
+                    combined.append(item)
+            merged[key] = combined
+        else:
+            merged[key] = value
+    return merged
+
+
+def encode_run_cursor(queued_at_text: str, run_id: str) -> str:
+    raw = json.dumps([queued_at_text, run_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_run_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        queued_at_text, run_id = json.loads(raw)
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise InvalidRunCursorError(f"invalid run cursor: {cursor}") from exc
+    if not isinstance(queued_at_text, str) or not isinstance(run_id, str):
+        raise InvalidRunCursorError(f"invalid run cursor: {cursor}")
+    return queued_at_text, run_id
+
+
 def map_run(row: sqlite3.Row) -> WorkflowRun:
     return WorkflowRun(
         run_id=row["run_id"],
@@ -55,6 +103,9 @@ def map_run(row: sqlite3.Row) -> WorkflowRun:
         requested_by=row["requested_by"],
         parent_run_id=row["parent_run_id"],
         result_summary=text_to_json(row["result_summary_json"]),
+        coalesced_count=row["coalesced_count"],
+        priority=row["priority"],
+        resume_from_step_id=row["resume_from_step_id"],
     )
 
 
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import sqlite3
 import uuid
 from collections.abc import Collection
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
 
 from pipelines.domain.errors import (
@@ -13,20 +14,33 @@ from pipelines.domain.errors import (
 )
 from pipelines.domain.workflow import (
     QueuedReason,
+    RunPage,
     StepRunStatus,
     TriggerType,
     WorkflowRun,
     WorkflowRunStatus,
+    resolve_run_priority,
 )
 from pipelines.infrastructure.db._shared import (
     SQLiteRepository,
+    decode_run_cursor,
     dt_to_text,
+    encode_run_cursor,
     json_to_text,
     map_run,
+    merge_result_summaries,
+    text_to_dt,
+    text_to_json,
     utc_now,
 )
 from pipelines.infrastructure.db.workflow_repository import WorkflowRepository
 
+# coalesce の merge 先にできる未実行 status
+_PENDING_STATUSES = (
+    WorkflowRunStatus.QUEUED.value,
+    WorkflowRunStatus.WAITING.value,
+)
+
 
 class RunRepository(SQLiteRepository):
     """workflow run の永続化を担う。"""
@@ -50,15 +64,31 @@ class RunRepository(SQLiteRepository):
         parent_run_id: str | None = None,
         scheduled_at: datetime | None = None,
         result_summary: dict[str, Any] | None = None,
+        coalesce: bool = False,
+        resume_from_step_id: str | None = None,
     ) -> WorkflowRun:
-        """workflow run を queued 状態で追加する。"""
+        """workflow run を queued 状態で追加する。
+
+        coalesce=True の場合、同じ workflow・trigger_type の queued / waiting run が
+        あれば新規 run を作らず result_summary をその run へ merge して返す。
+        resume_from_step_id 指定時は dispatcher がその step から実行を始める。
+        """
         workflow = self._workflow_repository.get_workflow(workflow_id)
         if not workflow["enabled"]:
             raise WorkflowDisabledError(f"workflow is disabled: {workflow_id}")
 
         now = utc_now()
         run_id = str(uuid.uuid4())
+        priority = resolve_run_priority(trigger_type, workflow["priority_boost"])
         with self._mutex, self._conn:
+            if coalesce:
+                coalesced_run_id = self._coalesce_into_pending_run(
+                    workflow_id=workflow_id,
+                    trigger_type=trigger_type,
+                    result_summary=result_summary,
+                )
+                if coalesced_run_id is not None:
+                    return self.get_run(coalesced_run_id)
             self._conn.execute(
                 """
                 INSERT INTO workflow_runs (
@@ -74,9 +104,11 @@ class RunRepository(SQLiteRepository):
                     last_error_message,
                     requested_by,
                     parent_run_id,
-                    result_summary_json
+                    result_summary_json,
+                    priority,
+                    resume_from_step_id
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, NULL, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, NULL, ?, ?, ?, ?, ?)
                 """,
                 (
                     run_id,
@@ -89,37 +121,87 @@ class RunRepository(SQLiteRepository):
                     requested_by,
                     parent_run_id,
                     json_to_text(result_summary),
+                    priority,
+                    resume_from_step_id,
                 ),
             )
         return self.get_run(run_id)
 
+    def _coalesce_into_pending_run(
+        self,
+        *,
+        workflow_id: str,
+        trigger_type: TriggerType,
+        result_summary: dict[str, Any] | None,
+    ) -> str | None:
+        # 呼び出し元の transaction 内で実行し、lease との競合は status 条件で防ぐ。
+        # lock 待ちで waiting に parked された run も未実行のため merge 先にする。
+        row = self._conn.execute(
+            """
+            SELECT run_id, result_summary_json
+            FROM workflow_runs
+            WHERE workflow_id = ?
+              AND trigger_type = ?
+              AND status IN (?, ?)
+            ORDER BY queued_at ASC, run_id ASC
+            LIMIT 1
+            """,
+            (workflow_id, trigger_type.value, *_PENDING_STATUSES),
+        ).fetchone()
+        if row is None:
+            return None
+        merged_summary = merge_result_summaries(
+            text_to_json(row["result_summary_json"]),
+            result_summary,
+        )
+        cursor = self._conn.execute(
+            """
+            UPDATE workflow_runs
+            SET result_summary_json = ?,
+                coalesced_count = coalesced_count + 1
+            WHERE run_id = ?
+              AND status IN (?, ?)
+            """,
+            (
+                json_to_text(merged_summary),
+                row["run_id"],
+                *_PENDING_STATUSES,
+            ),
+        )
+        if cursor.rowcount == 0:
+            return None
+        return row["run_id"]
+
     def lease_next_queued_run(
         self,
         *,
         excluded_run_ids: Collection[str] = (),
+        min_priority: int | None = None,
+        aging_seconds: float = 0,
     ) -> WorkflowRun | None:
-        """queued run を1件 running に遷移させて取得する。"""
-        now_text = dt_to_text(utc_now())
-        excluded_clause = ""
-        params: list[str] = [WorkflowRunStatus.QUEUED.value]
-        if excluded_run_ids:
-            placeholders = ", ".join("?" for _ in excluded_run_ids)
-            excluded_clause = f"AND run_id NOT IN ({placeholders})"
-            params.extend(excluded_run_ids)
+        """queued run を1件 running に遷移させて取得する。
+
+        priority lane ごとの先頭 run（queued_at 最古）を比較し、実効優先度が最も高い
+        run を選ぶ。aging_seconds > 0 の場合は待機時間 aging_seconds ごとに実効優先度を
+        1 加算し、低優先度 lane の starvation を防ぐ。min_priority 指定時は
+        priority がそれ未満の lane を対象外にする。
+        """
+        now = utc_now()
         with self._mutex, self._conn:
-            row = self._conn.execute(
-                f"""
-                SELECT *
-                FROM workflow_runs
-                WHERE status = ?
-                {excluded_clause}
-                ORDER BY queued_at ASC
-                LIMIT 1
-                """,
-                params,
-            ).fetchone()
-            if row is None:
+            candidates = self._select_lane_heads(
+                excluded_run_ids=excluded_run_ids,
+                min_priority=min_priority,
+            )
+            if not candidates:
                 return None
+            row = min(
+                candidates,
+                key=lambda candidate: (
+                    -_effective_priority(candidate, now, aging_seconds),
+                    candidate["queued_at"],
+                    candidate["run_id"],
+                ),
+            )
             self._conn.execute(
                 """
                 UPDATE workflow_runs
@@ -129,7 +211,7 @@ class RunRepository(SQLiteRepository):
                 """,
                 (
                     WorkflowRunStatus.RUNNING.value,
-                    now_text,
+                    dt_to_text(now),
                     row["run_id"],
                 ),
             )
@@ -139,6 +221,52 @@ class RunRepository(SQLiteRepository):
             ).fetchone()
         return map_run(updated)
 
+    def _select_lane_heads(
+        self,
+        *,
+        excluded_run_ids: Collection[str],
+        min_priority: int | None,
+    ) -> list[sqlite3.Row]:
+        # lane 数は少ないため、index を使って lane ごとに先頭 run を引く。
+        priority_clause = ""
+        lane_params: list[Any] = [WorkflowRunStatus.QUEUED.value]
+        if min_priority is not None:
+            priority_clause = "AND priority >= ?"
+            lane_params.append(min_priority)
+        excluded_clause = ""
+        if excluded_run_ids:
+            placeholders = ", ".join("?" for _ in excluded_run_ids)
+            excluded_clause = f"AND run_id NOT IN ({placeholders})"
+        priorities = [
+            row["priority"]
+            for row in self._conn.execute(
+                f"""
+                SELECT DISTINCT priority
+                FROM workflow_runs
+                WHERE status = ?
+                {priority_clause}
+                """,
+                lane_params,
+            ).fetchall()
+        ]
+        heads: list[sqlite3.Row] = []
+        for priority in priorities:
+            row = self._conn.execute(
+                f"""
+                SELECT *
+                FROM workflow_runs
+                WHERE status = ?
+                  AND priority = ?
+                {excluded_clause}
+                ORDER BY queued_at ASC, run_id ASC
+                LIMIT 1
+                """,
+                [WorkflowRunStatus.QUEUED.value, priority, *excluded_run_ids],
+            ).fetchone()
+            if row is not None:
+                heads.append(row)
+        return heads
+
     def requeue_run(self, run_id: str, *, reason: str | None = None) -> WorkflowRun:
         """running に遷移させた run を再度 queued に戻す。"""
         now_text = dt_to_text(utc_now())
@@ -161,6 +289,79 @@ class RunRepository(SQLiteRepository):
             )
         return self.get_run(run_id)
 
+    def park_run(self, run_id: str, *, reason: str | None = None) -> WorkflowRun:
+        """lock 待ちの run を waiting に遷移させる。"""
+        with self._mutex, self._conn:
+            self._conn.execute(
+                """
+                UPDATE workflow_runs
+                SET status = ?,
+                    started_at = NULL,
+                    last_error_message = ?
+                WHERE run_id = ?
+                """,
+                (
+                    WorkflowRunStatus.WAITING.value,
+                    reason,
+                    run_id,
+                ),
+            )
+        return self.get_run(run_id)
+
+    def resume_waiting_run(self, run_id: str) -> WorkflowRun | None:
+        """lock を引き渡された waiting run を running に遷移させる。
+
+        待機中に cancel された run は遷移させず None を返す。
+        """
+        with self._mutex, self._conn:
+            cursor = self._conn.execute(
+                """
+                UPDATE workflow_runs
+                SET status = ?,
+                    started_at = ?,
+                    last_error_message = NULL
+                WHERE run_id = ?
+                  AND status = ?
+                """,
+                (
+                    WorkflowRunStatus.RUNNING.value,
+                    dt_to_text(utc_now()),
+                    run_id,
+                    WorkflowRunStatus.WAITING.value,
+                ),
+            )
+        if cursor.rowcount == 0:
+            return None
+        return self.get_run(run_id)
+
+    def requeue_waiting_runs(self, run_ids: Collection[str] | None = None) -> int:
+        """waiting run を queued に戻す。run_ids 省略時は全件を対象にする。
+
+        queued_at は維持し、FIFO 上の順番を失わないようにする。
+        """
+        params: list[str] = [
+            WorkflowRunStatus.QUEUED.value,
+            WorkflowRunStatus.WAITING.value,
+        ]
+        run_id_clause = ""
+        if run_ids is not None:
+            if not run_ids:
+                return 0
+            placeholders = ", ".join("?" for _ in run_ids)
+            run_id_clause = f"AND run_id IN ({placeholders})"
+            params.extend(run_ids)
+        with self._mutex, self._conn:
+            cursor = self._conn.execute(
+                f"""
+                UPDATE workflow_runs
+                SET status = ?
+                WHERE status = ?
+                {run_id_clause}
+                """,
+                params,
+            )
+        return cursor.rowcount
+
     def get_run(self, run_id: str) -> WorkflowRun:
         """workflow run を1件取得する。"""
         with self._mutex:
@@ -174,26 +375,61 @@ class RunRepository(SQLiteRepository):
 
     def list_runs(self, workflow_id: str | None = None) -> list[WorkflowRun]:
         """workflow run 一覧を新しい順で返す。"""
+        return self.list_runs_page(workflow_id=workflow_id).runs
+
+    def list_runs_page(
+        self,
+        *,
+        workflow_id: str | None = None,
+        statuses: Collection[WorkflowRunStatus] = (),
+        queued_after: datetime | None = None,
+        queued_before: datetime | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> RunPage:
+        """workflow run 一覧を (queued_at, run_id) の keyset で新しい順に返す。"""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if workflow_id:
+            clauses.append("workflow_id = ?")
+            params.append(workflow_id)
+        if statuses:
+            placeholders = ", ".join("?" for _ in statuses)
+            clauses.append(f"status IN ({placeholders})")
+            params.extend(WorkflowRunStatus(status).value for status in statuses)
+        # queued_at は UTC の ISO 文字列で保存されるため、比較前に UTC へ揃える。
+        if queued_after is not None:
+            clauses.append("queued_at >= ?")
+            params.append(dt_to_text(queued_after.astimezone(UTC)))
+        if queued_before is not None:
+            clauses.append("queued_at < ?")
+            params.append(dt_to_text(queued_before.astimezone(UTC)))
+        if cursor:
+            cursor_queued_at, cursor_run_id = decode_run_cursor(cursor)
+            clauses.append("(queued_at < ? OR (queued_at = ? AND run_id < ?))")
+            params.extend([cursor_queued_at, cursor_queued_at, cursor_run_id])
+        where_clause = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        limit_clause = ""
+        if limit is not None:
+            # 1件余分に読み、次ページの有無を判定する。
+            limit_clause = "LIMIT ?"
+            params.append(max(1, limit) + 1)
         with self._mutex:
-            if workflow_id:
-                rows = self._conn.execute(
-                    """
-                    SELECT *
-                    FROM workflow_runs
-                    WHERE workflow_id = ?
-                    ORDER BY queued_at DESC
-                    """,
-                    (workflow_id,),
-                ).fetchall()
-            else:
-                rows = self._conn.execute(
-                    """
-                    SELECT *
-                    FROM workflow_runs
-                    ORDER BY queued_at DESC
-                    """
-                ).fetchall()
-        return [map_run(row) for row in rows]
+            rows = self._conn.execute(
+                f"""
+                SELECT *
+                FROM workflow_runs
+                {where_clause}
+                ORDER BY queued_at DESC, run_id DESC
+                {limit_clause}
+                """,
+                params,
+            ).fetchall()
+        next_cursor = None
+        if limit is not None and len(rows) > max(1, limit):
+            rows = rows[: max(1, limit)]
+            next_cursor = encode_run_cursor(rows[-1]["queued_at"], rows[-1]["run_id"])
+        return RunPage(runs=[map_run(row) for row in rows], next_cursor=next_cursor)
 
     def update_run_result(
         self,
@@ -225,9 +461,9 @@ class RunRepository(SQLiteRepository):
         return self.get_run(run_id)
 
     def cancel_run(self, run_id: str) -> WorkflowRun:
-        """queued run を canceled にする。"""
+        """queued/waiting run を canceled にする。"""
         run = self.get_run(run_id)
-        if run.status == WorkflowRunStatus.QUEUED:
+        if run.status in (WorkflowRunStatus.QUEUED, WorkflowRunStatus.WAITING):
             return self.update_run_result(
                 run_id=run_id,
                 status=WorkflowRunStatus.CANCELED,
@@ -235,6 +471,45 @@ class RunRepository(SQLiteRepository):
             )
         return run
 
+    def list_expired_runs(
+        self,
+        *,
+        finished_before: datetime,
+        limit: int,
+    ) -> list[WorkflowRun]:
+        """retention 対象となる終了済み run を古い順に返す。"""
+        terminal_statuses = (
+            WorkflowRunStatus.SUCCEEDED.value,
+            WorkflowRunStatus.FAILED.value,
+            WorkflowRunStatus.CANCELED.value,
+        )
+        with self._mutex:
+            rows = self._conn.execute(
+                """
+                SELECT *
+                FROM workflow_runs
+                WHERE status IN (?, ?, ?)
+                  AND finished_at < ?
+                ORDER BY finished_at ASC
+                LIMIT ?
+                """,
+                (*terminal_statuses, dt_to_text(finished_before), limit),
+            ).fetchall()
+        return [map_run(row) for row in rows]
+
+    def delete_runs(self, run_ids: Collection[str]) -> int:
+        """run と紐づく step run を削除する。"""
+        if not run_ids:
+            return 0
+        placeholders = ", ".join("?" for _ in run_ids)
+        with self._mutex, self._conn:
+            # step_runs は FK の ON DELETE CASCADE で削除される。
+            cursor = self._conn.execute(
+                f"DELETE FROM workflow_runs WHERE run_id IN ({placeholders})",
+                list(run_ids),
+            )
+        return cursor.rowcount
+
     def mark_stale_running_runs_failed(self) -> int:
         """再起動後に running のまま残った run/step を failed に寄せる。"""
         now_text = dt_to_text(utc_now())
@@ -282,3 +557,15 @@ class RunRepository(SQLiteRepository):
                 ),
             )
         return len(run_rows)
+
+
+def _effective_priority(
+    row: sqlite3.Row,
+    now: datetime,
+    aging_seconds: float,
+) -> int:
+    if aging_seconds <= 0:
+        return row["priority"]
+    queued_at = text_to_dt(row["queued_at"]) or now
+    waited_seconds = max(0.0, (now - queued_at).total_seconds())
+    return row["priority"] + int(waited_seconds // aging_seconds)
@@ -2,6 +2,16 @@
 
 import sqlite3
 
+# 既存 DB へ後から追加した列。CREATE TABLE と同じ定義を ALTER TABLE で補う。
+_WORKFLOW_DEFINITION_ADDED_COLUMNS = {
+    "priority_boost": "INTEGER NOT NULL DEFAULT 0",
+}
+_WORKFLOW_RUN_ADDED_COLUMNS = {
+    "coalesced_count": "INTEGER NOT NULL DEFAULT 0",
+    "priority": "INTEGER NOT NULL DEFAULT 0",
+    "resume_from_step_id": "TEXT",
+}
+
 
 def initialize_schema(conn: sqlite3.Connection) -> None:
     """pipelines 管理テーブルを作成する。"""
@@ -13,6 +23,7 @@ def initialize_schema(conn: sqlite3.Connection) -> None:
             description TEXT NOT NULL,
             enabled INTEGER NOT NULL,
             definition_version INTEGER NOT NULL,
+            priority_boost INTEGER NOT NULL DEFAULT 0,
             created_at TEXT NOT NULL,
             updated_at TEXT NOT NULL
         );
@@ -44,6 +55,9 @@ def initialize_schema(conn: sqlite3.Connection) -> None:
             requested_by TEXT NOT NULL,
             parent_run_id TEXT,
             result_summary_json TEXT,
+            coalesced_count INTEGER NOT NULL DEFAULT 0,
+            priority INTEGER NOT NULL DEFAULT 0,
+            resume_from_step_id TEXT,
             FOREIGN KEY (workflow_id)
               REFERENCES workflow_definitions(workflow_id)
               ON DELETE CASCADE
@@ -53,6 +67,10 @@ def initialize_schema(conn: sqlite3.Connection) -> None:
             ON workflow_runs(status, queued_at);
         CREATE INDEX IF NOT EXISTS idx_workflow_runs_workflow_id
             ON workflow_runs(workflow_id, queued_at);
+        CREATE INDEX IF NOT EXISTS idx_workflow_runs_queued_at_run_id
+            ON workflow_runs(queued_at, run_id);
+        CREATE INDEX IF NOT EXISTS idx_workflow_runs_status_finished_at
+            ON workflow_runs(status, finished_at);
 
         CREATE TABLE IF NOT EXISTS step_runs (
             step_run_id TEXT PRIMARY KEY,
@@ -88,4 +106,26 @@ def initialize_schema(conn: sqlite3.Connection) -> None:
         );
         """
     )
+    _add_missing_columns(
+        conn, "workflow_definitions", _WORKFLOW_DEFINITION_ADDED_COLUMNS
+    )
+    _add_missing_columns(conn, "workflow_runs", _WORKFLOW_RUN_ADDED_COLUMNS)
+    # 追加列を使う index は migration 後に作成する。
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_workflow_runs_status_priority_queued_at
+            ON workflow_runs(status, priority, queued_at, run_id)
+        """
+    )
     conn.commit()
+
+
+def _add_missing_columns(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: dict[str, str],
+) -> None:
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, definition in columns.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
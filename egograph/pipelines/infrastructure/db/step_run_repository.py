@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Collection
 from typing import Any
 
 from pipelines.domain.workflow import StepRun, StepRunStatus
@@ -135,3 +136,26 @@ class StepRunRepository(SQLiteRepository):
                 (run_id,),
             ).fetchall()
         return [map_step_run(row) for row in rows]
+
+    def list_step_runs_for_runs(
+        self,
+        run_ids: Collection[str],
+    ) -> dict[str, list[StepRun]]:
+        """複数 run の step run を run_id ごとにまとめて返す。"""
+        grouped: dict[str, list[StepRun]] = {run_id: [] for run_id in run_ids}
+        if not grouped:
+            return grouped
+        placeholders = ", ".join("?" for _ in grouped)
+        with self._mutex:
+            rows = self._conn.execute(
+                f"""
+                SELECT *
+                FROM step_runs
+                WHERE run_id IN ({placeholders})
+                ORDER BY run_id ASC, sequence_no ASC, attempt_no ASC
+                """,
+                list(grouped),
+            ).fetchall()
+        for row in rows:
+            grouped[row["run_id"]].append(map_step_run(row))
+        return grouped
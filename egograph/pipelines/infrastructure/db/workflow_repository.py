@@ -25,14 +25,16 @@ class WorkflowRepository(SQLiteRepository):
                         description,
                         enabled,
                         definition_version,
+                        priority_boost,
                         created_at,
                         updated_at
                     )
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     ON CONFLICT(workflow_id) DO UPDATE SET
                         name = excluded.name,
                         description = excluded.description,
                         definition_version = excluded.definition_version,
+                        priority_boost = excluded.priority_boost,
                         updated_at = excluded.updated_at
                     """,
                     (
@@ -41,6 +43,7 @@ class WorkflowRepository(SQLiteRepository):
                         workflow.description,
                         1 if workflow.enabled else 0,
                         workflow.definition_version,
+                        workflow.priority_boost,
                         now_text,
                         now_text,
                     ),
@@ -140,7 +143,8 @@ class WorkflowRepository(SQLiteRepository):
                     name,
                     description,
                     enabled,
-                    definition_version
+                    definition_version,
+                    priority_boost
                 FROM workflow_definitions
                 WHERE workflow_id = ?
                 """,
@@ -169,6 +173,7 @@ class WorkflowRepository(SQLiteRepository):
             "description": row["description"],
             "enabled": bool(row["enabled"]),
             "definition_version": row["definition_version"],
+            "priority_boost": row["priority_boost"],
             "schedules": [
                 {
                     "schedule_id": schedule["schedule_id"],
@@ -5,6 +5,7 @@ from __future__ import annotations
 import sqlite3
 import threading
 import uuid
+from collections import deque
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 
@@ -25,7 +26,11 @@ class WorkflowLease:
 
 
 class WorkflowLockManager:
-    """lease + heartbeat 方式で workflow_locks を管理する。"""
+    """lease + heartbeat 方式で workflow_locks を管理する。
+
+    lock を取得できなかった run は lock_key ごとの FIFO waiter queue に park し、
+    release 時に先頭 waiter へ lock を直接引き渡す。
+    """
 
     def __init__(
         self,
@@ -38,6 +43,7 @@ class WorkflowLockManager:
         self._lease_seconds = lease_seconds
         self._lease_owner = f"pipelines-{uuid.uuid4()}"
         self._mutex = mutex or threading.RLock()
+        self._waiters: dict[str, deque[str]] = {}
 
     @property
     def lease_owner(self) -> str:
@@ -46,51 +52,109 @@ class WorkflowLockManager:
 
     def acquire(self, *, lock_key: str, run_id: str) -> WorkflowLease:
         """stale lock を回収しながら lock を取得する。"""
+        with self._mutex, self._conn:
+            return self._acquire_locked(lock_key=lock_key, run_id=run_id)
+
+    def try_acquire(self, *, lock_key: str, run_id: str) -> WorkflowLease | None:
+        """waiter を追い越さずに lock を取得し、取得できなければ None を返す。"""
+        with self._mutex, self._conn:
+            if self._waiters.get(lock_key):
+                return None
+            try:
+                return self._acquire_locked(lock_key=lock_key, run_id=run_id)
+            except WorkflowLockUnavailableError:
+                return None
+
+    def acquire_or_wait(self, *, lock_key: str, run_id: str) -> WorkflowLease | None:
+        """lock を取得し、取得できなければ waiter queue の末尾へ追加する。
+
+        既に waiter がいる lock_key は空いていても先頭 waiter を追い越さない。
+        """
+        with self._mutex, self._conn:
+            waiters = self._waiters.get(lock_key)
+            if waiters:
+                waiters.append(run_id)
+                return None
+            try:
+                return self._acquire_locked(lock_key=lock_key, run_id=run_id)
+            except WorkflowLockUnavailableError:
+                self._waiters.setdefault(lock_key, deque()).append(run_id)
+                return None
+
+    def acquire_next_waiter(self, lock_key: str) -> WorkflowLease | None:
+        """lock が空いていれば先頭 waiter の lease として取得する。"""
+        with self._mutex, self._conn:
+            waiters = self._waiters.get(lock_key)
+            if not waiters:
+                return None
+            try:
+                lease = self._acquire_locked(lock_key=lock_key, run_id=waiters[0])
+            except WorkflowLockUnavailableError:
+                return None
+            self._pop_waiter(lock_key)
+            return lease
+
+    def waiting_lock_keys(self) -> list[str]:
+        """waiter が park されている lock_key 一覧。"""
+        with self._mutex:
+            return [key for key, waiters in self._waiters.items() if waiters]
+
+    def drain_waiters(self) -> list[str]:
+        """全 waiter を queue から外し、run_id を FIFO 順で返す。"""
+        with self._mutex:
+            run_ids = [
+                run_id for waiters in self._waiters.values() for run_id in waiters
+            ]
+            self._waiters.clear()
+        return run_ids
+
+    def _pop_waiter(self, lock_key: str) -> str:
+        waiters = self._waiters[lock_key]
+        run_id = waiters.popleft()
+        if not waiters:
+            del self._waiters[lock_key]
+        return run_id
+
+    def _acquire_locked(self, *, lock_key: str, run_id: str) -> WorkflowLease:
         now = _utc_now()
         expires_at = now + timedelta(seconds=self._lease_seconds)
-        with self._mutex, self._conn:
-            row = self._conn.execute(
-                """
-                SELECT lock_key, lease_expires_at
-                FROM workflow_locks
-                WHERE lock_key = ?
-                """,
-                (lock_key,),
-            ).fetchone()
-            if (
-                row is not None
-                and datetime.fromisoformat(row["lease_expires_at"]) >= now
-            ):
-                raise WorkflowLockUnavailableError(
-                    f"workflow lock is active: {lock_key}"
-                )
-            self._conn.execute(
-                """
-                INSERT INTO workflow_locks (
-                    lock_key,
-                    run_id,
-                    lease_owner,
-                    acquired_at,
-                    heartbeat_at,
-                    lease_expires_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?)
-                ON CONFLICT(lock_key) DO UPDATE SET
-                    run_id = excluded.run_id,
-                    lease_owner = excluded.lease_owner,
-                    acquired_at = excluded.acquired_at,
-                    heartbeat_at = excluded.heartbeat_at,
-                    lease_expires_at = excluded.lease_expires_at
-                """,
-                (
-                    lock_key,
-                    run_id,
-                    self._lease_owner,
-                    now.isoformat(),
-                    now.isoformat(),
-                    expires_at.isoformat(),
-                ),
+        row = self._conn.execute(
+            """
+            SELECT lock_key, lease_expires_at
+            FROM workflow_locks
+            WHERE lock_key = ?
+            """,
+            (lock_key,),
+        ).fetchone()
+        if row is not None and datetime.fromisoformat(row["lease_expires_at"]) >= now:
+            raise WorkflowLockUnavailableError(f"workflow lock is active: {lock_key}")
+        self._conn.execute(
+            """
+            INSERT INTO workflow_locks (
+                lock_key,
+                run_id,
+                lease_owner,
+                acquired_at,
+                heartbeat_at,
+                lease_expires_at
             )
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(lock_key) DO UPDATE SET
+                run_id = excluded.run_id,
+                lease_owner = excluded.lease_owner,
+                acquired_at = excluded.acquired_at,
+                heartbeat_at = excluded.heartbeat_at,
+                lease_expires_at = excluded.lease_expires_at
+            """,
+            (
+                lock_key,
+                run_id,
+                self._lease_owner,
+                now.isoformat(),
+                now.isoformat(),
+                expires_at.isoformat(),
+            ),
+        )
         return WorkflowLease(
             lock_key=lock_key,
             run_id=run_id,
@@ -120,9 +184,52 @@ class WorkflowLockManager:
                 ),
             )
 
-    def release(self, lease: WorkflowLease) -> None:
-        """保持中 lease を解放する。"""
+    def release(
+        self,
+        lease: WorkflowLease,
+        *,
+        handoff: bool = True,
+    ) -> WorkflowLease | None:
+        """保持中 lease を解放する。
+
+        handoff 時に waiter がいれば lock を削除せず先頭 waiter へ引き渡し、
+        その lease を返す。
+        """
+        now = _utc_now()
+        expires_at = now + timedelta(seconds=self._lease_seconds)
         with self._mutex, self._conn:
+            if handoff and self._waiters.get(lease.lock_key):
+                next_run_id = self._waiters[lease.lock_key][0]
+                cursor = self._conn.execute(
+                    """
+                    UPDATE workflow_locks
+                    SET run_id = ?,
+                        acquired_at = ?,
+                        heartbeat_at = ?,
+                        lease_expires_at = ?
+                    WHERE lock_key = ?
+                      AND run_id = ?
+                      AND lease_owner = ?
+                    """,
+                    (
+                        next_run_id,
+                        now.isoformat(),
+                        now.isoformat(),
+                        expires_at.isoformat(),
+                        lease.lock_key,
+                        lease.run_id,
+                        lease.lease_owner,
+                    ),
+                )
+                if cursor.rowcount == 1:
+                    self._pop_waiter(lease.lock_key)
+                    return WorkflowLease(
+                        lock_key=lease.lock_key,
+                        run_id=next_run_id,
+                        lease_owner=self._lease_owner,
+                    )
+                # lease を既に失っている場合は引き渡さず、次回の取得に任せる。
+                return None
             self._conn.execute(
                 """
                 DELETE FROM workflow_locks
@@ -136,6 +243,7 @@ class WorkflowLockManager:
                     lease.lease_owner,
                 ),
             )
+        return None
 
     def cleanup_stale_locks(self) -> int:
         """期限切れ lock を削除する。"""
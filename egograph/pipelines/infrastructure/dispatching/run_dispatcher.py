@@ -5,9 +5,11 @@ from __future__ import annotations
 import logging
 import threading
 import time
+from dataclasses import replace
 
 from pipelines.domain.errors import WorkflowLockUnavailableError
 from pipelines.domain.workflow import (
+    RunPriority,
     StepDefinition,
     StepExecutorType,
     StepRunStatus,
@@ -15,6 +17,7 @@ from pipelines.domain.workflow import (
     WorkflowRun,
     WorkflowRunStatus,
 )
+from pipelines.infrastructure.db._shared import merge_result_summaries
 from pipelines.infrastructure.db.run_repository import RunRepository
 from pipelines.infrastructure.db.step_run_repository import StepRunRepository
 from pipelines.infrastructure.dispatching.lock_manager import (
@@ -34,9 +37,9 @@ logger = logging.getLogger(__name__)
 class _DispatchOutcome:
     """1回の dispatch 試行結果。"""
 
-    def __init__(self, *, dispatched: bool, blocked_run_id: str | None = None) -> None:
+    def __init__(self, *, dispatched: bool, parked: bool = False) -> None:
         self.dispatched = dispatched
-        self.blocked_run_id = blocked_run_id
+        self.parked = parked
 
 
 class RunDispatcher:
@@ -54,6 +57,8 @@ class RunDispatcher:
         poll_seconds: float,
         heartbeat_seconds: int,
         max_concurrent_runs: int = 1,
+        priority_aging_seconds: float = 0,
+        reserved_priority_slots: int = 0,
     ) -> None:
         self._run_repository = run_repository
         self._step_run_repository = step_run_repository
@@ -64,6 +69,12 @@ class RunDispatcher:
         self._poll_seconds = poll_seconds
         self._heartbeat_seconds = heartbeat_seconds
         self._max_concurrent_runs = max(1, max_concurrent_runs)
+        self._priority_aging_seconds = priority_aging_seconds
+        # 全 slot を予約すると低優先度 run が永久に動けないため、最低1枠は共用に残す。
+        self._reserved_priority_slots = min(
+            max(0, reserved_priority_slots),
+            self._max_concurrent_runs - 1,
+        )
         self._stop_event = threading.Event()
         self._thread: threading.Thread | None = None
         self._worker_mutex = threading.Lock()
@@ -84,6 +95,7 @@ class RunDispatcher:
             self._thread.join(timeout=max(1.0, self._poll_seconds * 2))
         for worker in self._take_worker_snapshot():
             worker.join(timeout=max(1.0, self._heartbeat_seconds))
+        self._requeue_parked_runs()
 
     def run_forever(self) -> None:
         """停止要求が来るまで dispatch を続ける。"""
@@ -97,29 +109,43 @@ class RunDispatcher:
                 self._stop_event.wait(self._poll_seconds)
 
     def _dispatch_available_runs(self) -> bool:
-        dispatched = False
-        blocked_run_ids: set[str] = set()
+        dispatched = self._dispatch_unblocked_waiters()
         while not self._stop_event.is_set():
             available_slots = self._available_slots()
             if available_slots <= 0:
                 return dispatched
-            outcome = self._dispatch_once_in_background(
-                excluded_run_ids=blocked_run_ids
-            )
-            if outcome.blocked_run_id is not None:
-                blocked_run_ids.add(outcome.blocked_run_id)
+            outcome = self._dispatch_once_in_background()
+            if outcome.parked:
+                # park した run は queued から外れるため、再スキャンせず次へ進める。
                 continue
-            blocked_run_ids.clear()
             if not outcome.dispatched:
                 return dispatched
             dispatched = True
         return dispatched
 
+    def _dispatch_unblocked_waiters(self) -> bool:
+        """他プロセス保持や期限切れで引き渡されなかった waiter を再開する。"""
+        dispatched = False
+        for lock_key in self._lock_manager.waiting_lock_keys():
+            if self._stop_event.is_set() or self._available_slots() <= 0:
+                break
+            lease = self._lock_manager.acquire_next_waiter(lock_key)
+            if lease is None:
+                continue
+            handoff = self._take_handoff(lease)
+            if handoff is None:
+                continue
+            self._start_worker(*handoff)
+            dispatched = True
+        return dispatched
+
     def dispatch_once(self) -> bool:
         """queued run を1件処理する。"""
         run: WorkflowRun | None = None
         try:
-            run = self._run_repository.lease_next_queued_run()
+            run = self._run_repository.lease_next_queued_run(
+                aging_seconds=self._priority_aging_seconds,
+            )
             if run is None:
                 return False
 
@@ -140,7 +166,11 @@ class RunDispatcher:
                 )
                 return False
 
-            self._execute_run_with_heartbeat(workflow, run, lease)
+            handoff = self._take_handoff(
+                self._execute_run_with_heartbeat(workflow, run, lease)
+            )
+            if handoff is not None:
+                self._start_worker(*handoff)
             return True
         except Exception as exc:
             if run is None:
@@ -156,15 +186,12 @@ class RunDispatcher:
             )
             return True
 
-    def _dispatch_once_in_background(
-        self,
-        *,
-        excluded_run_ids: set[str],
-    ) -> _DispatchOutcome:
+    def _dispatch_once_in_background(self) -> _DispatchOutcome:
         run: WorkflowRun | None = None
         try:
             run = self._run_repository.lease_next_queued_run(
-                excluded_run_ids=excluded_run_ids
+                min_priority=self._lease_min_priority(),
+                aging_seconds=self._priority_aging_seconds,
             )
             if run is None:
                 return _DispatchOutcome(dispatched=False)
@@ -172,32 +199,23 @@ class RunDispatcher:
             workflow = self._workflows.get(run.workflow_id)
             if workflow is None:
                 self._fail_unknown_workflow_run(run)
-                return True
+                return _DispatchOutcome(dispatched=True)
 
-            try:
-                lease = self._lock_manager.acquire(
-                    lock_key=workflow.lock_key,
-                    run_id=run.run_id,
-                )
-            except WorkflowLockUnavailableError as exc:
-                self._run_repository.requeue_run(
-                    run_id=run.run_id,
-                    reason=str(exc),
-                )
-                return _DispatchOutcome(
-                    dispatched=False,
-                    blocked_run_id=run.run_id,
-                )
-
-            worker = threading.Thread(
-                target=self._execute_run_in_worker,
-                args=(workflow, run, lease),
-                daemon=True,
-                name=f"workflow-run-{run.run_id}",
+            lease = self._lock_manager.try_acquire(
+                lock_key=workflow.lock_key,
+                run_id=run.run_id,
             )
-            with self._worker_mutex:
-                self._worker_threads[run.run_id] = worker
-            worker.start()
+            if lease is None:
+                lease = self._park_run(workflow, run)
+                if lease is None:
+                    return _DispatchOutcome(dispatched=False, parked=True)
+                resumed = self._run_repository.resume_waiting_run(run.run_id)
+                if resumed is None:
+                    self._release_and_start_handoff(lease)
+                    return _DispatchOutcome(dispatched=True)
+                run = resumed
+
+            self._start_worker(workflow, run, lease)
             return _DispatchOutcome(dispatched=True)
         except Exception as exc:
             if run is None:
@@ -213,6 +231,66 @@ class RunDispatcher:
             )
             return _DispatchOutcome(dispatched=True)
 
+    def _park_run(
+        self,
+        workflow: WorkflowDefinition,
+        run: WorkflowRun,
+    ) -> WorkflowLease | None:
+        """run を waiting にして waiter queue へ登録する。
+
+        handoff 時に resume できるよう、waiter 登録より先に waiting へ遷移させる。
+        登録前に lock が空いた場合は取得した lease を返す。
+        """
+        self._run_repository.park_run(
+            run.run_id,
+            reason=f"waiting for workflow lock: {workflow.lock_key}",
+        )
+        return self._lock_manager.acquire_or_wait(
+            lock_key=workflow.lock_key,
+            run_id=run.run_id,
+        )
+
+    def _release_and_start_handoff(self, lease: WorkflowLease) -> None:
+        handoff = self._take_handoff(self._lock_manager.release(lease))
+        if handoff is not None:
+            self._start_worker(*handoff)
+
+    def _start_worker(
+        self,
+        workflow: WorkflowDefinition,
+        run: WorkflowRun,
+        lease: WorkflowLease,
+    ) -> None:
+        worker = threading.Thread(
+            target=self._execute_run_in_worker,
+            args=(workflow, run, lease),
+            daemon=True,
+            name=f"workflow-run-{run.run_id}",
+        )
+        with self._worker_mutex:
+            self._worker_threads[run.run_id] = worker
+        worker.start()
+
+    def _take_handoff(
+        self,
+        lease: WorkflowLease | None,
+    ) -> tuple[WorkflowDefinition, WorkflowRun, WorkflowLease] | None:
+        """引き渡された lease の waiter run を running にして返す。"""
+        while lease is not None:
+            run = self._run_repository.resume_waiting_run(lease.run_id)
+            if run is not None:
+                return self._workflows[run.workflow_id], run, lease
+            # 待機中に cancel された waiter は飛ばし、次の waiter へ引き渡す。
+            lease = self._lock_manager.release(lease)
+        return None
+
+    def _requeue_parked_runs(self) -> None:
+        run_ids = self._lock_manager.drain_waiters()
+        try:
+            self._run_repository.requeue_waiting_runs(run_ids)
+        except Exception:
+            logger.exception("failed to requeue parked runs on stop")
+
     def _heartbeat_loop(
         self,
         lease: WorkflowLease,
@@ -238,10 +316,25 @@ class RunDispatcher:
     ) -> None:
         last_summary: dict | None = None
         try:
-            for sequence_no, step in enumerate(workflow.steps, start=1):
+            start_index = self._resolve_start_index(workflow, run)
+            if start_index is None:
+                self._run_repository.update_run_result(
+                    run_id=run.run_id,
+                    status=WorkflowRunStatus.FAILED,
+                    error_message=(f"resume step not found: {run.resume_from_step_id}"),
+                )
+                return
+            self._record_reused_steps(run=run, steps=workflow.steps[:start_index])
+            # 後続 step は run 入力に前段 step の result_summary を merge した
+            # context を受け取る（例: ingest の changed_partitions を compact へ渡す）。
+            step_context = run.result_summary
+            for sequence_no, step in enumerate(
+                workflow.steps[start_index:],
+                start=start_index + 1,
+            ):
                 success, last_summary, error_message = self._execute_step(
                     workflow=workflow,
-                    run=run,
+                    run=replace(run, result_summary=step_context),
                     step=step,
                     sequence_no=sequence_no,
                 )
@@ -254,11 +347,11 @@ class RunDispatcher:
                     self._run_repository.update_run_result(
                         run_id=run.run_id,
                         status=WorkflowRunStatus.FAILED,
-                        error_message=error_message
-                        or f"step failed: {step.step_id}",
+                        error_message=error_message or f"step failed: {step.step_id}",
                         result_summary=last_summary,
                     )
                     return
+                step_context = merge_result_summaries(step_context, last_summary)
             self._run_repository.update_run_result(
                 run_id=run.run_id,
                 status=WorkflowRunStatus.SUCCEEDED,
@@ -274,6 +367,45 @@ class RunDispatcher:
                 exc=exc,
             )
 
+    @staticmethod
+    def _resolve_start_index(
+        workflow: WorkflowDefinition,
+        run: WorkflowRun,
+    ) -> int | None:
+        if run.resume_from_step_id is None:
+            return 0
+        for index, step in enumerate(workflow.steps):
+            if step.step_id == run.resume_from_step_id:
+                return index
+        return None
+
+    def _record_reused_steps(
+        self,
+        *,
+        run: WorkflowRun,
+        steps: tuple[StepDefinition, ...],
+    ) -> None:
+        # resume 前の step は実行せず、親 run の出力を再利用したことだけを残す。
+        for sequence_no, step in enumerate(steps, start=1):
+            step_run = self._step_run_repository.insert_step_run(
+                run_id=run.run_id,
+                step_id=step.step_id,
+                step_name=step.step_name,
+                sequence_no=sequence_no,
+                attempt_no=1,
+                command=self._format_command(step),
+                status=StepRunStatus.SKIPPED,
+            )
+            self._step_run_repository.update_step_result(
+                step_run_id=step_run.step_run_id,
+                status=StepRunStatus.SKIPPED,
+                exit_code=None,
+                stdout_tail=f"reused output of parent run {run.parent_run_id}",
+                stderr_tail="",
+                log_path=None,
+                result_summary=None,
+            )
+
     def _execute_step(
         self,
         *,
@@ -387,7 +519,8 @@ class RunDispatcher:
         workflow: WorkflowDefinition,
         run: WorkflowRun,
         lease: WorkflowLease,
-    ) -> None:
+    ) -> WorkflowLease | None:
+        """run を実行して lease を解放し、waiter へ引き渡した lease を返す。"""
         heartbeat_stop = threading.Event()
         heartbeat_thread = threading.Thread(
             target=self._heartbeat_loop,
@@ -401,13 +534,15 @@ class RunDispatcher:
             heartbeat_stop.set()
             heartbeat_thread.join(timeout=max(1, self._heartbeat_seconds))
             try:
-                self._lock_manager.release(lease)
+                handoff_lease = self._lock_manager.release(lease)
             except Exception:
                 logger.exception(
                     "failed to release workflow lease: lock_key=%s, run_id=%s",
                     lease.lock_key,
                     lease.run_id,
                 )
+                handoff_lease = None
+        return handoff_lease
 
     def _execute_run_in_worker(
         self,
@@ -415,11 +550,27 @@ class RunDispatcher:
         run: WorkflowRun,
         lease: WorkflowLease,
     ) -> None:
+        current_run_id = run.run_id
         try:
-            self._execute_run_with_heartbeat(workflow, run, lease)
+            while True:
+                handoff_lease = self._execute_run_with_heartbeat(workflow, run, lease)
+                if self._stop_event.is_set() and handoff_lease is not None:
+                    # 停止中は引き渡された lease を握らず、waiter は stop 側で戻す。
+                    self._lock_manager.release(handoff_lease, handoff=False)
+                    return
+                handoff = self._take_handoff(handoff_lease)
+                if handoff is None:
+                    return
+                workflow, run, lease = handoff
+                # 同じ worker thread と slot のまま次の waiter を実行する。
+                with self._worker_mutex:
+                    worker = self._worker_threads.pop(current_run_id, None)
+                    if worker is not None:
+                        self._worker_threads[run.run_id] = worker
+                current_run_id = run.run_id
         finally:
             with self._worker_mutex:
-                self._worker_threads.pop(run.run_id, None)
+                self._worker_threads.pop(current_run_id, None)
 
     def _available_slots(self) -> int:
         with self._worker_mutex:
@@ -433,6 +584,14 @@ class RunDispatcher:
             active_count = len(self._worker_threads)
         return self._max_concurrent_runs - active_count
 
+    def _lease_min_priority(self) -> int | None:
+        """空き slot が予約枠だけなら event lane 以上の run に限定する。"""
+        if self._reserved_priority_slots <= 0:
+            return None
+        if self._available_slots() > self._reserved_priority_slots:
+            return None
+        return int(RunPriority.EVENT)
+
     def _take_worker_snapshot(self) -> list[threading.Thread]:
         with self._worker_mutex:
             return list(self._worker_threads.values())
@@ -478,8 +637,7 @@ class RunDispatcher:
                 run_id=run_id,
                 status=WorkflowRunStatus.FAILED,
                 error_message=(
-                    "unexpected dispatcher error: "
-                    f"{type(exc).__name__}: {exc}"
+                    f"unexpected dispatcher error: {type(exc).__name__}: {exc}"
                 ),
             )
         except Exception:
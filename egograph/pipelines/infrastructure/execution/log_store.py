@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import shutil
 from pathlib import Path
 
 
@@ -51,3 +52,11 @@ class LocalLogStore:
     def read_log(log_path: str) -> str:
         """ログ本文を読み込む。"""
         return Path(log_path).read_text(encoding="utf-8")
+
+    def delete_run_logs(self, *, workflow_id: str, run_id: str) -> bool:
+        """run 単位のログディレクトリを削除する。"""
+        log_dir = self._logs_root / workflow_id / run_id
+        if not log_dir.is_dir():
+            return False
+        shutil.rmtree(log_dir)
+        return True
@@ -0,0 +1 @@
+"""Run retention adapters."""
@@ -0,0 +1,162 @@
+"""Workflow run retention and archival."""
+
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+import logging
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from pipelines.domain.workflow import StepRun, WorkflowRun
+from pipelines.infrastructure.db.run_repository import RunRepository
+from pipelines.infrastructure.db.step_run_repository import StepRunRepository
+from pipelines.infrastructure.execution.log_store import LocalLogStore
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"unsupported archive value: {type(value).__name__}")
+
+
+class RunArchiveStore:
+    """削除前の run/step を gzip JSON Lines としてローカルへ追記保存する。"""
+
+    def __init__(self, archive_root: Path) -> None:
+        self._archive_root = archive_root
+
+    def append(
+        self,
+        runs: list[WorkflowRun],
+        steps_by_run_id: dict[str, list[StepRun]],
+        *,
+        archived_at: datetime,
+    ) -> str:
+        """run 群を日付ごとの archive ファイルへ追記し、そのパスを返す。"""
+        self._archive_root.mkdir(parents=True, exist_ok=True)
+        archive_path = (
+            self._archive_root / f"runs-{archived_at.strftime('%Y%m%d')}.jsonl.gz"
+        )
+        # gzip は member 連結でも有効なストリームになるため追記モードで書ける。
+        with gzip.open(archive_path, "at", encoding="utf-8") as handle:
+            for run in runs:
+                record = {
+                    "archived_at": archived_at,
+                    "run": dataclasses.asdict(run),
+                    "steps": [
+                        dataclasses.asdict(step)
+                        for step in steps_by_run_id.get(run.run_id, [])
+                    ],
+                }
+                handle.write(
+                    json.dumps(
+                        record,
+                        default=_json_default,
+                        ensure_ascii=False,
+                        sort_keys=True,
+                    )
+                )
+                handle.write("\n")
+        return str(archive_path)
+
+
+class RunRetentionPolicy:
+    """保持期間を過ぎた run を archive し、行とログをバッチ単位で削除する。"""
+
+    def __init__(
+        self,
+        *,
+        run_repository: RunRepository,
+        step_run_repository: StepRunRepository,
+        log_store: LocalLogStore,
+        archive_store: RunArchiveStore,
+        retention_days: int,
+        batch_size: int = 500,
+    ) -> None:
+        self._run_repository = run_repository
+        self._step_run_repository = step_run_repository
+        self._log_store = log_store
+        self._archive_store = archive_store
+        self._retention_days = retention_days
+        self._batch_size = max(1, batch_size)
+
+    @property
+    def enabled(self) -> bool:
+        """retention が有効かどうか。"""
+        return self._retention_days > 0
+
+    def apply(
+        self,
+        *,
+        retention_days: int | None = None,
+        now: datetime | None = None,
+    ) -> dict[str, Any]:
+        """保持期間外の終了済み run を archive して削除する。"""
+        days = self._retention_days if retention_days is None else retention_days
+        summary: dict[str, Any] = {
+            "retention_days": days,
+            "archived_runs": 0,
+            "deleted_step_runs": 0,
+            "deleted_log_dirs": 0,
+            "archive_paths": [],
+        }
+        if days <= 0:
+            return summary
+
+        current = now or datetime.now(tz=UTC)
+        cutoff = current - timedelta(days=days)
+        summary["cutoff"] = cutoff.isoformat()
+        archive_paths: list[str] = summary["archive_paths"]
+        while True:
+            runs = self._run_repository.list_expired_runs(
+                finished_before=cutoff,
+                limit=self._batch_size,
+            )
+            if not runs:
+                break
+            run_ids = [run.run_id for run in runs]
+            steps_by_run_id = self._step_run_repository.list_step_runs_for_runs(run_ids)
+            # archive へ書き出してから削除し、途中失敗でも履歴を失わないようにする。
+            archive_path = self._archive_store.append(
+                runs,
+                steps_by_run_id,
+                archived_at=current,
+            )
+            if archive_path not in archive_paths:
+                archive_paths.append(archive_path)
+            self._run_repository.delete_runs(run_ids)
+            summary["archived_runs"] += len(runs)
+            summary["deleted_step_runs"] += sum(
+                len(steps) for steps in steps_by_run_id.values()
+            )
+            for run in runs:
+                try:
+                    if self._log_store.delete_run_logs(
+                        workflow_id=run.workflow_id,
+                        run_id=run.run_id,
+                    ):
+                        summary["deleted_log_dirs"] += 1
+                except OSError as exc:
+                    logger.warning(
+                        "failed to delete run logs: run_id=%s, error=%s",
+                        run.run_id,
+                        exc,
+                    )
+            if len(runs) < self._batch_size:
+                break
+
+        if summary["archived_runs"]:
+            logger.info(
+                "run retention archived %d runs older than %s",
+                summary["archived_runs"],
+                summary["cutoff"],
+            )
+        return summary
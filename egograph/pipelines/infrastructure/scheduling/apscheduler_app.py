@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from datetime import UTC, datetime
+from typing import Any
 from zoneinfo import ZoneInfo
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -36,6 +38,7 @@ class ScheduleTriggerApp:
         self._run_repository = run_repository
         self._workflows = workflows
         self._scheduler = BackgroundScheduler(timezone=ZoneInfo(timezone))
+        self._maintenance_jobs: dict[str, tuple[Callable[[], Any], int]] = {}
 
     def start(self) -> None:
         """scheduler を開始する。"""
@@ -109,6 +112,30 @@ class ScheduleTriggerApp:
                     misfire_grace_time=3600,
                 )
 
+        self._add_maintenance_jobs()
+
+    def add_maintenance_job(
+        self,
+        job_id: str,
+        func: Callable[[], Any],
+        *,
+        interval_seconds: int,
+    ) -> None:
+        """workflow run を介さない定期保守 job を登録する。"""
+        self._maintenance_jobs[job_id] = (func, interval_seconds)
+        self._add_maintenance_jobs()
+
+    def _add_maintenance_jobs(self) -> None:
+        for job_id, (func, interval_seconds) in self._maintenance_jobs.items():
+            self._scheduler.add_job(
+                func,
+                id=f"maintenance:{job_id}",
+                trigger=IntervalTrigger(seconds=interval_seconds),
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+
     def enqueue_event_run(
         self,
         *,
@@ -116,7 +143,12 @@ class ScheduleTriggerApp:
         requested_by: str = "api",
         result_summary: dict | None = None,
     ):
-        """event 由来の run を queue に積む。"""
+        """event 由来の run を queue に積む。
+
+        workflow が coalesce_event_runs を宣言していれば、queued 中の event run へ
+        payload を merge する。
+        """
+        workflow = self._workflows.get(workflow_id)
         return self._run_repository.enqueue_run(
             workflow_id=workflow_id,
             trigger_type=TriggerType.EVENT,
@@ -124,6 +156,7 @@ class ScheduleTriggerApp:
             requested_by=requested_by,
             scheduled_at=datetime.now(tz=UTC),
             result_summary=result_summary,
+            coalesce=workflow.coalesce_event_runs if workflow else False,
         )
 
     def _enqueue_schedule_run(self, schedule_id: str, workflow_id: str) -> None:
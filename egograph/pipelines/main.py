@@ -4,12 +4,15 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
+from datetime import datetime
 from typing import Any
 
 import uvicorn
 
 from pipelines.app import create_app
 from pipelines.config import PipelinesConfig
+from pipelines.domain.workflow import WorkflowRunStatus
 from pipelines.service import PipelineService
 
 
@@ -62,6 +65,17 @@ def _build_parser() -> argparse.ArgumentParser:
     run_parser = subparsers.add_parser("run")
     run_sub = run_parser.add_subparsers(dest="run_command", required=True)
     run_list_parser = run_sub.add_parser("list")
+    run_list_parser.add_argument("--workflow-id", default=None)
+    run_list_parser.add_argument(
+        "--status",
+        action="append",
+        choices=[status.value for status in WorkflowRunStatus],
+        default=None,
+    )
+    run_list_parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    run_list_parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    run_list_parser.add_argument("--limit", type=int, default=100)
+    run_list_parser.add_argument("--cursor", default=None)
     run_list_parser.add_argument("--json", action="store_true")
     run_show_parser = run_sub.add_parser("show")
     run_show_parser.add_argument("run_id")
@@ -71,10 +85,14 @@ def _build_parser() -> argparse.ArgumentParser:
     run_log_parser.add_argument("step_id")
     run_retry_parser = run_sub.add_parser("retry")
     run_retry_parser.add_argument("run_id")
+    run_retry_parser.add_argument("--resume", action="store_true")
     run_retry_parser.add_argument("--json", action="store_true")
     run_cancel_parser = run_sub.add_parser("cancel")
     run_cancel_parser.add_argument("run_id")
     run_cancel_parser.add_argument("--json", action="store_true")
+    run_prune_parser = run_sub.add_parser("prune")
+    run_prune_parser.add_argument("--older-than-days", type=int, default=None)
+    run_prune_parser.add_argument("--json", action="store_true")
     return parser
 
 
@@ -105,7 +123,17 @@ def main() -> None:
         _emit(service.set_workflow_enabled(args.workflow_id, False), args.json)
         return
     if args.command == "run" and args.run_command == "list":
-        _emit([run.__dict__ for run in service.list_runs()], args.json)
+        page = service.list_runs_page(
+            workflow_id=args.workflow_id,
+            statuses=[WorkflowRunStatus(status) for status in args.status or ()],
+            queued_after=args.since,
+            queued_before=args.until,
+            limit=args.limit,
+            cursor=args.cursor,
+        )
+        _emit([run.__dict__ for run in page.runs], args.json)
+        if page.next_cursor:
+            print(f"next_cursor: {page.next_cursor}", file=sys.stderr)
         return
     if args.command == "run" and args.run_command == "show":
         detail = service.get_run_detail(args.run_id)
@@ -121,10 +149,16 @@ def main() -> None:
         print(service.get_step_log(args.run_id, args.step_id))
         return
     if args.command == "run" and args.run_command == "retry":
-        _emit(service.retry_run(args.run_id).__dict__, args.json)
+        _emit(
+            service.retry_run(args.run_id, resume=args.resume).__dict__,
+            args.json,
+        )
         return
     if args.command == "run" and args.run_command == "cancel":
         _emit(service.cancel_run(args.run_id).__dict__, args.json)
+        return
+    if args.command == "run" and args.run_command == "prune":
+        _emit(service.prune_runs(retention_days=args.older_than_days), args.json)
 
 
 if __name__ == "__main__":
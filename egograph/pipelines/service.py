@@ -3,11 +3,23 @@
 from __future__ import annotations
 
 import threading
+from collections.abc import Collection
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
 from pipelines.config import PipelinesConfig
-from pipelines.domain.errors import WorkflowNotFoundError
-from pipelines.domain.workflow import QueuedReason, TriggerType, WorkflowRun
+from pipelines.domain.errors import RunNotResumableError, WorkflowNotFoundError
+from pipelines.domain.workflow import (
+    QueuedReason,
+    RunPage,
+    StepRunStatus,
+    TriggerType,
+    WorkflowDefinition,
+    WorkflowRun,
+    WorkflowRunStatus,
+)
+from pipelines.infrastructure.db._shared import merge_result_summaries
 from pipelines.infrastructure.db.connection import connect
 from pipelines.infrastructure.db.run_repository import RunRepository
 from pipelines.infrastructure.db.schedule_state_repository import (
@@ -23,6 +35,10 @@ from pipelines.infrastructure.execution.log_store import LocalLogStore
 from pipelines.infrastructure.execution.subprocess_executor import (
     SubprocessStepExecutor,
 )
+from pipelines.infrastructure.retention.run_retention import (
+    RunArchiveStore,
+    RunRetentionPolicy,
+)
 from pipelines.infrastructure.scheduling.apscheduler_app import ScheduleTriggerApp
 from pipelines.workflows.registry import get_workflows
 
@@ -32,6 +48,7 @@ class PipelineService:
     """pipelines サービスのユースケース境界。"""
 
     config: PipelinesConfig
+    workflows: dict[str, WorkflowDefinition]
     workflow_repository: WorkflowRepository
     schedule_state_repository: ScheduleStateRepository
     run_repository: RunRepository
@@ -40,6 +57,7 @@ class PipelineService:
     scheduler: ScheduleTriggerApp
     dispatcher: RunDispatcher
     log_store: LocalLogStore
+    retention_policy: RunRetentionPolicy
 
     @classmethod
     def create(cls, config: PipelinesConfig | None = None) -> "PipelineService":
@@ -65,6 +83,7 @@ class PipelineService:
         log_store = LocalLogStore(config.logs_root)
         service = cls(
             config=config,
+            workflows=workflows,
             workflow_repository=workflow_repository,
             schedule_state_repository=schedule_state_repository,
             run_repository=run_repository,
@@ -87,15 +106,33 @@ class PipelineService:
                 poll_seconds=config.dispatcher_poll_seconds,
                 heartbeat_seconds=config.lock_heartbeat_seconds,
                 max_concurrent_runs=config.max_concurrent_runs,
+                priority_aging_seconds=config.run_priority_aging_seconds,
+                reserved_priority_slots=config.reserved_priority_slots,
             ),
             log_store=log_store,
+            retention_policy=RunRetentionPolicy(
+                run_repository=run_repository,
+                step_run_repository=step_run_repository,
+                log_store=log_store,
+                archive_store=RunArchiveStore(config.archive_root),
+                retention_days=config.run_retention_days,
+                batch_size=config.run_retention_batch_size,
+            ),
         )
         service.workflow_repository.register_workflows(workflows)
+        if service.retention_policy.enabled:
+            service.scheduler.add_maintenance_job(
+                "run_retention",
+                service.prune_runs,
+                interval_seconds=max(1, config.run_retention_interval_hours) * 3600,
+            )
         return service
 
     def start(self) -> None:
         """scheduler/dispatcher を起動し、再起動後の残状態を収束させる。"""
         self.run_repository.mark_stale_running_runs_failed()
+        # waiter queue はメモリ上にしかないため、前回 park された run は queued に戻す。
+        self.run_repository.requeue_waiting_runs()
         self.lock_manager.cleanup_stale_locks()
         self.scheduler.start()
         self.dispatcher.start()
@@ -117,6 +154,30 @@ class PipelineService:
         """run 一覧を返す。"""
         return self.run_repository.list_runs(workflow_id=workflow_id)
 
+    def list_runs_page(
+        self,
+        *,
+        workflow_id: str | None = None,
+        statuses: Collection[WorkflowRunStatus] = (),
+        queued_after: datetime | None = None,
+        queued_before: datetime | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> RunPage:
+        """filter と cursor を指定して run 一覧の1ページを返す。"""
+        return self.run_repository.list_runs_page(
+            workflow_id=workflow_id,
+            statuses=statuses,
+            queued_after=queued_after,
+            queued_before=queued_before,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    def prune_runs(self, *, retention_days: int | None = None) -> dict[str, Any]:
+        """保持期間を過ぎた run を archive し、行とログを削除する。"""
+        return self.retention_policy.apply(retention_days=retention_days)
+
     def get_run_detail(self, run_id: str) -> dict:
         """run 詳細と step 一覧を返す。"""
         run = self.run_repository.get_run(run_id)
@@ -146,17 +207,66 @@ class PipelineService:
         self.scheduler.sync_jobs()
         return workflow
 
-    def retry_run(self, run_id: str, *, requested_by: str = "api") -> WorkflowRun:
-        """失敗 run の再実行 run を queue に積む。"""
+    def retry_run(
+        self,
+        run_id: str,
+        *,
+        requested_by: str = "api",
+        resume: bool = False,
+    ) -> WorkflowRun:
+        """失敗 run の再実行 run を queue に積む。
+
+        resume=True の場合は最初の失敗 step から再開し、成功済み step の
+        result_summary を入力 context として引き継ぐ。
+        """
         source_run = self.run_repository.get_run(run_id)
+        resume_from_step_id: str | None = None
+        result_summary: dict[str, Any] | None = None
+        if resume:
+            resume_from_step_id, result_summary = self._resolve_resume_point(source_run)
         return self.run_repository.enqueue_run(
             workflow_id=source_run.workflow_id,
             trigger_type=TriggerType.RETRY,
             queued_reason=QueuedReason.RETRY_REQUEST,
             requested_by=requested_by,
             parent_run_id=source_run.run_id,
+            result_summary=result_summary,
+            resume_from_step_id=resume_from_step_id,
         )
 
+    def _resolve_resume_point(
+        self,
+        source_run: WorkflowRun,
+    ) -> tuple[str | None, dict[str, Any] | None]:
+        if source_run.status != WorkflowRunStatus.FAILED:
+            raise RunNotResumableError(
+                f"only failed runs can be resumed: {source_run.run_id}"
+            )
+        workflow = self.workflows.get(source_run.workflow_id)
+        if workflow is None:
+            raise WorkflowNotFoundError(f"workflow not found: {source_run.workflow_id}")
+        latest_attempts = {
+            step_run.step_id: step_run
+            for step_run in self.step_run_repository.list_step_runs(source_run.run_id)
+        }
+        context = source_run.result_summary
+        for index, step in enumerate(workflow.steps):
+            step_run = latest_attempts.get(step.step_id)
+            # 親 run で再利用済み（skipped）の step は、その出力が context に含まれる。
+            if step_run is not None and step_run.status in (
+                StepRunStatus.SUCCEEDED,
+                StepRunStatus.SKIPPED,
+            ):
+                context = merge_result_summaries(context, step_run.result_summary)
+                continue
+            if index == 0:
+                # 先頭 step からの再開は通常の retry と同じ。
+                return None, source_run.result_summary
+            if not step.resumable:
+                raise RunNotResumableError(f"step is not resumable: {step.step_id}")
+            return step.step_id, context
+        raise RunNotResumableError(f"run has no failed step: {source_run.run_id}")
+
     def cancel_run(self, run_id: str) -> WorkflowRun:
         """queued run を cancel する。"""
         return self.run_repository.cancel_run(run_id)
@@ -11,6 +11,7 @@ from pipelines.sources.browser_history.storage import BrowserHistoryStorage
 from pipelines.sources.common.compaction import discover_available_months
 from pipelines.sources.common.settings import PipelinesSettings
 from pipelines.sources.github.storage import GitHubWorklogStorage
+from pipelines.sources.google_activity.storage import YouTubeStorage
 from pipelines.sources.spotify.storage import SpotifyStorage
 
 logger = logging.getLogger(__name__)
@@ -30,7 +31,7 @@ def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--provider",
-        choices=("all", "spotify", "github", "browser_history"),
+        choices=("all", "spotify", "github", "browser_history", "google_activity"),
         default="all",
         help="Compact only the selected provider (default: all).",
     )
@@ -161,6 +162,72 @@ def _compact_github(
     return failures
 
 
+def _compact_google_activity(
+    s3_client: Any,
+    bucket_name: str,
+    events_path: str,
+    master_path: str,
+    storage: YouTubeStorage,
+) -> list[str]:
+    failures: list[str] = []
+    datasets = (
+        DatasetSpec("events", "youtube/watch_history", "watch_id", "watched_at_utc"),
+        DatasetSpec("master", "youtube/videos", "video_id", "updated_at"),
+        DatasetSpec("master", "youtube/channels", "channel_id", "updated_at"),
+    )
+
+    for dataset in datasets:
+        root_prefix = events_path if dataset.data_domain == "events" else master_path
+        if dataset.data_domain == "master":
+            # パーティション導入前の直下ファイルも compact 対象の月へ移す
+            try:
+                storage.migrate_unpartitioned_master(dataset.dataset_path)
+            except Exception as exc:
+                logger.exception(
+                    "Bootstrap Google Activity master migration failed: "
+                    "dataset=%s error=%s",
+                    dataset.dataset_path,
+                    exc,
+                )
+                failures.append(f"google_activity:{dataset.dataset_path}:legacy")
+        months = _discover_dataset_months(
+            s3_client,
+            bucket_name,
+            root_prefix,
+            dataset,
+        )
+        logger.info(
+            "Bootstrap compact target months discovered: "
+            "provider=google_activity dataset=%s months=%s",
+            dataset.dataset_path,
+            months,
+        )
+        for year, month in months:
+            try:
+                storage.compact_month(
+                    data_domain=dataset.data_domain,
+                    dataset_path=dataset.dataset_path,
+                    year=year,
+                    month=month,
+                    dedupe_key=dataset.dedupe_key,
+                    sort_by=dataset.sort_by,
+                )
+            except Exception as exc:
+                logger.exception(
+                    "Bootstrap Google Activity compaction failed: "
+                    "dataset=%s year=%d month=%02d error=%s",
+                    dataset.dataset_path,
+                    year,
+                    month,
+                    exc,
+                )
+                failures.append(
+                    f"google_activity:{dataset.dataset_path}:{year}-{month:02d}"
+                )
+
+    return failures
+
+
 def _compact_browser_history(
     s3_client: Any,
     bucket_name: str,
@@ -286,6 +353,26 @@ def main() -> None:
             )
         )
 
+    if args.provider in ("all", "google_activity"):
+        youtube_storage = YouTubeStorage(
+            endpoint_url=r2_conf.endpoint_url,
+            access_key_id=r2_conf.access_key_id,
+            secret_access_key=r2_conf.secret_access_key.get_secret_value(),
+            bucket_name=r2_conf.bucket_name,
+            raw_path=r2_conf.raw_path,
+            events_path=r2_conf.events_path,
+            master_path=r2_conf.master_path,
+        )
+        failures.extend(
+            _compact_google_activity(
+                s3_client=s3_client,
+                bucket_name=r2_conf.bucket_name,
+                events_path=r2_conf.events_path,
+                master_path=r2_conf.master_path,
+                storage=youtube_storage,
+            )
+        )
+
     if failures:
         raise RuntimeError(
             f"Bootstrap compaction failed for: {', '.join(sorted(failures))}"
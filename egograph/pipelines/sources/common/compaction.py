@@ -2,6 +2,7 @@
 
 import logging
 import re
+from collections.abc import Iterable
 from datetime import datetime, timezone
 from io import BytesIO
 from typing import Any
@@ -13,6 +14,11 @@ logger = logging.getLogger(__name__)
 COMPACTED_ROOT = "compacted/"
 _YEAR_MONTH_PATTERN = re.compile(r"year=(\d{4})/month=(\d{2})/")
 
+# ingest step が result_summary で後続 compact step へ渡す変更 partition の key。
+CHANGED_PARTITIONS_KEY = "changed_partitions"
+
+PartitionRef = tuple[str, int, int]
+
 
 def _normalize_path(path: str) -> str:
     return path.rstrip("/") + "/"
@@ -86,6 +92,45 @@ def resolve_target_months(
     return [previous_pair, current_pair]
 
 
+def build_changed_partitions(
+    partitions: Iterable[PartitionRef],
+) -> list[dict[str, Any]]:
+    """書き込んだ (dataset, year, month) を result_summary 用の list に整形する。"""
+    return [
+        {"dataset": dataset_path, "year": year, "month": month}
+        for dataset_path, year, month in sorted(set(partitions))
+    ]
+
+
+def parse_changed_partitions(
+    summary: dict[str, Any] | None,
+) -> set[PartitionRef] | None:
+    """result_summary から変更 partition を取り出す。
+
+    前段 step が申告していない場合は None、申告したが変更が無い場合は空集合を返す。
+    """
+    if not summary or CHANGED_PARTITIONS_KEY not in summary:
+        return None
+    raw_partitions = summary[CHANGED_PARTITIONS_KEY]
+    if not isinstance(raw_partitions, list):
+        return None
+
+    partitions: set[PartitionRef] = set()
+    for item in raw_partitions:
+        if not isinstance(item, dict):
+            continue
+        dataset_path = item.get("dataset")
+        year = item.get("year")
+        month = item.get("month")
+        if (
+            isinstance(dataset_path, str)
+            and isinstance(year, int)
+            and isinstance(month, int)
+        ):
+            partitions.add((dataset_path, year, month))
+    return partitions
+
+
 def read_parquet_records_from_prefix(
     s3_client: Any,
     bucket_name: str,
@@ -1,6 +1,15 @@
 """Pipelines source configuration models."""
 
-from egograph_paths import ANALYTICS_DUCKDB_PATH, PARQUET_DATA_DIR
+from typing import Literal
+
+from egograph_paths import (
+    ANALYTICS_DUCKDB_PATH,
+    GITHUB_COMMIT_DETAIL_CACHE_PATH,
+    GITHUB_HTTP_CACHE_PATH,
+    PARQUET_DATA_DIR,
+    SPOTIFY_MASTER_ID_INDEX_PATH,
+    YOUTUBE_KNOWN_ID_INDEX_PATH,
+)
 from pydantic import BaseModel, SecretStr, field_validator
 
 
@@ -14,6 +23,14 @@ class GoogleActivityConfig(BaseModel):
     """Google Activity API設定。"""
 
     accounts: list[str]
+    # 共有ブラウザ上で同時にスクレイピングするアカウント数
+    max_concurrency: int = 2
+    # 取得済み動画・チャンネル ID のローカルインデックス（None で毎回全件取得）
+    known_id_index_path: str | None = str(YOUTUBE_KNOWN_ID_INDEX_PATH)
+    # この日数を過ぎた動画・チャンネルは統計情報を取り直す
+    metadata_refresh_days: int = 30
+    # YouTube Data API の1日あたりのクォータ予算
+    api_quota_per_day: int = 10000
 
 
 class LastFmConfig(BaseModel):
@@ -33,6 +50,8 @@ class SpotifyConfig(BaseModel):
     scope: str = (
         "user-read-recently-played playlist-read-private playlist-read-collaborative"
     )
+    # 既存マスター ID のローカルインデックス（None で毎回 R2 から読み込む）
+    master_id_index_path: str | None = str(SPOTIFY_MASTER_ID_INDEX_PATH)
 
 
 class GitHubWorklogConfig(BaseModel):
@@ -44,6 +63,16 @@ class GitHubWorklogConfig(BaseModel):
     backfill_days: int = 365
     fetch_commit_details: bool = True
     max_commit_detail_requests_per_repo: int = 200
+    # PR review / commit detail 取得の同時実行数
+    enrichment_concurrency: int = 4
+    # 残量がこの値以下になったら reset まで GitHub API 呼び出しを止める
+    rate_limit_reserve: int = 50
+    # ETag 条件付きリクエスト用キャッシュ（None で無効）
+    http_cache_path: str | None = str(GITHUB_HTTP_CACHE_PATH)
+    # SHA をキーにした Commit 詳細キャッシュ（None で無効）
+    commit_detail_cache_path: str | None = str(GITHUB_COMMIT_DETAIL_CACHE_PATH)
+    # "graphql" では PR・Commit をレビュー数/変更量込みで1ページ1クエリ取得する
+    api_mode: Literal["rest", "graphql"] = "rest"
 
 
 class EmbeddingConfig(BaseModel):
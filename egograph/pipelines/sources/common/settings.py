@@ -3,9 +3,16 @@
 import logging
 import os
 from collections.abc import Callable
-from typing import TypeVar
-
-from egograph_paths import ANALYTICS_DUCKDB_PATH, PARQUET_DATA_DIR
+from typing import Literal, TypeVar
+
+from egograph_paths import (
+    ANALYTICS_DUCKDB_PATH,
+    GITHUB_COMMIT_DETAIL_CACHE_PATH,
+    GITHUB_HTTP_CACHE_PATH,
+    PARQUET_DATA_DIR,
+    SPOTIFY_MASTER_ID_INDEX_PATH,
+    YOUTUBE_KNOWN_ID_INDEX_PATH,
+)
 from pydantic import AliasChoices, Field, SecretStr, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -61,6 +68,7 @@ class SpotifySettings(_RuntimeBaseSettings):
     scope: str = (
         "user-read-recently-played playlist-read-private playlist-read-collaborative"
     )
+    master_id_index_path: str | None = str(SPOTIFY_MASTER_ID_INDEX_PATH)
 
     def to_config(self) -> SpotifyConfig:
         return SpotifyConfig(
@@ -69,6 +77,7 @@ class SpotifySettings(_RuntimeBaseSettings):
             refresh_token=self.refresh_token,
             redirect_uri=self.redirect_uri,
             scope=self.scope,
+            master_id_index_path=self.master_id_index_path,
         )
 
 
@@ -84,6 +93,11 @@ class GitHubWorklogSettings(_RuntimeBaseSettings):
     backfill_days: int = 365
     fetch_commit_details: bool = True
     max_commit_detail_requests_per_repo: int = 200
+    enrichment_concurrency: int = 4
+    rate_limit_reserve: int = 50
+    http_cache_path: str | None = str(GITHUB_HTTP_CACHE_PATH)
+    commit_detail_cache_path: str | None = str(GITHUB_COMMIT_DETAIL_CACHE_PATH)
+    api_mode: Literal["rest", "graphql"] = "rest"
 
     def to_config(self) -> GitHubWorklogConfig:
         return GitHubWorklogConfig(
@@ -95,6 +109,11 @@ class GitHubWorklogSettings(_RuntimeBaseSettings):
             max_commit_detail_requests_per_repo=(
                 self.max_commit_detail_requests_per_repo
             ),
+            enrichment_concurrency=self.enrichment_concurrency,
+            rate_limit_reserve=self.rate_limit_reserve,
+            http_cache_path=self.http_cache_path,
+            commit_detail_cache_path=self.commit_detail_cache_path,
+            api_mode=self.api_mode,
         )
 
 
@@ -102,11 +121,23 @@ class GoogleActivitySettings(_RuntimeBaseSettings):
     """Google Activity 設定。"""
 
     accounts: list[str] = Field(default_factory=list, alias="GOOGLE_ACTIVITY_ACCOUNTS")
+    max_concurrency: int = Field(2, alias="GOOGLE_ACTIVITY_MAX_CONCURRENCY")
+    known_id_index_path: str | None = Field(
+        str(YOUTUBE_KNOWN_ID_INDEX_PATH), alias="YOUTUBE_KNOWN_ID_INDEX_PATH"
+    )
+    metadata_refresh_days: int = Field(30, alias="YOUTUBE_METADATA_REFRESH_DAYS")
+    api_quota_per_day: int = Field(10000, alias="YOUTUBE_API_QUOTA_PER_DAY")
 
     def to_config(self) -> GoogleActivityConfig:
         if not self.accounts:
             raise ValueError("GOOGLE_ACTIVITY_ACCOUNTS is required but not set")
-        return GoogleActivityConfig(accounts=self.accounts)
+        return GoogleActivityConfig(
+            accounts=self.accounts,
+            max_concurrency=self.max_concurrency,
+            known_id_index_path=self.known_id_index_path,
+            metadata_refresh_days=self.metadata_refresh_days,
+            api_quota_per_day=self.api_quota_per_day,
+        )
 
 
 class YouTubeSettings(_RuntimeBaseSettings):
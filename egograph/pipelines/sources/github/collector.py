@@ -7,8 +7,12 @@ GitHub APIに接続し、以下を収集します:
 - Repository Commits
 - PR Reviews
 - Commit Detail
+
+GraphQL モードでは PR（レビュー数込み）と Commit 履歴（変更量込み）を
+1ページ1クエリで取得します。
 """
 
+import json
 import logging
 from collections.abc import Callable
 from datetime import datetime
@@ -22,6 +26,17 @@ from tenacity import (
     wait_exponential,
 )
 
+from pipelines.sources.github.graphql import (
+    COMMIT_HISTORY_PAGE_SIZE,
+    COMMIT_HISTORY_QUERY,
+    PULL_REQUESTS_PAGE_SIZE,
+    PULL_REQUESTS_QUERY,
+    map_graphql_commit,
+    map_graphql_pull_request,
+)
+from pipelines.sources.github.http_cache import GitHubResponseCache
+from pipelines.sources.github.rate_limit import GitHubRateLimiter
+
 # 設定値は Spotify と同様のデフォルトを使用
 MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 2
@@ -39,18 +54,84 @@ github_retry = retry(
 )
 
 
-@github_retry
-def _get_json_with_retry(
+def _send_get(
     session: requests.Session,
     url: str,
     params: dict[str, Any] | None = None,
-) -> Any:
-    """単一APIリクエストをリトライ付きで実行する。"""
-    response = session.get(url, params=params)
+    rate_limiter: GitHubRateLimiter | None = None,
+    headers: dict[str, str] | None = None,
+) -> requests.Response:
+    """レート制限を考慮して GET を送り、ステータスを検証する。"""
+    if rate_limiter is not None:
+        rate_limiter.wait()
+    response = session.get(url, params=params, headers=headers)
+    if rate_limiter is not None:
+        rate_limiter.observe(response.status_code, response.headers)
     response.raise_for_status()
+    return response
+
+
+def _get_json(
+    session: requests.Session,
+    url: str,
+    params: dict[str, Any] | None = None,
+    rate_limiter: GitHubRateLimiter | None = None,
+    response_cache: GitHubResponseCache | None = None,
+) -> Any:
+    """GET して JSON を返す。キャッシュがあれば条件付きリクエストにする。"""
+    if response_cache is None:
+        return _send_get(session, url, params, rate_limiter).json()
+
+    cache_key = requests.Request("GET", url, params=params).prepare().url or url
+    cached = response_cache.lookup(cache_key)
+    response = _send_get(
+        session,
+        url,
+        params,
+        rate_limiter,
+        headers=cached.conditional_headers() if cached else None,
+    )
+    if response.status_code == 304 and cached is not None:
+        response_cache.record(hit=True)
+        return json.loads(cached.body)
+
+    response_cache.record(hit=False)
+    response_cache.store(
+        cache_key,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        body=response.text,
+    )
     return response.json()
 
 
+# 単一APIリクエストをリトライ付きで実行する。
+_get_json_with_retry = github_retry(_get_json)
+
+
+@github_retry
+def _post_graphql_with_retry(
+    session: requests.Session,
+    url: str,
+    query: str,
+    variables: dict[str, Any],
+    rate_limiter: GitHubRateLimiter | None = None,
+) -> dict[str, Any]:
+    """GraphQL クエリをリトライ付きで実行し、data を返す。"""
+    if rate_limiter is not None:
+        rate_limiter.wait()
+    response = session.post(url, json={"query": query, "variables": variables})
+    if rate_limiter is not None:
+        rate_limiter.observe(response.status_code, response.headers)
+    response.raise_for_status()
+    payload = response.json()
+    errors = payload.get("errors")
+    if errors:
+        messages = "; ".join(str(error.get("message")) for error in errors)
+        raise RuntimeError(f"GitHub GraphQL query failed: {messages}")
+    return payload.get("data") or {}
+
+
 def _paginate(
     fetch_fn: Callable[..., dict[str, Any]],
     *,
@@ -133,6 +214,8 @@ class GitHubWorklogCollector:
         token: str,
         github_login: str,
         base_url: str = "https://api.github.com",
+        rate_limiter: GitHubRateLimiter | None = None,
+        response_cache_path: str | None = None,
     ):
         """GitHubコレクターを初期化します。
 
@@ -140,6 +223,9 @@ class GitHubWorklogCollector:
             token: GitHub Personal Access Token
             github_login: フィルタ対象のGitHubユーザー名（個人所有Repo判定用）
             base_url: GitHub APIベースURL
+            rate_limiter: 並列ワーカー間で共有するレート制限スケジューラ
+            response_cache_path: ETag レスポンスキャッシュの SQLite パス
+                (None の場合は条件付きリクエストを使わない)
         """
         if not token.strip():
             raise ValueError("GitHub token is required")
@@ -149,6 +235,16 @@ class GitHubWorklogCollector:
         self.token = token
         self.github_login = github_login
         self.base_url = base_url.rstrip("/")
+        # GitHub Enterprise の REST (/api/v3) に対応する GraphQL は /api/graphql
+        self.graphql_url = (
+            f"{self.base_url[: -len('/v3')]}/graphql"
+            if self.base_url.endswith("/v3")
+            else f"{self.base_url}/graphql"
+        )
+        self.rate_limiter = rate_limiter or GitHubRateLimiter()
+        self.response_cache = (
+            GitHubResponseCache(response_cache_path) if response_cache_path else None
+        )
 
         # セッションの設定
         self.session = requests.Session()
@@ -178,9 +274,12 @@ class GitHubWorklogCollector:
         """
         logger.debug("Fetching repository: %s/%s", owner, repo)
         url = f"{self.base_url}/repos/{owner}/{repo}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        return response.json()
+        return _get_json(
+            self.session,
+            url,
+            rate_limiter=self.rate_limiter,
+            response_cache=self.response_cache,
+        )
 
     def get_pull_requests(
         self,
@@ -215,7 +314,9 @@ class GitHubWorklogCollector:
                 "sort": "updated",
                 "direction": "desc",
             }
-            return _get_json_with_retry(self.session, url, params)
+            return _get_json_with_retry(
+                self.session, url, params, self.rate_limiter, self.response_cache
+            )
 
         prs: list[dict[str, Any]] = []
         page = 1
@@ -285,7 +386,9 @@ class GitHubWorklogCollector:
         while True:
             url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/commits"
             params = {"per_page": per_page, "page": page}
-            page_data = _get_json_with_retry(self.session, url, params)
+            page_data = _get_json_with_retry(
+                self.session, url, params, self.rate_limiter, self.response_cache
+            )
 
             if not page_data:
                 break
@@ -329,7 +432,9 @@ class GitHubWorklogCollector:
             params: dict[str, Any] = {"per_page": per_page, "page": page}
             if since:
                 params["since"] = since
-            page_data = _get_json_with_retry(self.session, url, params)
+            page_data = _get_json_with_retry(
+                self.session, url, params, self.rate_limiter, self.response_cache
+            )
 
             if not page_data:
                 break
@@ -372,7 +477,9 @@ class GitHubWorklogCollector:
         while True:
             url = f"{self.base_url}/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
             params = {"per_page": per_page, "page": page}
-            page_data = _get_json_with_retry(self.session, url, params)
+            page_data = _get_json_with_retry(
+                self.session, url, params, self.rate_limiter, self.response_cache
+            )
 
             if not page_data:
                 break
@@ -408,9 +515,127 @@ class GitHubWorklogCollector:
         """
         logger.debug("Fetching commit detail: %s/%s@%s", owner, repo, sha)
         url = f"{self.base_url}/repos/{owner}/{repo}/commits/{sha}"
-        response = self.session.get(url)
-        response.raise_for_status()
-        return response.json()
+        return _send_get(self.session, url, rate_limiter=self.rate_limiter).json()
+
+    def get_pull_requests_graphql(
+        self,
+        owner: str,
+        repo: str,
+        since: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """GraphQL で PR 一覧をレビュー数・変更量込みで取得します。
+
+        Args:
+            owner: リポジトリ所有者
+            repo: リポジトリ名
+            since: この時刻以降に更新された PR のみ取得する
+
+        Returns:
+            REST PR レスポンス形式（reviews_count 付き）の辞書リスト
+
+        Raises:
+            requests.exceptions.HTTPError: API呼び出しが失敗した場合
+            RuntimeError: GraphQL がエラーを返した場合
+        """
+        logger.debug("Fetching pull requests via GraphQL for %s/%s", owner, repo)
+        since_dt = _parse_github_datetime(since)
+        prs: list[dict[str, Any]] = []
+        cursor: str | None = None
+
+        while True:
+            data = _post_graphql_with_retry(
+                self.session,
+                self.graphql_url,
+                PULL_REQUESTS_QUERY,
+                {
+                    "owner": owner,
+                    "name": repo,
+                    "pageSize": PULL_REQUESTS_PAGE_SIZE,
+                    "cursor": cursor,
+                },
+                self.rate_limiter,
+            )
+            connection = (data.get("repository") or {}).get("pullRequests") or {}
+
+            # updatedAt 降順なので since より古い PR が出たら打ち切る
+            reached_since = False
+            for node in connection.get("nodes") or []:
+                pr = map_graphql_pull_request(node)
+                updated_dt = _parse_github_datetime(pr.get("updated_at"))
+                if since_dt and updated_dt and updated_dt < since_dt:
+                    reached_since = True
+                    break
+                prs.append(pr)
+
+            page_info = connection.get("pageInfo") or {}
+            if reached_since or not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+
+        logger.info(
+            "Successfully fetched %d pull requests via GraphQL for %s/%s",
+            len(prs),
+            owner,
+            repo,
+        )
+        return prs
+
+    def get_commit_history_graphql(
+        self,
+        owner: str,
+        repo: str,
+        since: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """GraphQL でデフォルトブランチの Commit 履歴を変更量込みで取得します。
+
+        Args:
+            owner: リポジトリ所有者
+            repo: リポジトリ名
+            since: この時刻以降の Commit のみ取得する
+
+        Returns:
+            REST commit detail レスポンス形式の辞書リスト
+
+        Raises:
+            requests.exceptions.HTTPError: API呼び出しが失敗した場合
+            RuntimeError: GraphQL がエラーを返した場合
+        """
+        logger.debug("Fetching commit history via GraphQL for %s/%s", owner, repo)
+        commits: list[dict[str, Any]] = []
+        cursor: str | None = None
+
+        while True:
+            data = _post_graphql_with_retry(
+                self.session,
+                self.graphql_url,
+                COMMIT_HISTORY_QUERY,
+                {
+                    "owner": owner,
+                    "name": repo,
+                    "pageSize": COMMIT_HISTORY_PAGE_SIZE,
+                    "cursor": cursor,
+                    "since": since,
+                },
+                self.rate_limiter,
+            )
+            branch = (data.get("repository") or {}).get("defaultBranchRef") or {}
+            history = (branch.get("target") or {}).get("history") or {}
+            commits.extend(
+                map_graphql_commit(node) for node in history.get("nodes") or []
+            )
+
+            page_info = history.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+
+        logger.info(
+            "Successfully fetched %d commits via GraphQL for %s/%s",
+            len(commits),
+            owner,
+            repo,
+        )
+        return commits
 
     def get_user_repositories(
         self,
@@ -435,7 +660,9 @@ class GitHubWorklogCollector:
         while True:
             url = f"{self.base_url}/user/repos"
             params = {"per_page": per_page, "page": page}
-            page_data = _get_json_with_retry(self.session, url, params)
+            page_data = _get_json_with_retry(
+                self.session, url, params, self.rate_limiter, self.response_cache
+            )
 
             if not page_data:
                 break
@@ -463,7 +690,19 @@ class GitHubWorklogCollector:
         """コンテキストマネージャーに入ります。"""
         return self
 
+    def cache_stats(self) -> dict[str, float | int] | None:
+        """ETag キャッシュの hit 統計を返す。キャッシュ無効時は None。"""
+        if self.response_cache is None:
+            return None
+        return self.response_cache.stats()
+
+    def close(self) -> None:
+        """セッションとキャッシュを閉じます。"""
+        self.session.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """コンテキストマネージャーを抜けます。"""
-        self.session.close()
+        self.close()
         return False
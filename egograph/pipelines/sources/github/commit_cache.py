@@ -0,0 +1,115 @@
+"""GitHub Commit 詳細の不変キャッシュ。
+
+Commit 詳細は SHA ごとに不変なため、``owner/repo@sha`` をキーに
+変更量メタ（stats と files の要約）をローカル SQLite に保存し、
+重複した ``since`` ウィンドウで同じ Commit を再取得しないようにします。
+"""
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# files 要約として保持するキー（patch など大きなフィールドは保存しない）
+_FILE_SUMMARY_KEYS = ("filename", "status", "additions", "deletions", "changes")
+
+
+def _cache_key(repo_full_name: str, sha: str) -> str:
+    return f"{repo_full_name}@{sha}"
+
+
+def summarize_commit_detail(detail: dict[str, Any]) -> dict[str, Any]:
+    """Commit 詳細レスポンスから stats と files 要約だけを抜き出す。"""
+    files = detail.get("files")
+    return {
+        "stats": detail.get("stats") or {},
+        "files": [
+            {key: file.get(key) for key in _FILE_SUMMARY_KEYS}
+            for file in files
+            if isinstance(file, dict)
+        ]
+        if isinstance(files, list)
+        else None,
+    }
+
+
+class CommitDetailCache:
+    """``owner/repo@sha`` をキーにした Commit 詳細要約の永続キャッシュ。"""
+
+    def __init__(self, db_path: str | Path):
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS commit_details (
+                commit_key TEXT PRIMARY KEY,
+                detail TEXT NOT NULL,
+                fetched_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(
+        self,
+        repo_full_name: str,
+        shas: Iterable[str],
+    ) -> dict[str, dict[str, Any]]:
+        """キャッシュ済みの Commit 詳細要約を sha -> 要約 の辞書で返す。"""
+        keys = {_cache_key(repo_full_name, sha): sha for sha in shas}
+        if not keys:
+            return {}
+        found: dict[str, dict[str, Any]] = {}
+        key_list = list(keys)
+        with self._lock:
+            # SQLite の変数上限を超えないよう分割して問い合わせる
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start : start + 500]
+                placeholders = ", ".join(["?"] * len(chunk))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT commit_key, detail
+                    FROM commit_details
+                    WHERE commit_key IN ({placeholders})
+                    """,
+                    chunk,
+                ).fetchall()
+                for commit_key, detail in rows:
+                    found[keys[commit_key]] = json.loads(detail)
+        return found
+
+    def put_many(
+        self,
+        repo_full_name: str,
+        details: dict[str, dict[str, Any]],
+    ) -> None:
+        """sha -> Commit 詳細レスポンス を要約して保存する。"""
+        if not details:
+            return
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO commit_details (commit_key, detail, fetched_at)
+                VALUES (?, ?, ?)
+                """,
+                [
+                    (
+                        _cache_key(repo_full_name, sha),
+                        json.dumps(summarize_commit_detail(detail), ensure_ascii=False),
+                        fetched_at,
+                    )
+                    for sha, detail in details.items()
+                ],
+            )
+
+    def close(self) -> None:
+        """DB 接続を閉じる。"""
+        with self._lock:
+            self._conn.close()
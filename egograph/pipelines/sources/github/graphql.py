@@ -0,0 +1,131 @@
+"""GitHub GraphQL API のクエリ定義と REST 互換形式へのマッピング。
+
+GraphQL の結果を REST API レスポンスと同じ形の辞書に変換し、
+``transform_pull_request`` / ``transform_commit`` をそのまま使えるようにします。
+"""
+
+from typing import Any
+
+PULL_REQUESTS_PAGE_SIZE = 50
+COMMIT_HISTORY_PAGE_SIZE = 100
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $pageSize: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(
+      first: $pageSize
+      after: $cursor
+      orderBy: {field: UPDATED_AT, direction: DESC}
+    ) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        number
+        state
+        title
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        headRefName
+        baseRefName
+        headRepository { name nameWithOwner owner { login } }
+        labels(first: 20) { nodes { name } }
+        comments { totalCount }
+        reviews { totalCount }
+        commits { totalCount }
+        additions
+        deletions
+        changedFiles
+      }
+    }
+  }
+}
+"""
+
+COMMIT_HISTORY_QUERY = """
+query(
+  $owner: String!
+  $name: String!
+  $pageSize: Int!
+  $cursor: String
+  $since: GitTimestamp
+) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $pageSize, after: $cursor, since: $since) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              authoredDate
+              additions
+              deletions
+              changedFilesIfAvailable
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def map_graphql_pull_request(node: dict[str, Any]) -> dict[str, Any]:
+    """GraphQL PullRequest ノードを REST PR レスポンス形式に変換する。"""
+    head_repo = node.get("headRepository") or {}
+    state = (node.get("state") or "OPEN").lower()
+    return {
+        "id": node.get("databaseId"),
+        "number": node.get("number"),
+        # REST では merged も closed として表現される
+        "state": "open" if state == "open" else "closed",
+        "title": node.get("title"),
+        "head": {
+            "ref": node.get("headRefName"),
+            "repo": {
+                "name": head_repo.get("name"),
+                "full_name": head_repo.get("nameWithOwner"),
+                "owner": {"login": (head_repo.get("owner") or {}).get("login")},
+            },
+        },
+        "base": {"ref": node.get("baseRefName")},
+        "labels": [
+            {"name": label.get("name")}
+            for label in (node.get("labels") or {}).get("nodes") or []
+        ],
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "closed_at": node.get("closedAt"),
+        "merged_at": node.get("mergedAt"),
+        "comments": (node.get("comments") or {}).get("totalCount"),
+        "review_comments": None,
+        "reviews_count": (node.get("reviews") or {}).get("totalCount"),
+        "commits": (node.get("commits") or {}).get("totalCount"),
+        "additions": node.get("additions"),
+        "deletions": node.get("deletions"),
+        "changed_files": node.get("changedFiles"),
+    }
+
+
+def map_graphql_commit(node: dict[str, Any]) -> dict[str, Any]:
+    """GraphQL Commit ノードを REST commit detail レスポンス形式に変換する。"""
+    additions = node.get("additions")
+    deletions = node.get("deletions")
+    total = (
+        additions + deletions
+        if isinstance(additions, int) and isinstance(deletions, int)
+        else None
+    )
+    return {
+        "sha": node.get("oid"),
+        "commit": {
+            "message": node.get("message"),
+            "author": {"date": node.get("authoredDate")},
+        },
+        "stats": {"additions": additions, "deletions": deletions, "total": total},
+        "changed_files": node.get("changedFilesIfAvailable"),
+    }
@@ -0,0 +1,126 @@
+"""GitHub API 条件付きリクエスト用の永続レスポンスキャッシュ。
+
+URL ごとに ETag / Last-Modified とレスポンス本文を SQLite に保存し、
+304 Not Modified 応答時に保存済み本文を再利用します。
+GitHub は 304 応答を primary rate limit に数えません。
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """キャッシュ済みレスポンス。"""
+
+    etag: str | None
+    last_modified: str | None
+    body: str
+
+    def conditional_headers(self) -> dict[str, str]:
+        """条件付きリクエスト用ヘッダーを返す。"""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class GitHubResponseCache:
+    """URL をキーにした ETag レスポンスキャッシュ（スレッドセーフ）。"""
+
+    def __init__(self, db_path: str | Path):
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        """URL に対応するキャッシュを返す。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body FROM http_responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(etag=row[0], last_modified=row[1], body=row[2])
+
+    def store(
+        self,
+        url: str,
+        *,
+        etag: str | None,
+        last_modified: str | None,
+        body: str,
+    ) -> None:
+        """検証子付きのレスポンスを保存する。検証子が無ければ何もしない。"""
+        if not etag and not last_modified:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO http_responses (url, etag, last_modified, body, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    body = excluded.body,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    url,
+                    etag,
+                    last_modified,
+                    body,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+            self.stores += 1
+
+    def record(self, *, hit: bool) -> None:
+        """キャッシュ hit / miss を記録する。"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict[str, float | int]:
+        """hit 率などの統計を返す。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def close(self) -> None:
+        """DB 接続を閉じる。"""
+        with self._lock:
+            self._conn.close()
@@ -5,8 +5,11 @@ from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from pipelines.sources.common.compaction import PartitionRef
 from pipelines.sources.common.config import Config
 from pipelines.sources.github.collector import GitHubWorklogCollector
+from pipelines.sources.github.commit_cache import CommitDetailCache
+from pipelines.sources.github.rate_limit import GitHubRateLimiter, map_bounded
 from pipelines.sources.github.storage import GitHubWorklogStorage
 from pipelines.sources.github.transform import (
     transform_commits_to_events,
@@ -48,12 +51,15 @@ def _resolve_since_iso(
     return since
 
 
-def run_pipeline(config: Config) -> None:
+def run_pipeline(config: Config) -> set[PartitionRef]:
     """GitHub作業ログインジェストの実行ロジック。
 
     Args:
         config: 設定情報（GitHubとR2を含む）
 
+    Returns:
+        新規イベントを書き込んだ (dataset, year, month) partition の集合
+
     Raises:
         ValueError: 設定が不足している場合
         RuntimeError: パイプラインの実行に失敗した場合
@@ -86,14 +92,26 @@ def run_pipeline(config: Config) -> None:
         master_path=r2_conf.master_path,
     )
 
+    rate_limiter = GitHubRateLimiter(reserve_requests=github_conf.rate_limit_reserve)
     collector = GitHubWorklogCollector(
         token=github_conf.token.get_secret_value(),
         github_login=github_conf.github_login,
+        rate_limiter=rate_limiter,
+        response_cache_path=github_conf.http_cache_path,
+    )
+    concurrency = max(1, github_conf.enrichment_concurrency)
+    use_graphql = github_conf.api_mode == "graphql"
+    commit_cache = (
+        CommitDetailCache(github_conf.commit_detail_cache_path)
+        if github_conf.commit_detail_cache_path
+        else None
     )
 
     # 状態を取得し、増分取得開始時刻を決定
     state = storage.get_ingest_state()
     since_iso = _resolve_since_iso(state, github_conf.backfill_days)
+    # リポジトリ単位の cursor / 最終 push 時刻（完了したリポジトリごとに checkpoint）
+    repo_states: dict[str, dict[str, Any]] = dict((state or {}).get("repos") or {})
 
     # ターゲットリポジトリを決定
     if github_conf.target_repos:
@@ -108,7 +126,7 @@ def run_pipeline(config: Config) -> None:
 
     if not target_repos:
         logger.warning("No repositories to process. Exiting.")
-        return
+        return set()
 
     # 各リポジトリを処理
     total_prs = 0
@@ -122,7 +140,9 @@ def run_pipeline(config: Config) -> None:
     total_failed_enrichment_api_calls = 0
     total_failed_repos = 0
 
-    all_commits_data = []
+    all_saved = True
+    total_skipped_repos = 0
+    written_partitions: set[PartitionRef] = set()
     max_cursor_candidate: datetime | None = None
 
     def update_cursor_candidate(value: str | None) -> None:
@@ -133,10 +153,13 @@ def run_pipeline(config: Config) -> None:
         if max_cursor_candidate is None or dt > max_cursor_candidate:
             max_cursor_candidate = dt
 
-    for repo_full_name in target_repos:
+    for repo_index, repo_full_name in enumerate(target_repos):
         try:
             owner, repo = repo_full_name.split("/", 1)
             logger.info(f"Processing repository: {repo_full_name}")
+            repo_state = repo_states.get(repo_full_name) or {}
+            repo_since_iso = repo_state.get("cursor_utc") or since_iso
+            repo_cursor: datetime | None = None
 
             # Repository情報を取得
             repo_info = collector.get_repository(owner, repo)
@@ -152,29 +175,52 @@ def run_pipeline(config: Config) -> None:
                 logger.info(f"Skipping non-personal repo: {repo_full_name}")
                 continue
 
-            # PR一覧を取得
-            prs = collector.get_pull_requests(owner, repo, since=since_iso)
+            # 前回完了時から push が無いリポジトリは PR/Commit 取得を省略する
+            pushed_at = repo_info.get("pushed_at")
+            if _is_unchanged_since_checkpoint(pushed_at, repo_state):
+                logger.info(
+                    "Skipping %s: no push since last checkpoint (pushed_at=%s)",
+                    repo_full_name,
+                    pushed_at,
+                )
+                total_skipped_repos += 1
+                continue
+
+            # PR一覧を取得（GraphQL ではレビュー数も同時に取得される）
+            if use_graphql:
+                prs = collector.get_pull_requests_graphql(
+                    owner, repo, since=repo_since_iso
+                )
+            else:
+                prs = collector.get_pull_requests(owner, repo, since=repo_since_iso)
             logger.info(f"Found {len(prs)} PRs in {repo_full_name}")
 
-            # 各PRのレビュー数を取得
-            for pr in prs:
-                pr_number = pr.get("number")
-                if pr_number:
-                    try:
-                        reviews = collector.get_pr_reviews(owner, repo, pr_number)
-                        pr["reviews_count"] = len(reviews)
-                    except Exception as e:
-                        pr_number_str = str(pr_number)
-                        logger.warning(
-                            "Failed to fetch reviews for PR #%s: %s",
-                            pr_number_str,
-                            e,
-                        )
-                        pr["reviews_count"] = 0
-                        total_failed_enrichment_api_calls += 1
+            # 各PRのレビュー数を並列取得
+            prs_with_number = [
+                pr for pr in prs if pr.get("number") and "reviews_count" not in pr
+            ]
+            review_results = map_bounded(
+                lambda pr: collector.get_pr_reviews(owner, repo, pr["number"]),
+                prs_with_number,
+                max_workers=concurrency,
+            )
+            for pr, (reviews, error) in zip(
+                prs_with_number, review_results, strict=True
+            ):
+                if error is None:
+                    pr["reviews_count"] = len(reviews or [])
+                    continue
+                logger.warning(
+                    "Failed to fetch reviews for PR #%s: %s",
+                    str(pr["number"]),
+                    error,
+                )
+                pr["reviews_count"] = 0
+                total_failed_enrichment_api_calls += 1
 
             for pr in prs:
                 update_cursor_candidate(pr.get("updated_at"))
+                repo_cursor = _max_datetime(repo_cursor, pr.get("updated_at"))
 
             total_prs += len(prs)
 
@@ -210,6 +256,10 @@ def run_pipeline(config: Config) -> None:
                                 stats["duplicates"],
                             )
                         total_new_pr_events += stats["new"]
+                        if stats["new"] > 0:
+                            written_partitions.add(
+                                ("github/pull_requests", year, month)
+                            )
                         total_duplicate_pr_events += stats["duplicates"]
 
                 # PR生データを保存
@@ -219,46 +269,96 @@ def run_pipeline(config: Config) -> None:
                     total_failed_records += len(prs)
 
             # Repository Commitsを取得
-            commits = collector.get_repository_commits(owner, repo, since=since_iso)
+            if use_graphql:
+                commits = collector.get_commit_history_graphql(
+                    owner, repo, since=repo_since_iso
+                )
+            else:
+                commits = collector.get_repository_commits(
+                    owner, repo, since=repo_since_iso
+                )
             logger.info(f"Found {len(commits)} commits in {repo_full_name}")
 
-            # 各Commitの詳細を取得（変更量メタデータ用）
-            enriched_commits = []
+            # 各Commitの詳細を並列取得（変更量メタデータ用）
+            enriched_commits = list(commits)
             detail_failures = 0
-            details_requested = 0
-            details_enabled = github_conf.fetch_commit_details
-            max_detail_requests = github_conf.max_commit_detail_requests_per_repo
-            detail_budget_exceeded_logged = False
-            for commit in commits:
-                sha = commit.get("sha")
-                if not sha or not details_enabled:
-                    enriched_commits.append(commit)
-                    continue
-
-                if details_requested >= max_detail_requests:
-                    if not detail_budget_exceeded_logged:
-                        logger.warning(
-                            (
-                                "Commit detail request budget exceeded for %s "
-                                "(max=%d); skipping remaining detail fetches"
-                            ),
-                            repo_full_name,
-                            max_detail_requests,
-                        )
-                        detail_budget_exceeded_logged = True
-                    enriched_commits.append(commit)
+            # GraphQL の Commit 履歴は変更量を含むため detail 取得は不要
+            details_enabled = github_conf.fetch_commit_details and not use_graphql
+            # 残りリポジトリ分の API 残量を確保するため上限を動的に縮める
+            max_detail_requests = rate_limiter.detail_budget(
+                github_conf.max_commit_detail_requests_per_repo,
+                pending_repos=len(target_repos) - repo_index,
+            )
+            if max_detail_requests < github_conf.max_commit_detail_requests_per_repo:
+                logger.info(
+                    "Commit detail budget for %s reduced to %d (remaining=%s)",
+                    repo_full_name,
+                    max_detail_requests,
+                    rate_limiter.remaining,
+                )
+            detail_indexes = (
+                [index for index, commit in enumerate(commits) if commit.get("sha")]
+                if details_enabled
+                else []
+            )
+            # SHA ごとに不変な詳細はキャッシュから補完し、予算は未取得分だけに使う
+            if commit_cache is not None and detail_indexes:
+                cached_details = commit_cache.get_many(
+                    repo_full_name,
+                    [commits[index]["sha"] for index in detail_indexes],
+                )
+                for index in detail_indexes:
+                    cached = cached_details.get(commits[index]["sha"])
+                    if cached is not None:
+                        enriched_commits[index] = {**commits[index], **cached}
+                detail_indexes = [
+                    index
+                    for index in detail_indexes
+                    if commits[index]["sha"] not in cached_details
+                ]
+                if cached_details:
+                    logger.info(
+                        "Reused %d cached commit details for %s",
+                        len(cached_details),
+                        repo_full_name,
+                    )
+            if len(detail_indexes) > max_detail_requests:
+                logger.warning(
+                    (
+                        "Commit detail request budget exceeded for %s "
+                        "(max=%d); %d commits left without detail"
+                    ),
+                    repo_full_name,
+                    max_detail_requests,
+                    len(detail_indexes) - max_detail_requests,
+                )
+                detail_indexes = detail_indexes[:max_detail_requests]
+
+            details_requested = len(detail_indexes)
+            detail_results = map_bounded(
+                lambda index: collector.get_commit_detail(
+                    owner, repo, commits[index]["sha"]
+                ),
+                detail_indexes,
+                max_workers=concurrency,
+            )
+            fetched_details: dict[str, dict[str, Any]] = {}
+            for index, (detail, error) in zip(
+                detail_indexes, detail_results, strict=True
+            ):
+                if error is None:
+                    enriched_commits[index] = {**commits[index], **detail}
+                    fetched_details[commits[index]["sha"]] = detail
                     continue
+                logger.warning(
+                    f"Failed to fetch detail for commit {commits[index]['sha']}: "
+                    f"{error}"
+                )
+                detail_failures += 1
+                total_failed_enrichment_api_calls += 1
 
-                details_requested += 1
-                try:
-                    detail = collector.get_commit_detail(owner, repo, sha)
-                    commit_with_detail = {**commit, **detail}
-                    enriched_commits.append(commit_with_detail)
-                except Exception as e:
-                    logger.warning(f"Failed to fetch detail for commit {sha}: {e}")
-                    detail_failures += 1
-                    total_failed_enrichment_api_calls += 1
-                    enriched_commits.append(commit)
+            if commit_cache is not None:
+                commit_cache.put_many(repo_full_name, fetched_details)
 
             if details_enabled and detail_failures > 0:
                 logger.warning(
@@ -273,11 +373,38 @@ def run_pipeline(config: Config) -> None:
                 enriched_commits, repo_full_name
             )
             total_failed_records += len(enriched_commits) - len(commits_transformed)
-            all_commits_data.extend(commits_transformed)
             total_commits += len(commits_transformed)
 
             for commit in commits_transformed:
                 update_cursor_candidate(commit.get("committed_at_utc"))
+                repo_cursor = _max_datetime(repo_cursor, commit.get("committed_at_utc"))
+
+            # Commitイベントを年月でグループ化して保存
+            repo_commits_saved = True
+            commits_by_month = _group_commits_by_month(commits_transformed)
+            for (year, month), month_commits in commits_by_month.items():
+                stats = storage.save_commits_parquet_with_stats(
+                    month_commits, year, month
+                )
+                if stats["failed"] > 0:
+                    logger.error(
+                        f"Failed to save commits Parquet for {year}-{month:02d}"
+                    )
+                    repo_commits_saved = False
+                else:
+                    logger.info(
+                        "Saved commits for %d-%02d (fetched=%d new=%d duplicates=%d)",
+                        year,
+                        month,
+                        stats["fetched"],
+                        stats["new"],
+                        stats["duplicates"],
+                    )
+                total_new_commits += stats["new"]
+                if stats["new"] > 0:
+                    written_partitions.add(("github/commits", year, month))
+                total_duplicate_commits += stats["duplicates"]
+                total_failed_records += stats["failed"]
 
             # Commit生データを保存
             if commits:
@@ -286,35 +413,39 @@ def run_pipeline(config: Config) -> None:
                     logger.error("Failed to save raw commits for %s", repo_full_name)
                     total_failed_records += len(commits)
 
+            if not repo_commits_saved:
+                all_saved = False
+                continue
+
+            # リポジトリ単位で checkpoint し、中断時は次回ここから再開する
+            repo_states[repo_full_name] = {
+                "cursor_utc": (
+                    repo_cursor.isoformat()
+                    if repo_cursor is not None
+                    else repo_since_iso
+                ),
+                "pushed_at": pushed_at,
+            }
+            storage.save_ingest_state(
+                {
+                    **(state or {}),
+                    "repos": repo_states,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+
         except Exception:
             logger.exception("Failed to process repository %s", repo_full_name)
             total_failed_fatal_api_calls += 1
             total_failed_repos += 1
             continue
 
-    logger.info(f"Total collected: {total_prs} PRs, {total_commits} commits")
-
-    # Commitイベントを年月でグループ化して保存
-    commits_by_month = _group_commits_by_month(all_commits_data)
-
-    all_saved = True
-    for (year, month), commits in commits_by_month.items():
-        stats = storage.save_commits_parquet_with_stats(commits, year, month)
-        if stats["failed"] > 0:
-            logger.error(f"Failed to save commits Parquet for {year}-{month:02d}")
-            all_saved = False
-        else:
-            logger.info(
-                "Saved commits for %d-%02d (fetched=%d new=%d duplicates=%d)",
-                year,
-                month,
-                stats["fetched"],
-                stats["new"],
-                stats["duplicates"],
-            )
-        total_new_commits += stats["new"]
-        total_duplicate_commits += stats["duplicates"]
-        total_failed_records += stats["failed"]
+    logger.info(
+        "Total collected: %d PRs, %d commits (skipped unchanged repos=%d)",
+        total_prs,
+        total_commits,
+        total_skipped_repos,
+    )
 
     logger.info(
         (
@@ -333,6 +464,12 @@ def run_pipeline(config: Config) -> None:
         total_failed_repos,
     )
     logger.info("Ingest enrichment API failures: %d", total_failed_enrichment_api_calls)
+    cache_stats = collector.cache_stats()
+    if cache_stats is not None:
+        logger.info("GitHub ETag cache stats: %s", cache_stats)
+    collector.close()
+    if commit_cache is not None:
+        commit_cache.close()
 
     # 状態を更新
     if all_saved and total_failed_fatal_api_calls == 0 and total_failed_repos == 0:
@@ -345,12 +482,39 @@ def run_pipeline(config: Config) -> None:
         new_state = {
             "cursor_utc": cursor,
             "total_repos": len(target_repos),
+            "repos": repo_states,
             "updated_at": now_utc,
         }
         storage.save_ingest_state(new_state)
         logger.info("Pipeline completed successfully!")
     else:
-        logger.warning("Pipeline had failures. State not updated.")
+        logger.warning(
+            "Pipeline had failures. Global cursor not updated; "
+            "completed repositories were checkpointed."
+        )
+    return written_partitions
+
+
+def _max_datetime(current: datetime | None, value: str | None) -> datetime | None:
+    """current と ISO8601 文字列 value の新しい方を返す。"""
+    dt = _parse_iso_utc(value)
+    if dt is None:
+        return current
+    if current is None or dt > current:
+        return dt
+    return current
+
+
+def _is_unchanged_since_checkpoint(
+    pushed_at: str | None,
+    repo_state: dict[str, Any],
+) -> bool:
+    """前回 checkpoint 時点から push が無いかを判定する。"""
+    current = _parse_iso_utc(pushed_at)
+    checkpointed = _parse_iso_utc(repo_state.get("pushed_at"))
+    if current is None or checkpointed is None:
+        return False
+    return current <= checkpointed
 
 
 def _group_commits_by_month(
@@ -1,8 +1,16 @@
 """In-process GitHub pipeline entrypoints for workflow steps."""
 
 import logging
+from collections.abc import Collection
 
-from pipelines.sources.common.compaction import resolve_target_months
+from pipelines.domain.workflow import WorkflowRun
+from pipelines.sources.common.compaction import (
+    CHANGED_PARTITIONS_KEY,
+    PartitionRef,
+    build_changed_partitions,
+    parse_changed_partitions,
+    resolve_target_months,
+)
 from pipelines.sources.common.config import Config
 from pipelines.sources.common.settings import PipelinesSettings
 from pipelines.sources.github.ingest_pipeline import (
@@ -12,12 +20,43 @@ from pipelines.sources.github.storage import GitHubWorklogStorage
 
 logger = logging.getLogger(__name__)
 
+# dataset_path -> (dedupe_key, sort_by)
+_COMPACT_DATASETS = {
+    "github/commits": ("commit_event_id", "committed_at_utc"),
+    "github/pull_requests": ("pr_event_id", "updated_at_utc"),
+}
+
 
 def run_github_ingest(config: Config | None = None) -> dict[str, object]:
     """GitHub ingest を in-process で実行する。"""
     resolved_config = config or PipelinesSettings.load()
-    _run_ingest_pipeline(resolved_config)
-    return {"provider": "github", "operation": "ingest", "status": "succeeded"}
+    written_partitions = _run_ingest_pipeline(resolved_config)
+    return {
+        "provider": "github",
+        "operation": "ingest",
+        "status": "succeeded",
+        CHANGED_PARTITIONS_KEY: build_changed_partitions(written_partitions or ()),
+    }
+
+
+def compact_github_from_ingest_context(run: WorkflowRun) -> dict[str, object]:
+    """ingest step が申告した変更 partition だけを compact する。
+
+    申告が無い run（手動 compact など）は従来どおり前月・当月を対象にする。
+    """
+    partitions = parse_changed_partitions(run.result_summary)
+    if partitions is None:
+        return run_github_compact()
+    if not partitions:
+        logger.info("No changed GitHub partitions. Skipping compaction.")
+        return {
+            "provider": "github",
+            "operation": "compact",
+            "target_months": [],
+            "compacted_keys": [],
+            "skipped_targets": [],
+        }
+    return run_github_compact(partitions=partitions)
 
 
 def run_github_compact(
@@ -25,8 +64,12 @@ def run_github_compact(
     *,
     year: int | None = None,
     month: int | None = None,
+    partitions: Collection[PartitionRef] | None = None,
 ) -> dict[str, object]:
-    """GitHub monthly compaction を in-process で実行する。"""
+    """GitHub monthly compaction を in-process で実行する。
+
+    partitions 指定時は対象 dataset・月をその集合に限定する。
+    """
     resolved_config = config or PipelinesSettings.load()
     if not resolved_config.duckdb or not resolved_config.duckdb.r2:
         raise ValueError("R2 configuration is required for compaction")
@@ -42,15 +85,15 @@ def run_github_compact(
         master_path=r2_conf.master_path,
     )
 
-    target_months = resolve_target_months(year, month)
+    targets = _resolve_compact_targets(year, month, partitions)
+    target_months = sorted({(y, m) for _, y, m in targets})
     compacted_keys: list[str] = []
     skipped_targets: list[str] = []
     failures: list[str] = []
     for target_year, target_month in target_months:
-        for dataset_path, dedupe_key, sort_by in (
-            ("github/commits", "commit_event_id", "committed_at_utc"),
-            ("github/pull_requests", "pr_event_id", "updated_at_utc"),
-        ):
+        for dataset_path, (dedupe_key, sort_by) in _COMPACT_DATASETS.items():
+            if (dataset_path, target_year, target_month) not in targets:
+                continue
             try:
                 key = storage.compact_month(
                     dataset_path=dataset_path,
@@ -85,3 +128,20 @@ def run_github_compact(
         "compacted_keys": compacted_keys,
         "skipped_targets": skipped_targets,
     }
+
+
+def _resolve_compact_targets(
+    year: int | None,
+    month: int | None,
+    partitions: Collection[PartitionRef] | None,
+) -> set[PartitionRef]:
+    if partitions is None:
+        return {
+            (dataset_path, target_year, target_month)
+            for target_year, target_month in resolve_target_months(year, month)
+            for dataset_path in _COMPACT_DATASETS
+        }
+    unknown = {p for p in partitions if p[0] not in _COMPACT_DATASETS}
+    if unknown:
+        logger.warning("Ignoring unknown GitHub partitions: %s", sorted(unknown))
+    return set(partitions) - unknown
@@ -0,0 +1,142 @@
+"""GitHub API のレート制限を考慮したリクエストスケジューラ。
+
+primary rate limit（``X-RateLimit-Remaining`` / ``X-RateLimit-Reset``）と
+secondary rate limit（``Retry-After``）のヘッダーを観測し、
+並列ワーカー間で共有される待機時刻を管理します。
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 残量がこの値以下になったら reset まで新規リクエストを止める
+DEFAULT_RESERVE_REQUESTS = 50
+# Retry-After が無い secondary rate limit 応答時の待機秒数（GitHub 推奨値）
+SECONDARY_LIMIT_FALLBACK_SECONDS = 60.0
+# 1回の待機の上限（reset 時刻が異常値でもパイプラインを止め続けない）
+DEFAULT_MAX_WAIT_SECONDS = 900.0
+
+
+def _parse_number(value: Any) -> float | None:
+    """ヘッダー値を数値に変換する。文字列以外や不正値は None。"""
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value.strip())
+    except ValueError:
+        return None
+
+
+class GitHubRateLimiter:
+    """レスポンスヘッダーからレート制限状態を追跡し、リクエストを待機させる。
+
+    スレッドセーフで、1つの collector を共有する全ワーカーから利用できます。
+    """
+
+    def __init__(
+        self,
+        *,
+        reserve_requests: int = DEFAULT_RESERVE_REQUESTS,
+        max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.reserve_requests = max(0, reserve_requests)
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._remaining: int | None = None
+        self._reset_at: float | None = None
+        self._paused_until = 0.0
+
+    @property
+    def remaining(self) -> int | None:
+        """最後に観測した残リクエスト数。未観測なら None。"""
+        with self._lock:
+            return self._remaining
+
+    def wait(self) -> float:
+        """次のリクエストを送ってよい時刻まで待機し、待機秒数を返す。"""
+        with self._lock:
+            delay = self._paused_until - self._clock()
+        if delay <= 0:
+            return 0.0
+        delay = min(delay, self.max_wait_seconds)
+        logger.warning("GitHub rate limit reached; sleeping %.1fs", delay)
+        self._sleep(delay)
+        return delay
+
+    def observe(self, status_code: int, headers: Mapping[str, Any]) -> None:
+        """レスポンスのステータスとヘッダーからレート制限状態を更新する。"""
+        remaining = _parse_number(headers.get("X-RateLimit-Remaining"))
+        reset_at = _parse_number(headers.get("X-RateLimit-Reset"))
+        retry_after = _parse_number(headers.get("Retry-After"))
+        now = self._clock()
+
+        with self._lock:
+            if remaining is not None:
+                self._remaining = int(remaining)
+            if reset_at is not None:
+                self._reset_at = reset_at
+
+            pause_until = 0.0
+            if retry_after is not None:
+                pause_until = now + retry_after
+            elif (
+                self._remaining is not None
+                and self._remaining <= self.reserve_requests
+                and self._reset_at is not None
+            ):
+                pause_until = self._reset_at
+            elif status_code == 429 or (status_code == 403 and remaining is None):
+                pause_until = now + SECONDARY_LIMIT_FALLBACK_SECONDS
+
+            if pause_until > self._paused_until:
+                self._paused_until = pause_until
+
+    def detail_budget(self, requested: int, pending_repos: int) -> int:
+        """残量を残りリポジトリ数で按分した commit detail の取得上限を返す。
+
+        Args:
+            requested: 設定上のリポジトリあたり上限
+            pending_repos: 現在のリポジトリを含む未処理リポジトリ数
+
+        Returns:
+            requested を超えない調整後の上限
+        """
+        with self._lock:
+            remaining = self._remaining
+        if remaining is None:
+            return requested
+        available = max(0, remaining - self.reserve_requests)
+        return min(requested, available // max(1, pending_repos))
+
+
+def map_bounded(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_workers: int,
+) -> list[tuple[R | None, Exception | None]]:
+    """items を最大 max_workers 並列で処理し、入力順に (結果, 例外) を返す。"""
+
+    def call(item: T) -> tuple[R | None, Exception | None]:
+        try:
+            return fn(item), None
+        except Exception as exc:
+            return None, exc
+
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
@@ -163,7 +163,10 @@ def transform_commit(
     # stats情報の抽出
     stats = commit.get("stats", {})
     files = commit.get("files")
-    changed_files_count = len(files) if isinstance(files, list) else None
+    # GraphQL モードでは files の代わりに changed_files（件数）を持つ
+    changed_files_count = (
+        len(files) if isinstance(files, list) else commit.get("changed_files")
+    )
 
     # owner/repoの抽出
     parts = repo_full_name.split("/", 1) if repo_full_name else ["", ""]
@@ -9,10 +9,13 @@ Playwrightを使用してスクレイピングを行い、クッキー認証を
 - 時刻抽出: .WFTFcf の親要素テキストから時刻を抜く（表示形式変更に弱い）
 - 日付ヘッダーの紐付け: DOM順にヘッダー→アイテムを読む前提
 - 認証判定: URL/テキスト判定（ログイン画面の文言変更に弱い）
+- 増分抽出: アイテムが DOM 末尾に追記される前提（既読件数をインデックスで管理）
 """
 
 import logging
 import re
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from urllib.parse import parse_qs, urlparse
@@ -23,8 +26,10 @@ from playwright.async_api import (
     BrowserContext,
     Page,
     Playwright,
+    Route,
     async_playwright,
 )
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from tenacity import (
     retry,
     retry_if_not_exception_type,
@@ -32,10 +37,25 @@ from tenacity import (
     wait_exponential,
 )
 
-from .config import MAX_RETRIES, MYACTIVITY_URL, RETRY_BACKOFF_FACTOR, TIMEZONE
+from .config import (
+    BLOCKED_RESOURCE_TYPES,
+    MAX_RETRIES,
+    MAX_SCROLLS,
+    MYACTIVITY_URL,
+    RETRY_BACKOFF_FACTOR,
+    SCROLL_GROWTH_TIMEOUT_MS,
+    TIMEZONE,
+)
 
 logger = logging.getLogger(__name__)
 
+ITEM_SELECTOR = ".k2bP7e"
+
+# アイテム数が count を超えるまで待つ（DOM の増加に反応して即座に解決する）
+_WAIT_FOR_GROWTH_JS = """
+([selector, count]) => document.querySelectorAll(selector).length > count
+"""
+
 
 class AuthenticationError(Exception):
     """クッキーの期限切れまたは認証エラー。"""
@@ -78,6 +98,34 @@ def _extract_video_id(video_url: str) -> str | None:
     return None
 
 
+async def _block_unused_resources(route: Route) -> None:
+    """スクレイピングに使わないリソースのリクエストを中断する。"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+@asynccontextmanager
+async def launch_shared_browser() -> AsyncIterator[Browser]:
+    """複数アカウントで共有するChromiumを起動する。
+
+    各 MyActivityCollector はこのブラウザ上に自分専用の BrowserContext を作るため、
+    クッキーやセッションはアカウント間で分離されたまま起動コストだけを共有できます。
+    """
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            logger.info("Shared browser launched")
+            yield browser
+        finally:
+            if browser.is_connected():
+                await browser.close()
+    finally:
+        await playwright.stop()
+
+
 def _parse_watched_at(timestamp_str: str) -> datetime | None:
     """視聴日時文字列をdatetimeオブジェクトに変換する。
 
@@ -116,17 +164,23 @@ class MyActivityCollector:
 
     Attributes:
         cookies: Google認証用のクッキーデータ
-        browser: Playwrightブラウザインスタンス（遅延初期化）
+        browser: Playwrightブラウザインスタンス（遅延初期化、または共有ブラウザ）
     """
 
-    def __init__(self, cookies: list[dict[str, Any]]):
+    def __init__(
+        self,
+        cookies: list[dict[str, Any]],
+        browser: Browser | None = None,
+    ):
         """MyActivityコレクターを初期化します。
 
         Args:
             cookies: Google認証用クッキー [{"name": "...", "value": "..."}]
+            browser: 共有ブラウザ。指定時はコンテキストだけを作成・破棄する
         """
         self.cookies = cookies
-        self.browser: Browser | None = None
+        self.browser: Browser | None = browser
+        self._owns_browser = browser is None
         self.context: BrowserContext | None = None
         self.page: Page | None = None
         self._playwright: Playwright | None = None
@@ -134,6 +188,12 @@ class MyActivityCollector:
 
     async def _initialize_browser(self) -> None:
         """Playwrightブラウザとコンテキストを初期化します。"""
+        if not self._owns_browser:
+            if self.browser is None or not self.browser.is_connected():
+                raise RuntimeError("Shared browser is not connected")
+            if self.context is None:
+                await self._open_context(self.browser)
+            return
         if self.browser is None or not self.browser.is_connected():
             if self._playwright is None:
                 self._playwright = await async_playwright().start()
@@ -144,30 +204,41 @@ class MyActivityCollector:
             browser = self.browser
             if browser is None:
                 raise RuntimeError("Browser failed to launch")
-            self.context = await browser.new_context(timezone_id="UTC")
+            await self._open_context(browser)
+
+    async def _open_context(self, browser: Browser) -> None:
+        """アカウント専用のコンテキストとページを作成します。"""
+        self.context = await browser.new_context(timezone_id="UTC")
 
-            context = self.context
-            if context is None:
-                raise RuntimeError("Browser context was not created")
+        context = self.context
+        if context is None:
+            raise RuntimeError("Browser context was not created")
 
-            # クッキーを設定
-            await context.add_cookies(self.cookies)
+        # クッキーを設定
+        await context.add_cookies(self.cookies)
+        # 画像・フォント・メディアは取得しない
+        await context.route("**/*", _block_unused_resources)
 
-            self.page = await context.new_page()
-            logger.info("Browser initialized with cookies")
+        self.page = await context.new_page()
+        logger.info("Browser initialized with cookies")
 
     async def _cleanup_browser(self) -> None:
-        """ブラウザリソースをクリーンアップします。"""
+        """ブラウザリソースをクリーンアップします。
+
+        共有ブラウザの場合はこのコレクターのコンテキストだけを閉じます。
+        """
         if self.context:
             await self.context.close()
+        self.context = None
+        self.page = None
+        if not self._owns_browser:
+            return
         if self.browser and self.browser.is_connected():
             await self.browser.close()
         if self._playwright:
             await self._playwright.stop()
             self._playwright = None
 
-        self.context = None
-        self.page = None
         self.browser = None
         logger.info("Browser resources cleaned up")
 
@@ -208,7 +279,8 @@ class MyActivityCollector:
 
             # MyActivityページにアクセス
             logger.info("Navigating to MyActivity page: %s", MYACTIVITY_URL)
-            response = await page.goto(MYACTIVITY_URL, wait_until="networkidle")
+            # networkidle は広告・計測通信で遅れるため DOM 構築完了で進める
+            response = await page.goto(MYACTIVITY_URL, wait_until="domcontentloaded")
 
             # 認証エラーのチェック
             if await self._is_authentication_failed(response):
@@ -277,14 +349,29 @@ class MyActivityCollector:
         if page is None:
             raise RuntimeError("Browser page is not initialized")
 
+        # 初回のアイテム描画を待つ
+        try:
+            await page.wait_for_selector(ITEM_SELECTOR, timeout=10000)
+        except PlaywrightTimeoutError:
+            logger.warning("Timeout waiting for %s selector", ITEM_SELECTOR)
+            # タイムアウトでもDOM解析は試みる
+
         items: list[dict[str, Any]] = []
+        seen: set[tuple[str, datetime]] = set()
+        scanned = 0  # 抽出済みのアイテム要素数
         scroll_count = 0
-        max_scrolls = 50  # 無限ループ防止
 
-        while scroll_count < max_scrolls:
-            # 現在のページのアイテムを抽出
-            page_items = await self._extract_items_from_page(after_timestamp)
-            new_items = [item for item in page_items if item not in items]
+        while scroll_count < MAX_SCROLLS:
+            # 前回以降に追記されたアイテムだけを抽出
+            page_items, scanned = await self._extract_items_from_page(
+                after_timestamp, start_index=scanned
+            )
+            new_items = []
+            for item in page_items:
+                key = (item["video_id"], item["watched_at"])
+                if key not in seen:
+                    seen.add(key)
+                    new_items.append(item)
             items.extend(new_items)
 
             logger.debug(
@@ -299,7 +386,7 @@ class MyActivityCollector:
                 items = items[:max_items]
                 break
 
-            # 新しいアイテムが見つからなければ終了
+            # 新しいアイテムが見つからなければ終了（after_timestamp より古い範囲に到達）
             if len(new_items) == 0:
                 logger.info(
                     "No new items found on scroll %d, stopping", scroll_count + 1
@@ -308,43 +395,59 @@ class MyActivityCollector:
 
             # スクロールしてさらにアイテムを読み込む
             await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await page.wait_for_timeout(2000)  # スクロール待機
-
             scroll_count += 1
+            if not await self._wait_for_more_items(scanned):
+                logger.info("No more items loaded after scroll %d", scroll_count)
+                break
 
         logger.info("Scraped %d items after %d scrolls", len(items), scroll_count)
         return items
 
+    async def _wait_for_more_items(self, count: int) -> bool:
+        """アイテム要素数が count を超えるまで待つ。
+
+        Returns:
+            アイテムが追加された場合はTrue、タイムアウトした場合はFalse
+        """
+        page = self.page
+        if page is None:
+            raise RuntimeError("Browser page is not initialized")
+        try:
+            await page.wait_for_function(
+                _WAIT_FOR_GROWTH_JS,
+                arg=[ITEM_SELECTOR, count],
+                timeout=SCROLL_GROWTH_TIMEOUT_MS,
+            )
+        except PlaywrightTimeoutError:
+            return False
+        return True
+
     async def _extract_items_from_page(
-        self, after_timestamp: datetime
-    ) -> list[dict[str, Any]]:
+        self, after_timestamp: datetime, start_index: int = 0
+    ) -> tuple[list[dict[str, Any]], int]:
         """現在のページから視聴履歴アイテムを抽出する。
 
         DOMをJavascriptでトラバースし、日付ヘッダーとアイテムを紐付けて抽出します。
+        start_index より前のアイテム要素は日付ヘッダーの追跡だけ行い、読み飛ばします。
 
         Args:
             after_timestamp: この時刻以降のアイテムのみ抽出
+            start_index: 抽出を始めるアイテム要素の位置（抽出済みの件数）
 
         Returns:
-            抽出したアイテムのリスト
+            抽出したアイテムのリストと、ページ上のアイテム要素数
         """
         page = self.page
         if page is None:
             raise RuntimeError("Browser page is not initialized")
 
-        # ページ読み込み完了を待機（アイテムコンテナが表示されるまで）
-        try:
-            await page.wait_for_selector(".k2bP7e", timeout=10000)
-        except Exception:
-            logger.warning("Timeout waiting for .k2bP7e selector")
-            # タイムアウトでもDOM解析は試みる
-
         # JavascriptでDOMを解析してデータ抽出
-        scraped_data = await page.evaluate(
+        scraped = await page.evaluate(
             """
-            () => {
+            (startIndex) => {
                 const results = [];
                 let currentDate = "";
+                let itemIndex = 0;
                 
                 const ITEM_CLASS = 'k2bP7e';
                 const TITLE_CLASS = 'l8sGWb';
@@ -354,7 +457,7 @@ class MyActivityCollector:
                     `${HEADER_SELECTOR}, .${ITEM_CLASS}`
                 );
                 
-                if (nodes.length === 0) return [];
+                if (nodes.length === 0) return {total: 0, items: []};
                 
                 for (const node of nodes) {
                     try {
@@ -367,6 +470,11 @@ class MyActivityCollector:
                             continue;
                         }
 
+                        // 抽出済みのアイテムは innerText を読まずに飛ばす
+                        if (itemIndex++ < startIndex) {
+                            continue;
+                        }
+
                         if (!currentDate) {
                             continue;
                         }
@@ -415,13 +523,14 @@ class MyActivityCollector:
                         console.error(e);
                     }
                 }
-                return results;
+                return {total: itemIndex, items: results};
             }
-            """
+            """,
+            start_index,
         )
 
         items = []
-        for data in scraped_data:
+        for data in scraped["items"]:
             if data["type"] != "item":
                 continue
 
@@ -472,7 +581,7 @@ class MyActivityCollector:
                 logger.warning("Failed to process scraped item: %s", e)
                 continue
 
-        return items
+        return items, scraped["total"]
 
     def _parse_relative_datetime(self, date_str: str, time_str: str) -> datetime | None:
         """相対日付("今日", "昨日")やMyActivityの日付形式をパースしてdatetimeを返す。"""
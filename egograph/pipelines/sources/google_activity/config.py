@@ -11,11 +11,27 @@ RETRY_BACKOFF_FACTOR = 2  # 指数バックオフ: 2, 4, 8秒
 SCROLL_DELAY_MIN = 2  # 秒
 SCROLL_DELAY_MAX = 5  # 秒
 MYACTIVITY_URL = "https://myactivity.google.com/product/youtube"
+# スクレイピングに不要なリソース種別（Playwright の resource_type）
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+# スクロール後に新しいアイテムが追加されるまで待つ上限（ミリ秒）
+SCROLL_GROWTH_TIMEOUT_MS = 10000
+MAX_SCROLLS = 50  # 無限ループ防止
+# 共有ブラウザ上で同時にスクレイピングするアカウント数
+MAX_CONCURRENT_ACCOUNTS = 2
 TIMEZONE = "UTC"
 
+# Google Takeout インポート設定
+TAKEOUT_READ_CHUNK_SIZE = 64 * 1024  # ファイルを読み進める単位（文字数）
+TAKEOUT_BATCH_SIZE = 5000  # 変換・保存をまとめるイベント数（メモリ上限の目安）
+
 # YouTube Data API設定
 YOUTUBE_API_BATCH_SIZE = 50  # API制限: videos.list, channels.listは50件/リクエスト
 YOUTUBE_API_QUOTA_PER_DAY = 10000  # 1日のクォータ上限
+YOUTUBE_API_MAX_CONCURRENCY = 4  # 同時に投げるバッチリクエスト数
+# list 系メソッド 1 リクエストあたりのクォータ消費量（件数に依らない）
+YOUTUBE_API_UNIT_COSTS = {"videos": 1, "channels": 1}
+# クォータは太平洋時間の 0 時にリセットされる
+YOUTUBE_QUOTA_TIMEZONE = "America/Los_Angeles"
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,179 @@
+"""YouTube 動画・チャンネル ID のローカル取得済みインデックス。
+
+YouTube Data API で取得済みの video_id / channel_id と取得時刻を
+ローカル SQLite に保持し、未取得または一定日数を過ぎた ID だけを
+API に問い合わせるために使います。
+クォータ不足で繰り越した ID と当日のクォータ消費量も同じ DB に保持します。
+参照先（bucket/master_path）が変わった場合は全件を破棄して取り直します。
+"""
+
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Literal
+
+# インデックスの構造や判定条件を変えたら上げる
+INDEX_VERSION = "1"
+
+KnownIdKind = Literal["video", "channel"]
+
+
+class YouTubeKnownIdIndex:
+    """取得済み YouTube ID と取得時刻の永続インデックス。"""
+
+    def __init__(self, db_path: str | Path, refresh_days: int):
+        """インデックスを開きます。
+
+        Args:
+            db_path: SQLite ファイルのパス
+            refresh_days: この日数を過ぎた ID は統計情報を取り直す
+        """
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.refresh_days = refresh_days
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS known_ids (
+                kind TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (kind, item_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS deferred_ids (
+                kind TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                PRIMARY KEY (kind, item_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS quota_usage (
+                day TEXT PRIMARY KEY,
+                units INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def ensure_scope(self, scope: str) -> None:
+        """バージョンまたは参照先が異なる場合は全件を破棄して scope を記録する。"""
+        with self._lock, self._conn:
+            rows = dict(
+                self._conn.execute("SELECT key, value FROM index_meta").fetchall()
+            )
+            if rows.get("version") == INDEX_VERSION and rows.get("scope") == scope:
+                return
+            self._conn.execute("DELETE FROM known_ids")
+            self._conn.execute("DELETE FROM deferred_ids")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)",
+                [("version", INDEX_VERSION), ("scope", scope)],
+            )
+
+    def select_stale(
+        self,
+        kind: KnownIdKind,
+        ids: Iterable[str],
+        now: datetime | None = None,
+    ) -> list[str]:
+        """ids のうち未取得または refresh_days を過ぎたものを入力順で返す。"""
+        id_list = [item_id for item_id in dict.fromkeys(ids) if item_id]
+        threshold = (now or datetime.now(timezone.utc)) - timedelta(
+            days=self.refresh_days
+        )
+        fresh: set[str] = set()
+        with self._lock:
+            # SQLite の変数上限を超えないよう分割して問い合わせる
+            for start in range(0, len(id_list), 500):
+                chunk = id_list[start : start + 500]
+                placeholders = ", ".join(["?"] * len(chunk))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT item_id
+                    FROM known_ids
+                    WHERE kind = ? AND fetched_at > ? AND item_id IN ({placeholders})
+                    """,
+                    [kind, threshold.isoformat(), *chunk],
+                ).fetchall()
+                fresh.update(row[0] for row in rows)
+        return [item_id for item_id in id_list if item_id not in fresh]
+
+    def mark_fetched(
+        self,
+        kind: KnownIdKind,
+        ids: Iterable[str],
+        fetched_at: datetime | None = None,
+    ) -> None:
+        """API から取得して保存した ID の取得時刻を記録し、繰り越しを解除する。"""
+        timestamp = (fetched_at or datetime.now(timezone.utc)).isoformat()
+        id_list = [item_id for item_id in ids if item_id]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO known_ids (kind, item_id, fetched_at)
+                VALUES (?, ?, ?)
+                """,
+                [(kind, item_id, timestamp) for item_id in id_list],
+            )
+            self._conn.executemany(
+                "DELETE FROM deferred_ids WHERE kind = ? AND item_id = ?",
+                [(kind, item_id) for item_id in id_list],
+            )
+
+    def defer(self, kind: KnownIdKind, ids: Iterable[str]) -> None:
+        """クォータ不足で問い合わせなかった ID を次回実行へ繰り越す。"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO deferred_ids (kind, item_id) VALUES (?, ?)",
+                [(kind, item_id) for item_id in ids if item_id],
+            )
+
+    def list_deferred(self, kind: KnownIdKind) -> list[str]:
+        """繰り越し中の ID を返す。"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id FROM deferred_ids WHERE kind = ? ORDER BY item_id",
+                [kind],
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def claim_deferred(self, kind: KnownIdKind) -> list[str]:
+        """繰り越し中の ID を返して繰り越しを解除する（1回の実行で1度だけ取り出す）。"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT item_id FROM deferred_ids WHERE kind = ? ORDER BY item_id",
+                [kind],
+            ).fetchall()
+            self._conn.execute("DELETE FROM deferred_ids WHERE kind = ?", [kind])
+        return [row[0] for row in rows]
+
+    def get_quota_used(self, day: str) -> int:
+        """day に記録済みのクォータ消費量を返す。"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT units FROM quota_usage WHERE day = ?", [day]
+            ).fetchone()
+        return row[0] if row else 0
+
+    def add_quota_used(self, day: str, units: int) -> None:
+        """day のクォータ消費量を加算し、古い日付の記録を消す。"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO quota_usage (day, units) VALUES (?, ?)
+                ON CONFLICT (day) DO UPDATE SET units = units + excluded.units
+                """,
+                [day, units],
+            )
+            self._conn.execute("DELETE FROM quota_usage WHERE day < ?", [day])
+
+    def close(self) -> None:
+        """DB 接続を閉じる。"""
+        with self._lock:
+            self._conn.close()
@@ -7,19 +7,32 @@ import os
 import sys
 from datetime import datetime, timedelta, timezone
 
+from pipelines.sources.common.compaction import (
+    CHANGED_PARTITIONS_KEY,
+    build_changed_partitions,
+)
+from pipelines.sources.common.config import GoogleActivityConfig
 from pipelines.sources.common.settings import PipelinesSettings
 from pipelines.sources.common.utils import log_execution_time
 from pipelines.sources.google_activity import transform as google_transform
 from pipelines.sources.google_activity.config import AccountConfig
+from pipelines.sources.google_activity.known_ids import YouTubeKnownIdIndex
 from pipelines.sources.google_activity.pipeline import run_all_accounts_pipeline
 from pipelines.sources.google_activity.storage import YouTubeStorage
+from pipelines.sources.google_activity.youtube_api import (
+    YouTubeQuotaBudget,
+    quota_day,
+)
 
 logger = logging.getLogger(__name__)
 
 
 @log_execution_time
-def main():
-    """メイン Ingestion パイプライン実行処理。"""
+def main() -> dict[str, object]:
+    """メイン Ingestion パイプライン実行処理。
+
+    後続の compact step 向けに、書き込んだ partition を result_summary として返す。
+    """
     # 設定を先にロードしてログ設定を初期化
     config = PipelinesSettings.load()
 
@@ -51,17 +64,47 @@ def main():
         # 過去1ヶ月分の視聴履歴を取得
         after_timestamp = datetime.now(timezone.utc) - timedelta(days=30)
         max_items = 1000
+        # GOOGLE_ACTIVITY_ACCOUNTS 未設定時は既定値で動かす
+        activity_config = config.google_activity or GoogleActivityConfig(accounts=[])
+
+        id_index = None
+        if activity_config.known_id_index_path:
+            id_index = YouTubeKnownIdIndex(
+                activity_config.known_id_index_path,
+                refresh_days=activity_config.metadata_refresh_days,
+            )
+            id_index.ensure_scope(f"{r2_config.bucket_name}/{storage.master_path}")
+
+        # 当日の消費済みクォータを引き継いで全アカウントで共有する
+        today = quota_day()
+        quota_budget = YouTubeQuotaBudget(
+            activity_config.api_quota_per_day,
+            used=id_index.get_quota_used(today) if id_index else 0,
+        )
 
         # パイプライン実行
-        results = asyncio.run(
-            run_all_accounts_pipeline(
-                accounts=accounts,
-                storage=storage,
-                transform=google_transform,
-                after_timestamp=after_timestamp,
-                max_items=max_items,
+        try:
+            results = asyncio.run(
+                run_all_accounts_pipeline(
+                    accounts=accounts,
+                    storage=storage,
+                    transform=google_transform,
+                    after_timestamp=after_timestamp,
+                    max_items=max_items,
+                    max_concurrency=activity_config.max_concurrency,
+                    id_index=id_index,
+                    quota_budget=quota_budget,
+                )
             )
-        )
+        finally:
+            logger.info(
+                "YouTube API quota used this run: %d (remaining today: %d)",
+                quota_budget.consumed,
+                quota_budget.remaining,
+            )
+            if id_index is not None:
+                id_index.add_quota_used(today, quota_budget.consumed)
+                id_index.close()
 
         # 結果の集計
         success_count = sum(1 for r in results.values() if r.success)
@@ -80,6 +123,18 @@ def main():
         if success_count < total_count:
             sys.exit(1)
 
+        written_partitions = {
+            partition
+            for result in results.values()
+            for partition in result.written_partitions
+        }
+        return {
+            "provider": "google_activity",
+            "operation": "ingest",
+            "status": "succeeded",
+            CHANGED_PARTITIONS_KEY: build_changed_partitions(written_partitions),
+        }
+
     except Exception:
         logger.exception("Pipeline failed")
         sys.exit(1)
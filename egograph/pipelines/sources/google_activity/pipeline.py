@@ -1,16 +1,47 @@
+import asyncio
+import contextlib
 import logging
 from collections import defaultdict
-from dataclasses import dataclass
+from collections.abc import Collection
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any
 
-from .collector import MyActivityCollector
-from .config import AccountConfig
+import httpx
+from playwright.async_api import Browser
+
+from pipelines.domain.workflow import WorkflowRun
+from pipelines.sources.common.compaction import (
+    PartitionRef,
+    parse_changed_partitions,
+    resolve_target_months,
+)
+from pipelines.sources.common.config import Config
+from pipelines.sources.common.settings import PipelinesSettings
+
+from .collector import MyActivityCollector, launch_shared_browser
+from .config import MAX_CONCURRENT_ACCOUNTS, AccountConfig
+from .known_ids import YouTubeKnownIdIndex
 from .storage import YouTubeStorage
-from .youtube_api import QuotaExceededError, YouTubeAPIClient
+from .youtube_api import (
+    AsyncYouTubeAPIClient,
+    YouTubeFetchResult,
+    YouTubeQuotaBudget,
+)
 
 logger = logging.getLogger(__name__)
 
+WATCH_HISTORY_DATASET = "youtube/watch_history"
+VIDEOS_DATASET = "youtube/videos"
+CHANNELS_DATASET = "youtube/channels"
+
+# dataset_path -> (data_domain, dedupe_key, sort_by)
+_COMPACT_DATASETS = {
+    WATCH_HISTORY_DATASET: ("events", "watch_id", "watched_at_utc"),
+    VIDEOS_DATASET: ("master", "video_id", "updated_at"),
+    CHANNELS_DATASET: ("master", "channel_id", "updated_at"),
+}
+
 
 @dataclass
 class PipelineResult:
@@ -22,6 +53,7 @@ class PipelineResult:
         collected_count: コレクターが取得したアイテム数
         saved_count: 保存したアイテム数
         error: 失敗した場合のエラー情報
+        written_partitions: 書き込んだ (dataset, year, month)
     """
 
     success: bool
@@ -29,6 +61,256 @@ class PipelineResult:
     collected_count: int
     saved_count: int
     error: str | None = None
+    written_partitions: set[PartitionRef] = field(default_factory=set)
+
+
+def _store_watch_events(
+    account_config: AccountConfig,
+    storage: YouTubeStorage,
+    transform: Any,
+    raw_items: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], int]:
+    """収集済みアイテムを変換・保存し、変換後イベントと保存件数を返す。
+
+    失敗時は例外を送出し、インジェスト状態は更新しません。
+    """
+    account_id = account_config.account_id
+    # 3. 収集データを変換
+    transformed_events = transform.transform_watch_history_items(raw_items, account_id)
+    logger.info(
+        "Transformed %d items for account=%s", len(transformed_events), account_id
+    )
+
+    # 4. 生データ(JSON)をR2に保存
+    raw_saved_key = storage.save_raw_json(
+        data=raw_items, prefix="youtube/activity", account_id=account_id
+    )
+    if not raw_saved_key:
+        raise RuntimeError("Failed to save raw JSON data")
+
+    # 5. イベントデータ(Parquet)をR2に保存（月次パーティショニング）
+    # 月ごとにグループ化して保存
+    monthly_events: dict[tuple[int, int], list[dict[str, Any]]] = defaultdict(list)
+    for event in transformed_events:
+        watched_at = event["watched_at_utc"]
+        month_key = (watched_at.year, watched_at.month)
+        monthly_events[month_key].append(event)
+
+    saved_count = 0
+    failed_count = 0
+    failed_months: list[str] = []
+    for (year, month), events in monthly_events.items():
+        saved_key = storage.save_parquet(
+            data=events, year=year, month=month, prefix=WATCH_HISTORY_DATASET
+        )
+        if saved_key:
+            saved_count += len(events)
+            logger.info(
+                "Saved %d events to %s/%02d for account=%s",
+                len(events),
+                year,
+                month,
+                account_id,
+            )
+        else:
+            failed_count += 1
+            failed_months.append(f"{year}/{month:02d}")
+            logger.warning(
+                "Failed to save events for %s/%02d for account=%s",
+                year,
+                month,
+                account_id,
+            )
+
+    if saved_count == 0:
+        raise RuntimeError("Failed to save any events to Parquet")
+
+    # 失敗したパーティションがある場合はstate更新をスキップ
+    if failed_count > 0:
+        failed_partitions = ", ".join(failed_months)
+        error_message = (
+            "Failed to save events for %d partition(s): %s. Ingest state not updated."
+        ) % (failed_count, failed_partitions)
+        raise RuntimeError(error_message)
+
+    return transformed_events, saved_count
+
+
+async def _save_master(
+    storage: YouTubeStorage, data: list[dict[str, Any]], prefix: str
+) -> PartitionRef:
+    """マスターを取得月のパーティションへ保存する（月次 compact の単位）。"""
+    now = datetime.now(timezone.utc)
+    saved_key = await asyncio.to_thread(
+        storage.save_master_parquet,
+        data=data,
+        prefix=prefix,
+        year=now.year,
+        month=now.month,
+    )
+    if not saved_key:
+        raise RuntimeError(f"Failed to save {prefix} master data")
+    return prefix, now.year, now.month
+
+
+async def _enrich_master_data(
+    account_config: AccountConfig,
+    storage: YouTubeStorage,
+    transform: Any,
+    video_ids: Collection[str],
+    id_index: YouTubeKnownIdIndex | None,
+    quota_budget: YouTubeQuotaBudget | None,
+    channel_ids: Collection[str] = (),
+) -> set[PartitionRef]:
+    """YouTube APIで動画・チャンネルのマスターデータを取得して保存する。
+
+    取得済みインデックスがあれば未取得・期限切れの ID だけを問い合わせ、
+    クォータ不足で送れなかった ID は次回へ繰り越します。
+    channel_ids は動画から辿れるチャンネルに加えて問い合わせる ID です。
+    書き込んだマスターのパーティションを返します。
+    """
+    written: set[PartitionRef] = set()
+    account_id = account_config.account_id
+    candidate_count = len(video_ids)
+    video_ids = sorted(set(video_ids))
+    extra_channel_ids = set(channel_ids)
+    if id_index is not None:
+        video_ids = id_index.select_stale("video", video_ids)
+        logger.info(
+            "Fetching metadata for %d videos (%d candidates) for account=%s",
+            len(video_ids),
+            candidate_count,
+            account_id,
+        )
+    if not video_ids and not extra_channel_ids:
+        return written
+
+    async with httpx.AsyncClient() as http_client:
+        api_client = AsyncYouTubeAPIClient(
+            account_config.youtube_api_key,
+            http_client=http_client,
+            budget=quota_budget,
+        )
+        video_result = (
+            await api_client.get_videos(video_ids)
+            if video_ids
+            else YouTubeFetchResult()
+        )
+        if video_result.items:
+            written.add(
+                await _save_master(
+                    storage,
+                    [
+                        transform.transform_video_info(video)
+                        for video in video_result.items
+                    ],
+                    VIDEOS_DATASET,
+                )
+            )
+        elif video_ids and not video_result.deferred_ids:
+            logger.warning("No video metadata returned for account=%s", account_id)
+        if id_index is not None:
+            # 削除・非公開で返らなかった動画も毎回問い合わせないよう取得済みにする
+            deferred = set(video_result.deferred_ids)
+            id_index.mark_fetched(
+                "video",
+                [video_id for video_id in video_ids if video_id not in deferred],
+            )
+            id_index.defer("video", video_result.deferred_ids)
+
+        channel_ids = sorted(
+            {
+                video.get("snippet", {}).get("channelId")
+                for video in video_result.items
+                if video.get("snippet", {}).get("channelId")
+            }
+            | extra_channel_ids
+        )
+        if id_index is not None:
+            channel_ids = id_index.select_stale("channel", channel_ids)
+        if not channel_ids:
+            return written
+        channel_result = await api_client.get_channels(channel_ids)
+        if channel_result.items:
+            written.add(
+                await _save_master(
+                    storage,
+                    [
+                        transform.transform_channel_info(channel)
+                        for channel in channel_result.items
+                    ],
+                    CHANNELS_DATASET,
+                )
+            )
+        elif not channel_result.deferred_ids:
+            logger.warning("No channel metadata returned for account=%s", account_id)
+        if id_index is not None:
+            deferred = set(channel_result.deferred_ids)
+            id_index.mark_fetched(
+                "channel",
+                [
+                    channel_id
+                    for channel_id in channel_ids
+                    if channel_id not in deferred
+                ],
+            )
+            id_index.defer("channel", channel_result.deferred_ids)
+    return written
+
+
+async def _fetch_carried_master_data(
+    account_config: AccountConfig,
+    storage: YouTubeStorage,
+    transform: Any,
+    video_ids: list[str],
+    channel_ids: list[str],
+    id_index: YouTubeKnownIdIndex | None,
+    quota_budget: YouTubeQuotaBudget | None,
+) -> set[PartitionRef]:
+    """前回までに繰り越した ID のマスターデータを取得する。
+
+    取得に失敗した場合は ID を繰り越し直し、アカウントの結果には影響させない。
+    """
+    logger.info(
+        "Fetching carried-over metadata (videos=%d, channels=%d)",
+        len(video_ids),
+        len(channel_ids),
+    )
+    try:
+        return await _enrich_master_data(
+            account_config,
+            storage,
+            transform,
+            video_ids,
+            id_index,
+            quota_budget,
+            channel_ids=channel_ids,
+        )
+    except Exception as e:
+        logger.exception("Failed to fetch carried-over metadata: %s", e)
+        if id_index is not None:
+            id_index.defer("video", video_ids)
+            id_index.defer("channel", channel_ids)
+        return set()
+
+
+def _save_latest_state(
+    storage: YouTubeStorage,
+    account_id: str,
+    transformed_events: list[dict[str, Any]],
+) -> None:
+    """最新の watched_at をインジェスト状態として保存する。"""
+    latest_event_watched_at = max(
+        (event["watched_at_utc"] for event in transformed_events), default=None
+    )
+    if latest_event_watched_at:
+        new_state = {"latest_watched_at": latest_event_watched_at.isoformat()}
+        storage.save_ingest_state(new_state, account_id)
+        logger.info(
+            "Updated ingest state for account=%s to latest_watched_at=%s",
+            account_id,
+            latest_event_watched_at.isoformat(),
+        )
 
 
 async def run_account_pipeline(
@@ -37,6 +319,10 @@ async def run_account_pipeline(
     transform: Any,
     after_timestamp: datetime,
     max_items: int,
+    browser: Browser | None = None,
+    scrape_semaphore: asyncio.Semaphore | None = None,
+    id_index: YouTubeKnownIdIndex | None = None,
+    quota_budget: YouTubeQuotaBudget | None = None,
 ) -> PipelineResult:
     """単一アカウントのパイプラインを実行する。
 
@@ -46,6 +332,10 @@ async def run_account_pipeline(
         transform: データ変換モジュール
         after_timestamp: この時刻以降の視聴履歴のみ収集
         max_items: 収集する最大アイテム数
+        browser: 共有ブラウザ（Noneの場合はコレクターが自前で起動する）
+        scrape_semaphore: 同時スクレイピング数を制限するセマフォ
+        id_index: 取得済み動画・チャンネル ID のインデックス（Noneの場合は全件取得）
+        quota_budget: YouTube APIのクォータ予算（アカウント間で共有）
 
     Returns:
         PipelineResult: 実行結果を含むデータクラス
@@ -56,7 +346,7 @@ async def run_account_pipeline(
         3. 収集データを変換
         4. 生データ(JSON)をR2に保存
         5. イベントデータ(Parquet)をR2に保存（月次パーティショニング）
-        6. YouTube APIで動画・チャンネルのマスターデータを取得して保存
+        6. YouTube APIで未取得・期限切れの動画・チャンネルのマスターデータを取得して保存
         7. インジェスト状態を更新（全コンポーネント成功時のみ）
     """
     account_id = account_config.account_id
@@ -69,7 +359,7 @@ async def run_account_pipeline(
 
     try:
         # 1. インジェスト状態を取得
-        state = storage.get_ingest_state(account_id)
+        state = await asyncio.to_thread(storage.get_ingest_state, account_id)
         latest_watched_at = state.get("latest_watched_at") if state else None
 
         if isinstance(latest_watched_at, str):
@@ -98,10 +388,12 @@ async def run_account_pipeline(
                 )
 
         # 2. MyActivityから視聴履歴を収集
-        collector = MyActivityCollector(cookies=account_config.cookies)
-        raw_items = await collector.collect_watch_history(
-            after_timestamp=fetch_after, max_items=max_items
-        )
+        # スクレイピングだけを同時実行数で絞り、後続の保存処理は次のアカウントと重ねる
+        collector = MyActivityCollector(cookies=account_config.cookies, browser=browser)
+        async with scrape_semaphore or contextlib.nullcontext():
+            raw_items = await collector.collect_watch_history(
+                after_timestamp=fetch_after, max_items=max_items
+            )
         collected_count = len(raw_items)
         logger.info("Collected %d items for account=%s", collected_count, account_id)
 
@@ -115,135 +407,39 @@ async def run_account_pipeline(
                 error=None,
             )
 
-        # 3. 収集データを変換
-        transformed_events = transform.transform_watch_history_items(
-            raw_items, account_id
-        )
-        logger.info(
-            "Transformed %d items for account=%s", len(transformed_events), account_id
+        # 3-5. 変換・保存はブロッキングI/Oのためスレッドで実行
+        transformed_events, saved_count = await asyncio.to_thread(
+            _store_watch_events, account_config, storage, transform, raw_items
         )
 
-        # 4. 生データ(JSON)をR2に保存
-        raw_saved_key = storage.save_raw_json(
-            data=raw_items, prefix="youtube/activity", account_id=account_id
-        )
-        if not raw_saved_key:
-            raise RuntimeError("Failed to save raw JSON data")
-
-        # 5. イベントデータ(Parquet)をR2に保存（月次パーティショニング）
-        # 月ごとにグループ化して保存
-        monthly_events: dict[tuple[int, int], list[dict[str, Any]]] = defaultdict(list)
-        for event in transformed_events:
-            watched_at = event["watched_at_utc"]
-            month_key = (watched_at.year, watched_at.month)
-            monthly_events[month_key].append(event)
-
-        saved_count = 0
-        failed_count = 0
-        failed_months: list[str] = []
-        for (year, month), events in monthly_events.items():
-            saved_key = storage.save_parquet(
-                data=events, year=year, month=month, prefix="youtube/watch_history"
+        written_partitions: set[PartitionRef] = {
+            (
+                WATCH_HISTORY_DATASET,
+                event["watched_at_utc"].year,
+                event["watched_at_utc"].month,
             )
-            if saved_key:
-                saved_count += len(events)
-                logger.info(
-                    "Saved %d events to %s/%02d for account=%s",
-                    len(events),
-                    year,
-                    month,
-                    account_id,
-                )
-            else:
-                failed_count += 1
-                failed_months.append(f"{year}/{month:02d}")
-                logger.warning(
-                    "Failed to save events for %s/%02d for account=%s",
-                    year,
-                    month,
-                    account_id,
-                )
-
-        if saved_count == 0:
-            raise RuntimeError("Failed to save any events to Parquet")
-
-        # 失敗したパーティションがある場合はstate更新をスキップ
-        if failed_count > 0:
-            failed_partitions = ", ".join(failed_months)
-            error_message = (
-                "Failed to save events for %d "
-                "partition(s): %s. "
-                "Ingest state not updated."
-            ) % (failed_count, failed_partitions)
-            raise RuntimeError(error_message)
+            for event in transformed_events
+        }
 
         # 6. YouTube APIで動画・チャンネルのマスターデータを取得して保存
-        video_ids = sorted(
+        written_partitions |= await _enrich_master_data(
+            account_config,
+            storage,
+            transform,
             {
-                event.get("video_id")
+                event["video_id"]
                 for event in transformed_events
                 if event.get("video_id")
-            }
+            },
+            id_index,
+            quota_budget,
         )
-        if video_ids:
-            api_client = YouTubeAPIClient(account_config.youtube_api_key)
-            try:
-                video_items = api_client.get_videos(video_ids)
-            except QuotaExceededError as e:
-                raise RuntimeError("YouTube API quota exceeded") from e
-
-            if not video_items:
-                logger.warning("No video metadata returned for account=%s", account_id)
-            else:
-                video_master = [
-                    transform.transform_video_info(video) for video in video_items
-                ]
-                saved_videos_key = storage.save_master_parquet(
-                    data=video_master, prefix="youtube/videos"
-                )
-                if not saved_videos_key:
-                    raise RuntimeError("Failed to save video master data")
-
-                channel_ids = sorted(
-                    {
-                        video.get("snippet", {}).get("channelId")
-                        for video in video_items
-                        if video.get("snippet", {}).get("channelId")
-                    }
-                )
-                if channel_ids:
-                    channel_items = api_client.get_channels(channel_ids)
-                    if not channel_items:
-                        logger.warning(
-                            "No channel metadata returned for account=%s",
-                            account_id,
-                        )
-                    else:
-                        channel_master = [
-                            transform.transform_channel_info(channel)
-                            for channel in channel_items
-                        ]
-                        saved_channels_key = storage.save_master_parquet(
-                            data=channel_master, prefix="youtube/channels"
-                        )
-                        if not saved_channels_key:
-                            raise RuntimeError("Failed to save channel master data")
 
         # 7. インジェスト状態を更新（全コンポーネント成功時のみ）
-        # 最新のwatched_atを特定
-        latest_event_watched_at = max(
-            (event["watched_at_utc"] for event in transformed_events), default=None
+        await asyncio.to_thread(
+            _save_latest_state, storage, account_id, transformed_events
         )
 
-        if latest_event_watched_at:
-            new_state = {"latest_watched_at": latest_event_watched_at.isoformat()}
-            storage.save_ingest_state(new_state, account_id)
-            logger.info(
-                "Updated ingest state for account=%s to latest_watched_at=%s",
-                account_id,
-                latest_event_watched_at.isoformat(),
-            )
-
         logger.info(
             "Pipeline completed successfully for account=%s (collected=%d, saved=%d)",
             account_id,
@@ -257,6 +453,7 @@ async def run_account_pipeline(
             collected_count=collected_count,
             saved_count=saved_count,
             error=None,
+            written_partitions=written_partitions,
         )
 
     except Exception as e:
@@ -280,8 +477,11 @@ async def run_all_accounts_pipeline(
     transform: Any,
     after_timestamp: datetime,
     max_items: int,
+    max_concurrency: int = MAX_CONCURRENT_ACCOUNTS,
+    id_index: YouTubeKnownIdIndex | None = None,
+    quota_budget: YouTubeQuotaBudget | None = None,
 ) -> dict[str, PipelineResult]:
-    """全アカウントのパイプラインを順次実行する。
+    """全アカウントのパイプラインを並行実行する。
 
     Args:
         accounts: アカウント設定リスト
@@ -289,24 +489,46 @@ async def run_all_accounts_pipeline(
         transform: データ変換モジュール
         after_timestamp: この時刻以降の視聴履歴のみ収集
         max_items: 収集する最大アイテム数
+        max_concurrency: 同時にスクレイピングするアカウント数の上限
+        id_index: 取得済み動画・チャンネル ID のインデックス
+        quota_budget: 全アカウントで共有するYouTube APIのクォータ予算
 
     Returns:
         dict[str, PipelineResult]: アカウントIDをキーとする実行結果辞書
 
     注意:
         - アカウントレベルの独立性を維持（1つのアカウントの失敗が他に影響しない）
-        - アカウントは順次実行される（並列実行は行わない）
+        - Chromiumは1つだけ起動し、アカウントごとにBrowserContextを分ける
+        - スクレイピングはmax_concurrencyまで並行し、保存処理は次のアカウントの
+          スクレイピングと重なって実行される
+        - 前回までに繰り越した ID は実行ごとに1度だけ、全アカウントの後に取得する。
+          失敗したアカウントがある場合は取得せずに繰り越し直す
     """
     logger.info(
-        "Starting all accounts pipeline (accounts=%d, after=%s, max_items=%s)",
+        "Starting all accounts pipeline "
+        "(accounts=%d, after=%s, max_items=%s, max_concurrency=%d)",
         len(accounts),
         after_timestamp.isoformat(),
         max_items,
+        max_concurrency,
     )
 
     results: dict[str, PipelineResult] = {}
-
-    for account_config in accounts:
+    if not accounts:
+        return results
+
+    scrape_semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    # 繰り越し ID はアカウントごとに問い合わせると共有クォータを重複して使うため、
+    # 並行実行の前に一度だけ取り出し、全アカウントの後にまとめて取得する
+    carried_video_ids: list[str] = []
+    carried_channel_ids: list[str] = []
+    if id_index is not None:
+        carried_video_ids = id_index.claim_deferred("video")
+        carried_channel_ids = id_index.claim_deferred("channel")
+
+    async def run_one(
+        account_config: AccountConfig, browser: Browser
+    ) -> PipelineResult:
         account_id = account_config.account_id
         try:
             result = await run_account_pipeline(
@@ -315,24 +537,11 @@ async def run_all_accounts_pipeline(
                 transform=transform,
                 after_timestamp=after_timestamp,
                 max_items=max_items,
+                browser=browser,
+                scrape_semaphore=scrape_semaphore,
+                id_index=id_index,
+                quota_budget=quota_budget,
             )
-            results[account_id] = result
-
-            # 結果をログ出力
-            if result.success:
-                logger.info(
-                    "Account %s pipeline succeeded (collected=%d, saved=%d)",
-                    account_id,
-                    result.collected_count,
-                    result.saved_count,
-                )
-            else:
-                logger.warning(
-                    "Account %s pipeline failed: %s",
-                    account_id,
-                    result.error,
-                )
-
         except Exception as e:
             # 予期しないエラーでも他のアカウントは続行
             logger.error(
@@ -341,7 +550,7 @@ async def run_all_accounts_pipeline(
                 e,
                 exc_info=True,
             )
-            results[account_id] = PipelineResult(
+            return PipelineResult(
                 success=False,
                 account_id=account_id,
                 collected_count=0,
@@ -349,6 +558,75 @@ async def run_all_accounts_pipeline(
                 error=f"Unexpected error: {str(e)}",
             )
 
+        # 結果をログ出力
+        if result.success:
+            logger.info(
+                "Account %s pipeline succeeded (collected=%d, saved=%d)",
+                account_id,
+                result.collected_count,
+                result.saved_count,
+            )
+        else:
+            logger.warning(
+                "Account %s pipeline failed: %s",
+                account_id,
+                result.error,
+            )
+        return result
+
+    outcomes: list[PipelineResult] | None = None
+    try:
+        async with launch_shared_browser() as browser:
+            outcomes = await asyncio.gather(
+                *(run_one(account_config, browser) for account_config in accounts)
+            )
+    except Exception as e:
+        logger.exception("Shared browser failed: %s", e)
+
+    if outcomes is None:
+        # ブラウザを起動できなかった場合は全アカウントを失敗扱いにする
+        outcomes = [
+            PipelineResult(
+                success=False,
+                account_id=account_config.account_id,
+                collected_count=0,
+                saved_count=0,
+                error="Shared browser failed to launch",
+            )
+            for account_config in accounts
+        ]
+
+    for account_config, result in zip(accounts, outcomes, strict=True):
+        results[account_config.account_id] = result
+
+    if (carried_video_ids or carried_channel_ids) and not all(
+        result.success for result in results.values()
+    ):
+        # 失敗したアカウントがあると main は非ゼロ終了して compact step が走らず、
+        # 取得したマスターの partition を後続へ渡せないため、取得せずに繰り越し直す
+        logger.warning(
+            "Skipping carried-over YouTube IDs because some accounts failed "
+            "(videos=%d, channels=%d)",
+            len(carried_video_ids),
+            len(carried_channel_ids),
+        )
+        if id_index is not None:
+            id_index.defer("video", carried_video_ids)
+            id_index.defer("channel", carried_channel_ids)
+    elif carried_video_ids or carried_channel_ids:
+        first_account = accounts[0]
+        results[
+            first_account.account_id
+        ].written_partitions |= await _fetch_carried_master_data(
+            first_account,
+            storage,
+            transform,
+            carried_video_ids,
+            carried_channel_ids,
+            id_index,
+            quota_budget,
+        )
+
     success_count = sum(1 for r in results.values() if r.success)
     logger.info(
         "All accounts pipeline completed (success=%d/%d)",
@@ -357,3 +635,119 @@ async def run_all_accounts_pipeline(
     )
 
     return results
+
+
+def compact_google_activity_from_ingest_context(
+    run: WorkflowRun,
+) -> dict[str, object]:
+    """ingest step が申告した変更 partition だけを compact する。
+
+    申告が無い run（手動 compact など）は従来どおり前月・当月を対象にする。
+    """
+    partitions = parse_changed_partitions(run.result_summary)
+    if partitions is None:
+        return run_google_activity_compact()
+    if not partitions:
+        logger.info("No changed YouTube partitions. Skipping compaction.")
+        return {
+            "provider": "google_activity",
+            "operation": "compact",
+            "target_months": [],
+            "compacted_keys": [],
+            "skipped_targets": [],
+        }
+    return run_google_activity_compact(partitions=partitions)
+
+
+def run_google_activity_compact(
+    config: Config | None = None,
+    *,
+    year: int | None = None,
+    month: int | None = None,
+    partitions: Collection[PartitionRef] | None = None,
+) -> dict[str, object]:
+    """YouTube 視聴履歴とマスターの monthly compaction を in-process で実行する。
+
+    視聴履歴は watch_id、マスターは最新の updated_at の行で重複排除する。
+    partitions 指定時は対象 dataset・月をその集合に限定する。
+    """
+    resolved_config = config or PipelinesSettings.load()
+    if not resolved_config.duckdb or not resolved_config.duckdb.r2:
+        raise ValueError("R2 configuration is required for compaction")
+
+    r2_conf = resolved_config.duckdb.r2
+    storage = YouTubeStorage(
+        endpoint_url=r2_conf.endpoint_url,
+        access_key_id=r2_conf.access_key_id,
+        secret_access_key=r2_conf.secret_access_key.get_secret_value(),
+        bucket_name=r2_conf.bucket_name,
+        raw_path=r2_conf.raw_path,
+        events_path=r2_conf.events_path,
+        master_path=r2_conf.master_path,
+    )
+
+    targets = _resolve_compact_targets(year, month, partitions)
+    target_months = sorted({(y, m) for _, y, m in targets})
+    compacted_keys: list[str] = []
+    skipped_targets: list[str] = []
+    failures: list[str] = []
+    for target_year, target_month in target_months:
+        for dataset_path, (
+            data_domain,
+            dedupe_key,
+            sort_by,
+        ) in _COMPACT_DATASETS.items():
+            if (dataset_path, target_year, target_month) not in targets:
+                continue
+            try:
+                key = storage.compact_month(
+                    data_domain=data_domain,
+                    dataset_path=dataset_path,
+                    year=target_year,
+                    month=target_month,
+                    dedupe_key=dedupe_key,
+                    sort_by=sort_by,
+                )
+            except Exception:
+                logger.exception(
+                    "YouTube compaction failed: dataset=%s year=%d month=%02d",
+                    dataset_path,
+                    target_year,
+                    target_month,
+                )
+                failures.append(f"{dataset_path}:{target_year}-{target_month:02d}")
+                continue
+            if key is None:
+                skipped_targets.append(
+                    f"{dataset_path}:{target_year}-{target_month:02d}"
+                )
+            else:
+                compacted_keys.append(key)
+
+    if failures:
+        raise RuntimeError(f"YouTube compaction failed for: {', '.join(failures)}")
+
+    return {
+        "provider": "google_activity",
+        "operation": "compact",
+        "target_months": [f"{y}-{m:02d}" for y, m in target_months],
+        "compacted_keys": compacted_keys,
+        "skipped_targets": skipped_targets,
+    }
+
+
+def _resolve_compact_targets(
+    year: int | None,
+    month: int | None,
+    partitions: Collection[PartitionRef] | None,
+) -> set[PartitionRef]:
+    if partitions is None:
+        return {
+            (dataset_path, target_year, target_month)
+            for target_year, target_month in resolve_target_months(year, month)
+            for dataset_path in _COMPACT_DATASETS
+        }
+    unknown = {p for p in partitions if p[0] not in _COMPACT_DATASETS}
+    if unknown:
+        logger.warning("Ignoring unknown YouTube partitions: %s", sorted(unknown))
+    return set(partitions) - unknown
@@ -5,12 +5,21 @@ import logging
 import uuid
 from datetime import datetime, timezone
 from io import BytesIO
+from itertools import batched
 from typing import Any
 
 import boto3
 import pandas as pd
 from botocore.exceptions import ClientError
 
+from pipelines.sources.common.compaction import (
+    COMPACTED_ROOT,
+    build_compacted_key,
+    compact_records,
+    dataframe_to_parquet_bytes,
+    read_parquet_records_from_prefix,
+)
+
 
 def _serialize_datetime(obj: Any) -> str:
     """JSONシリアライズ用のdatetimeハンドラー。
@@ -62,6 +71,7 @@ class YouTubeStorage:
         self.raw_path = _normalize_path(raw_path)
         self.events_path = _normalize_path(events_path)
         self.master_path = _normalize_path(master_path)
+        self.compacted_path = COMPACTED_ROOT
 
         self.s3 = boto3.client(
             "s3",
@@ -220,6 +230,134 @@ class YouTubeStorage:
 
         return self._upload_parquet(data, key, "master Parquet")
 
+    def list_watch_ids(
+        self, year: int, month: int, prefix: str = "youtube/watch_history"
+    ) -> set[str]:
+        """指定月に保存済みの watch_id を返す（watch_id 列だけを読み込む）。
+
+        Args:
+            year: パーティション年
+            month: パーティション月
+            prefix: イベントカテゴリー
+
+        Returns:
+            保存済み watch_id の集合
+        """
+        source_prefix = f"{self.events_path}{prefix}/year={year}/month={month:02d}/"
+        paginator = self.s3.get_paginator("list_objects_v2")
+        watch_ids: set[str] = set()
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=source_prefix):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith(".parquet"):
+                    continue
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=obj["Key"])
+                df = pd.read_parquet(
+                    BytesIO(response["Body"].read()), columns=["watch_id"]
+                )
+                watch_ids.update(df["watch_id"].dropna().astype(str))
+        return watch_ids
+
+    def migrate_unpartitioned_master(self, prefix: str) -> list[tuple[int, int]]:
+        """パーティション導入前のマスター（master/{prefix}/{uuid}.parquet）を移す。
+
+        updated_at の年月ごとに year=/month= 配下へ書き直し、全件保存できた場合だけ
+        元ファイルを削除する。
+
+        Args:
+            prefix: マスターデータカテゴリー
+
+        Returns:
+            書き込んだ (year, month) のリスト
+        """
+        source_prefix = f"{self.master_path}{prefix}/"
+        paginator = self.s3.get_paginator("list_objects_v2")
+        keys: list[str] = []
+        frames: list[pd.DataFrame] = []
+        # Delimiter で year= 配下を除き、直下のファイルだけを対象にする
+        for page in paginator.paginate(
+            Bucket=self.bucket_name, Prefix=source_prefix, Delimiter="/"
+        ):
+            for obj in page.get("Contents", []):
+                if not obj["Key"].endswith(".parquet"):
+                    continue
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=obj["Key"])
+                frames.append(pd.read_parquet(BytesIO(response["Body"].read())))
+                keys.append(obj["Key"])
+        if not frames:
+            return []
+
+        df = pd.concat(frames, ignore_index=True)
+        updated_at = pd.to_datetime(df["updated_at"], utc=True, errors="coerce")
+        updated_at = updated_at.fillna(pd.Timestamp(datetime.now(timezone.utc)))
+        months: list[tuple[int, int]] = []
+        for (year, month), group in df.groupby(
+            [updated_at.dt.year, updated_at.dt.month]
+        ):
+            saved_key = self.save_master_parquet(
+                group.to_dict(orient="records"),
+                prefix,
+                year=int(year),
+                month=int(month),
+            )
+            if not saved_key:
+                raise RuntimeError(
+                    f"Failed to migrate {prefix} master to {year}-{month:02d}"
+                )
+            months.append((int(year), int(month)))
+
+        for batch in batched(keys, 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch]},
+            )
+        logger.info(
+            "Migrated %d unpartitioned %s master files into months %s",
+            len(keys),
+            prefix,
+            months,
+        )
+        return months
+
+    def compact_month(
+        self,
+        data_domain: str,
+        dataset_path: str,
+        year: int,
+        month: int,
+        dedupe_key: str,
+        sort_by: str | None = None,
+    ) -> str | None:
+        """指定月のParquetをcompact版として保存する。"""
+        source_root = self.events_path if data_domain == "events" else self.master_path
+        source_prefix = f"{source_root}{dataset_path}/year={year}/month={month:02d}/"
+        records = read_parquet_records_from_prefix(
+            self.s3, self.bucket_name, source_prefix
+        )
+        if not records:
+            logger.info("No parquet records found for compaction: %s", source_prefix)
+            return None
+
+        compacted_df = compact_records(records, dedupe_key=dedupe_key, sort_by=sort_by)
+        key = build_compacted_key(
+            self.compacted_path,
+            data_domain=data_domain,
+            dataset_path=dataset_path,
+            year=year,
+            month=month,
+        )
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=dataframe_to_parquet_bytes(compacted_df),
+                ContentType="application/octet-stream",
+            )
+        except ClientError:
+            logger.exception("Failed to save compacted parquet to %s", key)
+            return None
+        logger.info("Saved compacted parquet to %s", key)
+        return key
+
     def get_ingest_state(self, account_id: str) -> dict[str, Any] | None:
         """インジェスト状態(カーソル)を取得する。
 
@@ -0,0 +1,538 @@
+"""Google Takeout の YouTube 視聴履歴インポーター。
+
+Takeout の ``watch-history.json`` / ``watch-history.html`` をチャンク単位で読み進め、
+MyActivity コレクターと同じ形のアイテムに変換して月次パーティションへ直接保存します。
+ファイル全体をメモリに載せないため、数年分の履歴も一度に取り込めます。
+
+使い方:
+    uv run python -m pipelines.sources.google_activity.takeout \\
+        --account account1 path/to/watch-history.json
+"""
+
+import argparse
+import json
+import logging
+import re
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone, tzinfo
+from html.parser import HTMLParser
+from itertools import batched
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from pipelines.sources.common.compaction import (
+    CHANGED_PARTITIONS_KEY,
+    PartitionRef,
+    build_changed_partitions,
+)
+from pipelines.sources.common.config import Config, GoogleActivityConfig
+from pipelines.sources.common.settings import PipelinesSettings
+from pipelines.sources.google_activity import transform as google_transform
+from pipelines.sources.google_activity.collector import _extract_video_id
+from pipelines.sources.google_activity.config import (
+    TAKEOUT_BATCH_SIZE,
+    TAKEOUT_READ_CHUNK_SIZE,
+    TIMEZONE,
+)
+from pipelines.sources.google_activity.known_ids import YouTubeKnownIdIndex
+from pipelines.sources.google_activity.pipeline import (
+    WATCH_HISTORY_DATASET,
+    run_google_activity_compact,
+)
+from pipelines.sources.google_activity.storage import YouTubeStorage
+
+logger = logging.getLogger(__name__)
+
+# 視聴レコードのタイトルに付く定型句（言語設定で変わる）
+_TITLE_PREFIXES = ("Watched ",)
+_TITLE_SUFFIXES = (" を視聴しました",)
+_ADS_DETAIL_NAME = "From Google Ads"
+# HTML 版の日時末尾に付くタイムゾーン表記（例: JST, GMT+09:00）
+_TZ_SUFFIX_PATTERN = re.compile(r"\s+([A-Z]{2,5}|(?:GMT|UTC)[+-]\d{1,2}(?::\d{2})?)$")
+_GMT_OFFSET_PATTERN = re.compile(r"(?:GMT|UTC)([+-])(\d{1,2})(?::(\d{2}))?")
+# 地域によって意味が変わらない略称の UTC オフセット。
+# CST や IST のように複数の意味を持つ略称は --timezone と一致する場合だけ受け付ける
+_TZ_ABBREVIATION_OFFSETS = {
+    "UTC": timedelta(0),
+    "GMT": timedelta(0),
+    "JST": timedelta(hours=9),
+    "KST": timedelta(hours=9),
+    "HKT": timedelta(hours=8),
+    "SGT": timedelta(hours=8),
+    "AWST": timedelta(hours=8),
+    "ACST": timedelta(hours=9, minutes=30),
+    "ACDT": timedelta(hours=10, minutes=30),
+    "AEST": timedelta(hours=10),
+    "AEDT": timedelta(hours=11),
+    "NZST": timedelta(hours=12),
+    "NZDT": timedelta(hours=13),
+    "WET": timedelta(0),
+    "WEST": timedelta(hours=1),
+    "BST": timedelta(hours=1),
+    "CET": timedelta(hours=1),
+    "CEST": timedelta(hours=2),
+    "EET": timedelta(hours=2),
+    "EEST": timedelta(hours=3),
+    "MSK": timedelta(hours=3),
+    "EST": timedelta(hours=-5),
+    "EDT": timedelta(hours=-4),
+    "CDT": timedelta(hours=-5),
+    "MST": timedelta(hours=-7),
+    "MDT": timedelta(hours=-6),
+    "PST": timedelta(hours=-8),
+    "PDT": timedelta(hours=-7),
+    "AKST": timedelta(hours=-9),
+    "AKDT": timedelta(hours=-8),
+    "HST": timedelta(hours=-10),
+}
+_HTML_DATETIME_FORMATS = (
+    "%b %d, %Y, %I:%M:%S %p",  # Jan 1, 2024, 10:00:00 AM
+    "%Y/%m/%d %H:%M:%S",
+    "%Y年%m月%d日 %H:%M:%S",
+)
+
+
+@dataclass
+class TakeoutImportResult:
+    """Takeout インポートの実行サマリー。
+
+    Attributes:
+        read_count: ファイルから読み込んだ視聴アイテム数
+        imported_count: 新規に保存したイベント数
+        duplicate_count: 保存済み（またはファイル内で重複）のため除外したイベント数
+        written_partitions: 書き込んだ (dataset, year, month)
+    """
+
+    read_count: int = 0
+    imported_count: int = 0
+    duplicate_count: int = 0
+    written_partitions: set[PartitionRef] = field(default_factory=set)
+
+
+def _resolve_suffix_tz(suffix: str, local: datetime, tz: ZoneInfo) -> tzinfo:
+    """HTML 版の時刻末尾のタイムゾーン表記を tzinfo に変換する。
+
+    --timezone のその時刻の略称と一致すれば tz（夏時間を含む）をそのまま使い、
+    GMT±hh:mm と既知の略称は固定オフセットで解釈する。
+
+    Raises:
+        ValueError: 表記が --timezone と食い違い、オフセットも決められない場合
+    """
+    if local.replace(tzinfo=tz).tzname() == suffix:
+        return tz
+    if match := _GMT_OFFSET_PATTERN.fullmatch(suffix):
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(-offset if sign == "-" else offset)
+    if suffix in _TZ_ABBREVIATION_OFFSETS:
+        return timezone(_TZ_ABBREVIATION_OFFSETS[suffix])
+    raise ValueError(
+        f"Takeout HTML timezone {suffix!r} does not match --timezone {tz.key}; "
+        "rerun with --timezone set to the export's timezone"
+    )
+
+
+def _normalize_watched_at(watched_at: datetime) -> datetime:
+    # MyActivity は分単位の時刻しか持たないため、秒以下を落として watch_id を揃える
+    return watched_at.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def _strip_title(title: str) -> str:
+    for prefix in _TITLE_PREFIXES:
+        if title.startswith(prefix):
+            return title[len(prefix) :]
+    for suffix in _TITLE_SUFFIXES:
+        if title.endswith(suffix):
+            return title[: -len(suffix)]
+    return title
+
+
+def _record_to_item(record: dict[str, Any]) -> dict[str, Any] | None:
+    """Takeout JSON の1レコードをコレクターと同じ形のアイテムに変換する。
+
+    広告視聴や削除済み動画（URL なし）は None を返す。
+    """
+    details = record.get("details") or []
+    if any(detail.get("name") == _ADS_DETAIL_NAME for detail in details):
+        return None
+
+    video_url = record.get("titleUrl")
+    video_id = _extract_video_id(video_url) if video_url else None
+    if not video_id:
+        return None
+
+    try:
+        watched_at = datetime.fromisoformat(str(record.get("time", "")))
+    except ValueError:
+        logger.warning("Skipping Takeout record with invalid time: %s", record)
+        return None
+
+    subtitles = record.get("subtitles") or []
+    return {
+        "video_id": video_id,
+        "title": _strip_title(record.get("title", "")),
+        "channel_name": subtitles[0].get("name") if subtitles else None,
+        "watched_at": _normalize_watched_at(watched_at),
+        "video_url": video_url,
+    }
+
+
+def iter_takeout_json(
+    path: str | Path, chunk_size: int = TAKEOUT_READ_CHUNK_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Takeout JSON（トップレベル配列）のレコードを1件ずつ返す。
+
+    配列全体を ``json.load`` せず、チャンクを読み足しながら要素ごとにデコードする。
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    in_array = False
+    eof = False
+    with open(path, encoding="utf-8-sig") as f:
+        while True:
+            while pos < len(buffer) and (
+                buffer[pos].isspace() or (in_array and buffer[pos] == ",")
+            ):
+                pos += 1
+
+            if pos < len(buffer):
+                if not in_array:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"Takeout JSON must be an array: {path}")
+                    in_array = True
+                    pos += 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    record, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # 要素がチャンク境界で切れている場合は読み足して再試行する
+                    if eof:
+                        raise
+                else:
+                    if isinstance(record, dict):
+                        yield record
+                    continue
+
+            if eof:
+                raise ValueError(f"Unexpected end of Takeout JSON: {path}")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+class _TakeoutHTMLParser(HTMLParser):
+    """Takeout HTML の視聴エントリ（content-cell）を逐次取り出すパーサー。"""
+
+    def __init__(self, tz: ZoneInfo):
+        super().__init__(convert_charrefs=True)
+        self.tz = tz
+        self.items: list[dict[str, Any]] = []
+        self._cell_depth = 0
+        self._links: list[tuple[str, str]] = []
+        self._href: str | None = None
+        self._link_text: list[str] = []
+        self._lines: list[str] = [""]
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "div":
+            if self._cell_depth:
+                self._cell_depth += 1
+                return
+            classes = (dict(attrs).get("class") or "").split()
+            if "content-cell" in classes and "mdl-typography--body-1" in classes:
+                self._cell_depth = 1
+                self._links = []
+                self._lines = [""]
+            return
+        if not self._cell_depth:
+            return
+        if tag == "br":
+            self._lines.append("")
+        elif tag == "a":
+            self._href = dict(attrs).get("href")
+            self._link_text = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._cell_depth:
+            return
+        if tag == "a" and self._href is not None:
+            self._links.append((self._href, "".join(self._link_text).strip()))
+            self._href = None
+        elif tag == "div":
+            self._cell_depth -= 1
+            if not self._cell_depth:
+                item = self._build_item()
+                if item:
+                    self.items.append(item)
+
+    def handle_data(self, data: str) -> None:
+        if not self._cell_depth:
+            return
+        self._lines[-1] += data
+        if self._href is not None:
+            self._link_text.append(data)
+
+    def _build_item(self) -> dict[str, Any] | None:
+        if not self._links:
+            return None
+        video_url, title = self._links[0]
+        video_id = _extract_video_id(video_url)
+        if not video_id:
+            return None
+        lines = [line.strip() for line in self._lines if line.strip()]
+        watched_at = self._parse_datetime(lines[-1]) if lines else None
+        if watched_at is None:
+            return None
+        return {
+            "video_id": video_id,
+            "title": title,
+            "channel_name": self._links[1][1] if len(self._links) > 1 else None,
+            "watched_at": watched_at,
+            "video_url": video_url,
+        }
+
+    def _parse_datetime(self, text: str) -> datetime | None:
+        # HTML 版はタイムゾーン表記付きのローカル時刻なので、表記を外して解釈し、
+        # 表記があればそのオフセット、無ければ tz を使う
+        normalized = text.replace("\u202f", " ").replace("\xa0", " ")
+        suffix = _TZ_SUFFIX_PATTERN.search(normalized)
+        if suffix:
+            normalized = normalized[: suffix.start()]
+        for fmt in _HTML_DATETIME_FORMATS:
+            try:
+                parsed = datetime.strptime(normalized, fmt)
+            except ValueError:
+                continue
+            tz = (
+                _resolve_suffix_tz(suffix.group(1), parsed, self.tz)
+                if suffix
+                else self.tz
+            )
+            return _normalize_watched_at(parsed.replace(tzinfo=tz))
+        logger.warning("Failed to parse Takeout HTML timestamp: %s", text)
+        return None
+
+
+def iter_takeout_html(
+    path: str | Path,
+    timezone_name: str = TIMEZONE,
+    chunk_size: int = TAKEOUT_READ_CHUNK_SIZE,
+) -> Iterator[dict[str, Any]]:
+    """Takeout HTML の視聴エントリをアイテムとして1件ずつ返す。"""
+    parser = _TakeoutHTMLParser(ZoneInfo(timezone_name))
+    with open(path, encoding="utf-8") as f:
+        while chunk := f.read(chunk_size):
+            parser.feed(chunk)
+            yield from parser.items
+            parser.items.clear()
+    parser.close()
+    yield from parser.items
+
+
+def iter_takeout_items(
+    path: str | Path, timezone_name: str = TIMEZONE
+) -> Iterator[dict[str, Any]]:
+    """拡張子に応じて Takeout ファイルを読み、視聴アイテムを返す。"""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".json":
+        for record in iter_takeout_json(path):
+            item = _record_to_item(record)
+            if item:
+                yield item
+    elif suffix in (".html", ".htm"):
+        yield from iter_takeout_html(path, timezone_name)
+    else:
+        raise ValueError(f"Unsupported Takeout file type: {path}")
+
+
+def import_takeout_files(
+    paths: Iterable[str | Path],
+    storage: YouTubeStorage,
+    account_id: str,
+    *,
+    timezone_name: str = TIMEZONE,
+    batch_size: int = TAKEOUT_BATCH_SIZE,
+    id_index: YouTubeKnownIdIndex | None = None,
+) -> TakeoutImportResult:
+    """Takeout ファイルを変換し、未保存の視聴イベントだけを月次 Parquet に保存する。
+
+    保持するのは batch_size 件までの未保存イベントと、月ごとの保存済み watch_id のみ。
+    マスター未取得の動画は id_index に繰り越し、次回 ingest でクォータ内に取得させる。
+
+    Args:
+        paths: watch-history.json / watch-history.html のパス
+        storage: ストレージインスタンス
+        account_id: 取り込み先のアカウントID
+        timezone_name: HTML 版の時刻を解釈するタイムゾーン（時刻の表記が優先）
+        batch_size: 変換・保存をまとめるイベント数
+        id_index: 取得済み動画・チャンネル ID のインデックス
+
+    Returns:
+        TakeoutImportResult: 実行サマリー
+
+    Raises:
+        RuntimeError: Parquet の保存に失敗した場合
+    """
+    result = TakeoutImportResult()
+    known_ids: dict[tuple[int, int], set[str]] = {}
+    pending: dict[tuple[int, int], list[dict[str, Any]]] = defaultdict(list)
+    pending_count = 0
+
+    def flush() -> None:
+        nonlocal pending_count
+        for (year, month), events in sorted(pending.items()):
+            saved_key = storage.save_parquet(
+                data=events, year=year, month=month, prefix=WATCH_HISTORY_DATASET
+            )
+            if not saved_key:
+                raise RuntimeError(
+                    f"Failed to save Takeout events for {year}/{month:02d}"
+                )
+            result.imported_count += len(events)
+            result.written_partitions.add((WATCH_HISTORY_DATASET, year, month))
+            if id_index is not None:
+                video_ids = sorted({event["video_id"] for event in events})
+                id_index.defer("video", id_index.select_stale("video", video_ids))
+        pending.clear()
+        pending_count = 0
+
+    for path in paths:
+        logger.info("Importing Takeout watch history from %s", path)
+        for items in batched(iter_takeout_items(path, timezone_name), batch_size):
+            result.read_count += len(items)
+            events = google_transform.transform_watch_history_items(
+                list(items), account_id
+            )
+            for event in events:
+                watched_at = event["watched_at_utc"]
+                month_key = (watched_at.year, watched_at.month)
+                if month_key not in known_ids:
+                    known_ids[month_key] = storage.list_watch_ids(*month_key)
+                if event["watch_id"] in known_ids[month_key]:
+                    result.duplicate_count += 1
+                    continue
+                known_ids[month_key].add(event["watch_id"])
+                pending[month_key].append(event)
+                pending_count += 1
+            if pending_count >= batch_size:
+                flush()
+    flush()
+
+    logger.info(
+        "Imported Takeout watch history for account=%s "
+        "(read=%d, imported=%d, duplicates=%d, partitions=%d)",
+        account_id,
+        result.read_count,
+        result.imported_count,
+        result.duplicate_count,
+        len(result.written_partitions),
+    )
+    return result
+
+
+def run_takeout_import(
+    paths: Iterable[str | Path],
+    account_id: str,
+    config: Config | None = None,
+    *,
+    timezone_name: str = TIMEZONE,
+    compact: bool = False,
+) -> dict[str, object]:
+    """Takeout インポートを実行し、result_summary 形式の dict を返す。
+
+    compact=True の場合は書き込んだ月をそのまま compact する。
+    """
+    resolved_config = config or PipelinesSettings.load()
+    if not resolved_config.duckdb or not resolved_config.duckdb.r2:
+        raise ValueError("R2 configuration is required for Takeout import")
+
+    r2_conf = resolved_config.duckdb.r2
+    storage = YouTubeStorage(
+        endpoint_url=r2_conf.endpoint_url,
+        access_key_id=r2_conf.access_key_id,
+        secret_access_key=r2_conf.secret_access_key.get_secret_value(),
+        bucket_name=r2_conf.bucket_name,
+        raw_path=r2_conf.raw_path,
+        events_path=r2_conf.events_path,
+        master_path=r2_conf.master_path,
+    )
+    activity_config = resolved_config.google_activity or GoogleActivityConfig(
+        accounts=[]
+    )
+    id_index = None
+    if activity_config.known_id_index_path:
+        id_index = YouTubeKnownIdIndex(
+            activity_config.known_id_index_path,
+            refresh_days=activity_config.metadata_refresh_days,
+        )
+        id_index.ensure_scope(f"{r2_conf.bucket_name}/{storage.master_path}")
+    try:
+        result = import_takeout_files(
+            paths,
+            storage,
+            account_id,
+            timezone_name=timezone_name,
+            id_index=id_index,
+        )
+    finally:
+        if id_index is not None:
+            id_index.close()
+    summary: dict[str, object] = {
+        "provider": "google_activity",
+        "operation": "takeout_import",
+        "status": "succeeded",
+        "read_count": result.read_count,
+        "imported_count": result.imported_count,
+        "duplicate_count": result.duplicate_count,
+        CHANGED_PARTITIONS_KEY: build_changed_partitions(result.written_partitions),
+    }
+    if compact and result.written_partitions:
+        summary["compaction"] = run_google_activity_compact(
+            resolved_config, partitions=result.written_partitions
+        )
+    return summary
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Import Google Takeout YouTube watch history into R2."
+    )
+    parser.add_argument("paths", nargs="+", help="watch-history.json / .html files")
+    parser.add_argument("--account", default="account1", help="Target account ID.")
+    parser.add_argument(
+        "--timezone",
+        default=TIMEZONE,
+        help=(
+            "Timezone used to interpret timestamps in HTML exports "
+            "that carry no recognizable zone suffix."
+        ),
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compact the written months after the import.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Takeout の視聴履歴をインポートする。"""
+    args = _parse_args()
+    summary = run_takeout_import(
+        args.paths,
+        args.account,
+        timezone_name=args.timezone,
+        compact=args.compact,
+    )
+    logger.info("Takeout import finished: %s", json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
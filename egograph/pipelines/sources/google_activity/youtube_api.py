@@ -1,13 +1,20 @@
+import asyncio
 import logging
-import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Any
+from zoneinfo import ZoneInfo
 
-import requests
+import httpx
 
 from pipelines.sources.google_activity.config import (
     MAX_RETRIES,
     RETRY_BACKOFF_FACTOR,
     YOUTUBE_API_BATCH_SIZE,
+    YOUTUBE_API_MAX_CONCURRENCY,
+    YOUTUBE_API_QUOTA_PER_DAY,
+    YOUTUBE_API_UNIT_COSTS,
+    YOUTUBE_QUOTA_TIMEZONE,
 )
 
 logger = logging.getLogger(__name__)
@@ -19,186 +26,203 @@ class QuotaExceededError(Exception):
     pass
 
 
-class YouTubeAPIClient:
-    """YouTube Data API v3 クライアント。
+def quota_day(now: datetime | None = None) -> str:
+    """クォータ集計日（太平洋時間の日付）を返す。"""
+    current = now or datetime.now(timezone.utc)
+    return current.astimezone(ZoneInfo(YOUTUBE_QUOTA_TIMEZONE)).date().isoformat()
+
+
+class YouTubeQuotaBudget:
+    """1日あたりのクォータ予算。
+
+    同じ API キーを使う全アカウントで共有し、残量が足りないバッチは送信せずに
+    次回実行へ繰り越します。
 
     Args:
-        api_key: YouTube Data API v3 の API キー
+        daily_limit: 1日に使ってよいクォータ量
+        used: 当日すでに消費したクォータ量（前回実行分）
     """
 
-    def __init__(self, api_key: str) -> None:
-        """クライアントを初期化する。
+    def __init__(self, daily_limit: int, used: int = 0) -> None:
+        self.daily_limit = daily_limit
+        self.used = used
+        self.consumed = 0
+        self.exhausted = False
+
+    @property
+    def remaining(self) -> int:
+        """残りのクォータ量。"""
+        return max(0, self.daily_limit - self.used)
+
+    def try_consume(self, units: int) -> bool:
+        """units を確保できれば消費して True を返す。"""
+        if self.exhausted or units > self.remaining:
+            return False
+        self.used += units
+        self.consumed += units
+        return True
+
+    def mark_exhausted(self) -> None:
+        """API からクォータ超過が返った場合に以降の送信を止める。"""
+        self.exhausted = True
+
+
+@dataclass
+class YouTubeFetchResult:
+    """バッチ取得の結果。
+
+    Attributes:
+        items: 取得できたリソース
+        deferred_ids: クォータ不足で問い合わせなかった ID（次回へ繰り越す）
+    """
 
-        Args:
-            api_key: YouTube Data API v3 の API キー
-        """
+    items: list[dict[str, Any]] = field(default_factory=list)
+    deferred_ids: list[str] = field(default_factory=list)
+
+
+class AsyncYouTubeAPIClient:
+    """YouTube Data API v3 の非同期クライアント。
+
+    50件ずつのバッチを最大 max_concurrency 件まで並行して送信し、
+    クォータ予算を超えるバッチは送らずに deferred_ids として返します。
+
+    Args:
+        api_key: YouTube Data API v3 の API キー
+        http_client: 呼び出し側が管理する httpx.AsyncClient
+        budget: クォータ予算（None の場合は1日の上限をこのクライアント単独で使う）
+        max_concurrency: 同時に送信するバッチ数
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        http_client: httpx.AsyncClient,
+        budget: YouTubeQuotaBudget | None = None,
+        max_concurrency: int = YOUTUBE_API_MAX_CONCURRENCY,
+    ) -> None:
         self.api_key = api_key
         self.base_url = "https://www.googleapis.com/youtube/v3"
-        logger.info("Initialized YouTubeAPIClient")
+        self._http = http_client
+        self.budget = budget or YouTubeQuotaBudget(YOUTUBE_API_QUOTA_PER_DAY)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
 
-    def _make_request_with_retry(
+    async def _request_with_retry(
         self, url: str, params: dict[str, Any]
     ) -> dict[str, Any]:
         """リトライロジック付きで API リクエストを行う。
 
-        Args:
-            url: リクエストURL
-            params: リクエストパラメータ
-
-        Returns:
-            API レスポンスの JSON データ
-
         Raises:
             QuotaExceededError: クォータ超過時
-            requests.HTTPError: HTTP エラー時
+            httpx.HTTPError: リトライ上限まで失敗した場合
         """
         for attempt in range(MAX_RETRIES):
             try:
-                response = requests.get(url, params=params, timeout=30)
-
-                # クォータ超過エラーチェック (403の場合は先にチェック)
-                if response.status_code == 403:
-                    try:
-                        data = response.json()
-                        if "error" in data:
-                            error = data["error"]
-                            for error_detail in error.get("errors", []):
-                                if error_detail.get("reason") == "quotaExceeded":
-                                    raise QuotaExceededError(
-                                        "YouTube API quota exceeded: %s"
-                                        % error.get("message", "Unknown reason")
-                                    )
-                    except ValueError:
-                        # JSON解析エラーの場合は後のraise_for_statusで処理
-                        pass
-
+                response = await self._http.get(url, params=params, timeout=30)
+                if response.status_code == 403 and _is_quota_exceeded(response):
+                    raise QuotaExceededError(
+                        "YouTube API quota exceeded: %s" % response.text[:200]
+                    )
                 response.raise_for_status()
-
-                data = response.json()
-
-                return data
-
+                return response.json()
             except QuotaExceededError:
                 # クォータ超過はリトライせず、即座に例外を再スロー
                 raise
-            except (
-                requests.HTTPError,
-                requests.ConnectionError,
-                requests.Timeout,
-            ) as e:
-                if attempt < MAX_RETRIES - 1:
-                    # 指数バックオフで待機
-                    wait_time = RETRY_BACKOFF_FACTOR**attempt
-                    logger.warning(
-                        "Request failed (attempt %d/%d): %s. Retrying in %d seconds...",
-                        attempt + 1,
-                        MAX_RETRIES,
-                        e,
-                        wait_time,
-                    )
-                    time.sleep(wait_time)
-                else:
-                    # 最後の試行で失敗した場合
+            except httpx.HTTPError as e:
+                if attempt >= MAX_RETRIES - 1:
                     logger.exception(
                         "Request failed after %d attempts: %s", MAX_RETRIES, e
                     )
                     raise
-
-        raise requests.HTTPError("Max retries exceeded")  # pragma: no cover
-
-    def _batch_request(
+                wait_time = RETRY_BACKOFF_FACTOR**attempt
+                logger.warning(
+                    "Request failed (attempt %d/%d): %s. Retrying in %d seconds...",
+                    attempt + 1,
+                    MAX_RETRIES,
+                    e,
+                    wait_time,
+                )
+                await asyncio.sleep(wait_time)
+
+        raise httpx.HTTPError("Max retries exceeded")  # pragma: no cover
+
+    async def _batch_request(
         self, endpoint: str, ids: list[str], part: str
-    ) -> list[dict[str, Any]]:
-        """ID リストをバッチ処理して API リクエストを行う。
-
-        Args:
-            endpoint: API エンドポイント（例: "videos"）
-            ids: 動画IDまたはチャンネルIDのリスト
-            part: 取得するデータパート（例: "snippet,statistics"）
-
-        Returns:
-            すべてのバッチの結果を結合したリスト
-        """
+    ) -> YouTubeFetchResult:
+        """ID リストをバッチに分けて並行に取得する。"""
         if not ids:
-            return []
-
-        all_items: list[dict[str, Any]] = []
-
-        # IDリストをバッチサイズに分割
-        for i in range(0, len(ids), YOUTUBE_API_BATCH_SIZE):
-            batch_ids = ids[i : i + YOUTUBE_API_BATCH_SIZE]
-            ids_str = ",".join(batch_ids)
-
-            logger.debug(
-                "Fetching %s (batch %d/%d): %s",
+            return YouTubeFetchResult()
+
+        url = "%s/%s" % (self.base_url, endpoint)
+        cost = YOUTUBE_API_UNIT_COSTS[endpoint]
+        batches = [
+            ids[i : i + YOUTUBE_API_BATCH_SIZE]
+            for i in range(0, len(ids), YOUTUBE_API_BATCH_SIZE)
+        ]
+
+        async def fetch(batch_ids: list[str]) -> list[dict[str, Any]] | None:
+            async with self._semaphore:
+                if not self.budget.try_consume(cost):
+                    return None
+                params = {"key": self.api_key, "id": ",".join(batch_ids), "part": part}
+                try:
+                    data = await self._request_with_retry(url, params)
+                except QuotaExceededError:
+                    logger.warning("YouTube API quota exceeded; deferring the rest")
+                    self.budget.mark_exhausted()
+                    return None
+                return data.get("items", [])
+
+        responses = await asyncio.gather(*(fetch(batch) for batch in batches))
+
+        result = YouTubeFetchResult()
+        for batch_ids, items in zip(batches, responses, strict=True):
+            if items is None:
+                result.deferred_ids.extend(batch_ids)
+            else:
+                result.items.extend(items)
+        if result.deferred_ids:
+            logger.warning(
+                "Deferred %d %s ids due to quota budget (remaining=%d)",
+                len(result.deferred_ids),
                 endpoint,
-                (i // YOUTUBE_API_BATCH_SIZE) + 1,
-                (len(ids) + YOUTUBE_API_BATCH_SIZE - 1) // YOUTUBE_API_BATCH_SIZE,
-                ids_str,
+                self.budget.remaining,
             )
+        return result
 
-            url = "%s/%s" % (self.base_url, endpoint)
-            params = {
-                "key": self.api_key,
-                "id": ids_str,
-                "part": part,
-            }
-
-            data = self._make_request_with_retry(url, params)
-
-            # items がない場合（空の結果）を考慮
-            items = data.get("items", [])
-            all_items.extend(items)
-
-            # レート制限を考慮して少し待機
-            time.sleep(0.1)
-
-        return all_items
-
-    def get_videos(self, video_ids: list[str]) -> list[dict[str, Any]]:
+    async def get_videos(self, video_ids: list[str]) -> YouTubeFetchResult:
         """動画情報を取得する。
 
         Args:
             video_ids: 動画IDのリスト
 
         Returns:
-            動画情報の辞書リスト
-
-        Raises:
-            QuotaExceededError: クォータ超過時
-            requests.HTTPError: HTTP エラー時
-
-        Example:
-            >>> client = YouTubeAPIClient(api_key="your_key")
-            >>> videos = client.get_videos(["video1", "video2"])
+            取得した動画情報と、クォータ不足で繰り越した動画ID
         """
         logger.info("Fetching %d videos", len(video_ids))
+        return await self._batch_request(
+            "videos", video_ids, "snippet,statistics,contentDetails"
+        )
 
-        # 取得するパートを指定
-        part = "snippet,statistics,contentDetails"
-
-        return self._batch_request("videos", video_ids, part)
-
-    def get_channels(self, channel_ids: list[str]) -> list[dict[str, Any]]:
+    async def get_channels(self, channel_ids: list[str]) -> YouTubeFetchResult:
         """チャンネル情報を取得する。
 
         Args:
             channel_ids: チャンネルIDのリスト
 
         Returns:
-            チャンネル情報の辞書リスト
-
-        Raises:
-            QuotaExceededError: クォータ超過時
-            requests.HTTPError: HTTP エラー時
-
-        Example:
-            >>> client = YouTubeAPIClient(api_key="your_key")
-            >>> channels = client.get_channels(["channel1", "channel2"])
+            取得したチャンネル情報と、クォータ不足で繰り越したチャンネルID
         """
         logger.info("Fetching %d channels", len(channel_ids))
-
-        # 取得するパートを指定
-        part = "snippet,statistics,brandingSettings"
-
-        return self._batch_request("channels", channel_ids, part)
+        return await self._batch_request(
+            "channels", channel_ids, "snippet,statistics,brandingSettings"
+        )
+
+
+def _is_quota_exceeded(response: httpx.Response) -> bool:
+    try:
+        error = response.json().get("error", {})
+    except ValueError:
+        return False
+    return any(
+        detail.get("reason") == "quotaExceeded" for detail in error.get("errors", [])
+    )
@@ -1,5 +1,10 @@
 """Local mirror sync pipeline."""
 
+from egograph_mirror_layout import (
+    read_current_version,
+    resolve_mirror_root,
+)
+
 from pipelines.sources.local_mirror_sync.pipeline import (
     LocalMirrorSyncResult,
     run_local_mirror_sync,
@@ -7,5 +12,7 @@ from pipelines.sources.local_mirror_sync.pipeline import (
 
 __all__ = [
     "LocalMirrorSyncResult",
+    "read_current_version",
+    "resolve_mirror_root",
     "run_local_mirror_sync",
 ]
@@ -1,13 +1,33 @@
-"""Sync compacted parquet files from R2 to local mirror storage."""
+"""Sync compacted parquet files from R2 to local mirror storage.
 
+ミラー直下の manifest（``.mirror_manifest.json``）に各キーの ETag / LastModified を
+記録し、変わったオブジェクトだけを並列にダウンロードします。
+同期は新しい世代ディレクトリに対して行い、未変更ファイルは前世代からハードリンクし、
+完了後に ``current`` を切り替えて公開します（R2 から消えたキーは新世代に含めない）。
+backend/scripts/sync_compacted_parquet.py はこの実装を呼び出す CLI です。
+"""
+
+import json
 import logging
 import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+from egograph_mirror_layout import (
+    link_file,
+    prepare_next_generation,
+    prune_generations,
+    publish_generation,
+    read_current_version,
+    resolve_mirror_root,
+)
 from egograph_paths import PARQUET_DATA_DIR
 
 from pipelines.sources.common.compaction import COMPACTED_ROOT
@@ -16,6 +36,12 @@ from pipelines.sources.common.settings import PipelinesSettings
 
 logger = logging.getLogger(__name__)
 
+MIRROR_MANIFEST_NAME = ".mirror_manifest.json"
+MIRROR_MANIFEST_VERSION = 1
+MAX_CONCURRENT_DOWNLOADS = 4
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+
 
 @dataclass(frozen=True)
 class LocalMirrorSyncResult:
@@ -27,25 +53,197 @@ class LocalMirrorSyncResult:
     failed_count: int
     failed_keys_sample: tuple[str, ...]
     last_success_at: str | None
+    deleted_count: int = 0
+    bytes_transferred: int = 0
+    dataset_version: int | None = None
 
     def to_summary_dict(self) -> dict[str, object]:
         """SQLite result_summary_json に保存しやすい dict に変換する。"""
         return asdict(self)
 
 
+@dataclass(frozen=True)
+class _RemoteObject:
+    key: str
+    etag: str | None
+    last_modified: str | None
+    size: int | None
+
+    def manifest_entry(self) -> dict[str, Any]:
+        return {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "size": self.size,
+        }
+
+
 def _resolve_r2_config(config: Config | None, r2_config: R2Config | None) -> R2Config:
     if r2_config is not None:
         return r2_config
-    if config and config.duckdb and config.duckdb.r2:
+    # r2_config を直接渡す呼び出し（backend の CLI など）では設定を読み込まない
+    config = config or PipelinesSettings.load()
+    if config.duckdb and config.duckdb.r2:
         return config.duckdb.r2
     raise ValueError("R2 configuration is required")
 
 
-def _should_skip_download(destination: Path, remote_size: int | None) -> bool:
-    """既存ファイルサイズが一致する場合はダウンロードをスキップする。"""
-    if not destination.exists() or remote_size is None:
+def _to_remote_object(obj: dict[str, Any]) -> _RemoteObject:
+    last_modified = obj.get("LastModified")
+    if isinstance(last_modified, datetime):
+        last_modified = last_modified.isoformat()
+    return _RemoteObject(
+        key=obj["Key"],
+        etag=obj.get("ETag"),
+        last_modified=last_modified,
+        size=obj.get("Size"),
+    )
+
+
+def load_mirror_manifest(path: Path) -> dict[str, dict[str, Any]]:
+    """manifest を読み込む。無い・壊れている・版が違う場合は空を返す。"""
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable mirror manifest: %s", path)
+        return {}
+    if payload.get("version") != MIRROR_MANIFEST_VERSION:
+        return {}
+    objects = payload.get("objects")
+    return objects if isinstance(objects, dict) else {}
+
+
+def save_mirror_manifest(path: Path, objects: dict[str, dict[str, Any]]) -> None:
+    """manifest を一時ファイル経由で原子的に書き込む。"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {"version": MIRROR_MANIFEST_VERSION, "objects": objects},
+            sort_keys=True,
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, path)
+
+
+def _is_unchanged(
+    remote: _RemoteObject,
+    entry: dict[str, Any] | None,
+    destination: Path,
+) -> bool:
+    """manifest の記録と ETag / LastModified が一致し、実ファイルも揃っているか。"""
+    if entry is None or remote.etag is None or not destination.exists():
+        return False
+    if entry.get("etag") != remote.etag:
         return False
-    return destination.stat().st_size == remote_size
+    if entry.get("last_modified") != remote.last_modified:
+        return False
+    return remote.size is None or destination.stat().st_size == remote.size
+
+
+def _part_path(destination: Path, etag: str | None) -> Path:
+    """ETag ごとの途中ファイルのパス。ETag が変われば別ファイルになる。"""
+    token = re.sub(r"[^0-9A-Za-z]", "", etag or "")[:32] or "noetag"
+    return destination.with_name(f"{destination.name}.{token}{PART_SUFFIX}")
+
+
+def _remove_stale_parts(destination: Path, keep: Path | None = None) -> None:
+    for part in destination.parent.glob(f"{destination.name}.*{PART_SUFFIX}"):
+        if part != keep:
+            part.unlink(missing_ok=True)
+
+
+def _download_object(
+    s3: Any,
+    bucket: str,
+    remote: _RemoteObject,
+    destination: Path,
+) -> int:
+    """途中ファイルがあれば続きから取得し、完了後に差し替える。
+
+    Returns:
+        今回転送したバイト数
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    part = _part_path(destination, remote.etag)
+    _remove_stale_parts(destination, keep=part)
+    offset = part.stat().st_size if part.exists() else 0
+    if remote.size is not None and offset > remote.size:
+        part.unlink()
+        offset = 0
+
+    transferred = 0
+    if remote.size is None or offset < remote.size:
+        request: dict[str, Any] = {"Bucket": bucket, "Key": remote.key}
+        if remote.etag:
+            # 取得途中でオブジェクトが置き換わった場合は 412 で失敗させる
+            request["IfMatch"] = remote.etag
+        if offset:
+            request["Range"] = f"bytes={offset}-"
+        response = s3.get_object(**request)
+        with part.open("ab") as fh:
+            for chunk in response["Body"].iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                fh.write(chunk)
+                transferred += len(chunk)
+
+    if remote.size is not None and part.stat().st_size != remote.size:
+        part.unlink()
+        raise OSError(f"Size mismatch for {remote.key}: expected {remote.size} bytes")
+    os.replace(part, destination)
+    return transferred
+
+
+def _sync_one(
+    s3: Any,
+    bucket: str,
+    remote: _RemoteObject,
+    destination: Path,
+) -> tuple[int, Exception | None]:
+    try:
+        return _download_object(s3, bucket, remote, destination), None
+    except (BotoCoreError, ClientError, OSError) as exc:
+        logger.exception("Failed to sync compacted parquet: %s", remote.key)
+        if isinstance(exc, ClientError):
+            status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if status == 412:
+                # ETag が変わった途中ファイルは再開できない
+                _remove_stale_parts(destination)
+        return 0, exc
+
+
+def _local_keys(root: Path, target_prefix: str) -> set[str]:
+    prefix_dir = root / target_prefix
+    if not prefix_dir.exists():
+        return set()
+    return {
+        path.relative_to(root).as_posix()
+        for path in prefix_dir.rglob("*")
+        if path.is_file() and not path.name.endswith(PART_SUFFIX)
+    }
+
+
+def _prune_deleted(root: Path, target_prefix: str, remote_keys: set[str]) -> int:
+    """R2 に存在しないキーのローカルファイル（途中ファイル含む）を削除する。"""
+    prefix_dir = root / target_prefix
+    if not prefix_dir.exists():
+        return 0
+    deleted = 0
+    for path in sorted(prefix_dir.rglob("*"), reverse=True):
+        if path.is_dir():
+            if not any(path.iterdir()):
+                path.rmdir()
+            continue
+        key = path.relative_to(root).as_posix()
+        if key.endswith(PART_SUFFIX):
+            base_key = key.removesuffix(PART_SUFFIX).rsplit(".", 1)[0]
+            if base_key not in remote_keys:
+                path.unlink()
+            continue
+        if key not in remote_keys:
+            path.unlink()
+            deleted += 1
+    return deleted
 
 
 def run_local_mirror_sync(
@@ -55,12 +253,17 @@ def run_local_mirror_sync(
     local_root: str | Path | None = None,
     target_prefix: str = COMPACTED_ROOT,
     failed_keys_sample_limit: int = 20,
+    max_workers: int = MAX_CONCURRENT_DOWNLOADS,
 ) -> LocalMirrorSyncResult:
-    """compacted parquet を R2 から local mirror へ同期する。"""
-    resolved_config = config or PipelinesSettings.load()
-    resolved_r2 = _resolve_r2_config(resolved_config, r2_config)
+    """compacted parquet を R2 から local mirror の新しい世代へ差分同期する。"""
+    resolved_r2 = _resolve_r2_config(config, r2_config)
     root = Path(local_root or resolved_r2.local_parquet_root or PARQUET_DATA_DIR)
     root.mkdir(parents=True, exist_ok=True)
+    manifest_path = root / MIRROR_MANIFEST_NAME
+    manifest = load_mirror_manifest(manifest_path)
+    previous_version = read_current_version(root)
+    # 未公開なら旧レイアウト（root 直下の compacted/）を前世代として扱う
+    previous_root = resolve_mirror_root(root)
 
     s3 = boto3.client(
         "s3",
@@ -71,47 +274,102 @@ def run_local_mirror_sync(
     )
     paginator = s3.get_paginator("list_objects_v2")
 
-    downloaded_count = 0
-    skipped_count = 0
+    remotes = [
+        _to_remote_object(obj)
+        for page in paginator.paginate(
+            Bucket=resolved_r2.bucket_name,
+            Prefix=target_prefix,
+        )
+        for obj in page.get("Contents", [])
+    ]
+    remote_keys = {remote.key for remote in remotes}
+
+    pending: list[_RemoteObject] = []
+    unchanged: list[_RemoteObject] = []
+    for remote in remotes:
+        entry = manifest.get(remote.key)
+        if _is_unchanged(remote, entry, previous_root / remote.key):
+            unchanged.append(remote)
+        else:
+            pending.append(remote)
+    stale_keys = _local_keys(previous_root, target_prefix) - remote_keys
+
+    if not remotes or (previous_version is not None and not pending and not stale_keys):
+        if not remotes:
+            # 一覧が空のときは設定ミスの可能性があるため空の世代は公開しない
+            logger.warning("No objects listed under %s; keeping mirror", target_prefix)
+        return LocalMirrorSyncResult(
+            target_prefix=target_prefix,
+            downloaded_count=0,
+            skipped_count=len(unchanged),
+            failed_count=0,
+            failed_keys_sample=(),
+            last_success_at=datetime.now(timezone.utc).isoformat(),
+            dataset_version=previous_version,
+        )
+
+    version, workdir = prepare_next_generation(root)
+    for remote in unchanged:
+        link_file(previous_root / remote.key, workdir / remote.key)
+
+    def sync(remote: _RemoteObject) -> tuple[int, Exception | None]:
+        return _sync_one(s3, resolved_r2.bucket_name, remote, workdir / remote.key)
+
+    if max_workers <= 1 or len(pending) <= 1:
+        outcomes = [sync(remote) for remote in pending]
+    else:
+        workers = min(max_workers, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(sync, pending))
+
     failed_keys: list[str] = []
+    bytes_transferred = 0
+    for remote, (transferred, error) in zip(pending, outcomes, strict=True):
+        bytes_transferred += transferred
+        if error is None:
+            manifest[remote.key] = remote.manifest_entry()
+            continue
+        failed_keys.append(remote.key)
+        previous_file = previous_root / remote.key
+        if previous_file.exists():
+            # 取得に失敗したキーは前世代の内容のまま新世代に含める
+            link_file(previous_file, workdir / remote.key)
 
-    for page in paginator.paginate(
-        Bucket=resolved_r2.bucket_name,
-        Prefix=target_prefix,
-    ):
-        for obj in page.get("Contents", []):
-            key = obj["Key"]
-            destination = root / Path(key)
-            tmp_destination = destination.with_suffix(destination.suffix + ".tmp")
-            destination.parent.mkdir(parents=True, exist_ok=True)
-
-            if _should_skip_download(destination, obj.get("Size")):
-                skipped_count += 1
-                continue
-
-            try:
-                s3.download_file(
-                    resolved_r2.bucket_name,
-                    key,
-                    str(tmp_destination),
-                )
-                os.replace(tmp_destination, destination)
-                downloaded_count += 1
-            except ClientError:
-                logger.exception("Failed to sync compacted parquet: %s", key)
-                if tmp_destination.exists():
-                    tmp_destination.unlink()
-                failed_keys.append(key)
+    # 再利用した未公開世代に残る古いファイルを掃除する
+    _prune_deleted(workdir, target_prefix, remote_keys)
+    publish_generation(root, version)
+    manifest = {
+        key: entry
+        for key, entry in manifest.items()
+        if not key.startswith(target_prefix) or key in remote_keys
+    }
+    save_mirror_manifest(manifest_path, manifest)
+    if previous_version is None and target_prefix.strip("/"):
+        # 旧レイアウトは新世代へハードリンク済みなので削除する
+        shutil.rmtree(root / target_prefix, ignore_errors=True)
+    prune_generations(root)
 
     last_success_at = None
     if not failed_keys:
         last_success_at = datetime.now(timezone.utc).isoformat()
 
+    logger.info(
+        "Local mirror sync v%d: downloaded=%d skipped=%d deleted=%d failed=%d bytes=%d",
+        version,
+        len(pending) - len(failed_keys),
+        len(unchanged),
+        len(stale_keys),
+        len(failed_keys),
+        bytes_transferred,
+    )
     return LocalMirrorSyncResult(
         target_prefix=target_prefix,
-        downloaded_count=downloaded_count,
-        skipped_count=skipped_count,
+        downloaded_count=len(pending) - len(failed_keys),
+        skipped_count=len(unchanged),
         failed_count=len(failed_keys),
         failed_keys_sample=tuple(failed_keys[:failed_keys_sample_limit]),
         last_success_at=last_success_at,
+        deleted_count=len(stale_keys),
+        bytes_transferred=bytes_transferred,
+        dataset_version=version,
     )
@@ -0,0 +1,13 @@
+"""Local DuckDB warehouse refresh pipeline."""
+
+from pipelines.sources.local_warehouse.pipeline import (
+    LocalWarehouseRefreshResult,
+    refresh_local_warehouse,
+    run_local_warehouse_refresh,
+)
+
+__all__ = [
+    "LocalWarehouseRefreshResult",
+    "refresh_local_warehouse",
+    "run_local_warehouse_refresh",
+]
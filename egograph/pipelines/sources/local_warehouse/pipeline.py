@@ -0,0 +1,444 @@
+"""Load compacted parquet from the local mirror into a persistent DuckDB file.
+
+``compacted/{domain}/{dataset}/year=YYYY/month=MM/data.parquet`` を
+``"{domain}"."{dataset の / を _ に置換}"`` テーブルへ月単位で取り込みます。
+各行には ``_year`` / ``_month`` 列を付与し、変更された月だけを入れ替えます。
+
+backend は同じファイルを read-only で開くため、更新はコピーに対して行い、
+完了後に ``os.replace`` で差し替えます（開いている reader は旧ファイルを読み続ける）。
+"""
+
+import logging
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import duckdb
+from egograph_mirror_layout import resolve_mirror_root
+from egograph_paths import ANALYTICS_DUCKDB_PATH, PARQUET_DATA_DIR
+
+from pipelines.sources.common.compaction import COMPACTED_ROOT
+from pipelines.sources.common.config import Config
+from pipelines.sources.common.settings import PipelinesSettings
+from pipelines.sources.spotify.schema import SpotifySchema
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ("_year", "_month")
+_MANIFEST_TABLE = "main._warehouse_partitions"
+
+# テーブルごとのインデックス定義: (index 名, カラム)
+_INDEXES: dict[tuple[str, str], tuple[tuple[str, str], ...]] = {
+    ("events", "spotify_plays"): (
+        ("idx_plays_time", "played_at_utc"),
+        ("idx_plays_track", "track_id"),
+    ),
+    ("events", "github_commits"): (("idx_github_commits_time", "committed_at_utc"),),
+    ("events", "github_pull_requests"): (("idx_github_prs_time", "updated_at_utc"),),
+    ("events", "browser_history_page_views"): (
+        ("idx_page_views_time", "started_at_utc"),
+    ),
+    ("events", "youtube_watch_history"): (
+        ("idx_youtube_watches_time", "watched_at_utc"),
+    ),
+}
+
+# Spotify の enriched view が参照する mart ビュー（master は最新月の行を採用）
+_SPOTIFY_MART_VIEWS: tuple[tuple[str, tuple[str, str], str], ...] = (
+    (
+        "mart.spotify_plays",
+        ("events", "spotify_plays"),
+        """
+        CREATE OR REPLACE VIEW mart.spotify_plays AS
+        SELECT * EXCLUDE (_year, _month) FROM events.spotify_plays
+        """,
+    ),
+    (
+        "mart.spotify_tracks",
+        ("master", "spotify_tracks"),
+        """
+        CREATE OR REPLACE VIEW mart.spotify_tracks AS
+        SELECT * EXCLUDE (_year, _month) FROM master.spotify_tracks
+        QUALIFY row_number() OVER (
+            PARTITION BY track_id ORDER BY _year DESC, _month DESC
+        ) = 1
+        """,
+    ),
+    (
+        "mart.spotify_artists",
+        ("master", "spotify_artists"),
+        """
+        CREATE OR REPLACE VIEW mart.spotify_artists AS
+        SELECT * EXCLUDE (_year, _month) FROM master.spotify_artists
+        QUALIFY row_number() OVER (
+            PARTITION BY artist_id ORDER BY _year DESC, _month DESC
+        ) = 1
+        """,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class WarehousePartition:
+    """local mirror 上の compacted 月次ファイル。"""
+
+    schema: str
+    table: str
+    year: int
+    month: int
+    path: Path
+
+    @property
+    def qualified_table(self) -> str:
+        return f'"{self.schema}"."{self.table}"'
+
+    @property
+    def label(self) -> str:
+        return f"{self.schema}.{self.table}:{self.year}-{self.month:02d}"
+
+
+@dataclass(frozen=True)
+class LocalWarehouseRefreshResult:
+    """Local warehouse 更新の実行サマリー。"""
+
+    warehouse_path: str
+    loaded_partitions: tuple[str, ...]
+    removed_partitions: tuple[str, ...]
+    skipped_count: int
+    failed_partitions: tuple[str, ...]
+    refreshed_at: str | None
+
+    def to_summary_dict(self) -> dict[str, object]:
+        """SQLite result_summary_json に保存しやすい dict に変換する。"""
+        return asdict(self)
+
+
+def warehouse_table_name(data_domain: str, dataset_path: str) -> tuple[str, str]:
+    """compacted dataset に対応する (schema, table) を返す。"""
+    return data_domain, dataset_path.strip("/").replace("/", "_")
+
+
+def _discover_partitions(local_root: Path) -> list[WarehousePartition]:
+    compacted_root = local_root / COMPACTED_ROOT
+    partitions: list[WarehousePartition] = []
+    for path in sorted(compacted_root.glob("*/**/year=*/month=*/data.parquet")):
+        parts = path.relative_to(compacted_root).parts
+        # (domain, *dataset, "year=YYYY", "month=MM", "data.parquet")
+        if len(parts) < 5:
+            continue
+        try:
+            year = int(parts[-3].removeprefix("year="))
+            month = int(parts[-2].removeprefix("month="))
+        except ValueError:
+            logger.warning("Skipping unexpected compacted path: %s", path)
+            continue
+        schema, table = warehouse_table_name(parts[0], "/".join(parts[1:-3]))
+        partitions.append(WarehousePartition(schema, table, year, month, path))
+    return partitions
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _load_manifest(
+    conn: duckdb.DuckDBPyConnection,
+) -> dict[tuple[str, str, int, int], tuple[int, int]]:
+    rows = conn.execute(
+        f"SELECT schema_name, table_name, year, month, size, mtime_ns "
+        f"FROM {_MANIFEST_TABLE}"
+    ).fetchall()
+    return {(r[0], r[1], r[2], r[3]): (r[4], r[5]) for r in rows}
+
+
+def _read_existing_manifest(
+    warehouse_path: Path,
+) -> dict[tuple[str, str, int, int], tuple[int, int]] | None:
+    """既存 warehouse の manifest を読む。無い・読めない場合は None。"""
+    if not warehouse_path.exists():
+        return None
+    try:
+        conn = duckdb.connect(str(warehouse_path), read_only=True)
+    except duckdb.Error:
+        logger.warning("Could not open existing warehouse: %s", warehouse_path)
+        return None
+    try:
+        return _load_manifest(conn)
+    except duckdb.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def _table_exists(conn: duckdb.DuckDBPyConnection, schema: str, table: str) -> bool:
+    row = conn.execute(
+        """
+        SELECT 1 FROM duckdb_tables()
+        WHERE database_name = current_database()
+          AND schema_name = ? AND table_name = ?
+        """,
+        [schema, table],
+    ).fetchone()
+    return row is not None
+
+
+def _add_missing_columns(
+    conn: duckdb.DuckDBPyConnection, partition: WarehousePartition
+) -> None:
+    """parquet 側で増えたカラムをテーブルに追加する。"""
+    existing = {
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT column_name FROM duckdb_columns()
+            WHERE database_name = current_database()
+              AND schema_name = ? AND table_name = ?
+            """,
+            [partition.schema, partition.table],
+        ).fetchall()
+    }
+    described = conn.execute(
+        "DESCRIBE SELECT * FROM read_parquet(?)", [str(partition.path)]
+    ).fetchall()
+    for column_name, column_type, *_ in described:
+        if column_name not in existing:
+            conn.execute(
+                f"ALTER TABLE {partition.qualified_table} "
+                f'ADD COLUMN "{column_name}" {column_type}'
+            )
+
+
+def _load_partition(
+    conn: duckdb.DuckDBPyConnection,
+    partition: WarehousePartition,
+    signature: tuple[int, int],
+) -> None:
+    """1か月分の compacted parquet をテーブルへ入れ替える。"""
+    select_sql = (
+        f"SELECT *, {partition.year} AS _year, {partition.month} AS _month "
+        "FROM read_parquet(?)"
+    )
+    conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{partition.schema}"')
+    if not _table_exists(conn, partition.schema, partition.table):
+        conn.execute(
+            f"CREATE TABLE {partition.qualified_table} AS {select_sql}",
+            [str(partition.path)],
+        )
+    else:
+        _add_missing_columns(conn, partition)
+        _delete_partition(
+            conn, partition.schema, partition.table, partition.year, partition.month
+        )
+        conn.execute(
+            f"INSERT INTO {partition.qualified_table} BY NAME {select_sql}",
+            [str(partition.path)],
+        )
+    conn.execute(
+        f"""
+        INSERT OR REPLACE INTO {_MANIFEST_TABLE}
+        (schema_name, table_name, year, month, size, mtime_ns, loaded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            partition.schema,
+            partition.table,
+            partition.year,
+            partition.month,
+            signature[0],
+            signature[1],
+            datetime.now(timezone.utc),
+        ],
+    )
+
+
+def _delete_partition(
+    conn: duckdb.DuckDBPyConnection,
+    schema: str,
+    table: str,
+    year: int,
+    month: int,
+) -> None:
+    conn.execute(
+        f'DELETE FROM "{schema}"."{table}" WHERE _year = ? AND _month = ?',
+        [year, month],
+    )
+
+
+def _drop_indexes(conn: duckdb.DuckDBPyConnection) -> None:
+    """ALTER TABLE と大量更新の前にインデックスを外す。"""
+    for (schema, _table), indexes in _INDEXES.items():
+        for index_name, _column in indexes:
+            conn.execute(f'DROP INDEX IF EXISTS "{schema}"."{index_name}"')
+
+
+def _create_indexes(conn: duckdb.DuckDBPyConnection) -> None:
+    for (schema, table), indexes in _INDEXES.items():
+        if not _table_exists(conn, schema, table):
+            continue
+        for index_name, column in indexes:
+            try:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{index_name}" '
+                    f'ON "{schema}"."{table}" ("{column}")'
+                )
+            except duckdb.BinderException:
+                logger.warning(
+                    "Skipping index %s: column %s not found in %s.%s",
+                    index_name,
+                    column,
+                    schema,
+                    table,
+                )
+
+
+def _create_views(conn: duckdb.DuckDBPyConnection) -> None:
+    conn.execute("CREATE SCHEMA IF NOT EXISTS mart")
+    created = 0
+    for view_name, (schema, table), sql in _SPOTIFY_MART_VIEWS:
+        if not _table_exists(conn, schema, table):
+            continue
+        try:
+            conn.execute(sql)
+            created += 1
+        except duckdb.Error as e:
+            logger.warning("Could not create %s: %s", view_name, e)
+    if created == len(_SPOTIFY_MART_VIEWS):
+        SpotifySchema.create_enriched_view(conn)
+
+
+def refresh_local_warehouse(
+    *,
+    local_root: str | Path,
+    warehouse_path: str | Path,
+    failed_partitions_sample_limit: int = 20,
+) -> LocalWarehouseRefreshResult:
+    """local mirror の compacted parquet のうち変更された月だけを取り込む。"""
+    root = Path(local_root)
+    target = Path(warehouse_path)
+    partitions = _discover_partitions(root)
+    signatures = {p: _file_signature(p.path) for p in partitions}
+    current_keys = {(p.schema, p.table, p.year, p.month) for p in partitions}
+
+    previous = _read_existing_manifest(target)
+    manifest = previous or {}
+    changed = [
+        p
+        for p in partitions
+        if manifest.get((p.schema, p.table, p.year, p.month)) != signatures[p]
+    ]
+    removed = sorted(key for key in manifest if key not in current_keys)
+    skipped_count = len(partitions) - len(changed)
+
+    if previous is not None and not changed and not removed:
+        logger.info("Local warehouse is up to date: %s", target)
+        return LocalWarehouseRefreshResult(
+            warehouse_path=str(target),
+            loaded_partitions=(),
+            removed_partitions=(),
+            skipped_count=skipped_count,
+            failed_partitions=(),
+            refreshed_at=None,
+        )
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(target.name + ".staging")
+    staging.unlink(missing_ok=True)
+    if previous is not None:
+        shutil.copy2(target, staging)
+
+    loaded: list[str] = []
+    failed: list[str] = []
+    conn = duckdb.connect(str(staging))
+    try:
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {_MANIFEST_TABLE} (
+                schema_name VARCHAR NOT NULL,
+                table_name VARCHAR NOT NULL,
+                year INTEGER NOT NULL,
+                month INTEGER NOT NULL,
+                size BIGINT NOT NULL,
+                mtime_ns BIGINT NOT NULL,
+                loaded_at TIMESTAMPTZ NOT NULL,
+                PRIMARY KEY (schema_name, table_name, year, month)
+            )
+            """
+        )
+        _drop_indexes(conn)
+
+        for partition in changed:
+            conn.begin()
+            try:
+                _load_partition(conn, partition, signatures[partition])
+                conn.commit()
+                loaded.append(partition.label)
+            except duckdb.Error:
+                conn.rollback()
+                logger.exception("Failed to load %s", partition.path)
+                failed.append(partition.label)
+
+        for schema, table, year, month in removed:
+            if _table_exists(conn, schema, table):
+                _delete_partition(conn, schema, table, year, month)
+            conn.execute(
+                f"""
+                DELETE FROM {_MANIFEST_TABLE}
+                WHERE schema_name = ? AND table_name = ?
+                  AND year = ? AND month = ?
+                """,
+                [schema, table, year, month],
+            )
+
+        _create_indexes(conn)
+        _create_views(conn)
+        conn.execute("CHECKPOINT")
+    except BaseException:
+        conn.close()
+        staging.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(staging, target)
+
+    logger.info(
+        "Local warehouse refreshed: loaded=%d removed=%d skipped=%d failed=%d",
+        len(loaded),
+        len(removed),
+        skipped_count,
+        len(failed),
+    )
+    return LocalWarehouseRefreshResult(
+        warehouse_path=str(target),
+        loaded_partitions=tuple(loaded),
+        removed_partitions=tuple(
+            f"{schema}.{table}:{year}-{month:02d}"
+            for schema, table, year, month in removed
+        ),
+        skipped_count=skipped_count,
+        failed_partitions=tuple(failed[:failed_partitions_sample_limit]),
+        refreshed_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def run_local_warehouse_refresh(
+    *,
+    config: Config | None = None,
+    local_root: str | Path | None = None,
+    warehouse_path: str | Path | None = None,
+) -> dict[str, object]:
+    """local mirror sync の後段として warehouse を更新する step。"""
+    resolved_config = config or PipelinesSettings.load()
+    r2_conf = resolved_config.duckdb.r2 if resolved_config.duckdb else None
+    root = local_root or (r2_conf.local_parquet_root if r2_conf else None)
+    target = warehouse_path or (
+        resolved_config.duckdb.db_path
+        if resolved_config.duckdb
+        else ANALYTICS_DUCKDB_PATH
+    )
+    result = refresh_local_warehouse(
+        local_root=resolve_mirror_root(root or PARQUET_DATA_DIR),
+        warehouse_path=target,
+    )
+    return result.to_summary_dict()
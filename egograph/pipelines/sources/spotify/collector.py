@@ -6,8 +6,9 @@ Spotify Web APIに接続し、以下を収集します:
 """
 
 import logging
-from collections.abc import Callable
-from typing import Any
+from collections.abc import Callable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
 
 import requests
 import spotipy
@@ -20,14 +21,40 @@ from tenacity import (
 )
 
 from .config import (
+    MAX_CONCURRENT_REQUESTS,
     MAX_RETRIES,
     PLAYLISTS_LIMIT,
     RECENTLY_PLAYED_LIMIT,
     RETRY_BACKOFF_FACTOR,
 )
+from .throttle import SpotifyThrottle
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 logger = logging.getLogger(__name__)
 
+
+def playlist_snapshot_state(
+    playlists: list[dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    """ingest state に保存するプレイリストごとの snapshot_id とトラック一覧を返す。
+
+    戻り値は次回の ``get_playlists_with_tracks(known_playlists=...)`` に渡す。
+    トラック取得に失敗したプレイリストは含めない。
+    """
+    return {
+        playlist["id"]: {
+            "snapshot_id": playlist["snapshot_id"],
+            "full_tracks": playlist["full_tracks"],
+        }
+        for playlist in playlists
+        if playlist.get("id")
+        and playlist.get("snapshot_id")
+        and "full_tracks" in playlist
+    }
+
+
 # 共通リトライデコレータ
 spotify_retry = retry(
     retry=retry_if_exception_type(
@@ -106,6 +133,8 @@ class SpotifyCollector:
             "user-read-recently-played playlist-read-private "
             "playlist-read-collaborative"
         ),
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        throttle: SpotifyThrottle | None = None,
     ):
         """Spotifyコレクターを初期化します。
 
@@ -115,10 +144,14 @@ class SpotifyCollector:
             refresh_token: OAuthリフレッシュトークン
             redirect_uri: OAuthリダイレクトURI
             scope: OAuthスコープ(スペース区切り)
+            max_concurrency: チャンク/プレイリスト取得の同時実行数
+            throttle: 全ワーカーで共有する token bucket
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.refresh_token = refresh_token
+        self.max_concurrency = max(1, max_concurrency)
+        self.throttle = throttle or SpotifyThrottle()
 
         self.auth_manager = SpotifyOAuth(
             client_id=client_id,
@@ -131,7 +164,14 @@ class SpotifyCollector:
         self.auth_manager.refresh_access_token(refresh_token)
         logger.info("Successfully refreshed Spotify access token")
 
-        self.sp = spotipy.Spotify(auth_manager=self.auth_manager)
+        # 429 は spotipy 内部で各スレッドが個別に待つのではなく、
+        # 共有 throttle で Retry-After を全ワーカーに反映する。
+        # spotipy 既定のセッションは urllib3 Retry が 429 を RetryError に変えて
+        # ヘッダーを失うため、ステータス再試行のない素のセッションを渡す
+        # （5xx や接続エラーは spotify_retry が再試行する）
+        self.sp = spotipy.Spotify(
+            auth_manager=self.auth_manager, requests_session=requests.Session()
+        )
         logger.info("Spotify collector initialized")
 
     @spotify_retry
@@ -168,7 +208,9 @@ class SpotifyCollector:
         if after is not None:
             api_params["after"] = after
 
-        results = self.sp.current_user_recently_played(**api_params)
+        results = self.throttle.call(
+            lambda: self.sp.current_user_recently_played(**api_params)
+        )
         items = results.get("items", [])
 
         if after is not None and len(items) == 0:
@@ -194,8 +236,8 @@ class SpotifyCollector:
         logger.info("Fetching user playlists (limit=%d)", limit)
 
         playlists = _paginate(
-            lambda offset, limit: self.sp.current_user_playlists(
-                limit=limit, offset=offset
+            lambda offset, limit: self.throttle.call(
+                lambda: self.sp.current_user_playlists(limit=limit, offset=offset)
             ),
             limit,
         )
@@ -220,8 +262,8 @@ class SpotifyCollector:
         limit = 100
 
         tracks = _paginate(
-            lambda offset, limit: self.sp.playlist_tracks(
-                playlist_id, limit=limit, offset=offset
+            lambda offset, limit: self.throttle.call(
+                lambda: self.sp.playlist_tracks(playlist_id, limit=limit, offset=offset)
             ),
             limit,
         )
@@ -230,15 +272,21 @@ class SpotifyCollector:
         return tracks
 
     def get_playlists_with_tracks(
-        self, limit: int = PLAYLISTS_LIMIT
+        self,
+        limit: int = PLAYLISTS_LIMIT,
+        known_playlists: Mapping[str, dict[str, Any]] | None = None,
     ) -> list[dict[str, Any]]:
         """ユーザーのプレイリストと全トラックを取得します。
 
         これは、完全なプレイリストデータを取得するために
         get_user_playlists() と get_playlist_tracks() を組み合わせた便利なメソッドです。
 
+        snapshot_id はプレイリストの変更時にのみ変わるため、known_playlists と
+        snapshot_id が一致するプレイリストは保存済みのトラック一覧を再利用します。
+
         Args:
             limit: 取得するプレイリストの最大数
+            known_playlists: 前回の playlist_snapshot_state() の結果
 
         Returns:
             'tracks' フィールドが入力されたプレイリスト辞書のリスト
@@ -247,17 +295,37 @@ class SpotifyCollector:
             spotipy.SpotifyException: API呼び出しが失敗した場合
         """
         playlists = self.get_user_playlists(limit=limit)
+        known_playlists = known_playlists or {}
         enriched_playlists = []
+        changed_playlists = []
 
         for playlist in playlists:
             playlist_id = playlist.get("id")
             if not playlist_id:
                 logger.warning("Skipping playlist without ID: %s", playlist.get("name"))
                 continue
+            enriched_playlists.append(playlist)
+
+            known = known_playlists.get(playlist_id) or {}
+            snapshot_id = playlist.get("snapshot_id")
+            if (
+                snapshot_id
+                and known.get("snapshot_id") == snapshot_id
+                and isinstance(known.get("full_tracks"), list)
+            ):
+                playlist["full_tracks"] = known["full_tracks"]
+            else:
+                changed_playlists.append(playlist)
 
+        logger.info(
+            "Fetching tracks for %d/%d playlists (others unchanged by snapshot_id)",
+            len(changed_playlists),
+            len(enriched_playlists),
+        )
+
+        def fetch_tracks(playlist: dict[str, Any]) -> None:
             try:
-                tracks = self.get_playlist_tracks(playlist_id)
-                playlist["full_tracks"] = tracks
+                playlist["full_tracks"] = self.get_playlist_tracks(playlist["id"])
             except spotipy.SpotifyException as e:
                 logger.warning(
                     "Failed to fetch tracks for playlist %s: %s",
@@ -265,7 +333,8 @@ class SpotifyCollector:
                     e,
                 )
 
-            enriched_playlists.append(playlist)
+        # プレイリストごとのページングを並列に進める
+        self._map_concurrently(fetch_tracks, changed_playlists)
 
         logger.info(
             "Successfully enriched %d playlists with tracks", len(enriched_playlists)
@@ -370,12 +439,14 @@ class SpotifyCollector:
         Returns:
             取得したアイテムのリスト(Noneを除外)
         """
-        all_items: list[dict[str, Any]] = []
-
-        for i in range(0, len(ids), chunk_size):
-            chunk = ids[i : i + chunk_size]
-            response = fetch_fn(chunk)
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+        responses = self._map_concurrently(
+            lambda chunk: self.throttle.call(lambda: fetch_fn(chunk)),
+            chunks,
+        )
 
+        all_items: list[dict[str, Any]] = []
+        for response in responses:
             if response_key:
                 items = response.get(response_key, []) if response else []
             else:
@@ -384,3 +455,18 @@ class SpotifyCollector:
             all_items.extend([item for item in items if item])
 
         return all_items
+
+    def _map_concurrently(
+        self,
+        fn: Callable[[T], R],
+        items: list[T],
+    ) -> list[R]:
+        """items を max_concurrency 並列で処理し、入力順に結果を返す。
+
+        いずれかの呼び出しが失敗した場合はその例外を送出します。
+        """
+        if self.max_concurrency <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        workers = min(self.max_concurrency, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fn, items))
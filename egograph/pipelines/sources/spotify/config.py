@@ -14,3 +14,10 @@ PLAYLISTS_LIMIT = 50  # ページネーションの妥当なデフォルト値
 # レート制限
 MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 2  # 指数バックオフ: 2, 4, 8秒
+
+# 並列取得とスロットリング
+MAX_CONCURRENT_REQUESTS = 4  # チャンク/プレイリスト取得の同時実行数
+REQUESTS_PER_SECOND = 5.0  # token bucket の補充レート
+REQUEST_BURST = 10  # token bucket の容量
+MAX_RATE_LIMIT_RETRIES = 5  # 429 応答を Retry-After 待機後に再試行する回数
+DEFAULT_RETRY_AFTER_SECONDS = 5.0  # Retry-After ヘッダーが無い 429 の待機秒数
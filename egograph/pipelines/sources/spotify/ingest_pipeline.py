@@ -9,9 +9,11 @@ from urllib.parse import urlparse
 import duckdb
 from dateutil import parser
 
+from pipelines.sources.common.compaction import PartitionRef
 from pipelines.sources.common.config import Config
 from pipelines.sources.common.utils import iso8601_to_unix_ms
 from pipelines.sources.spotify.collector import SpotifyCollector
+from pipelines.sources.spotify.master_index import SpotifyMasterIdIndex
 from pipelines.sources.spotify.storage import SpotifyStorage
 from pipelines.sources.spotify.transform import (
     transform_artist_info,
@@ -125,15 +127,50 @@ def _load_existing_master_ids(r2_conf) -> tuple[set[str], set[str]]:
             conn.close()
 
 
+def _master_index_scope(r2_conf) -> str:
+    """ローカル ID インデックスの参照先を表す文字列を返す。"""
+    return f"{r2_conf.bucket_name}/{r2_conf.master_path}spotify"
+
+
+def _lookup_existing_master_ids(
+    track_ids: set[str],
+    artist_ids: set[str],
+    r2_conf,
+    id_index: SpotifyMasterIdIndex | None,
+) -> tuple[set[str], set[str]]:
+    """候補 ID のうち既存マスターに含まれるものを返す。
+
+    ローカルインデックスがあればそれを引き、未構築または版不一致の場合だけ
+    R2 の master parquet から再構築する。
+    """
+    if id_index is None:
+        return _load_existing_master_ids(r2_conf)
+
+    scope = _master_index_scope(r2_conf)
+    if not id_index.is_current(scope):
+        logger.info("Rebuilding local Spotify master ID index from R2.")
+        all_track_ids, all_artist_ids = _load_existing_master_ids(r2_conf)
+        id_index.rebuild(scope, all_track_ids, all_artist_ids)
+    return (
+        id_index.find_existing("track", track_ids),
+        id_index.find_existing("artist", artist_ids),
+    )
+
+
 def _enrich_tracks(
     new_track_ids: list[str],
     collector: SpotifyCollector,
     storage: SpotifyStorage,
-) -> bool:
-    """新規トラックのマスターデータを取得して保存する。"""
+    id_index: SpotifyMasterIdIndex | None = None,
+) -> set[PartitionRef] | None:
+    """新規トラックのマスターデータを取得して保存する。
+
+    Returns:
+        書き込んだ partition の集合。保存に失敗した場合は None
+    """
     if not new_track_ids:
         logger.info("No new tracks to enrich.")
-        return True
+        return set()
 
     logger.info("Fetching %d new track details.", len(new_track_ids))
     try:
@@ -150,26 +187,34 @@ def _enrich_tracks(
             )
             if result is None:
                 logger.error("Failed to save track master parquet.")
-                return False
-        return True
+                return None
+            if id_index is not None:
+                id_index.add("track", [row["track_id"] for row in track_rows])
+            return {("spotify/tracks", now.year, now.month)}
+        return set()
     except Exception as e:
         logger.error(
             "Failed to enrich track master data: %s: %s",
             type(e).__name__,
             e,
         )
-        return False
+        return None
 
 
 def _enrich_artists(
     new_artist_ids: list[str],
     collector: SpotifyCollector,
     storage: SpotifyStorage,
-) -> bool:
-    """新規アーティストのマスターデータを取得して保存する。"""
+    id_index: SpotifyMasterIdIndex | None = None,
+) -> set[PartitionRef] | None:
+    """新規アーティストのマスターデータを取得して保存する。
+
+    Returns:
+        書き込んだ partition の集合。保存に失敗した場合は None
+    """
     if not new_artist_ids:
         logger.info("No new artists to enrich.")
-        return True
+        return set()
 
     logger.info("Fetching %d new artist details.", len(new_artist_ids))
     try:
@@ -186,15 +231,18 @@ def _enrich_artists(
             )
             if result is None:
                 logger.error("Failed to save artist master parquet.")
-                return False
-        return True
+                return None
+            if id_index is not None:
+                id_index.add("artist", [row["artist_id"] for row in artist_rows])
+            return {("spotify/artists", now.year, now.month)}
+        return set()
     except Exception as e:
         logger.error(
             "Failed to enrich artist master data: %s: %s",
             type(e).__name__,
             e,
         )
-        return False
+        return None
 
 
 def enrich_master_data(
@@ -204,32 +252,42 @@ def enrich_master_data(
     r2_conf,
     existing_track_ids: set[str] | None = None,
     existing_artist_ids: set[str] | None = None,
-) -> None:
+    id_index: SpotifyMasterIdIndex | None = None,
+) -> set[PartitionRef]:
     """再生履歴からマスター情報を補完して保存する。
 
+    id_index を渡すと既存 ID の判定をローカルインデックスで行い、
+    保存に成功したマスター ID をインデックスへ追加する。
+
+    Returns:
+        書き込んだマスター partition の集合
+
     Raises:
         RuntimeError: マスターの保存に失敗した場合
     """
     track_ids, artist_ids = _extract_unique_ids(items)
     if not track_ids and not artist_ids:
         logger.info("No master candidates found in recently played data.")
-        return
+        return set()
 
     if existing_track_ids is None or existing_artist_ids is None:
-        existing_track_ids, existing_artist_ids = _load_existing_master_ids(r2_conf)
+        existing_track_ids, existing_artist_ids = _lookup_existing_master_ids(
+            track_ids, artist_ids, r2_conf, id_index
+        )
 
     new_track_ids = [tid for tid in track_ids if tid not in existing_track_ids]
     new_artist_ids = [aid for aid in artist_ids if aid not in existing_artist_ids]
 
-    track_ok = _enrich_tracks(new_track_ids, collector, storage)
-    artist_ok = _enrich_artists(new_artist_ids, collector, storage)
-    if not track_ok or not artist_ok:
+    track_partitions = _enrich_tracks(new_track_ids, collector, storage, id_index)
+    artist_partitions = _enrich_artists(new_artist_ids, collector, storage, id_index)
+    if track_partitions is None or artist_partitions is None:
         failed_targets = []
-        if not track_ok:
+        if track_partitions is None:
             failed_targets.append("tracks")
-        if not artist_ok:
+        if artist_partitions is None:
             failed_targets.append("artists")
         raise RuntimeError("Failed to enrich master data: " + ", ".join(failed_targets))
+    return track_partitions | artist_partitions
 
 
 def _group_events_by_month(
@@ -269,8 +327,12 @@ def _get_after_timestamp(state: dict[str, Any] | None) -> int | None:
         return None
 
 
-def run_pipeline(config: Config) -> None:
-    """Spotifyインジェストの実行ロジック。"""
+def run_pipeline(config: Config) -> set[PartitionRef]:
+    """Spotifyインジェストの実行ロジック。
+
+    Returns:
+        書き込んだ (dataset, year, month) partition の集合
+    """
     if not config.spotify:
         raise ValueError("Spotify configuration is required")
     if not config.duckdb or not config.duckdb.r2:
@@ -303,7 +365,7 @@ def run_pipeline(config: Config) -> None:
     items = collector.get_recently_played(after=after_ms)
     if not items:
         logger.info("No new tracks found. Exiting.")
-        return
+        return set()
 
     logger.info("Collected %d new tracks.", len(items))
 
@@ -317,6 +379,7 @@ def run_pipeline(config: Config) -> None:
     grouped_events = _group_events_by_month(events)
 
     all_saved = True
+    written_partitions: set[PartitionRef] = set()
     for (year, month), partition_events in grouped_events.items():
         result = storage.save_parquet(
             partition_events, year, month, prefix="spotify/plays"
@@ -324,8 +387,21 @@ def run_pipeline(config: Config) -> None:
         if result is None:
             logger.error("Failed to save Parquet for %d-%02d", year, month)
             all_saved = False
+        else:
+            written_partitions.add(("spotify/plays", year, month))
 
-    enrich_master_data(items, collector, storage, r2_conf)
+    id_index = (
+        SpotifyMasterIdIndex(config.spotify.master_id_index_path)
+        if config.spotify.master_id_index_path
+        else None
+    )
+    try:
+        written_partitions |= enrich_master_data(
+            items, collector, storage, r2_conf, id_index=id_index
+        )
+    finally:
+        if id_index is not None:
+            id_index.close()
 
     if latest_played_at_in_batch and all_saved:
         new_state = {
@@ -340,3 +416,4 @@ def run_pipeline(config: Config) -> None:
         )
 
     logger.info("Pipeline completed successfully!")
+    return written_partitions
@@ -0,0 +1,102 @@
+"""Spotify マスター ID のローカルインデックス。
+
+R2 上の master parquet を毎回スキャンせずに新規 ID を判定するため、
+保存済みのトラック/アーティスト ID をローカル SQLite に保持します。
+バージョンまたは参照先（bucket/master_path）が一致しない場合は R2 から再構築します。
+"""
+
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Literal
+
+# インデックスの構造や再構築条件を変えたら上げる
+INDEX_VERSION = "1"
+
+MasterKind = Literal["track", "artist"]
+
+
+class SpotifyMasterIdIndex:
+    """保存済みマスター ID の永続インデックス。"""
+
+    def __init__(self, db_path: str | Path):
+        path = Path(db_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS master_ids (
+                kind TEXT NOT NULL,
+                master_id TEXT NOT NULL,
+                PRIMARY KEY (kind, master_id)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def is_current(self, scope: str) -> bool:
+        """インデックスが現行バージョンかつ同じ参照先で構築済みかを返す。"""
+        with self._lock:
+            rows = dict(
+                self._conn.execute("SELECT key, value FROM index_meta").fetchall()
+            )
+        return rows.get("version") == INDEX_VERSION and rows.get("scope") == scope
+
+    def rebuild(
+        self,
+        scope: str,
+        track_ids: Iterable[str],
+        artist_ids: Iterable[str],
+    ) -> None:
+        """インデックスを全件入れ替える。"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM master_ids")
+            self._insert("track", track_ids)
+            self._insert("artist", artist_ids)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)",
+                [("version", INDEX_VERSION), ("scope", scope)],
+            )
+
+    def add(self, kind: MasterKind, ids: Iterable[str]) -> None:
+        """保存に成功したマスター ID を追加する。"""
+        with self._lock, self._conn:
+            self._insert(kind, ids)
+
+    def find_existing(self, kind: MasterKind, ids: Iterable[str]) -> set[str]:
+        """ids のうちインデックスに存在するものを返す。"""
+        id_list = list(dict.fromkeys(ids))
+        found: set[str] = set()
+        with self._lock:
+            # SQLite の変数上限を超えないよう分割して問い合わせる
+            for start in range(0, len(id_list), 500):
+                chunk = id_list[start : start + 500]
+                placeholders = ", ".join(["?"] * len(chunk))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT master_id
+                    FROM master_ids
+                    WHERE kind = ? AND master_id IN ({placeholders})
+                    """,
+                    [kind, *chunk],
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def close(self) -> None:
+        """DB 接続を閉じる。"""
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, kind: MasterKind, ids: Iterable[str]) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO master_ids (kind, master_id) VALUES (?, ?)",
+            [(kind, master_id) for master_id in ids if master_id],
+        )
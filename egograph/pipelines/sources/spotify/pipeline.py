@@ -1,8 +1,16 @@
 """In-process Spotify pipeline entrypoints for workflow steps."""
 
 import logging
+from collections.abc import Collection
 
-from pipelines.sources.common.compaction import resolve_target_months
+from pipelines.domain.workflow import WorkflowRun
+from pipelines.sources.common.compaction import (
+    CHANGED_PARTITIONS_KEY,
+    PartitionRef,
+    build_changed_partitions,
+    parse_changed_partitions,
+    resolve_target_months,
+)
 from pipelines.sources.common.config import Config
 from pipelines.sources.common.settings import PipelinesSettings
 from pipelines.sources.spotify.ingest_pipeline import (
@@ -12,12 +20,44 @@ from pipelines.sources.spotify.storage import SpotifyStorage
 
 logger = logging.getLogger(__name__)
 
+# dataset_path -> (data_domain, dedupe_key, sort_by)
+_COMPACT_DATASETS = {
+    "spotify/plays": ("events", "play_id", "played_at_utc"),
+    "spotify/tracks": ("master", "track_id", "updated_at"),
+    "spotify/artists": ("master", "artist_id", "updated_at"),
+}
+
 
 def run_spotify_ingest(config: Config | None = None) -> dict[str, object]:
     """Spotify ingest を in-process で実行する。"""
     resolved_config = config or PipelinesSettings.load()
-    _run_ingest_pipeline(resolved_config)
-    return {"provider": "spotify", "operation": "ingest", "status": "succeeded"}
+    written_partitions = _run_ingest_pipeline(resolved_config)
+    return {
+        "provider": "spotify",
+        "operation": "ingest",
+        "status": "succeeded",
+        CHANGED_PARTITIONS_KEY: build_changed_partitions(written_partitions or ()),
+    }
+
+
+def compact_spotify_from_ingest_context(run: WorkflowRun) -> dict[str, object]:
+    """ingest step が申告した変更 partition だけを compact する。
+
+    申告が無い run（手動 compact など）は従来どおり前月・当月を対象にする。
+    """
+    partitions = parse_changed_partitions(run.result_summary)
+    if partitions is None:
+        return run_spotify_compact()
+    if not partitions:
+        logger.info("No changed Spotify partitions. Skipping compaction.")
+        return {
+            "provider": "spotify",
+            "operation": "compact",
+            "target_months": [],
+            "compacted_keys": [],
+            "skipped_targets": [],
+        }
+    return run_spotify_compact(partitions=partitions)
 
 
 def run_spotify_compact(
@@ -25,8 +65,12 @@ def run_spotify_compact(
     *,
     year: int | None = None,
     month: int | None = None,
+    partitions: Collection[PartitionRef] | None = None,
 ) -> dict[str, object]:
-    """Spotify monthly compaction を in-process で実行する。"""
+    """Spotify monthly compaction を in-process で実行する。
+
+    partitions 指定時は対象 dataset・月をその集合に限定する。
+    """
     resolved_config = config or PipelinesSettings.load()
     if not resolved_config.duckdb or not resolved_config.duckdb.r2:
         raise ValueError("R2 configuration is required for compaction")
@@ -42,16 +86,19 @@ def run_spotify_compact(
         master_path=r2_conf.master_path,
     )
 
-    target_months = resolve_target_months(year, month)
+    targets = _resolve_compact_targets(year, month, partitions)
+    target_months = sorted({(y, m) for _, y, m in targets})
     compacted_keys: list[str] = []
     skipped_targets: list[str] = []
     failures: list[str] = []
     for target_year, target_month in target_months:
-        for data_domain, dataset_path, dedupe_key, sort_by in (
-            ("events", "spotify/plays", "play_id", "played_at_utc"),
-            ("master", "spotify/tracks", "track_id", "updated_at"),
-            ("master", "spotify/artists", "artist_id", "updated_at"),
-        ):
+        for dataset_path, (
+            data_domain,
+            dedupe_key,
+            sort_by,
+        ) in _COMPACT_DATASETS.items():
+            if (dataset_path, target_year, target_month) not in targets:
+                continue
             try:
                 key = storage.compact_month(
                     data_domain=data_domain,
@@ -87,3 +134,20 @@ def run_spotify_compact(
         "compacted_keys": compacted_keys,
         "skipped_targets": skipped_targets,
     }
+
+
+def _resolve_compact_targets(
+    year: int | None,
+    month: int | None,
+    partitions: Collection[PartitionRef] | None,
+) -> set[PartitionRef]:
+    if partitions is None:
+        return {
+            (dataset_path, target_year, target_month)
+            for target_year, target_month in resolve_target_months(year, month)
+            for dataset_path in _COMPACT_DATASETS
+        }
+    unknown = {p for p in partitions if p[0] not in _COMPACT_DATASETS}
+    if unknown:
+        logger.warning("Ignoring unknown Spotify partitions: %s", sorted(unknown))
+    return set(partitions) - unknown
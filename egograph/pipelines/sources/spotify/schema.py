@@ -181,4 +181,18 @@ class SpotifySchema:
         for view_name, sql in view_definitions:
             _create_view_safely(conn, view_name, sql)
 
-        _create_view_safely(conn, "mart.spotify_plays_enriched", _ENRICHED_VIEW_SQL)
+        SpotifySchema.create_enriched_view(conn)
+
+    @staticmethod
+    def create_enriched_view(conn: duckdb.DuckDBPyConnection) -> bool:
+        """mart.spotify_plays / tracks / artists を結合したビューを作成します。
+
+        Args:
+            conn: 3つの mart ビューが定義済みの DuckDB コネクション
+
+        Returns:
+            作成に成功した場合は True
+        """
+        return _create_view_safely(
+            conn, "mart.spotify_plays_enriched", _ENRICHED_VIEW_SQL
+        )
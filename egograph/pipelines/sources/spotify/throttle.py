@@ -0,0 +1,111 @@
+"""Spotify API 呼び出しのスロットリング。
+
+並列ワーカー間で token bucket を共有し、429 応答の ``Retry-After`` を
+全ワーカーの待機として反映します。
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TypeVar
+
+import spotipy
+
+from .config import (
+    DEFAULT_RETRY_AFTER_SECONDS,
+    MAX_RATE_LIMIT_RETRIES,
+    REQUEST_BURST,
+    REQUESTS_PER_SECOND,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _retry_after_seconds(exc: spotipy.SpotifyException) -> float:
+    """SpotifyException のヘッダーから Retry-After 秒数を取り出す。"""
+    headers = exc.headers or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+class SpotifyThrottle:
+    """Retry-After を尊重する共有 token bucket（スレッドセーフ）。"""
+
+    def __init__(
+        self,
+        rate_per_second: float = REQUESTS_PER_SECOND,
+        burst: int = REQUEST_BURST,
+        *,
+        max_rate_limit_retries: int = MAX_RATE_LIMIT_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._paused_until = 0.0
+
+    def acquire(self) -> float:
+        """token を1つ取得するまで待機し、合計待機秒数を返す。"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated_at) * self.rate_per_second,
+                )
+                self._updated_at = now
+                if self._paused_until > now:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate_per_second
+            self._sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """全ワーカーの新規リクエストを seconds 秒止める。"""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated_at = now
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """token を取得して fn を呼ぶ。429 は Retry-After 待機後に再試行する。
+
+        429 以外の例外はそのまま送出し、呼び出し側の spotify_retry に任せる。
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                return fn()
+            except spotipy.SpotifyException as exc:
+                if exc.http_status != 429 or attempt >= self.max_rate_limit_retries:
+                    raise
+                retry_after = _retry_after_seconds(exc)
+                logger.warning(
+                    "Spotify rate limited (429); pausing %.1fs (attempt %d/%d)",
+                    retry_after,
+                    attempt + 1,
+                    self.max_rate_limit_retries,
+                )
+                self.pause(retry_after)
+                attempt += 1
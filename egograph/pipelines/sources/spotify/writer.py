@@ -5,27 +5,42 @@ from datetime import timezone
 from typing import Any
 
 import duckdb
+import pyarrow as pa
 
 from .transform import transform_play_item
 
 logger = logging.getLogger(__name__)
 
-# 再生履歴用 SQL
-_UPSERT_PLAYS_SQL = """
-    INSERT OR REPLACE INTO raw.spotify_plays
-    (play_id, played_at_utc, track_id, track_name,
-     artist_ids, artist_names, album_id, album_name,
-     ms_played, context_type, device_name)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-"""
-
-# トラックマスター用 SQL
-_UPSERT_TRACKS_SQL = """
-    INSERT OR REPLACE INTO mart.spotify_tracks
-    (track_id, name, artist_ids, artist_names,
-     album_id, album_name, duration_ms, popularity)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-"""
+# 再生履歴の一括 upsert 用 Arrow スキーマ
+_PLAYS_ARROW_SCHEMA = pa.schema(
+    [
+        ("play_id", pa.string()),
+        ("played_at_utc", pa.string()),
+        ("track_id", pa.string()),
+        ("track_name", pa.string()),
+        ("artist_ids", pa.list_(pa.string())),
+        ("artist_names", pa.list_(pa.string())),
+        ("album_id", pa.string()),
+        ("album_name", pa.string()),
+        ("ms_played", pa.int32()),
+        ("context_type", pa.string()),
+        ("device_name", pa.string()),
+    ]
+)
+
+# トラックマスターの一括 upsert 用 Arrow スキーマ
+_TRACKS_ARROW_SCHEMA = pa.schema(
+    [
+        ("track_id", pa.string()),
+        ("name", pa.string()),
+        ("artist_ids", pa.list_(pa.string())),
+        ("artist_names", pa.list_(pa.string())),
+        ("album_id", pa.string()),
+        ("album_name", pa.string()),
+        ("duration_ms", pa.int32()),
+        ("popularity", pa.int32()),
+    ]
+)
 
 
 class SpotifyDuckDBWriter:
@@ -53,30 +68,32 @@ class SpotifyDuckDBWriter:
 
         logger.info("Upserting %d play records", len(items))
 
-        rows = []
+        # 同一 play_id は1文で2回更新できないため、後勝ちで事前に重複除去する
+        rows: dict[str, dict[str, Any]] = {}
         for item in items:
             event = transform_play_item(item)
             if not event:
                 continue
 
-            rows.append(
-                (
-                    event["play_id"],
-                    event["played_at_utc"],
-                    event["track_id"],
-                    event["track_name"],
-                    event["artist_ids"],
-                    event["artist_names"],
-                    event["album_id"],
-                    event["album_name"],
-                    event["ms_played"],
-                    event["context_type"],
-                    None,  # device_name: recently_played API には含まれない
-                )
-            )
+            rows[event["play_id"]] = {
+                "play_id": event["play_id"],
+                "played_at_utc": event["played_at_utc"],
+                "track_id": event["track_id"],
+                "track_name": event["track_name"],
+                "artist_ids": event["artist_ids"],
+                "artist_names": event["artist_names"],
+                "album_id": event["album_id"],
+                "album_name": event["album_name"],
+                "ms_played": event["ms_played"],
+                "context_type": event["context_type"],
+                "device_name": None,  # recently_played API には含まれない
+            }
 
         if rows:
-            self.conn.executemany(_UPSERT_PLAYS_SQL, rows)
+            table = pa.Table.from_pylist(
+                list(rows.values()), schema=_PLAYS_ARROW_SCHEMA
+            )
+            self._bulk_upsert("raw.spotify_plays", table)
 
         logger.info("Successfully upserted %d plays", len(rows))
         return len(rows)
@@ -106,24 +123,43 @@ class SpotifyDuckDBWriter:
 
             seen_ids.add(track_id)
             rows.append(
-                (
-                    track_id,
-                    track.get("name", "Unknown"),
-                    [a.get("id") for a in track.get("artists", [])],
-                    [a.get("name") for a in track.get("artists", [])],
-                    track.get("album", {}).get("id"),
-                    track.get("album", {}).get("name"),
-                    track.get("duration_ms"),
-                    track.get("popularity"),
-                )
+                {
+                    "track_id": track_id,
+                    "name": track.get("name", "Unknown"),
+                    "artist_ids": [a.get("id") for a in track.get("artists", [])],
+                    "artist_names": [a.get("name") for a in track.get("artists", [])],
+                    "album_id": track.get("album", {}).get("id"),
+                    "album_name": track.get("album", {}).get("name"),
+                    "duration_ms": track.get("duration_ms"),
+                    "popularity": track.get("popularity"),
+                }
             )
 
         if rows:
-            self.conn.executemany(_UPSERT_TRACKS_SQL, rows)
+            table = pa.Table.from_pylist(rows, schema=_TRACKS_ARROW_SCHEMA)
+            self._bulk_upsert("mart.spotify_tracks", table)
 
         logger.info("Successfully upserted %d tracks", len(rows))
         return len(rows)
 
+    def _bulk_upsert(self, target_table: str, table: pa.Table) -> None:
+        """Arrow テーブルを登録し、1回の INSERT OR REPLACE ... SELECT で upsert する。
+
+        Args:
+            target_table: 書き込み先テーブル名（スキーマ修飾付き）
+            table: 主キーが重複しない Arrow テーブル
+        """
+        columns = ", ".join(table.column_names)
+        view_name = "_spotify_upsert_batch"
+        self.conn.register(view_name, table)
+        try:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {target_table} ({columns}) "
+                f"SELECT {columns} FROM {view_name}"
+            )
+        finally:
+            self.conn.unregister(view_name)
+
     def get_stats(self) -> dict[str, Any]:
         """データベース統計情報を取得する。
 
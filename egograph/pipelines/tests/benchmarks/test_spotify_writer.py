@@ -0,0 +1,104 @@
+"""SpotifyDuckDBWriter の一括 upsert ベンチマーク（CI 除外）。"""
+
+import logging
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from pipelines.sources.spotify.transform import transform_play_item
+from pipelines.sources.spotify.writer import SpotifyDuckDBWriter
+
+logger = logging.getLogger(__name__)
+
+PLAY_COUNT = 100_000
+# 行単位 executemany の比較はこの件数で計測し、件数あたりの速度で比べる
+BASELINE_SAMPLE = 5_000
+
+_ROW_BY_ROW_SQL = """
+    INSERT OR REPLACE INTO raw.spotify_plays
+    (play_id, played_at_utc, track_id, track_name,
+     artist_ids, artist_names, album_id, album_name,
+     ms_played, context_type, device_name)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _generate_plays(count: int) -> list[dict]:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return [
+        {
+            "played_at": (start + timedelta(minutes=i)).strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z"
+            ),
+            "context": {"type": "playlist"},
+            "track": {
+                "id": f"track{i % 5_000}",
+                "name": f"Track {i % 5_000}",
+                "duration_ms": 180_000,
+                "popularity": 50,
+                "artists": [{"id": f"artist{i % 500}", "name": "Artist"}],
+                "album": {"id": f"album{i % 1_000}", "name": "Album"},
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def _upsert_row_by_row(conn, items: list[dict]) -> None:
+    rows = []
+    for item in items:
+        event = transform_play_item(item)
+        rows.append(
+            (
+                event["play_id"],
+                event["played_at_utc"],
+                event["track_id"],
+                event["track_name"],
+                event["artist_ids"],
+                event["artist_names"],
+                event["album_id"],
+                event["album_name"],
+                event["ms_played"],
+                event["context_type"],
+                None,
+            )
+        )
+    conn.executemany(_ROW_BY_ROW_SQL, rows)
+
+
+@pytest.mark.benchmark
+def test_bulk_upsert_100k_plays(temp_db):
+    """10万件の再生履歴を一括 upsert し、行単位 upsert と速度を比較する。"""
+    # Arrange
+    items = _generate_plays(PLAY_COUNT)
+    writer = SpotifyDuckDBWriter(temp_db)
+
+    # Act
+    started = time.perf_counter()
+    count = writer.upsert_plays(items)
+    bulk_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    writer.upsert_plays(items)
+    rerun_seconds = time.perf_counter() - started
+
+    temp_db.execute("DELETE FROM raw.spotify_plays")
+    started = time.perf_counter()
+    _upsert_row_by_row(temp_db, items[:BASELINE_SAMPLE])
+    baseline_seconds = time.perf_counter() - started
+
+    # Assert
+    total = temp_db.execute("SELECT COUNT(*) FROM raw.spotify_plays").fetchone()[0]
+    assert count == PLAY_COUNT
+    assert total == BASELINE_SAMPLE
+    bulk_rate = PLAY_COUNT / bulk_seconds
+    baseline_rate = BASELINE_SAMPLE / baseline_seconds
+    logger.info(
+        "bulk: %.2fs (%s rows/s), rerun: %.2fs, row-by-row: %s rows/s (x%.1f)",
+        bulk_seconds,
+        f"{bulk_rate:,.0f}",
+        rerun_seconds,
+        f"{baseline_rate:,.0f}",
+        bulk_rate / baseline_rate,
+    )
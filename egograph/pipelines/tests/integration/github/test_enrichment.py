@@ -39,6 +39,8 @@ def _build_config(memory_s3, **kwargs) -> Config:
         "backfill_days": 30,
         "fetch_commit_details": True,
         "max_commit_detail_requests_per_repo": 10,
+        "http_cache_path": None,
+        "commit_detail_cache_path": None,
     }
     github_kwargs.update(kwargs)
     return Config(
@@ -5,6 +5,7 @@
 成功・失敗シナリオ、順次アカウント実行、増分取得など総合的な動作を検証する。
 """
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -17,7 +18,23 @@ from pipelines.sources.google_activity.pipeline import (
     run_account_pipeline,
     run_all_accounts_pipeline,
 )
-from pipelines.sources.google_activity.youtube_api import YouTubeAPIClient
+from pipelines.sources.google_activity.youtube_api import YouTubeFetchResult
+
+
+@pytest.fixture
+def shared_browser():
+    """Chromiumを起動せずに共有ブラウザを差し替える。"""
+
+    @asynccontextmanager
+    async def fake_launch():
+        yield MagicMock(name="shared_browser")
+
+    with patch(
+        "pipelines.sources.google_activity.pipeline.launch_shared_browser",
+        fake_launch,
+    ):
+        yield
+
 
 # テスト用サンプルデータ
 SAMPLE_WATCH_HISTORY = [
@@ -151,8 +168,8 @@ async def test_full_pipeline_success():
     mock_storage.save_ingest_state = MagicMock()
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     # Act
     with (
@@ -161,7 +178,7 @@ async def test_full_pipeline_success():
             return_value=mock_collector,
         ),
         patch(
-            "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+            "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
             return_value=mock_api_client,
         ),
     ):
@@ -218,16 +235,16 @@ async def test_pipeline_with_multiple_months():
     mock_storage.save_ingest_state = MagicMock()
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     # Act
     with (
@@ -236,7 +253,7 @@ async def test_pipeline_with_multiple_months():
             return_value=mock_collector,
         ),
         patch(
-            "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+            "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
             return_value=mock_api_client,
         ),
     ):
@@ -304,8 +321,8 @@ async def test_incremental_fetch_with_state():
     mock_storage.save_ingest_state = MagicMock()
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     # Act
     with (
@@ -314,7 +331,7 @@ async def test_incremental_fetch_with_state():
             return_value=mock_collector,
         ),
         patch(
-            "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+            "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
             return_value=mock_api_client,
         ),
     ):
@@ -366,8 +383,8 @@ async def test_collector_failure_isolation():
     mock_storage.save_ingest_state = MagicMock()
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     # Act
     with patch(
@@ -494,8 +511,8 @@ async def test_no_new_data_early_return():
 
 
 @pytest.mark.asyncio
-async def test_sequential_account_execution():
-    """複数アカウントが順次実行されることを検証する。"""
+async def test_sequential_account_execution(shared_browser):
+    """複数アカウントがリスト順に開始されることを検証する。"""
     # Arrange
     account1_config = AccountConfig(
         account_id="account1",
@@ -519,7 +536,7 @@ async def test_sequential_account_execution():
     execution_order = []
 
     async def mock_run_pipeline(
-        account_config, storage, transform, after_timestamp, max_items
+        account_config, storage, transform, after_timestamp, max_items, **kwargs
     ):
         execution_order.append(account_config.account_id)
         return PipelineResult(
@@ -557,7 +574,7 @@ async def test_sequential_account_execution():
 
 
 @pytest.mark.asyncio
-async def test_account_independence_on_failure():
+async def test_account_independence_on_failure(shared_browser):
     """1つのアカウントの失敗が他のアカウントの実行に影響しないことを検証する。"""
     # Arrange
     account1_config = AccountConfig(
@@ -586,7 +603,7 @@ async def test_account_independence_on_failure():
 
     # アカウントごとに異なる結果を返す
     async def mock_run_pipeline(
-        account_config, storage, transform, after_timestamp, max_items
+        account_config, storage, transform, after_timestamp, max_items, **kwargs
     ):
         if account_config.account_id == "account2":
             return PipelineResult(
@@ -681,45 +698,6 @@ async def test_transform_integration():
     assert event1["watch_id"] != event2["watch_id"]
 
 
-@pytest.mark.asyncio
-async def test_video_channel_api_integration():
-    """YouTube API Client による動画・チャンネルメタデータ取得の統合を検証する。
-
-    注: このテストでは実際のAPI呼び出しは行わず、モックを使用します。
-    実際の統合では、Pipeline から API Client を呼び出して
-    マスター情報を補完するフローを追加する必要があります。
-    """
-    # Arrange
-    # Mock YouTube API Client
-    mock_client = MagicMock(spec=YouTubeAPIClient)
-    mock_client.get_videos.return_value = SAMPLE_API_VIDEOS
-    mock_client.get_channels.return_value = SAMPLE_API_CHANNELS
-
-    # Act: 動画情報を取得
-    video_ids = ["abc123", "def456"]
-    videos = mock_client.get_videos(video_ids)
-
-    # Assert: 動画情報の検証
-    assert len(videos) == 2
-    assert videos[0]["id"] == "abc123"
-    assert videos[0]["snippet"]["title"] == "Test Video 1"
-    assert videos[0]["statistics"]["viewCount"] == "1000"
-
-    mock_client.get_videos.assert_called_once_with(video_ids)
-
-    # Act: チャンネル情報を取得
-    channel_ids = ["channel1", "channel2"]
-    channels = mock_client.get_channels(channel_ids)
-
-    # Assert: チャンネル情報の検証
-    assert len(channels) == 2
-    assert channels[0]["id"] == "channel1"
-    assert channels[0]["snippet"]["title"] == "Test Channel 1"
-    assert channels[0]["statistics"]["subscriberCount"] == "10000"
-
-    mock_client.get_channels.assert_called_once_with(channel_ids)
-
-
 @pytest.mark.asyncio
 async def test_end_to_end_with_api_enrichment():
     """Collector → Transform → API Client → Storage の
@@ -736,8 +714,12 @@ async def test_end_to_end_with_api_enrichment():
     mock_collector.collect_watch_history.return_value = SAMPLE_WATCH_HISTORY
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = SAMPLE_API_VIDEOS
-    mock_api_client.get_channels.return_value = SAMPLE_API_CHANNELS
+    mock_api_client.get_videos = AsyncMock(
+        return_value=YouTubeFetchResult(items=SAMPLE_API_VIDEOS)
+    )
+    mock_api_client.get_channels = AsyncMock(
+        return_value=YouTubeFetchResult(items=SAMPLE_API_CHANNELS)
+    )
 
     mock_storage = MagicMock()
     mock_storage.get_ingest_state.return_value = None
@@ -753,7 +735,7 @@ async def test_end_to_end_with_api_enrichment():
             return_value=mock_collector,
         ),
         patch(
-            "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+            "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
             return_value=mock_api_client,
         ),
     ):
@@ -807,8 +789,8 @@ async def test_max_items_limit():
     mock_storage.save_ingest_state = MagicMock()
 
     mock_api_client = MagicMock()
-    mock_api_client.get_videos.return_value = []
-    mock_api_client.get_channels.return_value = []
+    mock_api_client.get_videos = AsyncMock(return_value=YouTubeFetchResult(items=[]))
+    mock_api_client.get_channels = AsyncMock(return_value=YouTubeFetchResult(items=[]))
 
     # Act
     with (
@@ -817,7 +799,7 @@ async def test_max_items_limit():
             return_value=mock_collector,
         ),
         patch(
-            "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+            "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
             return_value=mock_api_client,
         ),
     ):
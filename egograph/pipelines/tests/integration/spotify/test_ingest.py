@@ -36,6 +36,7 @@ def _build_config(memory_s3) -> Config:
             client_id="test-client-id",
             client_secret=SecretStr("test-client-secret"),
             refresh_token=SecretStr("test-refresh-token"),
+            master_id_index_path=None,
         ),
         duckdb=DuckDBConfig(r2=r2),
     )
@@ -305,6 +305,72 @@ class TestGetPRReviews:
         assert result[1]["state"] == "CHANGES_REQUESTED"
 
 
+class TestResponseCache:
+    """ETag 条件付きリクエストキャッシュのテスト。"""
+
+    @responses.activate
+    def test_replays_cached_body_on_not_modified(self, tmp_path):
+        """2回目は If-None-Match を送り、304 ならキャッシュ本文を返す。"""
+        # Arrange
+        url = "https://api.github.com/repos/test-user/test-repo/pulls/1/reviews"
+        mock_reviews = get_mock_pr_reviews(2)
+        responses.get(url, json=mock_reviews, status=200, headers={"ETag": '"v1"'})
+        responses.get(
+            url,
+            status=304,
+            match=[responses.matchers.header_matcher({"If-None-Match": '"v1"'})],
+        )
+        collector = GitHubWorklogCollector(
+            token="test_token",
+            github_login="test-user",
+            response_cache_path=str(tmp_path / "cache.sqlite3"),
+        )
+
+        # Act
+        first = collector.get_pr_reviews("test-user", "test-repo", 1)
+        second = collector.get_pr_reviews("test-user", "test-repo", 1)
+
+        # Assert
+        assert first == mock_reviews
+        assert second == mock_reviews
+        assert collector.cache_stats() == {
+            "hits": 1,
+            "misses": 1,
+            "stores": 1,
+            "hit_rate": 0.5,
+        }
+
+    @responses.activate
+    def test_cache_persists_across_collectors(self, tmp_path):
+        """キャッシュは SQLite に永続化され、次回実行でも再利用される。"""
+        # Arrange
+        url = "https://api.github.com/repos/test-user/test-repo"
+        mock_repo = get_mock_repository("test-user", "test-repo")
+        cache_path = str(tmp_path / "cache.sqlite3")
+        responses.get(url, json=mock_repo, status=200, headers={"ETag": '"r1"'})
+        with GitHubWorklogCollector(
+            token="test_token",
+            github_login="test-user",
+            response_cache_path=cache_path,
+        ) as collector:
+            collector.get_repository("test-user", "test-repo")
+        responses.replace(responses.GET, url, status=304)
+
+        # Act
+        with GitHubWorklogCollector(
+            token="test_token",
+            github_login="test-user",
+            response_cache_path=cache_path,
+        ) as collector:
+            result = collector.get_repository("test-user", "test-repo")
+            stats = collector.cache_stats()
+
+        # Assert
+        assert result == mock_repo
+        assert responses.calls[-1].request.headers["If-None-Match"] == '"r1"'
+        assert stats["hits"] == 1
+
+
 class TestGetCommitDetail:
     """get_commit_detail メソッドのテスト。"""
 
@@ -0,0 +1,204 @@
+"""GitHub GraphQL モードのテスト。"""
+
+import json
+
+import pytest
+import responses
+from pipelines.sources.github.collector import GitHubWorklogCollector
+from pipelines.sources.github.graphql import (
+    map_graphql_commit,
+    map_graphql_pull_request,
+)
+from pipelines.sources.github.transform import transform_commit, transform_pull_request
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+
+def _pr_node(number: int, updated_at: str, state: str = "OPEN") -> dict:
+    return {
+        "databaseId": 1000 + number,
+        "number": number,
+        "state": state,
+        "title": f"PR {number}",
+        "createdAt": "2026-01-01T00:00:00Z",
+        "updatedAt": updated_at,
+        "closedAt": None,
+        "mergedAt": "2026-01-05T00:00:00Z" if state == "MERGED" else None,
+        "headRefName": "feature",
+        "baseRefName": "main",
+        "headRepository": {
+            "name": "test-repo",
+            "nameWithOwner": "test-user/test-repo",
+            "owner": {"login": "test-user"},
+        },
+        "labels": {"nodes": [{"name": "bug"}]},
+        "comments": {"totalCount": 2},
+        "reviews": {"totalCount": 3},
+        "commits": {"totalCount": 4},
+        "additions": 10,
+        "deletions": 5,
+        "changedFiles": 2,
+    }
+
+
+def _commit_node(oid: str) -> dict:
+    return {
+        "oid": oid,
+        "message": f"commit {oid}",
+        "authoredDate": "2026-01-03T00:00:00Z",
+        "additions": 7,
+        "deletions": 1,
+        "changedFilesIfAvailable": 3,
+    }
+
+
+def _pr_page(nodes: list[dict], *, end_cursor: str | None) -> dict:
+    return {
+        "data": {
+            "repository": {
+                "pullRequests": {
+                    "pageInfo": {
+                        "hasNextPage": end_cursor is not None,
+                        "endCursor": end_cursor,
+                    },
+                    "nodes": nodes,
+                }
+            }
+        }
+    }
+
+
+class TestGraphQLMapping:
+    """GraphQL ノードから REST 互換辞書へのマッピングのテスト。"""
+
+    def test_pull_request_maps_into_transform_schema(self):
+        """PR ノードを transform_pull_request がそのまま扱える。"""
+        # Arrange
+        pr = map_graphql_pull_request(_pr_node(7, "2026-01-02T00:00:00Z", "MERGED"))
+
+        # Act
+        result = transform_pull_request(pr, "test-user")
+
+        # Assert
+        assert result is not None
+        assert result["pr_number"] == 7
+        assert result["pr_id"] == 1007
+        assert result["state"] == "closed"
+        assert result["is_merged"] is True
+        assert result["action"] == "merged"
+        assert result["labels"] == ["bug"]
+        assert result["reviews_count"] == 3
+        assert result["commits_count"] == 4
+        assert result["changed_files_count"] == 2
+
+    def test_commit_maps_into_transform_schema(self):
+        """Commit ノードを transform_commit がそのまま扱える。"""
+        # Arrange
+        commit = map_graphql_commit(_commit_node("abc"))
+
+        # Act
+        result = transform_commit(commit, "test-user/test-repo")
+
+        # Assert
+        assert result is not None
+        assert result["sha"] == "abc"
+        assert result["committed_at_utc"] == "2026-01-03T00:00:00Z"
+        assert result["additions"] == 7
+        assert result["deletions"] == 1
+        assert result["changed_files_count"] == 3
+
+
+class TestGraphQLCollector:
+    """GitHubWorklogCollector の GraphQL メソッドのテスト。"""
+
+    @responses.activate
+    def test_get_pull_requests_graphql_paginates_until_since(self):
+        """cursor でページングし、since より古い PR に達したら打ち切る。"""
+        # Arrange
+        responses.post(
+            GRAPHQL_URL,
+            json=_pr_page([_pr_node(3, "2026-01-10T00:00:00Z")], end_cursor="c1"),
+        )
+        responses.post(
+            GRAPHQL_URL,
+            json=_pr_page(
+                [
+                    _pr_node(2, "2026-01-05T00:00:00Z"),
+                    _pr_node(1, "2025-12-01T00:00:00Z"),
+                ],
+                end_cursor="c2",
+            ),
+        )
+        collector = GitHubWorklogCollector(token="test_token", github_login="test-user")
+
+        # Act
+        prs = collector.get_pull_requests_graphql(
+            "test-user", "test-repo", since="2026-01-01T00:00:00Z"
+        )
+
+        # Assert
+        assert [pr["number"] for pr in prs] == [3, 2]
+        assert len(responses.calls) == 2
+        second_body = json.loads(responses.calls[1].request.body)
+        assert second_body["variables"]["cursor"] == "c1"
+
+    @responses.activate
+    def test_get_commit_history_graphql_returns_commits_with_stats(self):
+        """デフォルトブランチ履歴を stats 付きで返す。"""
+        # Arrange
+        responses.post(
+            GRAPHQL_URL,
+            json={
+                "data": {
+                    "repository": {
+                        "defaultBranchRef": {
+                            "target": {
+                                "history": {
+                                    "pageInfo": {
+                                        "hasNextPage": False,
+                                        "endCursor": None,
+                                    },
+                                    "nodes": [_commit_node("a"), _commit_node("b")],
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+        )
+        collector = GitHubWorklogCollector(token="test_token", github_login="test-user")
+
+        # Act
+        commits = collector.get_commit_history_graphql(
+            "test-user", "test-repo", since="2026-01-01T00:00:00Z"
+        )
+
+        # Assert
+        assert [commit["sha"] for commit in commits] == ["a", "b"]
+        assert commits[0]["stats"] == {"additions": 7, "deletions": 1, "total": 8}
+        body = json.loads(responses.calls[0].request.body)
+        assert body["variables"]["since"] == "2026-01-01T00:00:00Z"
+
+    @responses.activate
+    def test_graphql_errors_raise_runtime_error(self):
+        """GraphQL の errors 応答は RuntimeError にする。"""
+        # Arrange
+        responses.post(
+            GRAPHQL_URL,
+            json={"errors": [{"message": "Could not resolve to a Repository"}]},
+        )
+        collector = GitHubWorklogCollector(token="test_token", github_login="test-user")
+
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="Could not resolve"):
+            collector.get_pull_requests_graphql("test-user", "missing")
+
+    def test_graphql_url_for_enterprise_base_url(self):
+        """GitHub Enterprise の /api/v3 から /api/graphql を導出する。"""
+        collector = GitHubWorklogCollector(
+            token="test_token",
+            github_login="test-user",
+            base_url="https://github.example.com/api/v3",
+        )
+
+        assert collector.graphql_url == "https://github.example.com/api/graphql"
@@ -9,6 +9,7 @@ from pipelines.sources.common.config import (
     GitHubWorklogConfig,
     R2Config,
 )
+from pipelines.sources.github.commit_cache import CommitDetailCache
 from pipelines.sources.github.ingest_pipeline import _resolve_since_iso, run_pipeline
 
 
@@ -22,6 +23,7 @@ def _build_config() -> Config:
             backfill_days=30,
             fetch_commit_details=True,
             max_commit_detail_requests_per_repo=200,
+            commit_detail_cache_path=None,
         ),
         duckdb=DuckDBConfig(
             db_path=":memory:",
@@ -146,7 +148,7 @@ def test_run_pipeline_updates_state_on_enrichment_api_failure(monkeypatch):
 
     run_pipeline(config)
 
-    storage.save_ingest_state.assert_called_once()
+    assert storage.save_ingest_state.call_count == 2
 
 
 def test_run_pipeline_does_not_update_state_on_fatal_repo_failure(monkeypatch):
@@ -221,9 +223,12 @@ def test_run_pipeline_uses_cursor_and_updates_state_on_success(monkeypatch):
         "test-repo",
         since="2026-01-01T00:00:00+00:00",
     )
-    storage.save_ingest_state.assert_called_once()
+    assert storage.save_ingest_state.call_count == 2
     state_arg = storage.save_ingest_state.call_args[0][0]
     assert state_arg["cursor_utc"] == "2026-01-03T00:00:00+00:00"
+    assert state_arg["repos"]["test-user/test-repo"]["cursor_utc"] == (
+        "2026-01-03T00:00:00+00:00"
+    )
 
 
 def test_run_pipeline_skips_commit_detail_when_disabled(monkeypatch):
@@ -266,3 +271,269 @@ def test_run_pipeline_skips_commit_detail_when_disabled(monkeypatch):
     run_pipeline(config)
 
     collector.get_commit_detail.assert_not_called()
+
+
+def test_run_pipeline_shrinks_commit_detail_budget_by_rate_limit(monkeypatch):
+    config = _build_config()
+    config.github_worklog.rate_limit_reserve = 10
+
+    storage = MagicMock()
+    storage.get_ingest_state.return_value = {"cursor_utc": "2026-01-01T00:00:00+00:00"}
+    storage.save_repo_master.return_value = "repo.parquet"
+    storage.save_raw_commits.return_value = "commits.json"
+    storage.save_commits_parquet_with_stats.return_value = {
+        "fetched": 3,
+        "new": 3,
+        "duplicates": 0,
+        "failed": 0,
+    }
+
+    def build_collector(**kwargs):
+        # 残量 12 / reserve 10 → このリポジトリでは 2 件まで
+        kwargs["rate_limiter"].observe(200, {"X-RateLimit-Remaining": "12"})
+        return collector
+
+    commits = [{**_build_commit(), "sha": sha} for sha in ("a", "b", "c")]
+    collector = MagicMock()
+    collector.get_repository.return_value = _build_personal_repo()
+    collector.get_pull_requests.return_value = []
+    collector.get_repository_commits.return_value = commits
+    collector.get_commit_detail.side_effect = lambda owner, repo, sha: {
+        **_build_commit_detail(),
+        "sha": sha,
+    }
+
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogStorage",
+        lambda **_: storage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogCollector",
+        build_collector,
+    )
+
+    run_pipeline(config)
+
+    requested = sorted(call.args[2] for call in collector.get_commit_detail.mock_calls)
+    assert requested == ["a", "b"]
+    assert storage.save_ingest_state.call_count == 2
+
+
+def test_run_pipeline_graphql_mode_skips_per_item_enrichment(monkeypatch):
+    config = _build_config()
+    config.github_worklog.api_mode = "graphql"
+
+    storage = MagicMock()
+    storage.get_ingest_state.return_value = {"cursor_utc": "2026-01-01T00:00:00+00:00"}
+    storage.save_repo_master.return_value = "repo.parquet"
+    storage.save_pr_events_parquet_with_stats.return_value = {
+        "fetched": 1,
+        "new": 1,
+        "duplicates": 0,
+        "failed": 0,
+    }
+    storage.save_raw_prs.return_value = "pr.json"
+    storage.save_raw_commits.return_value = "commits.json"
+    storage.save_commits_parquet_with_stats.return_value = {
+        "fetched": 1,
+        "new": 1,
+        "duplicates": 0,
+        "failed": 0,
+    }
+
+    collector = MagicMock()
+    collector.get_repository.return_value = _build_personal_repo()
+    collector.get_pull_requests_graphql.return_value = [
+        {**_build_pr(), "reviews_count": 2}
+    ]
+    collector.get_commit_history_graphql.return_value = [_build_commit_detail()]
+
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogStorage",
+        lambda **_: storage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogCollector",
+        lambda **_: collector,
+    )
+
+    run_pipeline(config)
+
+    collector.get_pull_requests.assert_not_called()
+    collector.get_repository_commits.assert_not_called()
+    collector.get_pr_reviews.assert_not_called()
+    collector.get_commit_detail.assert_not_called()
+    pr_events = storage.save_pr_events_parquet_with_stats.call_args[0][0]
+    assert pr_events[0]["reviews_count"] == 2
+    commit_events = storage.save_commits_parquet_with_stats.call_args[0][0]
+    assert commit_events[0]["additions"] == 2
+    assert storage.save_ingest_state.call_count == 2
+
+
+def test_run_pipeline_reuses_cached_commit_details(monkeypatch, tmp_path):
+    config = _build_config()
+    cache_path = tmp_path / "commit_details.sqlite3"
+    config.github_worklog.commit_detail_cache_path = str(cache_path)
+    config.github_worklog.max_commit_detail_requests_per_repo = 1
+    cache = CommitDetailCache(cache_path)
+    cache.put_many(
+        "test-user/test-repo",
+        {"a": {**_build_commit_detail(), "sha": "a", "patch": "large"}},
+    )
+    cache.close()
+
+    storage = MagicMock()
+    storage.get_ingest_state.return_value = {"cursor_utc": "2026-01-01T00:00:00+00:00"}
+    storage.save_repo_master.return_value = "repo.parquet"
+    storage.save_raw_commits.return_value = "commits.json"
+    storage.save_commits_parquet_with_stats.return_value = {
+        "fetched": 2,
+        "new": 2,
+        "duplicates": 0,
+        "failed": 0,
+    }
+
+    commits = [{**_build_commit(), "sha": sha} for sha in ("a", "b")]
+    collector = MagicMock()
+    collector.get_repository.return_value = _build_personal_repo()
+    collector.get_pull_requests.return_value = []
+    collector.get_repository_commits.return_value = commits
+    collector.get_commit_detail.side_effect = lambda owner, repo, sha: {
+        **_build_commit_detail(),
+        "sha": sha,
+        "stats": {"additions": 5, "deletions": 0, "total": 5},
+    }
+
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogStorage",
+        lambda **_: storage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogCollector",
+        lambda **_: collector,
+    )
+
+    run_pipeline(config)
+
+    # キャッシュ済みの a は API を呼ばず、予算 1 件は新規の b に使われる
+    collector.get_commit_detail.assert_called_once_with("test-user", "test-repo", "b")
+    events = storage.save_commits_parquet_with_stats.call_args[0][0]
+    assert {event["sha"]: event["additions"] for event in events} == {"a": 2, "b": 5}
+    cache = CommitDetailCache(cache_path)
+    assert set(cache.get_many("test-user/test-repo", ["a", "b"])) == {"a", "b"}
+    assert "patch" not in str(cache.get_many("test-user/test-repo", ["a"]))
+    cache.close()
+
+
+def test_run_pipeline_uses_repo_cursor_and_skips_unchanged_repos(monkeypatch):
+    config = _build_config()
+    config.github_worklog.target_repos = ["test-user/quiet", "test-user/active"]
+
+    storage = MagicMock()
+    storage.get_ingest_state.return_value = {
+        "cursor_utc": "2026-01-01T00:00:00+00:00",
+        "repos": {
+            "test-user/quiet": {
+                "cursor_utc": "2026-01-10T00:00:00+00:00",
+                "pushed_at": "2026-01-10T00:00:00Z",
+            },
+            "test-user/active": {
+                "cursor_utc": "2026-01-02T00:00:00+00:00",
+                "pushed_at": "2026-01-02T00:00:00Z",
+            },
+        },
+    }
+    storage.save_repo_master.return_value = "repo.parquet"
+    storage.save_raw_commits.return_value = "commits.json"
+    storage.save_commits_parquet_with_stats.return_value = {
+        "fetched": 1,
+        "new": 1,
+        "duplicates": 0,
+        "failed": 0,
+    }
+
+    def get_repository(owner, repo):
+        pushed_at = (
+            "2026-01-10T00:00:00Z" if repo == "quiet" else "2026-01-05T00:00:00Z"
+        )
+        return {
+            **_build_personal_repo(),
+            "name": repo,
+            "full_name": f"{owner}/{repo}",
+            "pushed_at": pushed_at,
+        }
+
+    collector = MagicMock()
+    collector.get_repository.side_effect = get_repository
+    collector.get_pull_requests.return_value = []
+    collector.get_repository_commits.return_value = [_build_commit()]
+    collector.get_commit_detail.return_value = _build_commit_detail()
+
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogStorage",
+        lambda **_: storage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogCollector",
+        lambda **_: collector,
+    )
+
+    run_pipeline(config)
+
+    # quiet は前回 checkpoint 以降 push が無いので PR/Commit を取得しない
+    collector.get_pull_requests.assert_called_once_with(
+        "test-user", "active", since="2026-01-02T00:00:00+00:00"
+    )
+    collector.get_repository_commits.assert_called_once_with(
+        "test-user", "active", since="2026-01-02T00:00:00+00:00"
+    )
+    checkpoint = storage.save_ingest_state.call_args_list[0][0][0]
+    assert checkpoint["cursor_utc"] == "2026-01-01T00:00:00+00:00"
+    assert checkpoint["repos"]["test-user/active"] == {
+        "cursor_utc": "2026-01-03T00:00:00+00:00",
+        "pushed_at": "2026-01-05T00:00:00Z",
+    }
+
+
+def test_run_pipeline_checkpoints_completed_repos_before_failure(monkeypatch):
+    config = _build_config()
+    config.github_worklog.target_repos = ["test-user/done", "test-user/broken"]
+
+    storage = MagicMock()
+    storage.get_ingest_state.return_value = {"cursor_utc": "2026-01-01T00:00:00+00:00"}
+    storage.save_repo_master.return_value = "repo.parquet"
+    storage.save_raw_commits.return_value = "commits.json"
+    storage.save_commits_parquet_with_stats.return_value = {
+        "fetched": 1,
+        "new": 1,
+        "duplicates": 0,
+        "failed": 0,
+    }
+
+    def get_repository(owner, repo):
+        if repo == "broken":
+            raise RuntimeError("timeout")
+        return {**_build_personal_repo(), "name": repo, "full_name": f"{owner}/{repo}"}
+
+    collector = MagicMock()
+    collector.get_repository.side_effect = get_repository
+    collector.get_pull_requests.return_value = []
+    collector.get_repository_commits.return_value = [_build_commit()]
+    collector.get_commit_detail.return_value = _build_commit_detail()
+
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogStorage",
+        lambda **_: storage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.github.ingest_pipeline.GitHubWorklogCollector",
+        lambda **_: collector,
+    )
+
+    run_pipeline(config)
+
+    # 完了した done だけが checkpoint され、全体 cursor は据え置き
+    storage.save_ingest_state.assert_called_once()
+    state_arg = storage.save_ingest_state.call_args[0][0]
+    assert state_arg["cursor_utc"] == "2026-01-01T00:00:00+00:00"
+    assert set(state_arg["repos"]) == {"test-user/done"}
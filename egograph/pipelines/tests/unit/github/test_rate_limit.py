@@ -0,0 +1,117 @@
+"""GitHub レート制限スケジューラのテスト。"""
+
+import threading
+import time
+
+from pipelines.sources.github.rate_limit import GitHubRateLimiter, map_bounded
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock: FakeClock, **kwargs) -> GitHubRateLimiter:
+    return GitHubRateLimiter(clock=clock.time, sleep=clock.sleep, **kwargs)
+
+
+class TestGitHubRateLimiter:
+    """GitHubRateLimiter のテスト。"""
+
+    def test_waits_until_reset_when_remaining_reaches_reserve(self):
+        """残量が reserve 以下になったら reset 時刻まで待機する。"""
+        # Arrange
+        clock = FakeClock()
+        limiter = _limiter(clock, reserve_requests=10)
+
+        # Act
+        limiter.observe(
+            200,
+            {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1030"},
+        )
+        waited = limiter.wait()
+
+        # Assert
+        assert waited == 30.0
+        assert limiter.wait() == 0.0
+
+    def test_honors_retry_after_of_secondary_rate_limit(self):
+        """secondary rate limit の Retry-After 秒数だけ待機する。"""
+        # Arrange
+        clock = FakeClock()
+        limiter = _limiter(clock)
+
+        # Act
+        limiter.observe(
+            403,
+            {"X-RateLimit-Remaining": "4000", "Retry-After": "5"},
+        )
+        limiter.wait()
+
+        # Assert
+        assert clock.sleeps == [5.0]
+
+    def test_does_not_wait_with_enough_remaining(self):
+        """残量が十分なら待機しない。非文字列ヘッダーは無視する。"""
+        # Arrange
+        clock = FakeClock()
+        limiter = _limiter(clock, reserve_requests=10)
+
+        # Act
+        limiter.observe(200, {"X-RateLimit-Remaining": "11", "Retry-After": 3})
+
+        # Assert
+        assert limiter.wait() == 0.0
+        assert clock.sleeps == []
+
+    def test_detail_budget_shrinks_with_remaining_quota(self):
+        """commit detail 上限を残量と残りリポジトリ数で按分する。"""
+        # Arrange
+        limiter = _limiter(FakeClock(), reserve_requests=50)
+
+        # Act
+        unknown = limiter.detail_budget(200, pending_repos=3)
+        limiter.observe(200, {"X-RateLimit-Remaining": "350"})
+        shrunk = limiter.detail_budget(200, pending_repos=3)
+        exhausted = limiter.detail_budget(200, pending_repos=400)
+
+        # Assert
+        assert unknown == 200
+        assert shrunk == 100
+        assert exhausted == 0
+
+
+def test_map_bounded_keeps_input_order_and_limits_concurrency():
+    """入力順に結果を返し、同時実行数を max_workers 以下に保つ。"""
+    # Arrange
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def work(value: int) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        if value == 3:
+            raise RuntimeError("boom")
+        return value * 2
+
+    # Act
+    results = map_bounded(work, range(8), max_workers=2)
+
+    # Assert
+    assert [result for result, _ in results] == [0, 2, 4, None, 8, 10, 12, 14]
+    assert isinstance(results[3][1], RuntimeError)
+    assert peak <= 2
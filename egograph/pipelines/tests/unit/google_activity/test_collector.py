@@ -2,12 +2,14 @@
 
 import logging
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from pipelines.sources.google_activity.collector import (
     MyActivityCollector,
+    _block_unused_resources,
     _extract_video_id,
     _parse_watched_at,
 )
@@ -314,3 +316,97 @@ async def test_collect_watch_history_after_timestamp_filtering():
     for item in result:
         if "watched_at" in item:
             assert item["watched_at"] >= after_timestamp
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("resource_type", "aborted"),
+    [("image", True), ("font", True), ("media", True), ("document", False)],
+)
+async def test_block_unused_resources(resource_type, aborted):
+    """画像・フォント・メディアのリクエストだけを中断する。"""
+    # Arrange
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.abort = AsyncMock()
+    route.continue_ = AsyncMock()
+
+    # Act
+    await _block_unused_resources(route)
+
+    # Assert
+    assert route.abort.await_count == (1 if aborted else 0)
+    assert route.continue_.await_count == (0 if aborted else 1)
+
+
+def _scraped_item(video_id: str, hour: int) -> dict:
+    return {
+        "type": "item",
+        "date": "2025/01/15",
+        "title": f"Video {video_id}",
+        "video_url": f"https://www.youtube.com/watch?v={video_id}",
+        "channel_name": "Channel",
+        "full_text": "",
+        "time_str": f"{hour}:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_scrape_watch_items_extracts_only_appended_items(mock_cookies):
+    """スクロールごとに追記分だけを抽出し、DOM が増えなくなったら終了する。"""
+    # Arrange
+    collector = MyActivityCollector(mock_cookies)
+    page = AsyncMock()
+    batches = [
+        {"total": 2, "items": [_scraped_item("v1", 12), _scraped_item("v2", 11)]},
+        {"total": 3, "items": [_scraped_item("v3", 10)]},
+    ]
+    start_indexes = []
+
+    async def evaluate(script, arg=None):
+        if "scrollTo" in script:
+            return None
+        start_indexes.append(arg)
+        return batches[len(start_indexes) - 1]
+
+    page.evaluate = evaluate
+    page.wait_for_function = AsyncMock(
+        side_effect=[None, PlaywrightTimeoutError("no growth")]
+    )
+    collector.page = page
+    after_timestamp = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    # Act
+    items = await collector._scrape_watch_items(after_timestamp, max_items=None)
+
+    # Assert
+    assert [item["video_id"] for item in items] == ["v1", "v2", "v3"]
+    assert start_indexes == [0, 2]
+    growth_args = [
+        call.kwargs["arg"] for call in page.wait_for_function.await_args_list
+    ]
+    assert growth_args == [[".k2bP7e", 2], [".k2bP7e", 3]]
+
+
+@pytest.mark.asyncio
+async def test_shared_browser_cleanup_closes_only_context(mock_cookies):
+    """共有ブラウザ使用時はコンテキストだけを閉じ、ブラウザは残す。"""
+    # Arrange
+    browser = MagicMock()
+    browser.is_connected.return_value = True
+    browser.close = AsyncMock()
+    context = AsyncMock()
+    browser.new_context = AsyncMock(return_value=context)
+    collector = MyActivityCollector(mock_cookies, browser=browser)
+
+    # Act
+    await collector._initialize_browser()
+    await collector._cleanup_browser()
+
+    # Assert
+    browser.new_context.assert_awaited_once_with(timezone_id="UTC")
+    context.add_cookies.assert_awaited_once_with(mock_cookies)
+    context.close.assert_awaited_once()
+    browser.close.assert_not_awaited()
+    assert collector.browser is browser
+    assert collector.context is None
@@ -0,0 +1,118 @@
+"""YouTube 取得済み ID インデックスのテスト。"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pipelines.sources.google_activity.known_ids import YouTubeKnownIdIndex
+
+SCOPE = "test-bucket/master/"
+NOW = datetime(2025, 2, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+    idx.ensure_scope(SCOPE)
+    yield idx
+    idx.close()
+
+
+def test_select_stale_returns_unknown_and_expired_ids(index):
+    """未取得と refresh_days を過ぎた ID だけを入力順で返す。"""
+    # Arrange
+    index.mark_fetched("video", ["fresh"], fetched_at=NOW - timedelta(days=1))
+    index.mark_fetched("video", ["expired"], fetched_at=NOW - timedelta(days=31))
+
+    # Act
+    stale = index.select_stale("video", ["new", "fresh", "expired", "new"], now=NOW)
+
+    # Assert
+    assert stale == ["new", "expired"]
+
+
+def test_select_stale_separates_kinds(index):
+    """動画とチャンネルの ID を区別して判定する。"""
+    # Arrange
+    index.mark_fetched("video", ["shared_id"], fetched_at=NOW)
+
+    # Act / Assert
+    assert index.select_stale("video", ["shared_id"], now=NOW) == []
+    assert index.select_stale("channel", ["shared_id"], now=NOW) == ["shared_id"]
+
+
+def test_ensure_scope_clears_ids_when_scope_changes(index):
+    """参照先が変わった場合は取得済み ID を破棄する。"""
+    # Arrange
+    index.mark_fetched("video", ["v1"], fetched_at=NOW)
+
+    # Act
+    index.ensure_scope(SCOPE)
+    kept = index.select_stale("video", ["v1"], now=NOW)
+    index.ensure_scope("other-bucket/master/")
+
+    # Assert
+    assert kept == []
+    assert index.select_stale("video", ["v1"], now=NOW) == ["v1"]
+
+
+def test_index_persists_across_instances(tmp_path):
+    """再オープン後も取得時刻を保持する。"""
+    # Arrange
+    first = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+    first.ensure_scope(SCOPE)
+    first.mark_fetched("channel", ["c1"], fetched_at=NOW)
+    first.close()
+
+    # Act
+    second = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+    second.ensure_scope(SCOPE)
+    stale = second.select_stale("channel", ["c1"], now=NOW)
+    second.close()
+
+    # Assert
+    assert stale == []
+
+
+def test_deferred_ids_are_cleared_when_fetched(index):
+    """繰り越した ID は取得済みになった時点で繰り越しから外れる。"""
+    # Arrange
+    index.defer("video", ["v2", "v1"])
+
+    # Act
+    before = index.list_deferred("video")
+    index.mark_fetched("video", ["v1"], fetched_at=NOW)
+
+    # Assert
+    assert before == ["v1", "v2"]
+    assert index.list_deferred("video") == ["v2"]
+    assert index.list_deferred("channel") == []
+
+
+def test_claim_deferred_returns_ids_only_once(index):
+    """claim_deferred は繰り越し ID を返し、同じ ID を二度返さない。"""
+    # Arrange
+    index.defer("video", ["v2", "v1"])
+    index.defer("channel", ["c1"])
+
+    # Act
+    first = index.claim_deferred("video")
+    second = index.claim_deferred("video")
+
+    # Assert
+    assert first == ["v1", "v2"]
+    assert second == []
+    assert index.list_deferred("channel") == ["c1"]
+
+
+def test_quota_usage_accumulates_per_day(index):
+    """クォータ消費量を日付ごとに加算し、古い日付は消す。"""
+    # Arrange
+    index.add_quota_used("2025-01-31", 5)
+
+    # Act
+    index.add_quota_used("2025-02-01", 3)
+    index.add_quota_used("2025-02-01", 4)
+
+    # Assert
+    assert index.get_quota_used("2025-02-01") == 7
+    assert index.get_quota_used("2025-01-31") == 0
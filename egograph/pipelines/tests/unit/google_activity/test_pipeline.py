@@ -1,15 +1,19 @@
 """パイプラインモジュールのテスト。"""
 
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-
 from pipelines.sources.google_activity.config import AccountConfig
+from pipelines.sources.google_activity.known_ids import YouTubeKnownIdIndex
 from pipelines.sources.google_activity.pipeline import (
+    PipelineResult,
     run_account_pipeline,
     run_all_accounts_pipeline,
 )
+from pipelines.sources.google_activity.youtube_api import YouTubeFetchResult
 
 
 class TestRunAccountPipeline:
@@ -61,10 +65,14 @@ class TestRunAccountPipeline:
         mock_transform.transform_channel_info.return_value = {"channel_id": "chan1"}
 
         mock_api_client = MagicMock()
-        mock_api_client.get_videos.return_value = [
-            {"id": "abc123", "snippet": {"channelId": "chan1"}}
-        ]
-        mock_api_client.get_channels.return_value = [{"id": "chan1"}]
+        mock_api_client.get_videos = AsyncMock(
+            return_value=YouTubeFetchResult(
+                items=[{"id": "abc123", "snippet": {"channelId": "chan1"}}]
+            )
+        )
+        mock_api_client.get_channels = AsyncMock(
+            return_value=YouTubeFetchResult(items=[{"id": "chan1"}])
+        )
 
         # Act
         with (
@@ -73,7 +81,7 @@ class TestRunAccountPipeline:
                 return_value=mock_collector,
             ),
             patch(
-                "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
                 return_value=mock_api_client,
             ),
         ):
@@ -95,6 +103,16 @@ class TestRunAccountPipeline:
         mock_transform.transform_watch_history_items.assert_called_once()
         mock_storage.save_raw_json.assert_called_once()
         mock_storage.save_parquet.assert_called_once()
+        # compact 対象として視聴履歴の月とマスターの取得月を申告する
+        assert ("youtube/watch_history", 2025, 1) in result.written_partitions
+        assert {dataset for dataset, _, _ in result.written_partitions} == {
+            "youtube/watch_history",
+            "youtube/videos",
+            "youtube/channels",
+        }
+        master_call = mock_storage.save_master_parquet.call_args_list[0]
+        assert master_call.kwargs["year"] is not None
+        assert master_call.kwargs["month"] is not None
 
     @pytest.mark.asyncio
     async def test_failure_path_when_collector_fails(self):
@@ -128,7 +146,7 @@ class TestRunAccountPipeline:
                 return_value=mock_collector,
             ),
             patch(
-                "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
                 return_value=MagicMock(),
             ),
         ):
@@ -210,10 +228,14 @@ class TestRunAccountPipeline:
         mock_transform.transform_channel_info.return_value = {"channel_id": "chan2"}
 
         mock_api_client = MagicMock()
-        mock_api_client.get_videos.return_value = [
-            {"id": "xyz789", "snippet": {"channelId": "chan2"}}
-        ]
-        mock_api_client.get_channels.return_value = [{"id": "chan2"}]
+        mock_api_client.get_videos = AsyncMock(
+            return_value=YouTubeFetchResult(
+                items=[{"id": "xyz789", "snippet": {"channelId": "chan2"}}]
+            )
+        )
+        mock_api_client.get_channels = AsyncMock(
+            return_value=YouTubeFetchResult(items=[{"id": "chan2"}])
+        )
 
         # Act & Assert for account1 (fails)
         with (
@@ -222,7 +244,7 @@ class TestRunAccountPipeline:
                 return_value=mock_collector1,
             ),
             patch(
-                "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
                 return_value=mock_api_client,
             ),
         ):
@@ -245,7 +267,7 @@ class TestRunAccountPipeline:
                 return_value=mock_collector2,
             ),
             patch(
-                "pipelines.sources.google_activity.pipeline.YouTubeAPIClient",
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
                 return_value=mock_api_client,
             ),
         ):
@@ -262,13 +284,140 @@ class TestRunAccountPipeline:
         assert result2.collected_count == 1
         assert result2.saved_count == 1
 
+    @pytest.mark.asyncio
+    async def test_enriches_only_unknown_or_stale_ids(self, tmp_path):
+        """取得済みインデックスにある新しい ID は YouTube API に問い合わせないこと。"""
+        # Arrange
+        account_config = AccountConfig(
+            account_id="account1",
+            cookies={"SID": "test_sid"},
+            youtube_api_key="test_api_key",
+        )
+        watched_at = datetime(2025, 1, 15, 12, 30, 0, tzinfo=timezone.utc)
+        mock_collector = AsyncMock()
+        mock_collector.collect_watch_history.return_value = [
+            {"video_id": video_id, "watched_at": watched_at}
+            for video_id in ("known", "new")
+        ]
+        mock_storage = MagicMock()
+        mock_storage.get_ingest_state.return_value = None
+        mock_transform = MagicMock()
+        mock_transform.transform_watch_history_items.return_value = [
+            {"video_id": video_id, "watched_at_utc": watched_at}
+            for video_id in ("known", "new")
+        ]
+        mock_transform.transform_video_info.side_effect = lambda v: {
+            "video_id": v["id"]
+        }
+        mock_api_client = MagicMock()
+        mock_api_client.get_videos = AsyncMock(
+            return_value=YouTubeFetchResult(
+                items=[{"id": "new", "snippet": {"channelId": "known_channel"}}]
+            )
+        )
+        id_index = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+        id_index.mark_fetched("video", ["known"])
+        id_index.mark_fetched("channel", ["known_channel"])
+
+        # Act
+        with (
+            patch(
+                "pipelines.sources.google_activity.pipeline.MyActivityCollector",
+                return_value=mock_collector,
+            ),
+            patch(
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
+                return_value=mock_api_client,
+            ),
+        ):
+            result = await run_account_pipeline(
+                account_config=account_config,
+                storage=mock_storage,
+                transform=mock_transform,
+                after_timestamp=datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+                max_items=10,
+                id_index=id_index,
+            )
+
+        # Assert
+        assert result.success is True
+        mock_api_client.get_videos.assert_awaited_once_with(["new"])
+        mock_api_client.get_channels.assert_not_called()
+        assert id_index.select_stale("video", ["known", "new"]) == []
+        id_index.close()
+
+    @pytest.mark.asyncio
+    async def test_defers_ids_over_quota_budget_to_next_run(self, tmp_path):
+        """クォータ不足で取得できなかった ID を繰り越し、状態は更新すること。"""
+        # Arrange
+        account_config = AccountConfig(
+            account_id="account1",
+            cookies={"SID": "test_sid"},
+            youtube_api_key="test_api_key",
+        )
+        watched_at = datetime(2025, 1, 15, 12, 30, 0, tzinfo=timezone.utc)
+        mock_collector = AsyncMock()
+        mock_collector.collect_watch_history.return_value = [{"v": "v1"}]
+        mock_storage = MagicMock()
+        mock_storage.get_ingest_state.return_value = None
+        mock_transform = MagicMock()
+        mock_transform.transform_watch_history_items.return_value = [
+            {"video_id": "v1", "watched_at_utc": watched_at}
+        ]
+        mock_api_client = MagicMock()
+        mock_api_client.get_videos = AsyncMock(
+            return_value=YouTubeFetchResult(deferred_ids=["v1"])
+        )
+        id_index = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+
+        # Act
+        with (
+            patch(
+                "pipelines.sources.google_activity.pipeline.MyActivityCollector",
+                return_value=mock_collector,
+            ),
+            patch(
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
+                return_value=mock_api_client,
+            ),
+        ):
+            result = await run_account_pipeline(
+                account_config=account_config,
+                storage=mock_storage,
+                transform=mock_transform,
+                after_timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                max_items=10,
+                id_index=id_index,
+            )
+
+        # Assert
+        assert result.success is True
+        mock_storage.save_ingest_state.assert_called()
+        assert id_index.list_deferred("video") == ["v1"]
+        id_index.close()
+
 
 class TestRunAllAccountsPipeline:
     """run_all_accounts_pipelineのテスト。"""
 
+    @pytest.fixture(autouse=True)
+    def shared_browser(self):
+        """Chromiumを起動せずに共有ブラウザを差し替える。"""
+        browser = MagicMock(name="shared_browser")
+
+        @asynccontextmanager
+        async def fake_launch():
+            yield browser
+
+        with patch(
+            "pipelines.sources.google_activity.pipeline.launch_shared_browser",
+            fake_launch,
+        ):
+            yield browser
+
     @pytest.mark.asyncio
-    async def test_sequential_execution(self):
-        """全てのアカウントが順次実行されること。"""
+    async def test_accounts_start_in_order(self):
+        """全てのアカウントがリスト順に開始されること。"""
         # Arrange
         account1_config = AccountConfig(
             account_id="account1",
@@ -308,7 +457,7 @@ class TestRunAllAccountsPipeline:
         execution_order = []
 
         async def mock_run_account_pipeline(
-            account_config, storage, transform, after_timestamp, max_items
+            account_config, storage, transform, after_timestamp, max_items, **kwargs
         ):
             execution_order.append(account_config.account_id)
             return MagicMock(
@@ -334,7 +483,7 @@ class TestRunAllAccountsPipeline:
 
         # Assert
         assert len(execution_order) == 2
-        assert execution_order == ["account1", "account2"]  # Sequential order preserved
+        assert execution_order == ["account1", "account2"]  # Start order preserved
         assert "account1" in results
         assert "account2" in results
 
@@ -362,7 +511,7 @@ class TestRunAllAccountsPipeline:
         mock_transform.transform_watch_history_items.return_value = []
 
         async def mock_run_account_pipeline(
-            account_config, storage, transform, after_timestamp, max_items
+            account_config, storage, transform, after_timestamp, max_items, **kwargs
         ):
             return MagicMock(
                 success=True,
@@ -426,7 +575,7 @@ class TestRunAllAccountsPipeline:
 
         # Mock different results for each account
         async def mock_run_account_pipeline(
-            account_config, storage, transform, after_timestamp, max_items
+            account_config, storage, transform, after_timestamp, max_items, **kwargs
         ):
             if account_config.account_id == "account2":
                 # account2 fails
@@ -474,3 +623,255 @@ class TestRunAllAccountsPipeline:
         assert results["account3"].success is True
         assert results["account3"].collected_count == 1
         assert results["account3"].saved_count == 1
+
+    @pytest.mark.asyncio
+    async def test_shares_browser_and_limits_concurrent_scraping(self, shared_browser):
+        """共有ブラウザを全アカウントに渡し、同時スクレイピング数を制限すること。"""
+        # Arrange
+        accounts = [
+            AccountConfig(
+                account_id=f"account{i}",
+                cookies={"SID": f"test_sid{i}"},
+                youtube_api_key="test_api_key",
+            )
+            for i in range(1, 4)
+        ]
+        browsers = []
+        active = 0
+        peak = 0
+
+        async def mock_run_account_pipeline(
+            account_config,
+            storage,
+            transform,
+            after_timestamp,
+            max_items,
+            browser,
+            scrape_semaphore,
+            **kwargs,
+        ):
+            nonlocal active, peak
+            browsers.append(browser)
+            async with scrape_semaphore:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+            return MagicMock(success=True, account_id=account_config.account_id)
+
+        # Act
+        with patch(
+            "pipelines.sources.google_activity.pipeline.run_account_pipeline",
+            side_effect=mock_run_account_pipeline,
+        ):
+            results = await run_all_accounts_pipeline(
+                accounts=accounts,
+                storage=MagicMock(),
+                transform=MagicMock(),
+                after_timestamp=datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+                max_items=10,
+                max_concurrency=2,
+            )
+
+        # Assert
+        assert all(result.success for result in results.values())
+        assert browsers == [shared_browser] * 3
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_all_accounts_fail_when_browser_launch_fails(self):
+        """共有ブラウザの起動に失敗した場合は全アカウントが失敗になること。"""
+        # Arrange
+        accounts = [
+            AccountConfig(
+                account_id="account1",
+                cookies={"SID": "test_sid1"},
+                youtube_api_key="test_api_key",
+            )
+        ]
+
+        @asynccontextmanager
+        async def failing_launch():
+            raise RuntimeError("chromium missing")
+            yield
+
+        # Act
+        with patch(
+            "pipelines.sources.google_activity.pipeline.launch_shared_browser",
+            failing_launch,
+        ):
+            results = await run_all_accounts_pipeline(
+                accounts=accounts,
+                storage=MagicMock(),
+                transform=MagicMock(),
+                after_timestamp=datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc),
+                max_items=10,
+            )
+
+        # Assert
+        assert results["account1"].success is False
+        assert "browser" in results["account1"].error
+
+    @pytest.mark.asyncio
+    async def test_fetches_deferred_ids_once_per_run(self, tmp_path):
+        """繰り越し ID はアカウント数によらず実行ごとに1度だけ問い合わせること。"""
+        # Arrange
+        accounts = [
+            AccountConfig(
+                account_id=account_id,
+                cookies={"SID": "test_sid"},
+                youtube_api_key="test_api_key",
+            )
+            for account_id in ("account1", "account2")
+        ]
+        id_index = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+        id_index.defer("video", ["v_old"])
+        mock_api_client = MagicMock()
+        mock_api_client.get_videos = AsyncMock(
+            return_value=YouTubeFetchResult(items=[{"id": "v_old"}])
+        )
+        mock_transform = MagicMock()
+        mock_transform.transform_video_info.side_effect = lambda v: {
+            "video_id": v["id"]
+        }
+
+        async def mock_run_account_pipeline(account_config, **kwargs):
+            return PipelineResult(
+                success=True,
+                account_id=account_config.account_id,
+                collected_count=0,
+                saved_count=0,
+            )
+
+        # Act
+        with (
+            patch(
+                "pipelines.sources.google_activity.pipeline.run_account_pipeline",
+                side_effect=mock_run_account_pipeline,
+            ),
+            patch(
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
+                return_value=mock_api_client,
+            ),
+        ):
+            results = await run_all_accounts_pipeline(
+                accounts=accounts,
+                storage=MagicMock(),
+                transform=mock_transform,
+                after_timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                max_items=10,
+                id_index=id_index,
+            )
+
+        # Assert
+        mock_api_client.get_videos.assert_awaited_once_with(["v_old"])
+        assert id_index.list_deferred("video") == []
+        assert {
+            partition[0] for partition in results["account1"].written_partitions
+        } == {"youtube/videos"}
+        assert results["account2"].written_partitions == set()
+        id_index.close()
+
+    @pytest.mark.asyncio
+    async def test_redefers_claimed_ids_when_an_account_fails(self, tmp_path):
+        """失敗したアカウントがある実行では繰り越し ID を取得せず繰り越し直すこと。"""
+        # Arrange
+        accounts = [
+            AccountConfig(
+                account_id=account_id,
+                cookies={"SID": "test_sid"},
+                youtube_api_key="test_api_key",
+            )
+            for account_id in ("account1", "account2")
+        ]
+        id_index = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+        id_index.defer("video", ["v_old"])
+        id_index.defer("channel", ["c_old"])
+        mock_api_client = MagicMock()
+        mock_api_client.get_videos = AsyncMock()
+
+        async def mock_run_account_pipeline(account_config, **kwargs):
+            return PipelineResult(
+                success=account_config.account_id == "account1",
+                account_id=account_config.account_id,
+                collected_count=0,
+                saved_count=0,
+            )
+
+        # Act
+        with (
+            patch(
+                "pipelines.sources.google_activity.pipeline.run_account_pipeline",
+                side_effect=mock_run_account_pipeline,
+            ),
+            patch(
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
+                return_value=mock_api_client,
+            ),
+        ):
+            results = await run_all_accounts_pipeline(
+                accounts=accounts,
+                storage=MagicMock(),
+                transform=MagicMock(),
+                after_timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                max_items=10,
+                id_index=id_index,
+            )
+
+        # Assert
+        mock_api_client.get_videos.assert_not_awaited()
+        assert id_index.list_deferred("video") == ["v_old"]
+        assert id_index.list_deferred("channel") == ["c_old"]
+        assert results["account1"].written_partitions == set()
+        id_index.close()
+
+    @pytest.mark.asyncio
+    async def test_redefers_claimed_ids_when_fetch_fails(self, tmp_path):
+        """繰り越し ID の取得に失敗した場合は繰り越し直すこと。"""
+        # Arrange
+        accounts = [
+            AccountConfig(
+                account_id="account1",
+                cookies={"SID": "test_sid"},
+                youtube_api_key="test_api_key",
+            )
+        ]
+        id_index = YouTubeKnownIdIndex(tmp_path / "ids.sqlite3", refresh_days=30)
+        id_index.defer("video", ["v_old"])
+        id_index.defer("channel", ["c_old"])
+        mock_api_client = MagicMock()
+        mock_api_client.get_videos = AsyncMock(side_effect=RuntimeError("boom"))
+
+        async def mock_run_account_pipeline(account_config, **kwargs):
+            return PipelineResult(
+                success=True,
+                account_id=account_config.account_id,
+                collected_count=0,
+                saved_count=0,
+            )
+
+        # Act
+        with (
+            patch(
+                "pipelines.sources.google_activity.pipeline.run_account_pipeline",
+                side_effect=mock_run_account_pipeline,
+            ),
+            patch(
+                "pipelines.sources.google_activity.pipeline.AsyncYouTubeAPIClient",
+                return_value=mock_api_client,
+            ),
+        ):
+            results = await run_all_accounts_pipeline(
+                accounts=accounts,
+                storage=MagicMock(),
+                transform=MagicMock(),
+                after_timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                max_items=10,
+                id_index=id_index,
+            )
+
+        # Assert
+        assert results["account1"].success is True
+        assert id_index.list_deferred("video") == ["v_old"]
+        assert id_index.list_deferred("channel") == ["c_old"]
+        id_index.close()
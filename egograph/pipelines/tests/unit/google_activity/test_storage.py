@@ -1,8 +1,11 @@
 """YouTubeStorageのテスト。"""
 
+import io
 import uuid as uuid_module
 from unittest.mock import MagicMock, patch
 
+import pandas as pd
+import pytest
 from botocore.exceptions import ClientError
 
 from pipelines.sources.google_activity.storage import YouTubeStorage
@@ -234,3 +237,202 @@ class TestYouTubeStorageSaveIngestState:
         assert call_args[1]["Bucket"] == "test-bucket"
         assert call_args[1]["Key"] == "state/youtube_account1_state.json"
         assert call_args[1]["ContentType"] == "application/json"
+
+
+class TestYouTubeStorageCompactMonth:
+    """compact_monthメソッドのテスト。"""
+
+    @patch("boto3.client")
+    def test_compact_month_keeps_latest_master_row(self, mock_boto3_client):
+        """マスターは updated_at が最新の行を compacted key へ保存することを確認。"""
+        # Arrange
+        mock_s3 = MagicMock()
+        mock_boto3_client.return_value = mock_s3
+        storage = YouTubeStorage(
+            endpoint_url="https://endpoint.r2.cloudflarestorage.com",
+            access_key_id="test_key",
+            secret_access_key="test_secret",
+            bucket_name="test-bucket",
+        )
+        records = [
+            {"video_id": "v1", "duration_seconds": 600, "updated_at": 2},
+            {"video_id": "v1", "duration_seconds": 100, "updated_at": 1},
+        ]
+
+        # Act
+        with (
+            patch(
+                "pipelines.sources.google_activity.storage.read_parquet_records_from_prefix",
+                return_value=records,
+            ) as mock_read,
+            patch(
+                "pipelines.sources.google_activity.storage.dataframe_to_parquet_bytes",
+                return_value=b"x",
+            ) as mock_to_bytes,
+        ):
+            key = storage.compact_month(
+                data_domain="master",
+                dataset_path="youtube/videos",
+                year=2024,
+                month=1,
+                dedupe_key="video_id",
+                sort_by="updated_at",
+            )
+
+        # Assert
+        assert mock_read.call_args[0][2] == "master/youtube/videos/year=2024/month=01/"
+        compacted_df = mock_to_bytes.call_args[0][0]
+        assert compacted_df.to_dict(orient="records") == [
+            {"video_id": "v1", "duration_seconds": 600, "updated_at": 2}
+        ]
+        assert key == "compacted/master/youtube/videos/year=2024/month=01/data.parquet"
+        assert mock_s3.put_object.call_args.kwargs["Key"] == key
+
+    @patch("boto3.client")
+    def test_compact_month_skips_empty_partition(self, mock_boto3_client):
+        """対象月にデータが無ければ保存しないことを確認。"""
+        # Arrange
+        mock_s3 = MagicMock()
+        mock_boto3_client.return_value = mock_s3
+        storage = YouTubeStorage(
+            endpoint_url="https://endpoint.r2.cloudflarestorage.com",
+            access_key_id="test_key",
+            secret_access_key="test_secret",
+            bucket_name="test-bucket",
+        )
+
+        # Act
+        with patch(
+            "pipelines.sources.google_activity.storage.read_parquet_records_from_prefix",
+            return_value=[],
+        ):
+            key = storage.compact_month(
+                data_domain="events",
+                dataset_path="youtube/watch_history",
+                year=2024,
+                month=1,
+                dedupe_key="watch_id",
+            )
+
+        # Assert
+        assert key is None
+        mock_s3.put_object.assert_not_called()
+
+
+class TestYouTubeStorageMigrateUnpartitionedMaster:
+    """migrate_unpartitioned_masterメソッドのテスト。"""
+
+    @patch("boto3.client")
+    def test_moves_flat_files_into_updated_at_months(self, mock_boto3_client):
+        """直下のマスターを updated_at の月へ書き直し、元ファイルを消すことを確認。"""
+        # Arrange
+        mock_s3 = MagicMock()
+        mock_boto3_client.return_value = mock_s3
+        buffer = io.BytesIO()
+        pd.DataFrame(
+            {
+                "video_id": ["v1", "v2"],
+                "duration_seconds": [60, 120],
+                "updated_at": pd.to_datetime(
+                    ["2024-01-31T23:00:00Z", "2024-02-01T00:00:00Z"]
+                ),
+            }
+        ).to_parquet(buffer, index=False)
+        mock_s3.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "master/youtube/videos/legacy.parquet"}]}
+        ]
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+        storage = YouTubeStorage(
+            endpoint_url="https://endpoint.r2.cloudflarestorage.com",
+            access_key_id="test_key",
+            secret_access_key="test_secret",
+            bucket_name="test-bucket",
+        )
+
+        # Act
+        months = storage.migrate_unpartitioned_master("youtube/videos")
+
+        # Assert
+        assert months == [(2024, 1), (2024, 2)]
+        mock_s3.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="test-bucket", Prefix="master/youtube/videos/", Delimiter="/"
+        )
+        saved_keys = [call.kwargs["Key"] for call in mock_s3.put_object.call_args_list]
+        assert [key.rsplit("/", 1)[0] for key in saved_keys] == [
+            "master/youtube/videos/year=2024/month=01",
+            "master/youtube/videos/year=2024/month=02",
+        ]
+        mock_s3.delete_objects.assert_called_once_with(
+            Bucket="test-bucket",
+            Delete={"Objects": [{"Key": "master/youtube/videos/legacy.parquet"}]},
+        )
+
+    @patch("boto3.client")
+    def test_keeps_flat_files_when_save_fails(self, mock_boto3_client):
+        """書き直しに失敗したら元ファイルを消さずにエラーにすることを確認。"""
+        # Arrange
+        mock_s3 = MagicMock()
+        mock_boto3_client.return_value = mock_s3
+        buffer = io.BytesIO()
+        pd.DataFrame(
+            {"video_id": ["v1"], "updated_at": pd.to_datetime(["2024-01-01"])}
+        ).to_parquet(buffer, index=False)
+        mock_s3.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "master/youtube/videos/legacy.parquet"}]}
+        ]
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+        mock_s3.put_object.side_effect = ClientError(
+            {"Error": {"Code": "500", "Message": "error"}}, "PutObject"
+        )
+        storage = YouTubeStorage(
+            endpoint_url="https://endpoint.r2.cloudflarestorage.com",
+            access_key_id="test_key",
+            secret_access_key="test_secret",
+            bucket_name="test-bucket",
+        )
+
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            storage.migrate_unpartitioned_master("youtube/videos")
+        mock_s3.delete_objects.assert_not_called()
+
+
+class TestYouTubeStorageListWatchIds:
+    """list_watch_idsメソッドのテスト。"""
+
+    @patch("boto3.client")
+    def test_list_watch_ids_reads_month_partition(self, mock_boto3_client):
+        """指定月のParquetから watch_id を集めることを確認。"""
+        # Arrange
+        mock_s3 = MagicMock()
+        mock_boto3_client.return_value = mock_s3
+        buffer = io.BytesIO()
+        pd.DataFrame({"watch_id": ["w1", "w2"], "video_id": ["v1", "v2"]}).to_parquet(
+            buffer, index=False
+        )
+        prefix = "events/youtube/watch_history/year=2024/month=01/"
+        mock_s3.get_paginator.return_value.paginate.return_value = [
+            {
+                "Contents": [
+                    {"Key": f"{prefix}a.parquet"},
+                    {"Key": f"{prefix}_SUCCESS"},
+                ]
+            }
+        ]
+        mock_s3.get_object.return_value = {"Body": io.BytesIO(buffer.getvalue())}
+        storage = YouTubeStorage(
+            endpoint_url="https://endpoint.r2.cloudflarestorage.com",
+            access_key_id="test_key",
+            secret_access_key="test_secret",
+            bucket_name="test-bucket",
+        )
+
+        # Act
+        watch_ids = storage.list_watch_ids(2024, 1)
+
+        # Assert
+        assert watch_ids == {"w1", "w2"}
+        mock_s3.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="test-bucket", Prefix=prefix
+        )
+        mock_s3.get_object.assert_called_once()
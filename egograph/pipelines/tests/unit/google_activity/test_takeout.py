@@ -0,0 +1,289 @@
+"""Google Takeout インポーターのテスト。"""
+
+import json
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from pipelines.sources.google_activity.known_ids import YouTubeKnownIdIndex
+from pipelines.sources.google_activity.takeout import (
+    import_takeout_files,
+    iter_takeout_html,
+    iter_takeout_items,
+    iter_takeout_json,
+)
+from pipelines.sources.google_activity.transform import _generate_watch_id
+
+TAKEOUT_RECORDS = [
+    {
+        "header": "YouTube",
+        "title": "Watched Video A",
+        "titleUrl": "https://www.youtube.com/watch?v=video_a",
+        "subtitles": [
+            {"name": "Channel X", "url": "https://www.youtube.com/channel/UCx"}
+        ],
+        "time": "2024-02-01T10:00:42.123Z",
+        "products": ["YouTube"],
+    },
+    {
+        "header": "YouTube",
+        "title": "Video B を視聴しました",
+        "titleUrl": "https://www.youtube.com/watch?v=video_b",
+        "subtitles": [{"name": "Channel Y"}],
+        "time": "2024-01-31T23:59:00Z",
+        "products": ["YouTube"],
+    },
+    {
+        "header": "YouTube",
+        "title": "Watched Ad",
+        "titleUrl": "https://www.youtube.com/watch?v=ad_video",
+        "time": "2024-01-31T12:00:00Z",
+        "details": [{"name": "From Google Ads"}],
+    },
+    {
+        "header": "YouTube",
+        "title": "Watched a video that has been removed",
+        "time": "2024-01-30T12:00:00Z",
+    },
+]
+
+TAKEOUT_HTML = """<html><body><div class="mdl-grid">
+<div class="outer-cell mdl-cell mdl-cell--12-col mdl-shadow--2dp">
+<div class="mdl-grid">
+<div class="header-cell mdl-cell mdl-cell--12-col">
+<p class="mdl-typography--title">YouTube<br></p></div>
+<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1"
+>Watched\xa0<a href="https://www.youtube.com/watch?v=video_a">Video A</a><br
+><a href="https://www.youtube.com/channel/UCx">Channel X</a><br
+>Feb 1, 2024, 7:00:42\u202fPM JST<br></div>
+<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1
+ mdl-typography--text-right"></div>
+<div class="content-cell mdl-cell mdl-cell--12-col mdl-typography--caption"
+><b>Products:</b><br>YouTube<br></div>
+</div></div>
+<div class="outer-cell mdl-cell mdl-cell--12-col mdl-shadow--2dp">
+<div class="mdl-grid">
+<div class="content-cell mdl-cell mdl-cell--6-col mdl-typography--body-1"
+>Watched a video that has been removed<br>Jan 30, 2024, 9:00:00 PM JST<br></div>
+</div></div>
+</div></body></html>
+"""
+
+
+def _write_json(tmp_path, records):
+    path = tmp_path / "watch-history.json"
+    path.write_text(json.dumps(records, ensure_ascii=False, indent=2), "utf-8")
+    return path
+
+
+class TestIterTakeoutJson:
+    """iter_takeout_jsonのテスト。"""
+
+    def test_yields_records_across_chunk_boundaries(self, tmp_path):
+        """チャンク境界で分割された要素も1件ずつ復元することを確認。"""
+        # Arrange
+        path = _write_json(tmp_path, TAKEOUT_RECORDS)
+
+        # Act: 要素より小さいチャンクで読む
+        records = list(iter_takeout_json(path, chunk_size=7))
+
+        # Assert
+        assert records == TAKEOUT_RECORDS
+
+    def test_empty_array_yields_nothing(self, tmp_path):
+        """空配列では何も返さないことを確認。"""
+        # Arrange
+        path = _write_json(tmp_path, [])
+
+        # Act & Assert
+        assert list(iter_takeout_json(path)) == []
+
+    def test_truncated_file_raises(self, tmp_path):
+        """途中で切れたファイルはエラーにすることを確認。"""
+        # Arrange
+        path = tmp_path / "watch-history.json"
+        path.write_text(json.dumps(TAKEOUT_RECORDS)[:-20], "utf-8")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            list(iter_takeout_json(path, chunk_size=16))
+
+
+class TestIterTakeoutItems:
+    """Takeoutレコードからコレクター形式のアイテムへの変換テスト。"""
+
+    def test_json_skips_ads_and_removed_videos(self, tmp_path):
+        """広告と削除済み動画を除外し、タイトルの定型句と秒以下を落とすことを確認。"""
+        # Arrange
+        path = _write_json(tmp_path, TAKEOUT_RECORDS)
+
+        # Act
+        items = list(iter_takeout_items(path))
+
+        # Assert
+        assert items == [
+            {
+                "video_id": "video_a",
+                "title": "Video A",
+                "channel_name": "Channel X",
+                "watched_at": datetime(2024, 2, 1, 10, 0, tzinfo=timezone.utc),
+                "video_url": "https://www.youtube.com/watch?v=video_a",
+            },
+            {
+                "video_id": "video_b",
+                "title": "Video B",
+                "channel_name": "Channel Y",
+                "watched_at": datetime(2024, 1, 31, 23, 59, tzinfo=timezone.utc),
+                "video_url": "https://www.youtube.com/watch?v=video_b",
+            },
+        ]
+
+    def test_html_parses_entries_in_given_timezone(self, tmp_path):
+        """HTML版のエントリを指定タイムゾーンで解釈することを確認。"""
+        # Arrange
+        path = tmp_path / "watch-history.html"
+        path.write_text(TAKEOUT_HTML, "utf-8")
+
+        # Act: 小さいチャンクでも同じ結果になる
+        items = list(iter_takeout_html(path, "Asia/Tokyo", chunk_size=32))
+
+        # Assert
+        assert items == [
+            {
+                "video_id": "video_a",
+                "title": "Video A",
+                "channel_name": "Channel X",
+                "watched_at": datetime(2024, 2, 1, 10, 0, tzinfo=timezone.utc),
+                "video_url": "https://www.youtube.com/watch?v=video_a",
+            }
+        ]
+
+    def test_html_honors_zone_suffix_over_default_timezone(self, tmp_path):
+        """JST のエクスポートを既定の UTC で読んでも時刻がずれないことを確認。"""
+        # Arrange
+        path = tmp_path / "watch-history.html"
+        path.write_text(TAKEOUT_HTML.replace("PM JST", "PM GMT+09:00"), "utf-8")
+        jst_path = tmp_path / "watch-history-jst.html"
+        jst_path.write_text(TAKEOUT_HTML, "utf-8")
+
+        # Act
+        offset_items = list(iter_takeout_html(path, "UTC"))
+        jst_items = list(iter_takeout_html(jst_path, "UTC"))
+
+        # Assert
+        expected = datetime(2024, 2, 1, 10, 0, tzinfo=timezone.utc)
+        assert [item["watched_at"] for item in offset_items] == [expected]
+        assert [item["watched_at"] for item in jst_items] == [expected]
+
+    def test_html_rejects_ambiguous_zone_suffix_not_matching_timezone(self, tmp_path):
+        """--timezone と食い違う曖昧な略称はずらして保存せずエラーにすることを確認。"""
+        # Arrange
+        path = tmp_path / "watch-history.html"
+        path.write_text(TAKEOUT_HTML.replace("JST", "CST"), "utf-8")
+
+        # Act / Assert
+        with pytest.raises(ValueError, match="CST"):
+            list(iter_takeout_html(path, "UTC"))
+        assert len(list(iter_takeout_html(path, "America/Chicago"))) == 1
+
+    def test_unsupported_extension_raises(self, tmp_path):
+        """未対応の拡張子はエラーにすることを確認。"""
+        # Arrange
+        path = tmp_path / "watch-history.csv"
+        path.write_text("", "utf-8")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            list(iter_takeout_items(path))
+
+
+class TestImportTakeoutFiles:
+    """import_takeout_filesのテスト。"""
+
+    def test_skips_existing_watch_ids_and_partitions_by_month(self, tmp_path):
+        """保存済み watch_id を除外し、月ごとに保存することを確認。"""
+        # Arrange
+        path = _write_json(tmp_path, TAKEOUT_RECORDS + TAKEOUT_RECORDS[:1])
+        existing_id = _generate_watch_id(
+            "account1",
+            "video_b",
+            datetime(2024, 1, 31, 23, 59, tzinfo=timezone.utc),
+        )
+        mock_storage = MagicMock()
+        mock_storage.list_watch_ids.side_effect = lambda year, month: (
+            {existing_id} if (year, month) == (2024, 1) else set()
+        )
+        mock_storage.save_parquet.return_value = "events/key.parquet"
+
+        # Act
+        result = import_takeout_files([path], mock_storage, "account1")
+
+        # Assert: video_b は保存済み、video_a の2件目はファイル内の重複
+        assert result.read_count == 3
+        assert result.imported_count == 1
+        assert result.duplicate_count == 2
+        assert result.written_partitions == {("youtube/watch_history", 2024, 2)}
+        mock_storage.save_parquet.assert_called_once()
+        call_kwargs = mock_storage.save_parquet.call_args.kwargs
+        assert (call_kwargs["year"], call_kwargs["month"]) == (2024, 2)
+        assert [event["video_id"] for event in call_kwargs["data"]] == ["video_a"]
+
+    def test_flushes_when_batch_size_is_reached(self, tmp_path):
+        """未保存イベントが batch_size に達するたびに保存することを確認。"""
+        # Arrange
+        records = [
+            {
+                "title": f"Watched Video {i}",
+                "titleUrl": f"https://www.youtube.com/watch?v=video_{i}",
+                "subtitles": [{"name": "Channel X"}],
+                "time": f"2024-03-01T10:{i:02d}:00Z",
+            }
+            for i in range(5)
+        ]
+        path = _write_json(tmp_path, records)
+        mock_storage = MagicMock()
+        mock_storage.list_watch_ids.return_value = set()
+        mock_storage.save_parquet.return_value = "events/key.parquet"
+
+        # Act
+        result = import_takeout_files([path], mock_storage, "account1", batch_size=2)
+
+        # Assert
+        assert result.imported_count == 5
+        assert [
+            len(call.kwargs["data"])
+            for call in mock_storage.save_parquet.call_args_list
+        ] == [2, 2, 1]
+        mock_storage.list_watch_ids.assert_called_once_with(2024, 3)
+
+    def test_defers_unknown_videos_for_next_ingest(self, tmp_path):
+        """マスター未取得の動画だけを次回 ingest へ繰り越すことを確認。"""
+        # Arrange
+        path = _write_json(tmp_path, TAKEOUT_RECORDS)
+        mock_storage = MagicMock()
+        mock_storage.list_watch_ids.return_value = set()
+        mock_storage.save_parquet.return_value = "events/key.parquet"
+        id_index = YouTubeKnownIdIndex(tmp_path / "known_ids.sqlite3", refresh_days=30)
+        id_index.mark_fetched("video", ["video_b"])
+
+        # Act
+        try:
+            import_takeout_files([path], mock_storage, "account1", id_index=id_index)
+            deferred = id_index.list_deferred("video")
+        finally:
+            id_index.close()
+
+        # Assert
+        assert deferred == ["video_a"]
+
+    def test_raises_when_save_fails(self, tmp_path):
+        """Parquet の保存に失敗したらエラーにすることを確認。"""
+        # Arrange
+        path = _write_json(tmp_path, TAKEOUT_RECORDS)
+        mock_storage = MagicMock()
+        mock_storage.list_watch_ids.return_value = set()
+        mock_storage.save_parquet.return_value = None
+
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            import_takeout_files([path], mock_storage, "account1")
@@ -1,12 +1,28 @@
 """Local mirror sync pipeline tests."""
 
-from pathlib import Path
+import json
 
 from botocore.exceptions import ClientError
+from egograph_mirror_layout import (
+    generation_dir,
+    read_current_version,
+    resolve_mirror_root,
+)
 from pipelines.sources.common.config import R2Config
-from pipelines.sources.local_mirror_sync.pipeline import run_local_mirror_sync
+from pipelines.sources.local_mirror_sync.pipeline import (
+    MIRROR_MANIFEST_NAME,
+    run_local_mirror_sync,
+    save_mirror_manifest,
+)
 from pydantic import SecretStr
 
+GITHUB_KEY = "compacted/events/github/commits/year=2026/month=04/data.parquet"
+SPOTIFY_KEY = "compacted/events/spotify/plays/year=2026/month=04/data.parquet"
+BROWSER_HISTORY_KEY = (
+    "compacted/events/browser_history/page_views/year=2026/month=04/data.parquet"
+)
+LAST_MODIFIED = "2026-04-30T00:00:00+00:00"
+
 
 class _FakePaginator:
     def __init__(self, pages):
@@ -16,29 +32,75 @@ class _FakePaginator:
         return self._pages
 
 
+class _FakeBody:
+    def __init__(self, data):
+        self._data = data
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, len(self._data), chunk_size):
+            yield self._data[start : start + chunk_size]
+
+
 class _FakeS3Client:
-    def __init__(self, pages, objects, fail_keys=()):
-        self._pages = pages
+    def __init__(self, objects, fail_keys=()):
         self._objects = objects
         self._fail_keys = set(fail_keys)
+        self.get_requests = []
 
     def get_paginator(self, name):
         assert name == "list_objects_v2"
-        return _FakePaginator(self._pages)
+        return _FakePaginator(
+            [
+                {
+                    "Contents": [
+                        {
+                            "Key": key,
+                            "ETag": etag,
+                            "LastModified": LAST_MODIFIED,
+                            "Size": len(data),
+                        }
+                        for key, (etag, data) in self._objects.items()
+                    ]
+                }
+            ]
+        )
 
-    def download_file(self, bucket, key, filename):
-        assert bucket == "egograph"
+    def get_object(self, **kwargs):
+        assert kwargs["Bucket"] == "egograph"
+        self.get_requests.append(kwargs)
+        key = kwargs["Key"]
         if key in self._fail_keys:
             raise ClientError(
-                {
-                    "Error": {
-                        "Code": "InternalError",
-                        "Message": "download failed",
-                    }
-                },
-                "DownloadFile",
+                {"Error": {"Code": "InternalError", "Message": "download failed"}},
+                "GetObject",
             )
-        Path(filename).write_bytes(self._objects[key])
+        etag, data = self._objects[key]
+        assert kwargs.get("IfMatch") == etag
+        offset = 0
+        if "Range" in kwargs:
+            offset = int(kwargs["Range"].removeprefix("bytes=").rstrip("-"))
+        return {"Body": _FakeBody(data[offset:])}
+
+
+def _r2_config(local_root) -> R2Config:
+    return R2Config(
+        endpoint_url="https://r2.example.com",
+        access_key_id="access-key",
+        secret_access_key=SecretStr("secret"),
+        bucket_name="egograph",
+        local_parquet_root=str(local_root),
+    )
+
+
+def _use_client(monkeypatch, fake_client):
+    monkeypatch.setattr(
+        "pipelines.sources.local_mirror_sync.pipeline.boto3.client",
+        lambda *args, **kwargs: fake_client,
+    )
+
+
+def _manifest_entry(etag, size):
+    return {"etag": etag, "last_modified": LAST_MODIFIED, "size": size}
 
 
 def test_run_local_mirror_sync_downloads_skips_and_reports_failures(
@@ -46,69 +108,161 @@ def test_run_local_mirror_sync_downloads_skips_and_reports_failures(
     tmp_path,
 ):
     """同期結果を summary フィールドとして返す。"""
-    github_key = "compacted/events/github/commits/year=2026/month=04/data.parquet"
-    spotify_key = "compacted/events/spotify/plays/year=2026/month=04/data.parquet"
-    browser_history_key = (
-        "compacted/events/browser_history/page_views/year=2026/month=04/data.parquet"
-    )
-
+    # Arrange
     local_root = tmp_path / "parquet"
-    existing = local_root / github_key
+    existing = local_root / GITHUB_KEY
     existing.parent.mkdir(parents=True)
     existing.write_bytes(b"already")
-
+    save_mirror_manifest(
+        local_root / MIRROR_MANIFEST_NAME,
+        {GITHUB_KEY: _manifest_entry('"gh-1"', 7)},
+    )
     fake_client = _FakeS3Client(
-        pages=[
-            {
-                "Contents": [
-                    {
-                        "Key": github_key,
-                        "Size": 7,
-                    },
-                    {
-                        "Key": spotify_key,
-                        "Size": 3,
-                    },
-                    {
-                        "Key": browser_history_key,
-                        "Size": 5,
-                    },
-                ]
-            }
-        ],
         objects={
-            spotify_key: b"new",
+            GITHUB_KEY: ('"gh-1"', b"already"),
+            SPOTIFY_KEY: ('"sp-1"', b"new"),
+            BROWSER_HISTORY_KEY: ('"bh-1"', b"fails"),
         },
-        fail_keys=(browser_history_key,),
-    )
-    monkeypatch.setattr(
-        "pipelines.sources.local_mirror_sync.pipeline.boto3.client",
-        lambda *args, **kwargs: fake_client,
+        fail_keys=(BROWSER_HISTORY_KEY,),
     )
+    _use_client(monkeypatch, fake_client)
 
-    result = run_local_mirror_sync(
-        r2_config=R2Config(
-            endpoint_url="https://r2.example.com",
-            access_key_id="access-key",
-            secret_access_key=SecretStr("secret"),
-            bucket_name="egograph",
-            local_parquet_root=str(local_root),
-        ),
-    )
+    # Act
+    result = run_local_mirror_sync(r2_config=_r2_config(local_root))
 
-    assert result.downloaded_count == 1
-    assert result.skipped_count == 1
-    assert result.failed_count == 1
-    assert result.failed_keys_sample == (browser_history_key,)
-    assert result.last_success_at is None
-    assert (
-        local_root / "compacted/events/spotify/plays/year=2026/month=04/data.parquet"
-    ).read_bytes() == b"new"
+    # Assert
+    assert (local_root / "current" / SPOTIFY_KEY).read_bytes() == b"new"
     assert result.to_summary_dict() == {
         "target_prefix": "compacted/",
         "downloaded_count": 1,
         "skipped_count": 1,
         "failed_count": 1,
-        "failed_keys_sample": (browser_history_key,),
+        "failed_keys_sample": (BROWSER_HISTORY_KEY,),
         "last_success_at": None,
+        "deleted_count": 0,
+        "bytes_transferred": 3,
+        "dataset_version": 1,
+    }
+    manifest = json.loads((local_root / MIRROR_MANIFEST_NAME).read_text())
+    assert set(manifest["objects"]) == {GITHUB_KEY, SPOTIFY_KEY}
+
+
+def test_run_local_mirror_sync_redownloads_same_size_object_with_new_etag(
+    monkeypatch,
+    tmp_path,
+):
+    """サイズが同じでも ETag が変わった再 compaction 済みファイルは取り直す。"""
+    # Arrange
+    local_root = tmp_path / "parquet"
+    existing = local_root / SPOTIFY_KEY
+    existing.parent.mkdir(parents=True)
+    existing.write_bytes(b"old")
+    save_mirror_manifest(
+        local_root / MIRROR_MANIFEST_NAME,
+        {SPOTIFY_KEY: _manifest_entry('"sp-1"', 3)},
+    )
+    _use_client(monkeypatch, _FakeS3Client(objects={SPOTIFY_KEY: ('"sp-2"', b"new")}))
+
+    # Act
+    result = run_local_mirror_sync(r2_config=_r2_config(local_root))
+
+    # Assert
+    assert result.downloaded_count == 1
+    assert result.skipped_count == 0
+    assert (resolve_mirror_root(local_root) / SPOTIFY_KEY).read_bytes() == b"new"
+
+
+def test_run_local_mirror_sync_resumes_partial_download(monkeypatch, tmp_path):
+    """同じ ETag の途中ファイルがあれば Range 指定で続きだけ取得する。"""
+    # Arrange
+    local_root = tmp_path / "parquet"
+    destination = generation_dir(local_root, 1) / SPOTIFY_KEY
+    destination.parent.mkdir(parents=True)
+    partial = destination.with_name(f"{destination.name}.sp1.part")
+    partial.write_bytes(b"0123")
+    fake_client = _FakeS3Client(objects={SPOTIFY_KEY: ('"sp-1"', b"0123456789")})
+    _use_client(monkeypatch, fake_client)
+
+    # Act
+    result = run_local_mirror_sync(r2_config=_r2_config(local_root))
+
+    # Assert
+    assert fake_client.get_requests[0]["Range"] == "bytes=4-"
+    assert result.bytes_transferred == 6
+    assert read_current_version(local_root) == 1
+    assert destination.read_bytes() == b"0123456789"
+    assert not partial.exists()
+
+
+def test_run_local_mirror_sync_prunes_keys_removed_from_r2(monkeypatch, tmp_path):
+    """R2 から消えたキーのローカルファイルと manifest エントリを削除する。"""
+    # Arrange
+    local_root = tmp_path / "parquet"
+    stale = local_root / GITHUB_KEY
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"stale")
+    save_mirror_manifest(
+        local_root / MIRROR_MANIFEST_NAME,
+        {GITHUB_KEY: _manifest_entry('"gh-1"', 5)},
+    )
+    _use_client(monkeypatch, _FakeS3Client(objects={SPOTIFY_KEY: ('"sp-1"', b"new")}))
+
+    # Act
+    result = run_local_mirror_sync(r2_config=_r2_config(local_root))
+
+    # Assert
+    assert result.deleted_count == 1
+    assert not stale.exists()
+    assert not (resolve_mirror_root(local_root) / GITHUB_KEY).exists()
+    manifest = json.loads((local_root / MIRROR_MANIFEST_NAME).read_text())
+    assert set(manifest["objects"]) == {SPOTIFY_KEY}
+
+
+def test_run_local_mirror_sync_publishes_new_generation_only_on_change(
+    monkeypatch,
+    tmp_path,
+):
+    """変更があれば未変更ファイルをハードリンクした新世代を公開する。"""
+    # Arrange
+    local_root = tmp_path / "parquet"
+    objects = {
+        GITHUB_KEY: ('"gh-1"', b"commits"),
+        SPOTIFY_KEY: ('"sp-1"', b"plays"),
     }
+    _use_client(monkeypatch, _FakeS3Client(objects=objects))
+    first = run_local_mirror_sync(r2_config=_r2_config(local_root))
+
+    # Act
+    unchanged = run_local_mirror_sync(r2_config=_r2_config(local_root))
+    objects[SPOTIFY_KEY] = ('"sp-2"', b"plays-v2")
+    changed = run_local_mirror_sync(r2_config=_r2_config(local_root))
+
+    # Assert
+    assert (first.dataset_version, unchanged.dataset_version) == (1, 1)
+    assert unchanged.downloaded_count == 0
+    assert changed.dataset_version == 2
+    assert changed.bytes_transferred == len(b"plays-v2")
+    old_gen = generation_dir(local_root, 1)
+    new_gen = generation_dir(local_root, 2)
+    assert (old_gen / SPOTIFY_KEY).read_bytes() == b"plays"
+    assert (new_gen / SPOTIFY_KEY).read_bytes() == b"plays-v2"
+    assert (new_gen / GITHUB_KEY).stat().st_ino == (old_gen / GITHUB_KEY).stat().st_ino
+    assert resolve_mirror_root(local_root) == new_gen
+
+
+def test_run_local_mirror_sync_keeps_only_recent_generations(monkeypatch, tmp_path):
+    """公開済み世代は直近 2 世代だけ残す。"""
+    # Arrange
+    local_root = tmp_path / "parquet"
+    objects = {SPOTIFY_KEY: ('"sp-1"', b"v1")}
+    _use_client(monkeypatch, _FakeS3Client(objects=objects))
+
+    # Act
+    for index in range(1, 4):
+        objects[SPOTIFY_KEY] = (f'"sp-{index}"', f"v{index}".encode())
+        run_local_mirror_sync(r2_config=_r2_config(local_root))
+
+    # Assert
+    assert read_current_version(local_root) == 3
+    assert not generation_dir(local_root, 1).exists()
+    assert generation_dir(local_root, 2).exists()
@@ -0,0 +1,179 @@
+"""Local warehouse refresh pipeline tests."""
+
+import os
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+from pipelines.sources.local_warehouse.pipeline import refresh_local_warehouse
+
+PLAYS_DIR = "compacted/events/spotify/plays"
+TRACKS_DIR = "compacted/master/spotify/tracks"
+
+
+def _write_month(root: Path, dataset_dir: str, year: int, month: int, df) -> Path:
+    path = root / dataset_dir / f"year={year}" / f"month={month:02d}" / "data.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(path)
+    return path
+
+
+def _plays(*play_ids: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "play_id": list(play_ids),
+            "played_at_utc": pd.to_datetime(["2026-04-01 10:00:00"] * len(play_ids)),
+            "track_id": ["t1"] * len(play_ids),
+            "track_name": ["Song"] * len(play_ids),
+            "artist_ids": [["a1"]] * len(play_ids),
+            "artist_names": [["Artist"]] * len(play_ids),
+            "album_id": ["al1"] * len(play_ids),
+            "album_name": ["Album"] * len(play_ids),
+            "ms_played": [1000] * len(play_ids),
+            "context_type": [None] * len(play_ids),
+            "popularity": [10] * len(play_ids),
+        }
+    )
+
+
+def _query(warehouse: Path, sql: str):
+    conn = duckdb.connect(str(warehouse), read_only=True)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_refresh_loads_all_months_on_first_run(tmp_path):
+    """初回は全 compacted 月を取り込み、インデックスを作成する。"""
+    # Arrange
+    mirror = tmp_path / "parquet"
+    warehouse = tmp_path / "analytics.duckdb"
+    _write_month(mirror, PLAYS_DIR, 2026, 3, _plays("p1"))
+    _write_month(mirror, PLAYS_DIR, 2026, 4, _plays("p2", "p3"))
+
+    # Act
+    result = refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+
+    # Assert
+    assert result.loaded_partitions == (
+        "events.spotify_plays:2026-03",
+        "events.spotify_plays:2026-04",
+    )
+    assert _query(
+        warehouse,
+        "SELECT _month, COUNT(*) FROM events.spotify_plays GROUP BY 1 ORDER BY 1",
+    ) == [(3, 1), (4, 2)]
+    indexes = _query(
+        warehouse,
+        "SELECT index_name FROM duckdb_indexes() ORDER BY index_name",
+    )
+    assert indexes == [("idx_plays_time",), ("idx_plays_track",)]
+
+
+def test_refresh_reloads_only_changed_months(tmp_path):
+    """変更された月だけを入れ替え、未変更の月はスキップする。"""
+    # Arrange
+    mirror = tmp_path / "parquet"
+    warehouse = tmp_path / "analytics.duckdb"
+    _write_month(mirror, PLAYS_DIR, 2026, 3, _plays("p1"))
+    april = _write_month(mirror, PLAYS_DIR, 2026, 4, _plays("p2"))
+    refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+
+    _write_month(mirror, PLAYS_DIR, 2026, 4, _plays("p2", "p4"))
+    stat = april.stat()
+    os.utime(april, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    # Act
+    result = refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+
+    # Assert
+    assert result.loaded_partitions == ("events.spotify_plays:2026-04",)
+    assert result.skipped_count == 1
+    assert _query(
+        warehouse, "SELECT play_id FROM events.spotify_plays ORDER BY play_id"
+    ) == [("p1",), ("p2",), ("p4",)]
+
+
+def test_refresh_is_noop_when_nothing_changed(tmp_path):
+    """変更が無ければ warehouse ファイルを書き換えない。"""
+    # Arrange
+    mirror = tmp_path / "parquet"
+    warehouse = tmp_path / "analytics.duckdb"
+    _write_month(mirror, PLAYS_DIR, 2026, 4, _plays("p1"))
+    refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+    inode = warehouse.stat().st_ino
+
+    # Act
+    result = refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+
+    # Assert
+    assert result.loaded_partitions == ()
+    assert result.refreshed_at is None
+    assert warehouse.stat().st_ino == inode
+
+
+def test_refresh_removes_months_deleted_from_mirror(tmp_path):
+    """mirror から消えた月の行を warehouse からも削除する。"""
+    # Arrange
+    mirror = tmp_path / "parquet"
+    warehouse = tmp_path / "analytics.duckdb"
+    _write_month(mirror, PLAYS_DIR, 2026, 3, _plays("p1"))
+    april = _write_month(mirror, PLAYS_DIR, 2026, 4, _plays("p2"))
+    refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+    april.unlink()
+
+    # Act
+    result = refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+
+    # Assert
+    assert result.removed_partitions == ("events.spotify_plays:2026-04",)
+    assert _query(warehouse, "SELECT play_id FROM events.spotify_plays") == [("p1",)]
+
+
+def test_refresh_creates_spotify_enriched_view_with_latest_master(tmp_path):
+    """master は最新月の行を採用した enriched view を作成する。"""
+    # Arrange
+    mirror = tmp_path / "parquet"
+    warehouse = tmp_path / "analytics.duckdb"
+    _write_month(mirror, PLAYS_DIR, 2026, 4, _plays("p1"))
+    for month, popularity in ((3, 10), (4, 90)):
+        _write_month(
+            mirror,
+            TRACKS_DIR,
+            2026,
+            month,
+            pd.DataFrame(
+                {
+                    "track_id": ["t1"],
+                    "duration_ms": [1000],
+                    "popularity": [popularity],
+                    "explicit": [False],
+                    "preview_url": [None],
+                }
+            ),
+        )
+    _write_month(
+        mirror,
+        "compacted/master/spotify/artists",
+        2026,
+        4,
+        pd.DataFrame(
+            {
+                "artist_id": ["a1"],
+                "name": ["Artist"],
+                "genres": [["pop"]],
+                "popularity": [50],
+                "followers_total": [100],
+            }
+        ),
+    )
+
+    # Act
+    refresh_local_warehouse(local_root=mirror, warehouse_path=warehouse)
+
+    # Assert
+    assert _query(
+        warehouse,
+        "SELECT play_id, track_popularity, genres FROM mart.spotify_plays_enriched",
+    ) == [("p1", 90, ["pop"])]
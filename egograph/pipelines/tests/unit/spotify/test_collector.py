@@ -1,11 +1,16 @@
 """Spotify コレクタのテスト。"""
 
+import json
 import re
 
+import pytest
 import responses
-
 from pipelines.sources.common.utils import iso8601_to_unix_ms
-from pipelines.sources.spotify.collector import SpotifyCollector
+from pipelines.sources.spotify.collector import (
+    SpotifyCollector,
+    playlist_snapshot_state,
+)
+from pipelines.sources.spotify.throttle import SpotifyThrottle
 from pipelines.tests.fixtures.spotify_responses import (
     INCREMENTAL_TEST_TIMESTAMPS,
     get_mock_recently_played,
@@ -284,3 +289,152 @@ def test_get_artists_success():
     assert len(result) == 2
     assert result[0]["id"] == "artist1"
     assert result[1]["name"] == "Artist B"
+
+
+@responses.activate
+def test_get_tracks_concurrent_chunks_preserve_order():
+    """チャンクを並列取得しても入力順で結果を返すことをテストする。"""
+    # Arrange: ids パラメータの順にトラックを返すようにモック
+    responses.add(
+        responses.POST,
+        "https://accounts.spotify.com/api/token",
+        json={"access_token": "mock_token", "expires_in": 3600, "token_type": "Bearer"},
+        status=200,
+    )
+
+    def tracks_callback(request):
+        ids = request.params["ids"].split(",")
+        return 200, {}, json.dumps({"tracks": [{"id": i} for i in ids]})
+
+    responses.add_callback(
+        responses.GET,
+        re.compile(r"https://api.spotify.com/v1/tracks.*"),
+        callback=tracks_callback,
+    )
+    track_ids = [f"track{i}" for i in range(120)]
+    collector = SpotifyCollector(
+        client_id="test_client_id",
+        client_secret="test_client_secret",
+        refresh_token="test_refresh_token",
+        max_concurrency=3,
+    )
+
+    # Act: 3 チャンク分のトラックを取得
+    result = collector.get_tracks(track_ids)
+
+    # Assert: 入力順が保たれていることを検証
+    assert [track["id"] for track in result] == track_ids
+
+
+@responses.activate
+def test_get_artists_retries_after_rate_limit():
+    """実際の 429 応答の Retry-After だけ待機して再試行することをテストする。"""
+    # Arrange: 1回目は 429、2回目は成功するようにモック
+    clock = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    responses.add(
+        responses.POST,
+        "https://accounts.spotify.com/api/token",
+        json={"access_token": "mock_token", "expires_in": 3600, "token_type": "Bearer"},
+        status=200,
+    )
+    artists_url = re.compile(r"https://api.spotify.com/v1/artists.*")
+    responses.add(
+        responses.GET,
+        artists_url,
+        json={"error": {"status": 429, "message": "API rate limit exceeded"}},
+        status=429,
+        headers={"Retry-After": "17"},
+    )
+    responses.add(
+        responses.GET,
+        artists_url,
+        json={"artists": [{"id": "artist1", "name": "Artist 1"}]},
+        status=200,
+    )
+    collector = SpotifyCollector(
+        client_id="test_client_id",
+        client_secret="test_client_secret",
+        refresh_token="test_refresh_token",
+        throttle=SpotifyThrottle(100.0, 10, clock=lambda: clock[0], sleep=fake_sleep),
+    )
+
+    # Act: アーティストを取得
+    result = collector.get_artists(["artist1"])
+
+    # Assert: 既定値ではなく応答ヘッダーの Retry-After だけ待機したことを検証
+    assert [artist["id"] for artist in result] == ["artist1"]
+    assert sum(sleeps) == pytest.approx(17.0)
+
+
+@responses.activate
+def test_get_playlists_with_tracks_skips_unchanged_snapshots():
+    """snapshot_id が同じプレイリストのトラックを再取得しないことをテストする。"""
+    # Arrange: 変更なし/変更ありのプレイリストをモック
+    responses.add(
+        responses.POST,
+        "https://accounts.spotify.com/api/token",
+        json={"access_token": "mock_token", "expires_in": 3600, "token_type": "Bearer"},
+        status=200,
+    )
+    responses.add(
+        responses.GET,
+        re.compile(r"https://api.spotify.com/v1/me/playlists.*"),
+        json={
+            "items": [
+                {"id": "unchanged", "name": "Old", "snapshot_id": "snap-1"},
+                {"id": "changed", "name": "New", "snapshot_id": "snap-3"},
+            ],
+            "next": None,
+        },
+        status=200,
+    )
+    changed_tracks_call = responses.add(
+        responses.GET,
+        re.compile(r"https://api.spotify.com/v1/playlists/changed/items.*"),
+        json={"items": [{"track": {"id": "fresh"}}], "next": None},
+        status=200,
+    )
+    unchanged_tracks_call = responses.add(
+        responses.GET,
+        re.compile(r"https://api.spotify.com/v1/playlists/unchanged/items.*"),
+        json={"items": [], "next": None},
+        status=200,
+    )
+    collector = SpotifyCollector(
+        client_id="test_client_id",
+        client_secret="test_client_secret",
+        refresh_token="test_refresh_token",
+    )
+    known = {
+        "unchanged": {
+            "snapshot_id": "snap-1",
+            "full_tracks": [{"track": {"id": "cached"}}],
+        },
+        "changed": {"snapshot_id": "snap-2", "full_tracks": []},
+    }
+
+    # Act: 前回の snapshot 状態を渡して取得
+    result = collector.get_playlists_with_tracks(known_playlists=known)
+
+    # Assert: 変更されたプレイリストだけトラックを取得していることを検証
+    assert unchanged_tracks_call.call_count == 0
+    assert changed_tracks_call.call_count == 1
+    tracks_by_id = {p["id"]: p["full_tracks"] for p in result}
+    assert tracks_by_id["unchanged"] == [{"track": {"id": "cached"}}]
+    assert tracks_by_id["changed"] == [{"track": {"id": "fresh"}}]
+    assert playlist_snapshot_state(result) == {
+        "unchanged": {
+            "snapshot_id": "snap-1",
+            "full_tracks": [{"track": {"id": "cached"}}],
+        },
+        "changed": {
+            "snapshot_id": "snap-3",
+            "full_tracks": [{"track": {"id": "fresh"}}],
+        },
+    }
@@ -0,0 +1,131 @@
+"""Spotify マスター ID インデックスのテスト。"""
+
+import sqlite3
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from pipelines.sources.spotify import ingest_pipeline
+from pipelines.sources.spotify.master_index import SpotifyMasterIdIndex
+
+SCOPE = "test-bucket/master/spotify"
+
+
+def _r2_conf():
+    return SimpleNamespace(bucket_name="test-bucket", master_path="master/")
+
+
+def _items(*pairs: tuple[str, str]) -> list[dict]:
+    return [
+        {"track": {"id": track_id, "artists": [{"id": artist_id}]}}
+        for track_id, artist_id in pairs
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = SpotifyMasterIdIndex(tmp_path / "ids.sqlite3")
+    yield idx
+    idx.close()
+
+
+def test_index_is_not_current_until_rebuilt(index):
+    """未構築のインデックスは再構築対象になる。"""
+    # Arrange / Act
+    before = index.is_current(SCOPE)
+    index.rebuild(SCOPE, ["t1"], ["a1"])
+
+    # Assert
+    assert before is False
+    assert index.is_current(SCOPE) is True
+    assert index.is_current("other-bucket/master/spotify") is False
+
+
+def test_index_detects_version_mismatch(tmp_path, index):
+    """保存されたバージョンが異なる場合は再構築対象になる。"""
+    # Arrange
+    index.rebuild(SCOPE, ["t1"], [])
+    conn = sqlite3.connect(tmp_path / "ids.sqlite3")
+    conn.execute("UPDATE index_meta SET value = '0' WHERE key = 'version'")
+    conn.commit()
+    conn.close()
+
+    # Act / Assert
+    assert index.is_current(SCOPE) is False
+
+
+def test_find_existing_separates_kinds(index):
+    """トラックとアーティストの ID を区別して検索する。"""
+    # Arrange
+    index.rebuild(SCOPE, ["t1"], ["a1"])
+    index.add("track", ["t2"])
+
+    # Act
+    tracks = index.find_existing("track", ["t1", "t2", "t3", "a1"])
+    artists = index.find_existing("artist", ["a1", "t1"])
+
+    # Assert
+    assert tracks == {"t1", "t2"}
+    assert artists == {"a1"}
+
+
+def test_enrich_master_data_rebuilds_index_once_and_then_reads_locally(
+    monkeypatch, index
+):
+    """初回のみ R2 から再構築し、以降はローカルインデックスで差分判定する。"""
+    # Arrange
+    load_from_r2 = MagicMock(return_value=({"t1"}, {"a1"}))
+    monkeypatch.setattr(ingest_pipeline, "_load_existing_master_ids", load_from_r2)
+    collector = MagicMock()
+    collector.get_tracks.return_value = [{"id": "t2", "artists": []}]
+    collector.get_artists.return_value = [{"id": "a2"}]
+    storage = MagicMock()
+    storage.save_master_parquet.return_value = "master/key.parquet"
+
+    # Act
+    ingest_pipeline.enrich_master_data(
+        _items(("t1", "a1"), ("t2", "a2")),
+        collector,
+        storage,
+        _r2_conf(),
+        id_index=index,
+    )
+    collector.reset_mock()
+    ingest_pipeline.enrich_master_data(
+        _items(("t2", "a2")),
+        collector,
+        storage,
+        _r2_conf(),
+        id_index=index,
+    )
+
+    # Assert
+    load_from_r2.assert_called_once()
+    collector.get_tracks.assert_not_called()
+    collector.get_artists.assert_not_called()
+    assert index.find_existing("track", ["t1", "t2"]) == {"t1", "t2"}
+
+
+def test_enrich_master_data_does_not_index_failed_saves(monkeypatch, index):
+    """マスター保存に失敗した ID はインデックスに追加しない。"""
+    # Arrange
+    index.rebuild(SCOPE, [], [])
+    collector = MagicMock()
+    collector.get_tracks.return_value = [{"id": "t1", "artists": []}]
+    collector.get_artists.return_value = [{"id": "a1"}]
+    storage = MagicMock()
+    storage.save_master_parquet.return_value = None
+
+    # Act
+    with pytest.raises(RuntimeError):
+        ingest_pipeline.enrich_master_data(
+            _items(("t1", "a1")),
+            collector,
+            storage,
+            _r2_conf(),
+            id_index=index,
+        )
+
+    # Assert
+    assert index.find_existing("track", ["t1"]) == set()
+    assert index.find_existing("artist", ["a1"]) == set()
@@ -0,0 +1,71 @@
+"""Spotify スロットリングのテスト。"""
+
+import pytest
+import spotipy
+from pipelines.sources.spotify.throttle import SpotifyThrottle
+
+
+class FakeClock:
+    """sleep で進む疑似時計。"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _rate_limited(retry_after: str | None) -> spotipy.SpotifyException:
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return spotipy.SpotifyException(429, -1, "rate limited", headers=headers)
+
+
+def test_acquire_waits_for_refill_after_burst():
+    """burst を使い切ると補充レートに従って待機する。"""
+    # Arrange
+    clock = FakeClock()
+    throttle = SpotifyThrottle(2.0, 2, clock=clock, sleep=clock.sleep)
+
+    # Act
+    waits = [throttle.acquire() for _ in range(3)]
+
+    # Assert
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.5)
+
+
+def test_call_raises_non_rate_limit_errors_immediately():
+    """429 以外のエラーは再試行せず送出する。"""
+    # Arrange
+    clock = FakeClock()
+    throttle = SpotifyThrottle(clock=clock, sleep=clock.sleep)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise spotipy.SpotifyException(500, -1, "server error")
+
+    # Act / Assert
+    with pytest.raises(spotipy.SpotifyException):
+        throttle.call(fetch)
+    assert len(calls) == 1
+
+
+def test_call_gives_up_after_max_rate_limit_retries():
+    """429 が続く場合は上限回数で諦める。"""
+    # Arrange
+    clock = FakeClock()
+    throttle = SpotifyThrottle(max_rate_limit_retries=2, clock=clock, sleep=clock.sleep)
+
+    def fetch():
+        raise _rate_limited(None)
+
+    # Act / Assert
+    with pytest.raises(spotipy.SpotifyException):
+        throttle.call(fetch)
+    assert sum(clock.sleeps) == pytest.approx(10.0)
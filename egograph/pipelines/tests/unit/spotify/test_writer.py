@@ -102,3 +102,34 @@ def test_play_id_generation(temp_db):
     # （タイムスタンプと track_id）が含まれていることを検証
     assert "2025-12-14T02:30:00.000Z" in play_id
     assert "3n3Ppam7vgaVa1iaRUc9Lp" in play_id
+
+
+def test_upsert_plays_deduplicates_within_batch(temp_db):
+    """同一バッチ内の重複 play_id を1件にまとめて一括 upsert する。"""
+    # Arrange: 同じ再生を重複させたデータの準備
+    writer = SpotifyDuckDBWriter(temp_db)
+    items = get_mock_recently_played(2)["items"]
+
+    # Act: 重複を含むバッチでアップサートを実行
+    count = writer.upsert_plays(items + items)
+
+    # Assert: ユニークな再生のみ挿入されていることを検証
+    assert count == 2
+    result = temp_db.execute("SELECT COUNT(*) FROM raw.spotify_plays").fetchone()
+    assert result[0] == 2
+
+
+def test_upsert_tracks_replaces_existing_values(temp_db):
+    """既存楽曲を再度 upsert すると最新の値で置き換えられる。"""
+    # Arrange: 楽曲を挿入した後に人気度を変更したデータを用意
+    writer = SpotifyDuckDBWriter(temp_db)
+    items = get_mock_recently_played(1)["items"]
+    writer.upsert_tracks(items)
+    items[0]["track"]["popularity"] = 1
+
+    # Act: 変更後のデータで再度アップサート
+    writer.upsert_tracks(items)
+
+    # Assert: 行数は変わらず値が更新されていることを検証
+    rows = temp_db.execute("SELECT popularity FROM mart.spotify_tracks").fetchall()
+    assert rows == [(1,)]
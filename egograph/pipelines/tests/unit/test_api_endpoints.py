@@ -132,3 +132,41 @@ def test_cancel_run_idempotent_for_non_queued_run(tmp_path):
         cancel_again = client.post(f"/v1/runs/{run_id}/cancel")
         assert cancel_again.status_code == 200
         assert cancel_again.json()["status"] == "canceled"
+
+
+def test_list_runs_paginates_with_next_cursor_header(tmp_path):
+    """limit を超える run があれば X-Next-Cursor で次ページを辿れる。"""
+    with _build_client(tmp_path) as client:
+        for _ in range(3):
+            client.post("/v1/workflows/spotify_ingest_workflow/runs")
+
+        first = client.get("/v1/runs", params={"limit": 2})
+        assert first.status_code == 200
+        assert len(first.json()) == 2
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get("/v1/runs", params={"limit": 2, "cursor": cursor})
+        assert second.status_code == 200
+        assert len(second.json()) == 1
+        assert "X-Next-Cursor" not in second.headers
+
+
+def test_list_runs_filters_by_status(tmp_path):
+    """status query で run を絞り込める。"""
+    with _build_client(tmp_path) as client:
+        run_id = client.post("/v1/workflows/spotify_ingest_workflow/runs").json()[
+            "run_id"
+        ]
+        client.post(f"/v1/runs/{run_id}/cancel")
+        client.post("/v1/workflows/spotify_ingest_workflow/runs")
+
+        response = client.get("/v1/runs", params={"status": "canceled"})
+        assert response.status_code == 200
+        assert [run["run_id"] for run in response.json()] == [run_id]
+
+
+def test_list_runs_400_for_invalid_cursor(tmp_path):
+    """不正な cursor は 400 を返す。"""
+    with _build_client(tmp_path) as client:
+        response = client.get("/v1/runs", params={"cursor": "broken"})
+        assert response.status_code == 400
@@ -9,6 +9,7 @@ from pydantic import SecretStr
 from pipelines.sources.common.bootstrap_compact import (
     _compact_browser_history,
     _compact_github,
+    _compact_google_activity,
     _compact_spotify,
     main,
 )
@@ -139,6 +140,66 @@ class TestCompactBrowserHistory:
         assert storage.compact_month.call_count == 2
 
 
+class TestCompactGoogleActivity:
+    """_compact_google_activity tests."""
+
+    def test_compacts_events_and_masters_from_their_roots(self, monkeypatch):
+        storage = Mock()
+        discovered_months = {
+            ("events/", "youtube/watch_history"): [(2024, 1), (2024, 2)],
+            ("master/", "youtube/videos"): [(2024, 2)],
+            ("master/", "youtube/channels"): [],
+        }
+        monkeypatch.setattr(
+            "pipelines.sources.common.bootstrap_compact._discover_dataset_months",
+            lambda s3, bucket_name, root_prefix, dataset: discovered_months[
+                (root_prefix, dataset.dataset_path)
+            ],
+        )
+
+        failures = _compact_google_activity(
+            s3_client=object(),
+            bucket_name="egograph",
+            events_path="events/",
+            master_path="master/",
+            storage=storage,
+        )
+
+        assert failures == []
+        assert [
+            (call.kwargs["dataset_path"], call.kwargs["dedupe_key"])
+            for call in storage.compact_month.call_args_list
+        ] == [
+            ("youtube/watch_history", "watch_id"),
+            ("youtube/watch_history", "watch_id"),
+            ("youtube/videos", "video_id"),
+        ]
+        assert [
+            call.args for call in storage.migrate_unpartitioned_master.call_args_list
+        ] == [("youtube/videos",), ("youtube/channels",)]
+
+    def test_records_failure_when_legacy_master_migration_fails(self, monkeypatch):
+        storage = Mock()
+        storage.migrate_unpartitioned_master.side_effect = [
+            RuntimeError("boom"),
+            [],
+        ]
+        monkeypatch.setattr(
+            "pipelines.sources.common.bootstrap_compact._discover_dataset_months",
+            lambda s3, bucket_name, root_prefix, dataset: [],
+        )
+
+        failures = _compact_google_activity(
+            s3_client=object(),
+            bucket_name="egograph",
+            events_path="events/",
+            master_path="master/",
+            storage=storage,
+        )
+
+        assert failures == ["google_activity:youtube/videos:legacy"]
+
+
 class TestMain:
     """main tests."""
 
@@ -158,6 +219,11 @@ class TestMain:
         spotify_compact = Mock(return_value=[])
         github_compact = Mock(return_value=[])
         browser_history_compact = Mock(return_value=[])
+        google_activity_compact = Mock(return_value=[])
+        monkeypatch.setattr(
+            "pipelines.sources.common.bootstrap_compact._compact_google_activity",
+            google_activity_compact,
+        )
         monkeypatch.setattr(
             "pipelines.sources.common.bootstrap_compact._compact_spotify",
             spotify_compact,
@@ -188,6 +254,7 @@ class TestMain:
         spotify_compact.assert_called_once()
         github_compact.assert_not_called()
         browser_history_compact.assert_not_called()
+        google_activity_compact.assert_not_called()
 
     def test_raises_when_any_provider_fails(self, monkeypatch):
         monkeypatch.setattr(
@@ -214,6 +281,10 @@ class TestMain:
             "pipelines.sources.common.bootstrap_compact._compact_browser_history",
             Mock(return_value=[]),
         )
+        monkeypatch.setattr(
+            "pipelines.sources.common.bootstrap_compact._compact_google_activity",
+            Mock(return_value=[]),
+        )
         monkeypatch.setattr(
             "pipelines.sources.common.bootstrap_compact.SpotifyStorage",
             Mock(),
@@ -226,6 +297,10 @@ class TestMain:
             "pipelines.sources.common.bootstrap_compact.BrowserHistoryStorage",
             Mock(),
         )
+        monkeypatch.setattr(
+            "pipelines.sources.common.bootstrap_compact.YouTubeStorage",
+            Mock(),
+        )
 
         with pytest.raises(RuntimeError, match="spotify:spotify/plays:2024-01"):
             main()
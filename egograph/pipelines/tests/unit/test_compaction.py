@@ -5,9 +5,11 @@ from datetime import datetime, timezone
 import pandas as pd
 
 from pipelines.sources.common.compaction import (
+    build_changed_partitions,
     build_compacted_key,
     compact_records,
     discover_available_months,
+    parse_changed_partitions,
     resolve_target_months,
 )
 
@@ -38,6 +40,35 @@ class TestBuildCompactedKey:
         assert key == "compacted/master/spotify/tracks/year=2024/month=02/data.parquet"
 
 
+class TestChangedPartitions:
+    """build_changed_partitions / parse_changed_partitions tests."""
+
+    def test_round_trips_sorted_unique_partitions(self):
+        summary = {
+            "changed_partitions": build_changed_partitions(
+                [
+                    ("spotify/plays", 2026, 10),
+                    ("spotify/plays", 2026, 9),
+                    ("spotify/plays", 2026, 10),
+                ]
+            )
+        }
+
+        assert summary["changed_partitions"] == [
+            {"dataset": "spotify/plays", "year": 2026, "month": 9},
+            {"dataset": "spotify/plays", "year": 2026, "month": 10},
+        ]
+        assert parse_changed_partitions(summary) == {
+            ("spotify/plays", 2026, 9),
+            ("spotify/plays", 2026, 10),
+        }
+
+    def test_distinguishes_missing_and_empty_declaration(self):
+        assert parse_changed_partitions({"status": "succeeded"}) is None
+        assert parse_changed_partitions(None) is None
+        assert parse_changed_partitions({"changed_partitions": []}) == set()
+
+
 class TestCompactRecords:
     """compact_records tests."""
 
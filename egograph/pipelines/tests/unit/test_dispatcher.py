@@ -29,7 +29,13 @@ from pipelines.infrastructure.execution.subprocess_executor import (
 )
 
 
-def _build_dispatcher(tmp_path, workflows, *, max_concurrent_runs=1):
+def _build_dispatcher(
+    tmp_path,
+    workflows,
+    *,
+    max_concurrent_runs=1,
+    reserved_priority_slots=0,
+):
     conn = connect(tmp_path / "state.sqlite3")
     initialize_schema(conn)
     db_mutex = threading.RLock()
@@ -49,6 +55,7 @@ def _build_dispatcher(tmp_path, workflows, *, max_concurrent_runs=1):
         poll_seconds=0.01,
         heartbeat_seconds=60,
         max_concurrent_runs=max_concurrent_runs,
+        reserved_priority_slots=reserved_priority_slots,
     )
     return run_repository, step_run_repository, dispatcher, lock_manager
 
@@ -176,6 +183,122 @@ def test_dispatch_once_executes_step_with_run_summary_context(tmp_path):
     }
 
 
+def test_dispatch_once_resumes_from_step_and_records_reused_steps(tmp_path):
+    """resume run は指定 step から実行し、前段 step は再利用として記録する。"""
+    # Arrange
+    workflow = WorkflowDefinition(
+        workflow_id="resumable_workflow",
+        name="Resumable workflow",
+        description="Resumable workflow",
+        steps=(
+            StepDefinition(
+                step_id="ingest",
+                step_name="Ingest",
+                executor_type=StepExecutorType.INPROCESS,
+                callable_ref="pipelines.tests.support.dummy_steps:fail",
+            ),
+            StepDefinition(
+                step_id="compact",
+                step_name="Compact",
+                executor_type=StepExecutorType.INPROCESS,
+                callable_ref="pipelines.tests.support.dummy_steps:echo_run_summary",
+                resumable=True,
+            ),
+        ),
+    )
+    run_repository, step_run_repository, dispatcher, _ = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+    )
+    run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.RETRY,
+        queued_reason=QueuedReason.RETRY_REQUEST,
+        parent_run_id="parent-run",
+        result_summary={"plays_saved": 12},
+        resume_from_step_id="compact",
+    )
+
+    # Act
+    dispatched = dispatcher.dispatch_once()
+
+    # Assert
+    steps = step_run_repository.list_step_runs(run.run_id)
+    assert dispatched is True
+    assert run_repository.get_run(run.run_id).status == WorkflowRunStatus.SUCCEEDED
+    assert [(step.step_id, step.status) for step in steps] == [
+        ("ingest", StepRunStatus.SKIPPED),
+        ("compact", StepRunStatus.SUCCEEDED),
+    ]
+    assert steps[0].stdout_tail == "reused output of parent run parent-run"
+    assert steps[1].result_summary == {"plays_saved": 12}
+
+
+def test_dispatch_once_fails_run_when_resume_step_is_missing(tmp_path):
+    """resume 先 step が workflow 定義に無い run は failed にする。"""
+    # Arrange
+    workflow = _shared_lock_workflow()
+    run_repository, _, dispatcher, _ = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+    )
+    run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.RETRY,
+        queued_reason=QueuedReason.RETRY_REQUEST,
+        resume_from_step_id="removed_step",
+    )
+
+    # Act
+    dispatcher.dispatch_once()
+
+    # Assert
+    failed = run_repository.get_run(run.run_id)
+    assert failed.status == WorkflowRunStatus.FAILED
+    assert failed.last_error_message == "resume step not found: removed_step"
+
+
+def test_dispatch_once_passes_previous_step_summary_to_next_step(tmp_path):
+    """後続 step は前段 step の result_summary を merge した context を受け取る。"""
+    # Arrange
+    workflow = WorkflowDefinition(
+        workflow_id="chained_workflow",
+        name="Chained workflow",
+        description="Chained workflow",
+        steps=(
+            StepDefinition(
+                step_id="ingest",
+                step_name="Ingest",
+                executor_type=StepExecutorType.INPROCESS,
+                callable_ref="pipelines.tests.support.dummy_steps:succeed",
+            ),
+            StepDefinition(
+                step_id="compact",
+                step_name="Compact",
+                executor_type=StepExecutorType.INPROCESS,
+                callable_ref="pipelines.tests.support.dummy_steps:echo_run_summary",
+            ),
+        ),
+    )
+    run_repository, step_run_repository, dispatcher, _ = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+    )
+    run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+        result_summary={"requested": True},
+    )
+
+    # Act
+    dispatcher.dispatch_once()
+
+    # Assert
+    steps = step_run_repository.list_step_runs(run.run_id)
+    assert steps[1].result_summary == {"requested": True, "message": "ok"}
+
+
 def test_dispatch_once_requeues_run_when_lock_is_active(tmp_path):
     """同一 workflow lock が active なら run を failed にせず queued に戻す。"""
     # Arrange
@@ -350,9 +473,7 @@ def test_dispatch_once_marks_step_and_run_failed_on_unexpected_executor_error(tm
     assert steps[0].exit_code is None
 
 
-def test_dispatch_once_marks_run_failed_when_lock_manager_crashes(
-    tmp_path, caplog
-):
+def test_dispatch_once_marks_run_failed_when_lock_manager_crashes(tmp_path, caplog):
     """dispatch_once 想定外例外でも run を failed にして継続可能にする。"""
     workflows = {
         "dummy_workflow": WorkflowDefinition(
@@ -471,18 +592,13 @@ def test_start_runs_distinct_workflows_in_parallel(tmp_path):
             ):
                 saw_parallel_running = True
                 break
-            if (
-                current_a.status
-                in {
-                    WorkflowRunStatus.SUCCEEDED,
-                    WorkflowRunStatus.FAILED,
-                }
-                and current_b.status
-                in {
-                    WorkflowRunStatus.SUCCEEDED,
-                    WorkflowRunStatus.FAILED,
-                }
-            ):
+            if current_a.status in {
+                WorkflowRunStatus.SUCCEEDED,
+                WorkflowRunStatus.FAILED,
+            } and current_b.status in {
+                WorkflowRunStatus.SUCCEEDED,
+                WorkflowRunStatus.FAILED,
+            }:
                 break
             time.sleep(0.01)
 
@@ -570,7 +686,7 @@ def test_start_allows_other_workflow_to_progress_while_locked_run_is_requeued(
     free_after = run_repository.get_run(free_run.run_id)
 
     assert blocked_after.status == WorkflowRunStatus.QUEUED
-    assert blocked_after.last_error_message == "workflow lock is active: shared-lock"
+    assert blocked_after.last_error_message == "waiting for workflow lock: shared-lock"
     assert free_after.status == WorkflowRunStatus.SUCCEEDED
 
 
@@ -639,9 +755,166 @@ def test_dispatch_available_runs_skips_blocked_run_within_same_cycle(tmp_path):
     assert run_repository.get_run(free_run.run_id).status == WorkflowRunStatus.SUCCEEDED
 
 
-def test_heartbeat_loop_logs_warning_and_continues_after_exception(
-    tmp_path, caplog
-):
+def _shared_lock_workflow() -> WorkflowDefinition:
+    return WorkflowDefinition(
+        workflow_id="locked_workflow",
+        name="Locked workflow",
+        description="Locked workflow",
+        concurrency_key="shared-lock",
+        steps=(
+            StepDefinition(
+                step_id="sleep",
+                step_name="Sleep",
+                executor_type=StepExecutorType.INPROCESS,
+                callable_ref="pipelines.tests.support.dummy_steps:sleep_briefly",
+            ),
+        ),
+    )
+
+
+def test_dispatch_available_runs_parks_blocked_run_and_hands_off_lock(tmp_path):
+    """lock 待ち run は waiting で park され、release 時に requeue なしで実行される。"""
+    # Arrange
+    workflow = _shared_lock_workflow()
+    run_repository, _, dispatcher, lock_manager = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+        max_concurrent_runs=2,
+    )
+    first_run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+    second_run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+
+    # Act
+    try:
+        dispatcher._dispatch_available_runs()
+        parked = run_repository.get_run(second_run.run_id)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if (
+                run_repository.get_run(second_run.run_id).status
+                == WorkflowRunStatus.SUCCEEDED
+            ):
+                break
+            time.sleep(0.01)
+    finally:
+        dispatcher.stop()
+
+    # Assert
+    first_after = run_repository.get_run(first_run.run_id)
+    second_after = run_repository.get_run(second_run.run_id)
+    assert parked.status == WorkflowRunStatus.WAITING
+    assert parked.last_error_message == "waiting for workflow lock: shared-lock"
+    assert first_after.status == WorkflowRunStatus.SUCCEEDED
+    assert second_after.status == WorkflowRunStatus.SUCCEEDED
+    assert second_after.started_at >= first_after.finished_at
+    assert second_after.last_error_message is None
+    assert lock_manager.waiting_lock_keys() == []
+
+
+def test_take_handoff_skips_waiter_canceled_while_waiting(tmp_path):
+    """待機中に cancel された waiter には実行を引き渡さず lock を解放する。"""
+    # Arrange
+    workflow = _shared_lock_workflow()
+    run_repository, _, dispatcher, lock_manager = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+    )
+    run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+    held_lease = lock_manager.acquire(lock_key="shared-lock", run_id="other-run")
+    outcome = dispatcher._dispatch_once_in_background()
+    run_repository.cancel_run(run.run_id)
+
+    # Act
+    handoff = dispatcher._take_handoff(lock_manager.release(held_lease))
+
+    # Assert
+    assert outcome.parked is True
+    assert handoff is None
+    assert run_repository.get_run(run.run_id).status == WorkflowRunStatus.CANCELED
+    assert lock_manager.try_acquire(lock_key="shared-lock", run_id="next") is not None
+
+
+def test_stop_requeues_parked_runs(tmp_path):
+    """停止時は waiter queue に残った run を queued に戻す。"""
+    # Arrange
+    workflow = _shared_lock_workflow()
+    run_repository, _, dispatcher, lock_manager = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+    )
+    run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+    lock_manager.acquire(lock_key="shared-lock", run_id="other-run")
+    dispatcher._dispatch_once_in_background()
+
+    # Act
+    dispatcher.stop()
+
+    # Assert
+    assert run_repository.get_run(run.run_id).status == WorkflowRunStatus.QUEUED
+    assert lock_manager.waiting_lock_keys() == []
+
+
+def test_reserved_priority_slot_only_leases_event_runs(tmp_path):
+    """空き slot が予約枠だけのときは event lane の run だけを dispatch する。"""
+    # Arrange
+    workflow = _shared_lock_workflow()
+    run_repository, _, dispatcher, _ = _build_dispatcher(
+        tmp_path,
+        {workflow.workflow_id: workflow},
+        max_concurrent_runs=2,
+        reserved_priority_slots=1,
+    )
+    schedule_run = run_repository.enqueue_run(
+        workflow_id=workflow.workflow_id,
+        trigger_type=TriggerType.SCHEDULE,
+        queued_reason=QueuedReason.SCHEDULE_TICK,
+    )
+    busy_stop = threading.Event()
+    busy_worker = threading.Thread(target=busy_stop.wait, daemon=True)
+    busy_worker.start()
+    dispatcher._worker_threads["busy-run"] = busy_worker
+
+    # Act
+    try:
+        schedule_outcome = dispatcher._dispatch_once_in_background()
+        event_run = run_repository.enqueue_run(
+            workflow_id=workflow.workflow_id,
+            trigger_type=TriggerType.EVENT,
+            queued_reason=QueuedReason.EVENT_ENQUEUE,
+        )
+        event_outcome = dispatcher._dispatch_once_in_background()
+    finally:
+        busy_stop.set()
+        dispatcher.stop()
+
+    # Assert
+    assert schedule_outcome.dispatched is False
+    assert event_outcome.dispatched is True
+    assert run_repository.get_run(schedule_run.run_id).status == (
+        WorkflowRunStatus.QUEUED
+    )
+    assert run_repository.get_run(event_run.run_id).status == (
+        WorkflowRunStatus.SUCCEEDED
+    )
+
+
+def test_heartbeat_loop_logs_warning_and_continues_after_exception(tmp_path, caplog):
     """heartbeat 失敗でスレッドが黙死しない。"""
     _, _, dispatcher, _ = _build_dispatcher(tmp_path, {})
     lease = dispatcher._lock_manager.acquire(lock_key="dummy-lock", run_id="run-1")
@@ -666,6 +939,7 @@ def test_invoke_does_not_pass_workflow_run_to_non_workflow_run_params():
     AttributeError: 'WorkflowRun' object has no attribute 'spotify' で
     クラッシュしていた問題を防止する。
     """
+
     class FakeConfig:
         spotify = "loaded"
 
@@ -26,6 +26,55 @@ def test_acquire_blocks_active_lock_and_releases(tmp_path):
     assert next_lease.run_id == "run-2"
 
 
+def test_release_hands_lock_to_waiters_in_fifo_order(tmp_path):
+    """release 時は lock を削除せず先頭 waiter へ FIFO 順で引き渡す。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    lock_manager = WorkflowLockManager(conn, lease_seconds=60)
+    lease = lock_manager.acquire(lock_key="dummy_workflow", run_id="run-1")
+
+    # Act
+    waiting_2 = lock_manager.acquire_or_wait(lock_key="dummy_workflow", run_id="run-2")
+    waiting_3 = lock_manager.acquire_or_wait(lock_key="dummy_workflow", run_id="run-3")
+    handoff_2 = lock_manager.release(lease)
+    overtaking = lock_manager.try_acquire(lock_key="dummy_workflow", run_id="run-4")
+    handoff_3 = lock_manager.release(handoff_2)
+    final = lock_manager.release(handoff_3)
+
+    # Assert
+    assert waiting_2 is None
+    assert waiting_3 is None
+    assert handoff_2.run_id == "run-2"
+    assert overtaking is None
+    assert handoff_3.run_id == "run-3"
+    assert final is None
+    assert lock_manager.waiting_lock_keys() == []
+    assert (
+        lock_manager.try_acquire(lock_key="dummy_workflow", run_id="run-4") is not None
+    )
+
+
+def test_acquire_next_waiter_takes_lock_released_without_handoff(tmp_path):
+    """handoff されなかった lock は先頭 waiter が次回取得する。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    lock_manager = WorkflowLockManager(conn, lease_seconds=60)
+    lease = lock_manager.acquire(lock_key="dummy_workflow", run_id="run-1")
+    lock_manager.acquire_or_wait(lock_key="dummy_workflow", run_id="run-2")
+
+    # Act
+    blocked = lock_manager.acquire_next_waiter("dummy_workflow")
+    lock_manager.release(lease, handoff=False)
+    next_lease = lock_manager.acquire_next_waiter("dummy_workflow")
+
+    # Assert
+    assert blocked is None
+    assert next_lease.run_id == "run-2"
+    assert lock_manager.drain_waiters() == []
+
+
 def test_cleanup_stale_locks_removes_expired_lease(tmp_path):
     """期限切れ lease を startup reconcile で回収できる。"""
     # Arrange
@@ -2,13 +2,31 @@
 
 import inspect
 
-from pipelines.domain.workflow import WorkflowRun
+from datetime import UTC, datetime
+
+from pipelines.domain.workflow import (
+    QueuedReason,
+    TriggerType,
+    WorkflowRun,
+    WorkflowRunStatus,
+)
 from pipelines.infrastructure.execution.inprocess_executor import (
     InProcessStepExecutor,
 )
 from pipelines.workflows.registry import get_workflows
-from pipelines.sources.github.pipeline import run_github_compact, run_github_ingest
-from pipelines.sources.spotify.pipeline import run_spotify_compact, run_spotify_ingest
+from pipelines.sources.github.pipeline import (
+    compact_github_from_ingest_context,
+    run_github_compact,
+    run_github_ingest,
+)
+from pipelines.sources.google_activity.pipeline import (
+    compact_google_activity_from_ingest_context,
+)
+from pipelines.sources.spotify.pipeline import (
+    compact_spotify_from_ingest_context,
+    run_spotify_compact,
+    run_spotify_ingest,
+)
 from pipelines.sources.common.config import Config, DuckDBConfig, R2Config
 from pydantic import SecretStr
 
@@ -32,6 +50,7 @@ def test_run_spotify_ingest_delegates_to_existing_pipeline(monkeypatch):
 
     def fake_run_pipeline(config):
         called["config"] = config
+        return {("spotify/plays", 2026, 4), ("spotify/tracks", 2026, 4)}
 
     monkeypatch.setattr(
         "pipelines.sources.spotify.pipeline._run_ingest_pipeline",
@@ -45,6 +64,10 @@ def test_run_spotify_ingest_delegates_to_existing_pipeline(monkeypatch):
         "provider": "spotify",
         "operation": "ingest",
         "status": "succeeded",
+        "changed_partitions": [
+            {"dataset": "spotify/plays", "year": 2026, "month": 4},
+            {"dataset": "spotify/tracks", "year": 2026, "month": 4},
+        ],
     }
 
 
@@ -54,6 +77,7 @@ def test_run_github_ingest_delegates_to_existing_pipeline(monkeypatch):
 
     def fake_run_pipeline(config):
         called["config"] = config
+        return set()
 
     monkeypatch.setattr(
         "pipelines.sources.github.pipeline._run_ingest_pipeline",
@@ -67,6 +91,7 @@ def test_run_github_ingest_delegates_to_existing_pipeline(monkeypatch):
         "provider": "github",
         "operation": "ingest",
         "status": "succeeded",
+        "changed_partitions": [],
     }
 
 
@@ -129,6 +154,129 @@ def test_run_github_compact_raises_after_collecting_failures(monkeypatch):
         raise AssertionError("RuntimeError was not raised")
 
 
+def _run_with_summary(result_summary: dict | None) -> WorkflowRun:
+    return WorkflowRun(
+        run_id="run-1",
+        workflow_id="spotify_ingest_workflow",
+        trigger_type=TriggerType.SCHEDULE,
+        queued_reason=QueuedReason.SCHEDULE_TICK,
+        status=WorkflowRunStatus.RUNNING,
+        scheduled_at=None,
+        queued_at=datetime(2026, 4, 1, tzinfo=UTC),
+        started_at=None,
+        finished_at=None,
+        last_error_message=None,
+        requested_by="system",
+        parent_run_id=None,
+        result_summary=result_summary,
+    )
+
+
+def test_compact_spotify_from_ingest_context_compacts_only_changed_partitions(
+    monkeypatch,
+):
+    """ingest が申告した partition だけを compact する。"""
+    calls = []
+
+    class FakeStorage:
+        def __init__(self, **kwargs):
+            pass
+
+        def compact_month(self, **kwargs):
+            calls.append((kwargs["dataset_path"], kwargs["year"], kwargs["month"]))
+            return f"compacted/{kwargs['dataset_path']}/data.parquet"
+
+    monkeypatch.setattr(
+        "pipelines.sources.spotify.pipeline.SpotifyStorage",
+        FakeStorage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.spotify.pipeline.PipelinesSettings.load",
+        _config,
+    )
+    run = _run_with_summary(
+        {
+            "changed_partitions": [
+                {"dataset": "spotify/plays", "year": 2025, "month": 12},
+                {"dataset": "spotify/tracks", "year": 2026, "month": 4},
+            ]
+        }
+    )
+
+    result = compact_spotify_from_ingest_context(run)
+
+    assert calls == [("spotify/plays", 2025, 12), ("spotify/tracks", 2026, 4)]
+    assert result["target_months"] == ["2025-12", "2026-04"]
+
+
+def test_compact_google_activity_from_ingest_context_dedupes_by_dataset(
+    monkeypatch,
+):
+    """視聴履歴は watch_id、マスターは最新 updated_at で compact する。"""
+    calls = []
+
+    class FakeStorage:
+        def __init__(self, **kwargs):
+            pass
+
+        def compact_month(self, **kwargs):
+            calls.append(kwargs)
+            return f"compacted/{kwargs['dataset_path']}/data.parquet"
+
+    monkeypatch.setattr(
+        "pipelines.sources.google_activity.pipeline.YouTubeStorage",
+        FakeStorage,
+    )
+    monkeypatch.setattr(
+        "pipelines.sources.google_activity.pipeline.PipelinesSettings.load",
+        _config,
+    )
+    run = _run_with_summary(
+        {
+            "changed_partitions": [
+                {"dataset": "youtube/watch_history", "year": 2026, "month": 3},
+                {"dataset": "youtube/videos", "year": 2026, "month": 4},
+            ]
+        }
+    )
+
+    result = compact_google_activity_from_ingest_context(run)
+
+    assert [
+        (c["data_domain"], c["dataset_path"], c["dedupe_key"], c["sort_by"])
+        for c in calls
+    ] == [
+        ("events", "youtube/watch_history", "watch_id", "watched_at_utc"),
+        ("master", "youtube/videos", "video_id", "updated_at"),
+    ]
+    assert result["target_months"] == ["2026-03", "2026-04"]
+
+
+def test_compact_github_from_ingest_context_skips_when_nothing_changed(monkeypatch):
+    """ingest が変更なしを申告した場合は storage に触れず skip する。"""
+
+    class FailingStorage:
+        def __init__(self, **kwargs):
+            raise AssertionError("storage must not be created")
+
+    monkeypatch.setattr(
+        "pipelines.sources.github.pipeline.GitHubWorklogStorage",
+        FailingStorage,
+    )
+
+    result = compact_github_from_ingest_context(
+        _run_with_summary({"changed_partitions": []})
+    )
+
+    assert result == {
+        "provider": "github",
+        "operation": "compact",
+        "target_months": [],
+        "compacted_keys": [],
+        "skipped_targets": [],
+    }
+
+
 def test_all_inprocess_steps_are_importable():
     """全 INPROCESS step の callable_ref が import 可能であることを検証する。"""
     workflows = get_workflows()
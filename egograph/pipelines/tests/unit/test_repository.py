@@ -1,8 +1,12 @@
-from datetime import UTC, datetime
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta, timezone
 
+import pytest
+from pipelines.domain.errors import InvalidRunCursorError
 from pipelines.domain.schedule import TriggerSpec, TriggerSpecType
 from pipelines.domain.workflow import (
     QueuedReason,
+    RunPriority,
     StepDefinition,
     StepExecutorType,
     TriggerType,
@@ -97,3 +101,356 @@ def test_register_workflows_preserves_runtime_enabled_state(tmp_path):
 
     # Assert
     assert workflow_repository.get_workflow("dummy_workflow")["enabled"] is False
+
+
+def test_list_runs_page_paginates_with_keyset_cursor(tmp_path):
+    """cursor を辿ると run を重複・欠落なく新しい順に列挙できる。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    run_ids = [
+        run_repository.enqueue_run(
+            workflow_id="dummy_workflow",
+            trigger_type=TriggerType.MANUAL,
+            queued_reason=QueuedReason.MANUAL_REQUEST,
+        ).run_id
+        for _ in range(5)
+    ]
+
+    # Act
+    first_page = run_repository.list_runs_page(limit=2)
+    second_page = run_repository.list_runs_page(limit=2, cursor=first_page.next_cursor)
+    last_page = run_repository.list_runs_page(limit=2, cursor=second_page.next_cursor)
+
+    # Assert
+    listed = [run.run_id for run in first_page.runs + second_page.runs + last_page.runs]
+    assert sorted(listed) == sorted(run_ids)
+    assert listed == [run.run_id for run in run_repository.list_runs()]
+    assert last_page.next_cursor is None
+
+
+def test_list_runs_page_filters_by_status_and_queued_range(tmp_path):
+    """status と queued_at 範囲で run を絞り込める。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    canceled = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+    run_repository.cancel_run(canceled.run_id)
+    queued = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+
+    # Act
+    canceled_page = run_repository.list_runs_page(statuses=[WorkflowRunStatus.CANCELED])
+    future_page = run_repository.list_runs_page(
+        queued_after=datetime(2999, 1, 1, tzinfo=UTC)
+    )
+    range_page = run_repository.list_runs_page(
+        queued_after=queued.queued_at,
+        queued_before=datetime(2999, 1, 1, tzinfo=UTC),
+    )
+
+    # Assert
+    assert [run.run_id for run in canceled_page.runs] == [canceled.run_id]
+    assert future_page.runs == []
+    assert [run.run_id for run in range_page.runs] == [queued.run_id]
+
+
+def test_list_runs_page_normalizes_queued_range_offsets(tmp_path):
+    """UTC 以外のオフセットを持つ範囲指定も UTC に揃えて比較する。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    queued = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+    jst = timezone(timedelta(hours=9))
+    est = timezone(timedelta(hours=-5))
+
+    # Act
+    range_page = run_repository.list_runs_page(
+        queued_after=queued.queued_at.astimezone(jst),
+        queued_before=(queued.queued_at + timedelta(seconds=1)).astimezone(est),
+    )
+
+    # Assert
+    assert [run.run_id for run in range_page.runs] == [queued.run_id]
+
+
+def test_list_runs_page_rejects_invalid_cursor(tmp_path):
+    """不正な cursor は InvalidRunCursorError にする。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    run_repository = RunRepository(workflow_repository, conn)
+
+    # Act / Assert
+    with pytest.raises(InvalidRunCursorError):
+        run_repository.list_runs_page(limit=10, cursor="not-a-cursor")
+
+
+def test_enqueue_run_coalesces_into_queued_event_run(tmp_path):
+    """coalesce 指定の event run は queued run へ payload を merge する。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    first = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.EVENT,
+        queued_reason=QueuedReason.EVENT_ENQUEUE,
+        result_summary={"compaction_targets": [{"year": 2026, "month": 3}]},
+        coalesce=True,
+    )
+
+    # Act
+    second = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.EVENT,
+        queued_reason=QueuedReason.EVENT_ENQUEUE,
+        result_summary={
+            "compaction_targets": [
+                {"year": 2026, "month": 3},
+                {"year": 2026, "month": 4},
+            ]
+        },
+        coalesce=True,
+    )
+
+    # Assert
+    assert second.run_id == first.run_id
+    assert second.coalesced_count == 1
+    assert second.result_summary == {
+        "compaction_targets": [
+            {"year": 2026, "month": 3},
+            {"year": 2026, "month": 4},
+        ]
+    }
+    assert len(run_repository.list_runs()) == 1
+
+
+def test_enqueue_run_does_not_coalesce_into_running_run(tmp_path):
+    """lease 済みの run には merge せず新しい queued run を作る。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    first = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.EVENT,
+        queued_reason=QueuedReason.EVENT_ENQUEUE,
+        result_summary={"compaction_targets": [{"year": 2026, "month": 3}]},
+        coalesce=True,
+    )
+    run_repository.lease_next_queued_run()
+
+    # Act
+    second = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.EVENT,
+        queued_reason=QueuedReason.EVENT_ENQUEUE,
+        result_summary={"compaction_targets": [{"year": 2026, "month": 4}]},
+        coalesce=True,
+    )
+
+    # Assert
+    assert second.run_id != first.run_id
+    assert second.status == WorkflowRunStatus.QUEUED
+    assert second.coalesced_count == 0
+    assert run_repository.get_run(first.run_id).result_summary == {
+        "compaction_targets": [{"year": 2026, "month": 3}]
+    }
+
+
+def test_enqueue_run_coalesces_into_parked_waiting_run(tmp_path):
+    """lock 待ちで waiting に parked された run にも payload を merge する。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    first = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.EVENT,
+        queued_reason=QueuedReason.EVENT_ENQUEUE,
+        result_summary={"compaction_targets": [{"year": 2026, "month": 3}]},
+        coalesce=True,
+    )
+    run_repository.lease_next_queued_run()
+    run_repository.park_run(first.run_id, reason="lock busy")
+
+    # Act
+    second = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.EVENT,
+        queued_reason=QueuedReason.EVENT_ENQUEUE,
+        result_summary={"compaction_targets": [{"year": 2026, "month": 4}]},
+        coalesce=True,
+    )
+    resumed = run_repository.resume_waiting_run(first.run_id)
+
+    # Assert
+    assert second.run_id == first.run_id
+    assert second.status == WorkflowRunStatus.WAITING
+    assert second.coalesced_count == 1
+    assert len(run_repository.list_runs()) == 1
+    assert resumed is not None
+    assert resumed.result_summary == {
+        "compaction_targets": [
+            {"year": 2026, "month": 3},
+            {"year": 2026, "month": 4},
+        ]
+    }
+
+
+def test_initialize_schema_adds_columns_to_existing_database(tmp_path):
+    """旧 schema の DB にも後から追加した列を補う。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    conn.execute(
+        """
+        CREATE TABLE workflow_runs (
+            run_id TEXT PRIMARY KEY,
+            workflow_id TEXT NOT NULL,
+            trigger_type TEXT NOT NULL,
+            queued_reason TEXT NOT NULL,
+            status TEXT NOT NULL,
+            scheduled_at TEXT,
+            queued_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            last_error_message TEXT,
+            requested_by TEXT NOT NULL,
+            parent_run_id TEXT,
+            result_summary_json TEXT
+        )
+        """
+    )
+
+    # Act
+    initialize_schema(conn)
+
+    # Assert
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(workflow_runs)")}
+    indexes = {row["name"] for row in conn.execute("PRAGMA index_list(workflow_runs)")}
+    assert "coalesced_count" in columns
+    assert "priority" in columns
+    assert "idx_workflow_runs_status_priority_queued_at" in indexes
+
+
+def _enqueue(run_repository, trigger_type, queued_reason):
+    return run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=trigger_type,
+        queued_reason=queued_reason,
+    )
+
+
+def test_lease_next_queued_run_prefers_higher_priority_lane(tmp_path):
+    """event > manual > schedule > reconcile の順に lease する。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    reconcile = _enqueue(
+        run_repository, TriggerType.RECONCILE, QueuedReason.STARTUP_RECONCILE
+    )
+    schedule = _enqueue(
+        run_repository, TriggerType.SCHEDULE, QueuedReason.SCHEDULE_TICK
+    )
+    manual = _enqueue(run_repository, TriggerType.MANUAL, QueuedReason.MANUAL_REQUEST)
+    event = _enqueue(run_repository, TriggerType.EVENT, QueuedReason.EVENT_ENQUEUE)
+
+    # Act
+    leased = [run_repository.lease_next_queued_run() for _ in range(5)]
+
+    # Assert
+    assert [run.run_id for run in leased[:4]] == [
+        event.run_id,
+        manual.run_id,
+        schedule.run_id,
+        reconcile.run_id,
+    ]
+    assert leased[4] is None
+    assert event.priority == RunPriority.EVENT
+    assert reconcile.priority == RunPriority.RECONCILE
+
+
+def test_lease_next_queued_run_ages_long_waiting_low_priority_run(tmp_path):
+    """待機時間が長い低優先度 run は aging により高優先度 run を追い越す。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    schedule = _enqueue(
+        run_repository, TriggerType.SCHEDULE, QueuedReason.SCHEDULE_TICK
+    )
+    event = _enqueue(run_repository, TriggerType.EVENT, QueuedReason.EVENT_ENQUEUE)
+    old_queued_at = datetime.now(tz=UTC) - timedelta(hours=1)
+    conn.execute(
+        "UPDATE workflow_runs SET queued_at = ? WHERE run_id = ?",
+        (old_queued_at.isoformat(), schedule.run_id),
+    )
+    conn.commit()
+
+    # Act
+    without_aging = run_repository.lease_next_queued_run(aging_seconds=0)
+    conn.execute(
+        "UPDATE workflow_runs SET status = 'queued' WHERE run_id = ?",
+        (without_aging.run_id,),
+    )
+    conn.commit()
+    with_aging = run_repository.lease_next_queued_run(aging_seconds=600)
+
+    # Assert
+    assert without_aging.run_id == event.run_id
+    assert with_aging.run_id == schedule.run_id
+
+
+def test_lease_next_queued_run_applies_min_priority_and_workflow_boost(tmp_path):
+    """min_priority 未満の lane は lease せず、priority_boost を加算する。"""
+    # Arrange
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows(
+        {"dummy_workflow": replace(_workflow(), priority_boost=-1)}
+    )
+    run_repository = RunRepository(workflow_repository, conn)
+    manual = _enqueue(run_repository, TriggerType.MANUAL, QueuedReason.MANUAL_REQUEST)
+
+    # Act
+    restricted = run_repository.lease_next_queued_run(min_priority=RunPriority.EVENT)
+    unrestricted = run_repository.lease_next_queued_run()
+
+    # Assert
+    assert manual.priority == RunPriority.MANUAL - 1
+    assert restricted is None
+    assert unrestricted.run_id == manual.run_id
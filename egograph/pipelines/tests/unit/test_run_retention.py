@@ -0,0 +1,164 @@
+import gzip
+import json
+from datetime import UTC, datetime, timedelta
+
+from pipelines.domain.workflow import (
+    QueuedReason,
+    StepDefinition,
+    StepExecutorType,
+    StepRunStatus,
+    TriggerType,
+    WorkflowDefinition,
+    WorkflowRunStatus,
+)
+from pipelines.infrastructure.db.connection import connect
+from pipelines.infrastructure.db.run_repository import RunRepository
+from pipelines.infrastructure.db.schema import initialize_schema
+from pipelines.infrastructure.db.step_run_repository import StepRunRepository
+from pipelines.infrastructure.db.workflow_repository import WorkflowRepository
+from pipelines.infrastructure.execution.log_store import LocalLogStore
+from pipelines.infrastructure.retention.run_retention import (
+    RunArchiveStore,
+    RunRetentionPolicy,
+)
+
+
+def _workflow() -> WorkflowDefinition:
+    return WorkflowDefinition(
+        workflow_id="dummy_workflow",
+        name="Dummy workflow",
+        description="Dummy workflow for tests",
+        steps=(
+            StepDefinition(
+                step_id="step_1",
+                step_name="Step 1",
+                executor_type=StepExecutorType.INPROCESS,
+                callable_ref="pipelines.tests.support.dummy_steps:succeed",
+            ),
+        ),
+    )
+
+
+def _build(tmp_path, *, batch_size=500):
+    conn = connect(tmp_path / "state.sqlite3")
+    initialize_schema(conn)
+    workflow_repository = WorkflowRepository(conn)
+    workflow_repository.register_workflows({"dummy_workflow": _workflow()})
+    run_repository = RunRepository(workflow_repository, conn)
+    step_run_repository = StepRunRepository(conn)
+    log_store = LocalLogStore(tmp_path / "logs")
+    policy = RunRetentionPolicy(
+        run_repository=run_repository,
+        step_run_repository=step_run_repository,
+        log_store=log_store,
+        archive_store=RunArchiveStore(tmp_path / "archive"),
+        retention_days=30,
+        batch_size=batch_size,
+    )
+    return conn, run_repository, step_run_repository, log_store, policy
+
+
+def _finished_run(conn, run_repository, step_run_repository, log_store, finished_at):
+    run = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+    step = step_run_repository.insert_step_run(
+        run_id=run.run_id,
+        step_id="step_1",
+        step_name="Step 1",
+        sequence_no=1,
+        attempt_no=1,
+        command="pipelines.tests.support.dummy_steps:succeed",
+    )
+    log_path = log_store.write_step_log(
+        workflow_id="dummy_workflow",
+        run_id=run.run_id,
+        step_id="step_1",
+        attempt_no=1,
+        stdout_text="ok",
+        stderr_text="",
+    )
+    step_run_repository.update_step_result(
+        step_run_id=step.step_run_id,
+        status=StepRunStatus.SUCCEEDED,
+        log_path=log_path,
+    )
+    run_repository.update_run_result(
+        run_id=run.run_id,
+        status=WorkflowRunStatus.SUCCEEDED,
+        result_summary={"message": "ok"},
+    )
+    with conn:
+        conn.execute(
+            "UPDATE workflow_runs SET finished_at = ? WHERE run_id = ?",
+            (finished_at.isoformat(), run.run_id),
+        )
+    return run
+
+
+def test_apply_archives_and_deletes_expired_runs_in_batches(tmp_path):
+    """保持期間外の run を archive し、行とログディレクトリを削除する。"""
+    # Arrange
+    conn, run_repository, step_run_repository, log_store, policy = _build(
+        tmp_path, batch_size=2
+    )
+    now = datetime(2026, 6, 1, tzinfo=UTC)
+    expired = [
+        _finished_run(
+            conn,
+            run_repository,
+            step_run_repository,
+            log_store,
+            now - timedelta(days=40 + offset),
+        )
+        for offset in range(3)
+    ]
+    recent = _finished_run(
+        conn, run_repository, step_run_repository, log_store, now - timedelta(days=1)
+    )
+    queued = run_repository.enqueue_run(
+        workflow_id="dummy_workflow",
+        trigger_type=TriggerType.MANUAL,
+        queued_reason=QueuedReason.MANUAL_REQUEST,
+    )
+
+    # Act
+    summary = policy.apply(now=now)
+
+    # Assert
+    assert summary["archived_runs"] == 3
+    assert summary["deleted_step_runs"] == 3
+    assert summary["deleted_log_dirs"] == 3
+    remaining = {run.run_id for run in run_repository.list_runs()}
+    assert remaining == {recent.run_id, queued.run_id}
+    for run in expired:
+        assert step_run_repository.list_step_runs(run.run_id) == []
+        assert not (tmp_path / "logs" / "dummy_workflow" / run.run_id).exists()
+    assert (tmp_path / "logs" / "dummy_workflow" / recent.run_id).exists()
+    with gzip.open(summary["archive_paths"][0], "rt", encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle]
+    assert {record["run"]["run_id"] for record in records} == {
+        run.run_id for run in expired
+    }
+    assert records[0]["steps"][0]["step_id"] == "step_1"
+    assert records[0]["run"]["result_summary"] == {"message": "ok"}
+
+
+def test_apply_is_noop_when_retention_disabled(tmp_path):
+    """retention_days が 0 以下なら何も削除しない。"""
+    # Arrange
+    conn, run_repository, step_run_repository, log_store, policy = _build(tmp_path)
+    now = datetime(2026, 6, 1, tzinfo=UTC)
+    _finished_run(
+        conn, run_repository, step_run_repository, log_store, now - timedelta(days=90)
+    )
+
+    # Act
+    summary = policy.apply(retention_days=0, now=now)
+
+    # Assert
+    assert summary["archived_runs"] == 0
+    assert len(run_repository.list_runs()) == 1
+    assert not (tmp_path / "archive").exists()
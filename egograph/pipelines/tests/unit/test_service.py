@@ -3,9 +3,14 @@
 retry_run, cancel_run, get_step_log などの運用機能を検証する。
 """
 
+import pytest
 from pipelines.config import PipelinesConfig
-from pipelines.domain.errors import WorkflowNotFoundError, WorkflowRunNotFoundError
-from pipelines.domain.workflow import StepRunStatus
+from pipelines.domain.errors import (
+    RunNotResumableError,
+    WorkflowNotFoundError,
+    WorkflowRunNotFoundError,
+)
+from pipelines.domain.workflow import StepRunStatus, WorkflowRunStatus
 from pipelines.service import PipelineService
 from pydantic import SecretStr
 
@@ -35,6 +40,64 @@ def test_retry_run_creates_new_queued_run(tmp_path):
     assert retry_run.parent_run_id == original_run.run_id
 
 
+def _record_step(service, run_id, step_id, sequence_no, status, summary=None):
+    step = service.step_run_repository.insert_step_run(
+        run_id=run_id,
+        step_id=step_id,
+        step_name=step_id,
+        sequence_no=sequence_no,
+        attempt_no=1,
+        command=step_id,
+    )
+    service.step_run_repository.update_step_result(
+        step_run_id=step.step_run_id,
+        status=status,
+        result_summary=summary,
+    )
+
+
+def test_retry_run_resume_starts_from_failed_resumable_step(tmp_path):
+    """resume retry は失敗 step から再開し、成功 step の出力を context に引き継ぐ。"""
+    # Arrange
+    service = _make_service(tmp_path)
+    original_run = service.trigger_workflow("spotify_ingest_workflow")
+    _record_step(
+        service,
+        original_run.run_id,
+        "run_spotify_ingest",
+        1,
+        StepRunStatus.SUCCEEDED,
+        {"plays_saved": 12},
+    )
+    _record_step(
+        service, original_run.run_id, "run_spotify_compact", 2, StepRunStatus.FAILED
+    )
+    service.run_repository.update_run_result(
+        run_id=original_run.run_id,
+        status=WorkflowRunStatus.FAILED,
+        error_message="compact failed",
+    )
+
+    # Act
+    resumed = service.retry_run(original_run.run_id, resume=True)
+
+    # Assert
+    assert resumed.parent_run_id == original_run.run_id
+    assert resumed.resume_from_step_id == "run_spotify_compact"
+    assert resumed.result_summary == {"plays_saved": 12}
+
+
+def test_retry_run_resume_rejects_non_failed_run(tmp_path):
+    """失敗していない run は resume retry できない。"""
+    # Arrange
+    service = _make_service(tmp_path)
+    run = service.trigger_workflow("spotify_ingest_workflow")
+
+    # Act & Assert
+    with pytest.raises(RunNotResumableError):
+        service.retry_run(run.run_id, resume=True)
+
+
 def test_retry_run_404_for_unknown_run(tmp_path):
     """存在しない run_id のリトライは例外を送出する。"""
     service = _make_service(tmp_path)
@@ -108,3 +171,24 @@ def test_get_step_log_404_for_missing_step(tmp_path):
         raise AssertionError("Should have raised WorkflowNotFoundError")
     except WorkflowNotFoundError:
         pass
+
+
+def test_enqueue_browser_history_compact_coalesces_burst_into_one_run(tmp_path):
+    """連続した ingest の compact event は1つの queued run にまとまる。"""
+    service = _make_service(tmp_path)
+
+    runs = [
+        service.enqueue_browser_history_compact([(2026, 4)]),
+        service.enqueue_browser_history_compact([(2026, 4)]),
+        service.enqueue_browser_history_compact([(2026, 3), (2026, 4)]),
+    ]
+
+    assert {run.run_id for run in runs} == {runs[0].run_id}
+    merged = service.run_repository.get_run(runs[0].run_id)
+    assert merged.coalesced_count == 2
+    assert merged.result_summary == {
+        "compaction_targets": [
+            {"year": 2026, "month": 4},
+            {"year": 2026, "month": 3},
+        ]
+    }
@@ -17,6 +17,7 @@ def _inprocess_step(
     *,
     timeout_seconds: int = 1800,
     max_attempts: int = 1,
+    resumable: bool = False,
 ) -> StepDefinition:
     return StepDefinition(
         step_id=step_id,
@@ -25,6 +26,7 @@ def _inprocess_step(
         callable_ref=callable_ref,
         timeout_seconds=timeout_seconds,
         max_attempts=max_attempts,
+        resumable=resumable,
     )
 
 
@@ -35,6 +37,7 @@ def _subprocess_step(
     *,
     timeout_seconds: int = 1800,
     max_attempts: int = 1,
+    resumable: bool = False,
 ) -> StepDefinition:
     return StepDefinition(
         step_id=step_id,
@@ -43,6 +46,7 @@ def _subprocess_step(
         command=command,
         timeout_seconds=timeout_seconds,
         max_attempts=max_attempts,
+        resumable=resumable,
     )
 
 
@@ -63,8 +67,10 @@ def get_workflows() -> dict[str, WorkflowDefinition]:
                 _inprocess_step(
                     "run_spotify_compact",
                     "Run Spotify compact",
-                    "pipelines.sources.spotify.pipeline:run_spotify_compact",
+                    "pipelines.sources.spotify.pipeline:"
+                    "compact_spotify_from_ingest_context",
                     timeout_seconds=1800,
+                    resumable=True,
                 ),
             ),
             triggers=(
@@ -92,8 +98,10 @@ def get_workflows() -> dict[str, WorkflowDefinition]:
                 _inprocess_step(
                     "run_github_compact",
                     "Run GitHub compact",
-                    "pipelines.sources.github.pipeline:run_github_compact",
+                    "pipelines.sources.github.pipeline:"
+                    "compact_github_from_ingest_context",
                     timeout_seconds=1800,
+                    resumable=True,
                 ),
             ),
             triggers=(TriggerSpec(TriggerSpecType.CRON, "0 15 * * *"),),
@@ -104,7 +112,7 @@ def get_workflows() -> dict[str, WorkflowDefinition]:
         WorkflowDefinition(
             workflow_id="google_activity_ingest_workflow",
             name="Google Activity ingest workflow",
-            description="Collect YouTube watch history from Google MyActivity",
+            description="Collect and compact YouTube watch history datasets",
             steps=(
                 _inprocess_step(
                     "run_google_activity_ingest",
@@ -112,11 +120,21 @@ def get_workflows() -> dict[str, WorkflowDefinition]:
                     "pipelines.sources.google_activity.main:main",
                     timeout_seconds=3600,
                 ),
+                _inprocess_step(
+                    "run_google_activity_compact",
+                    "Run Google Activity compact",
+                    "pipelines.sources.google_activity.pipeline:"
+                    "compact_google_activity_from_ingest_context",
+                    timeout_seconds=1800,
+                    resumable=True,
+                ),
             ),
             triggers=(TriggerSpec(TriggerSpecType.CRON, "0 14 * * *"),),
             concurrency_key="google_activity_ingest_workflow",
             timeout_seconds=7200,
             misfire_policy=MisfirePolicy.COALESCE_LATEST,
+            # 長時間の scrape は同じ lane の他 workflow より後に回す。
+            priority_boost=-1,
         ),
         WorkflowDefinition(
             workflow_id="local_mirror_sync_workflow",
@@ -129,6 +147,13 @@ def get_workflows() -> dict[str, WorkflowDefinition]:
                     "pipelines.sources.local_mirror_sync.pipeline:run_local_mirror_sync",
                     timeout_seconds=1800,
                 ),
+                _inprocess_step(
+                    "run_local_warehouse_refresh",
+                    "Refresh local DuckDB warehouse",
+                    "pipelines.sources.local_warehouse.pipeline:"
+                    "run_local_warehouse_refresh",
+                    timeout_seconds=1800,
+                ),
             ),
             triggers=(TriggerSpec(TriggerSpecType.INTERVAL, "6h"),),
             concurrency_key="local_mirror_sync_workflow",
@@ -151,6 +176,7 @@ def get_workflows() -> dict[str, WorkflowDefinition]:
             concurrency_key="browser_history_compact_workflow",
             timeout_seconds=3600,
             misfire_policy=MisfirePolicy.SKIP_MISFIRE,
+            coalesce_event_runs=True,
         ),
         WorkflowDefinition(
             workflow_id="browser_history_compact_maintenance_workflow",